@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Load test: per-request httpx clients vs the pooled QueueManager forwarding path.
+
+Starts a local stand-in OmniParser (FastAPI on 127.0.0.1) that sleeps for a
+fixed "processing" time and returns a small parse result, then fires the same
+workload through:
+
+  fresh   - a new httpx.AsyncClient per request (previous behaviour)
+  pooled  - QueueManager._forward_to_omniparser with its long-lived pool
+
+and prints p50/p99 request latency plus the pool's connection reuse stats.
+
+Usage:
+    python scripts/load_test_forwarding.py [--requests 200] [--concurrency 4]
+                                           [--image-kb 2048] [--process-ms 20]
+"""
+
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+
+from queue_service.config import QueueServiceConfig, set_config  # noqa: E402
+from queue_service.queue_manager import QueueManager, QueuedRequest  # noqa: E402
+
+
+def make_standin(process_s: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/parse/")
+    async def parse(request: Request):
+        body = await request.body()
+        await asyncio.sleep(process_s)
+        return {"parsed_content_list": [{"type": "text", "content": "OK", "bbox": [0, 0, 1, 1]}],
+                "latency": process_s, "received_bytes": len(body)}
+
+    @app.get("/probe/")
+    async def probe():
+        return {"message": "ok"}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def summarize(name: str, latencies, wall: float):
+    lat_ms = sorted(x * 1000 for x in latencies)
+    p99 = lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * 0.99))]
+    print(f"{name:<8} n={len(lat_ms):<5} wall={wall:6.2f}s  "
+          f"p50={statistics.median(lat_ms):7.2f}ms  p99={p99:7.2f}ms  max={lat_ms[-1]:7.2f}ms")
+
+
+async def run_load(send, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            t0 = time.perf_counter()
+            await send(i)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return latencies, time.perf_counter() - t0
+
+
+async def main_async(args):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config(make_standin(args.process_ms / 1000),
+                                           host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    image = base64.b64encode(os.urandom(args.image_kb * 1024 * 3 // 4)).decode()
+    payload = {"base64_image": image, "box_threshold": 0.05}
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, "
+          f"{len(image) // 1024} KB base64 image, {args.process_ms}ms stand-in processing")
+
+    async def fresh(_):
+        async with httpx.AsyncClient(timeout=60) as client:
+            r = await client.post(f"{url}/parse/", json=payload)
+            r.raise_for_status()
+
+    set_config(QueueServiceConfig(omniparser_urls=[url], pool_max_connections=args.concurrency,
+                                  pool_max_keepalive=args.concurrency, http2=args.http2))
+    manager = QueueManager()
+    await manager.start()
+
+    async def pooled(i):
+        await manager._forward_to_omniparser(QueuedRequest(request_id=str(i), payload=payload))
+
+    # Warm up both paths once so neither pays first-import costs in the numbers
+    await fresh(0)
+    await pooled(0)
+
+    latencies, wall = await run_load(fresh, args.requests, args.concurrency)
+    summarize("fresh", latencies, wall)
+    latencies, wall = await run_load(pooled, args.requests, args.concurrency)
+    summarize("pooled", latencies, wall)
+    print(f"pool stats: {manager.get_pool_stats()[url]}")
+
+    await manager.stop()
+    server.should_exit = True
+    await server_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue service forwarding load test")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--image-kb", type=int, default=2048, help="Raw image size before base64")
+    parser.add_argument("--process-ms", type=float, default=20.0)
+    parser.add_argument("--http2", action="store_true", help="Enable HTTP/2 on the pooled client")
+    args = parser.parse_args()
+
+    # Importing queue_service configures INFO logging; keep the output to the results
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main_async(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
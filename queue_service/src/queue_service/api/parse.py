@@ -3,7 +3,7 @@ Parse API endpoint - queues and forwards parse requests to OmniParser.
 """
 
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 
 from ..queue_manager import get_queue_manager, ParseRequest
 
@@ -12,7 +12,7 @@ router = APIRouter()
 
 
 @router.post("/parse/")
-async def parse_image(request: ParseRequest):
+async def parse_image(request: ParseRequest, response: Response):
     """
     Parse image endpoint - queues request and forwards to OmniParser.
     Compatible with OmniparserClient API format.
@@ -21,7 +21,9 @@ async def parse_image(request: ParseRequest):
         request: Parse request with base64_image and parameters
 
     Returns:
-        OmniParser response with parsed_content_list and som_image_base64
+        OmniParser response with parsed_content_list and som_image_base64.
+        X-Cache, X-Queue-Wait-Ms and X-Processing-Ms headers report where the
+        time went.
     """
     try:
         # Exclude None values to avoid sending null to OmniParser for optional fields like imgsz
@@ -29,8 +31,13 @@ async def parse_image(request: ParseRequest):
         logger.info(f"Received parse request (image size: {len(payload['base64_image'])} bytes)")
 
         manager = get_queue_manager()
-        result = await manager.enqueue_request(payload)
+        timing = {}
+        result = await manager.enqueue_request(payload, timing=timing)
 
+        response.headers["X-Cache"] = timing.get("cache", "off")
+        if "queue_wait_ms" in timing:
+            response.headers["X-Queue-Wait-Ms"] = str(timing["queue_wait_ms"])
+            response.headers["X-Processing-Ms"] = str(timing["processing_ms"])
         return result
 
     except Exception as e:
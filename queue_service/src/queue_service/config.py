@@ -38,6 +38,23 @@ class QueueServiceConfig:
     max_queue_size: int = 100   # Maximum number of requests in queue
     num_workers: int = 0        # Number of parallel workers (0 = auto: one per OmniParser URL)
 
+    # Connection pool to each OmniParser server (kept open between requests)
+    pool_max_connections: int = 8        # Per server
+    pool_max_keepalive: int = 4          # Idle keep-alive connections kept per server
+    pool_keepalive_expiry: float = 60.0  # Seconds an idle connection is kept
+    http2: bool = False                  # Requires the 'h2' package
+
+    # Priority scheduling (priority 1-10, lower = served first)
+    default_priority: int = 5
+    priority_aging_seconds: float = 10.0  # Waiting this long promotes a request by one priority level
+
+    # Parse result cache, keyed by image hash + OCR options
+    cache_enabled: bool = True
+    cache_max_mb: int = 256            # In-memory budget (0 = disabled)
+    cache_ttl_seconds: float = 3600.0
+    cache_dir: str = ""                # On-disk tier directory (empty = memory only)
+    cache_disk_max_mb: int = 2048      # On-disk budget (0 = unbounded)
+
     # Dashboard settings
     stats_history_size: int = 100  # Number of historical stats to keep
     job_history_size: int = 50     # Number of jobs to keep in history
@@ -56,6 +73,17 @@ class QueueServiceConfig:
             request_timeout=int(os.getenv("QUEUE_REQUEST_TIMEOUT", "120")),
             max_queue_size=int(os.getenv("QUEUE_MAX_SIZE", "100")),
             num_workers=int(os.getenv("QUEUE_NUM_WORKERS", "0")),  # 0 = auto
+            pool_max_connections=int(os.getenv("QUEUE_POOL_MAX_CONNECTIONS", "8")),
+            pool_max_keepalive=int(os.getenv("QUEUE_POOL_MAX_KEEPALIVE", "4")),
+            pool_keepalive_expiry=float(os.getenv("QUEUE_POOL_KEEPALIVE_EXPIRY", "60")),
+            http2=os.getenv("QUEUE_HTTP2", "false").lower() in ("1", "true", "yes"),
+            default_priority=int(os.getenv("QUEUE_DEFAULT_PRIORITY", "5")),
+            priority_aging_seconds=float(os.getenv("QUEUE_PRIORITY_AGING_SECONDS", "10")),
+            cache_enabled=os.getenv("QUEUE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+            cache_max_mb=int(os.getenv("QUEUE_CACHE_MAX_MB", "256")),
+            cache_ttl_seconds=float(os.getenv("QUEUE_CACHE_TTL_SECONDS", "3600")),
+            cache_dir=os.getenv("QUEUE_CACHE_DIR", ""),
+            cache_disk_max_mb=int(os.getenv("QUEUE_CACHE_DISK_MAX_MB", "2048")),
             stats_history_size=int(os.getenv("QUEUE_STATS_HISTORY", "100")),
             job_history_size=int(os.getenv("QUEUE_JOB_HISTORY", "50")),
             log_level=os.getenv("QUEUE_LOG_LEVEL", "INFO"),
@@ -3,6 +3,13 @@ Queue Manager - Core queue logic for OmniParser requests.
 
 Queues requests and forwards them sequentially to OmniParser server.
 Tracks job history and statistics for dashboard monitoring.
+
+Requests carry a priority (1-10, lower = served first). To keep low-priority
+work from starving, priorities age: every `priority_aging_seconds` spent
+waiting counts as one priority level. Because all requests age at the same
+rate this reduces to a static heap key of
+    priority * aging_seconds + enqueue_time
+so the queue never needs re-sorting.
 """
 
 import asyncio
@@ -15,9 +22,10 @@ from collections import deque
 import uuid
 
 import httpx
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .config import get_config
+from .result_cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +40,10 @@ class ParseRequest(BaseModel):
     use_local_semantics: bool = True # Use caption model for icon labeling
     scale_img: bool = False          # Scale image before processing
     imgsz: Optional[int] = None      # Image size for YOLO model (None = use original)
+    priority: Optional[int] = Field(default=None, ge=1, le=10)  # Queue priority, lower = sooner (not forwarded)
+
+MIN_PRIORITY = 1
+MAX_PRIORITY = 10
 
 
 @dataclass
@@ -44,6 +56,7 @@ class JobRecord:
     queue_wait_time: float
     error: Optional[str] = None
     image_size: int = 0  # Base64 image size in bytes
+    priority: int = 5
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -54,6 +67,7 @@ class JobRecord:
             "queue_wait_time": round(self.queue_wait_time, 3),
             "error": self.error,
             "image_size": self.image_size,
+            "priority": self.priority,
         }
 
 
@@ -62,8 +76,16 @@ class QueuedRequest:
     """Represents a queued request with its metadata."""
     request_id: str
     payload: Dict[str, Any]
+    priority: int = 5
     enqueued_at: datetime = field(default_factory=datetime.now)
+    enqueued_monotonic: float = field(default_factory=time.monotonic)
     response_future: asyncio.Future = field(default_factory=asyncio.Future)
+    queue_wait: float = 0.0       # Seconds spent queued (set by the worker)
+    processing_time: float = 0.0  # Seconds spent forwarding to OmniParser (set by the worker)
+
+    def sort_key(self, aging_seconds: float) -> float:
+        """Heap key with aging: each aging_seconds waited is worth one priority level."""
+        return self.priority * aging_seconds + self.enqueued_monotonic
 
     @property
     def queue_wait_time(self) -> float:
@@ -85,6 +107,9 @@ class QueueStats:
     avg_queue_wait_time: float = 0.0
     requests_per_minute: float = 0.0
     uptime_seconds: float = 0.0
+    priority_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    connection_pools: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    result_cache: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -99,6 +124,27 @@ class QueueStats:
             "avg_queue_wait_time": round(self.avg_queue_wait_time, 3),
             "requests_per_minute": round(self.requests_per_minute, 2),
             "uptime_seconds": round(self.uptime_seconds, 1),
+            "priority_stats": self.priority_stats,
+            "connection_pools": self.connection_pools,
+            "result_cache": self.result_cache,
+        }
+
+
+@dataclass
+class PoolStats:
+    """Connection reuse counters for one OmniParser server's pool."""
+    requests: int = 0
+    connections_opened: int = 0
+    http_version: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reused_requests": reused,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "http_version": self.http_version,
         }
 
 
@@ -114,6 +160,8 @@ class QueueManager:
         self.target_urls = target_urls or config.omniparser_urls
         self.timeout = timeout or config.request_timeout
         self.max_queue_size = config.max_queue_size
+        self.default_priority = config.default_priority
+        self.priority_aging_seconds = config.priority_aging_seconds
 
         # Number of workers: 0 = auto (one per OmniParser URL, min 2)
         configured_workers = num_workers if num_workers is not None else config.num_workers
@@ -122,7 +170,8 @@ class QueueManager:
         else:
             self.num_workers = configured_workers
 
-        self.request_queue: asyncio.Queue = None
+        self.request_queue: asyncio.PriorityQueue = None
+        self._enqueue_seq = 0  # Tie-breaker so equal keys stay FIFO
         self.worker_tasks: List[asyncio.Task] = []  # Multiple workers
 
         # Round-robin state with lock for thread safety
@@ -130,6 +179,26 @@ class QueueManager:
         self._server_index_lock = asyncio.Lock()
         self._server_health: Dict[str, bool] = {url: True for url in self.target_urls}
 
+        # Long-lived per-server HTTP clients (created in start(), closed in stop())
+        self.pool_limits = httpx.Limits(
+            max_connections=config.pool_max_connections,
+            max_keepalive_connections=config.pool_max_keepalive,
+            keepalive_expiry=config.pool_keepalive_expiry,
+        )
+        self.http2 = config.http2
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._pool_stats: Dict[str, PoolStats] = {url: PoolStats() for url in self.target_urls}
+
+        # Parse result cache (None = disabled)
+        self.result_cache: Optional[ResultCache] = None
+        if config.cache_enabled and config.cache_max_mb > 0:
+            self.result_cache = ResultCache(
+                max_bytes=config.cache_max_mb * 1024 * 1024,
+                ttl_seconds=config.cache_ttl_seconds,
+                disk_dir=config.cache_dir or None,
+                disk_max_bytes=config.cache_disk_max_mb * 1024 * 1024,
+            )
+
         # Statistics tracking
         self._stats = QueueStats(num_workers=self.num_workers)
         self._start_time = datetime.now()
@@ -137,6 +206,10 @@ class QueueManager:
         self._queue_wait_times: deque = deque(maxlen=100)
         self._request_timestamps: deque = deque(maxlen=100)
 
+        # Per-priority queue wait times and counts
+        self._priority_wait_times: Dict[int, deque] = {}
+        self._priority_counts: Dict[int, int] = {}
+
         # Job history
         self._job_history: deque = deque(maxlen=config.job_history_size)
 
@@ -161,10 +234,46 @@ class QueueManager:
             logger.warning("All OmniParser servers unhealthy, trying first server")
             return self.target_urls[0]
 
+    def _create_client(self, url: str) -> httpx.AsyncClient:
+        """Create the pooled client for one OmniParser server."""
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("QUEUE_HTTP2 enabled but 'h2' is not installed, using HTTP/1.1")
+                http2 = False
+        return httpx.AsyncClient(
+            base_url=url,
+            timeout=self.timeout,
+            limits=self.pool_limits,
+            http2=http2,
+        )
+
+    def _get_client(self, url: str) -> httpx.AsyncClient:
+        client = self._clients.get(url)
+        if client is None or client.is_closed:
+            client = self._create_client(url)
+            self._clients[url] = client
+        return client
+
+    def _trace_hook(self, url: str):
+        """httpcore trace callback counting new TCP connections for a server."""
+        stats = self._pool_stats.setdefault(url, PoolStats())
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                stats.connections_opened += 1
+
+        return trace
+
     async def start(self):
         """Start the queue manager and parallel workers."""
+        for url in self.target_urls:
+            self._get_client(url)
+
         if self.request_queue is None:
-            self.request_queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self.request_queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
 
         # Start multiple workers
         if not self.worker_tasks or all(t.done() for t in self.worker_tasks):
@@ -191,6 +300,10 @@ class QueueManager:
             self._stats.worker_running = False
             logger.info("All queue workers stopped")
 
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
     async def _worker(self, worker_id: int = 0):
         """Background worker that processes requests from the queue."""
         logger.info(f"Worker {worker_id} started")
@@ -198,15 +311,19 @@ class QueueManager:
         while True:
             try:
                 # Get next request from queue
-                queued_request: QueuedRequest = await self.request_queue.get()
+                _, _, queued_request = await self.request_queue.get()
+                queued_request: QueuedRequest
                 self._update_queue_depth()
 
                 queue_wait_time = queued_request.queue_wait_time
+                queued_request.queue_wait = queue_wait_time
                 self._queue_wait_times.append(queue_wait_time)
+                self._record_priority_wait(queued_request.priority, queue_wait_time)
 
                 logger.info(
                     f"[W{worker_id}] Processing request {queued_request.request_id} "
-                    f"(waited {queue_wait_time:.2f}s, queue size: {self.request_queue.qsize()})"
+                    f"(priority {queued_request.priority}, waited {queue_wait_time:.2f}s, "
+                    f"queue size: {self.request_queue.qsize()})"
                 )
 
                 # Process the request
@@ -218,13 +335,15 @@ class QueueManager:
                     processing_time=0,
                     queue_wait_time=queue_wait_time,
                     image_size=len(queued_request.payload.get("base64_image", "")),
+                    priority=queued_request.priority,
                 )
 
                 try:
                     response_data = await self._forward_to_omniparser(queued_request)
+                    processing_time = time.time() - start_time
+                    queued_request.processing_time = processing_time
                     queued_request.response_future.set_result(response_data)
 
-                    processing_time = time.time() - start_time
                     self._processing_times.append(processing_time)
                     self._request_timestamps.append(datetime.now())
 
@@ -272,32 +391,63 @@ class QueueManager:
         target_url = await self._get_next_server()
         logger.debug(f"Forwarding request {queued_request.request_id} to {target_url}")
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(
-                    f"{target_url}/parse/",
-                    json=queued_request.payload,
-                    headers={"Content-Type": "application/json"},
-                )
-
-                if response.status_code != 200:
-                    self._server_health[target_url] = False
-                    raise Exception(f"OmniParser error {response.status_code}: {response.text}")
-
-                # Mark server as healthy on success
-                self._server_health[target_url] = True
-                return response.json()
-
-            except httpx.ConnectError as e:
+        client = self._get_client(target_url)
+        stats = self._pool_stats.setdefault(target_url, PoolStats())
+        stats.requests += 1
+        try:
+            response = await client.post(
+                "/parse/",
+                json=queued_request.payload,
+                headers={"Content-Type": "application/json"},
+                extensions={"trace": self._trace_hook(target_url)},
+            )
+            stats.http_version = response.http_version
+
+            if response.status_code != 200:
                 self._server_health[target_url] = False
-                logger.error(f"Connection failed to {target_url}: {e}")
-                raise
-
-    async def enqueue_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Add a request to the queue and wait for its result."""
+                raise Exception(f"OmniParser error {response.status_code}: {response.text}")
+
+            # Mark server as healthy on success
+            self._server_health[target_url] = True
+            return response.json()
+
+        except httpx.ConnectError as e:
+            self._server_health[target_url] = False
+            logger.error(f"Connection failed to {target_url}: {e}")
+            raise
+
+    async def enqueue_request(self, payload: Dict[str, Any], timing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Add a request to the queue and wait for its result.
+
+        Served from the result cache when the same image was already parsed
+        with the same options; identical requests in flight share one parse.
+        If a timing dict is given it is filled with cache outcome, queue wait
+        and processing time (ms) for the caller to report.
+        """
+        if timing is None:
+            timing = {}
         if self.request_queue is None:
             await self.start()
 
+        # Priority is a queue concern only - don't forward it to OmniParser
+        payload = dict(payload)
+        priority = payload.pop("priority", None)
+        if priority is None:
+            priority = self.default_priority
+        priority = min(max(int(priority), MIN_PRIORITY), MAX_PRIORITY)
+
+        if self.result_cache is None:
+            timing["cache"] = "off"
+            return await self._enqueue(payload, priority, timing)
+        # Hits and requests coalesced onto another's parse never run _enqueue
+        timing["cache"] = "hit"
+        return await self.result_cache.get_or_compute(
+            payload, lambda: self._enqueue(payload, priority, timing, cache="miss")
+        )
+
+    async def _enqueue(self, payload: Dict[str, Any], priority: int,
+                       timing: Dict[str, Any], cache: str = "off") -> Dict[str, Any]:
+        """Queue a request for the workers and wait for its result."""
         # Generate unique request ID
         request_id = str(uuid.uuid4())[:8]
 
@@ -311,19 +461,29 @@ class QueueManager:
         queued_request = QueuedRequest(
             request_id=request_id,
             payload=payload,
+            priority=priority,
         )
 
         self._stats.total_requests += 1
 
         # Add to queue
-        await self.request_queue.put(queued_request)
+        self._enqueue_seq += 1
+        await self.request_queue.put(
+            (queued_request.sort_key(self.priority_aging_seconds), self._enqueue_seq, queued_request)
+        )
         self._update_queue_depth()
 
-        queue_position = self.request_queue.qsize()
-        logger.info(f"Request {request_id} queued at position {queue_position}")
+        queue_size = self.request_queue.qsize()
+        logger.info(f"Request {request_id} queued with priority {priority} (queue size: {queue_size})")
 
         # Wait for result
-        return await queued_request.response_future
+        result = await queued_request.response_future
+        timing.update({
+            "cache": cache,
+            "queue_wait_ms": round(queued_request.queue_wait * 1000, 1),
+            "processing_ms": round(queued_request.processing_time * 1000, 1),
+        })
+        return result
 
     def _update_queue_depth(self):
         """Update queue depth history."""
@@ -333,6 +493,29 @@ class QueueManager:
         })
         self._stats.current_queue_size = self.request_queue.qsize() if self.request_queue else 0
 
+    def _record_priority_wait(self, priority: int, wait_time: float):
+        """Track queue wait time per priority level."""
+        if priority not in self._priority_wait_times:
+            self._priority_wait_times[priority] = deque(maxlen=100)
+        self._priority_wait_times[priority].append(wait_time)
+        self._priority_counts[priority] = self._priority_counts.get(priority, 0) + 1
+
+    def _compute_priority_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-priority wait-time summary over the recent window."""
+        stats = {}
+        for priority in sorted(self._priority_wait_times):
+            waits = sorted(self._priority_wait_times[priority])
+            if not waits:
+                continue
+            p95_index = min(len(waits) - 1, int(len(waits) * 0.95))
+            stats[str(priority)] = {
+                "count": self._priority_counts.get(priority, 0),
+                "avg_wait_time": round(sum(waits) / len(waits), 3),
+                "p95_wait_time": round(waits[p95_index], 3),
+                "max_wait_time": round(waits[-1], 3),
+            }
+        return stats
+
     def _update_stats(self):
         """Update running statistics."""
         # Average processing time
@@ -351,11 +534,26 @@ class QueueManager:
         # Uptime
         self._stats.uptime_seconds = (datetime.now() - self._start_time).total_seconds()
 
+        # Per-priority wait times
+        self._stats.priority_stats = self._compute_priority_stats()
+
+        # Connection reuse per OmniParser server
+        self._stats.connection_pools = self.get_pool_stats()
+
+        # Result cache
+        self._stats.result_cache = (
+            self.result_cache.get_stats() if self.result_cache else {"enabled": False}
+        )
+
     def get_stats(self) -> QueueStats:
         """Get current queue statistics."""
         self._update_stats()
         return self._stats
 
+    def get_pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get connection reuse stats per OmniParser server."""
+        return {url: stats.to_dict() for url, stats in self._pool_stats.items()}
+
     def get_job_history(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recent job history."""
         return [job.to_dict() for job in list(self._job_history)[:limit]]
@@ -367,26 +565,26 @@ class QueueManager:
     async def health_check(self) -> List[Dict[str, Any]]:
         """Check health of all OmniParser servers."""
         results = []
-        async with httpx.AsyncClient(timeout=5, follow_redirects=True) as client:
-            for url in self.target_urls:
-                try:
-                    # Use trailing slash - OmniParser requires it
-                    response = await client.get(f"{url}/probe/")
-                    response.raise_for_status()
-                    self._server_health[url] = True
-                    results.append({
-                        "url": url,
-                        "status": "healthy",
-                        "response": response.json(),
-                    })
-                except Exception as e:
-                    self._server_health[url] = False
-                    logger.error(f"Health check failed for {url}: {e}")
-                    results.append({
-                        "url": url,
-                        "status": "unhealthy",
-                        "error": str(e),
-                    })
+        for url in self.target_urls:
+            client = self._get_client(url)
+            try:
+                # Use trailing slash - OmniParser requires it
+                response = await client.get("/probe/", timeout=5, follow_redirects=True)
+                response.raise_for_status()
+                self._server_health[url] = True
+                results.append({
+                    "url": url,
+                    "status": "healthy",
+                    "response": response.json(),
+                })
+            except Exception as e:
+                self._server_health[url] = False
+                logger.error(f"Health check failed for {url}: {e}")
+                results.append({
+                    "url": url,
+                    "status": "unhealthy",
+                    "error": str(e),
+                })
         return results
 
     def get_server_health(self) -> Dict[str, bool]:
@@ -0,0 +1,266 @@
+"""
+Result Cache - content-hash cache for OmniParser parse results.
+
+Campaigns parse the same screens (main menu, graphics settings, results) on
+every iteration and every SUT. Results are keyed by a SHA-256 of the image
+plus the OCR options that affect the output, so identical screenshots with the
+same config are answered without touching a backend.
+
+Tiers:
+- Memory: LRU bounded by an approximate byte budget, entries expire after TTL
+- Disk (optional): one JSON file per key, also TTL'd and size-bounded
+
+Identical requests that arrive while the first one is still being parsed are
+coalesced onto the same future, so only one reaches OmniParser.
+
+Callers get their own copy of a result; the cached one is never handed out.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Request fields that never change the parse output
+_NON_RESULT_FIELDS = ("base64_image", "priority")
+
+
+@dataclass
+class CacheStats:
+    """Result cache counters."""
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class ResultCache:
+    """LRU + TTL cache of parse results with in-flight request coalescing."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (stored_at, size_bytes, result)
+        self._entries: "OrderedDict[str, tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = CacheStats()
+
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        # Disk bookkeeping is touched from worker threads; guarded by _disk_lock
+        self._disk_sizes: "OrderedDict[str, int]" = OrderedDict()  # key -> file size, oldest first
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash of the image plus every option that affects the parse result."""
+        h = hashlib.sha256()
+        h.update(payload.get("base64_image", "").encode("ascii", errors="ignore"))
+        options = {k: v for k, v in payload.items() if k not in _NON_RESULT_FIELDS}
+        h.update(json.dumps(options, sort_keys=True).encode())
+        return h.hexdigest()
+
+    async def get_or_compute(
+        self,
+        payload: Dict[str, Any],
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Return a cached result, join an identical in-flight parse, or run compute()."""
+        key = self.make_key(payload)
+
+        result = self._get_memory(key)
+        if result is None and self.disk_dir:
+            result = await asyncio.to_thread(self._get_disk, key)
+            if result is not None:
+                self.stats.disk_hits += 1
+                self._put_memory(key, result)
+        if result is not None:
+            self.stats.hits += 1
+            return copy.deepcopy(result)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled
+                # The leader was cancelled, not us: start over (likely as the new leader)
+                return await self.get_or_compute(payload, compute)
+
+        self.stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+        except BaseException as e:
+            if not future.done():
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                    # Mark retrieved so an unshared failure isn't logged as unhandled
+                    future.exception()
+                else:
+                    # Cancellation is the leader's own; followers retry
+                    future.cancel()
+            raise
+        else:
+            stored = copy.deepcopy(result)
+            self._put_memory(key, stored)
+            # Release followers before the disk write so cancelling it can't strand them
+            future.set_result(stored)
+            if self.disk_dir:
+                await asyncio.to_thread(self._put_disk, key, stored)
+            return result
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        with self._disk_lock:
+            disk_entries, disk_bytes = len(self._disk_sizes), self._disk_bytes
+        stats.update({
+            "entries": len(self._entries),
+            "memory_bytes": self._bytes,
+            "memory_budget_bytes": self.max_bytes,
+            "inflight": len(self._inflight),
+            "disk_enabled": self.disk_dir is not None,
+            "disk_entries": disk_entries,
+            "disk_bytes": disk_bytes,
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, size, result = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self._bytes -= size
+            self.stats.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put_memory(self, key: str, result: Dict[str, Any]):
+        size = len(json.dumps(result))
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= old[1]
+        self._entries[key] = (time.monotonic(), size, result)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.stats.evictions += 1
+
+    # ------------------------------------------------------------------
+    # Disk tier (runs in a worker thread)
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.json"
+
+    def _load_disk_index(self):
+        files = sorted(self.disk_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        with self._disk_lock:
+            for path in files:
+                size = path.stat().st_size
+                self._disk_sizes[path.stem] = size
+                self._disk_bytes += size
+        logger.info(f"Result cache disk tier: {len(files)} entries in {self.disk_dir}")
+
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._disk_lock:
+            if key not in self._disk_sizes:
+                return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                self._remove_disk(key)
+                self.stats.expired += 1
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            self._remove_disk(key)
+            return None
+
+    def _put_disk(self, key: str, result: Dict[str, Any]):
+        path = self._disk_path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key[:12]}: {e}")
+            return
+        size = path.stat().st_size
+        evicted: List[str] = []
+        with self._disk_lock:
+            self._disk_bytes += size - self._disk_sizes.pop(key, 0)
+            self._disk_sizes[key] = size
+            while self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes:
+                oldest, oldest_size = self._disk_sizes.popitem(last=False)
+                self._disk_bytes -= oldest_size
+                evicted.append(oldest)
+        for oldest in evicted:
+            self._unlink_disk(oldest)
+
+    def _remove_disk(self, key: str):
+        with self._disk_lock:
+            self._disk_bytes -= self._disk_sizes.pop(key, 0)
+        self._unlink_disk(key)
+
+    def _unlink_disk(self, key: str):
+        try:
+            self._disk_path(key).unlink()
+        except OSError:
+            pass
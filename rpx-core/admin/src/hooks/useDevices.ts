@@ -11,6 +11,8 @@ export function useDevices(pollInterval: number = 10000) {
   const eventSourceRef = useRef<EventSource | null>(null);
   const retryCountRef = useRef(0);
   const retryTimeoutRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  // Last SSE event ID seen; a new EventSource resumes from it
+  const lastEventIdRef = useRef<string | null>(null);
   const isMountedRef = useRef(true);
 
   const fetchDevices = useCallback(async () => {
@@ -60,7 +62,10 @@ export function useDevices(pollInterval: number = 10000) {
       }
 
       try {
-        const eventSource = new EventSource(API.discovery.events);
+        const url = lastEventIdRef.current
+          ? `${API.discovery.events}?last_event_id=${encodeURIComponent(lastEventIdRef.current)}`
+          : API.discovery.events;
+        const eventSource = new EventSource(url);
         eventSourceRef.current = eventSource;
 
         eventSource.onopen = () => {
@@ -76,11 +81,15 @@ export function useDevices(pollInterval: number = 10000) {
         eventSource.onmessage = (event) => {
           if (!isMountedRef.current) return;
 
+          if (event.lastEventId) {
+            lastEventIdRef.current = event.lastEventId;
+          }
+
           try {
             const data = JSON.parse(event.data);
             console.log('[SSE] Event:', data.type);
 
-            if (data.type === 'sut_online' || data.type === 'sut_offline') {
+            if (data.type === 'sut_online' || data.type === 'sut_offline' || data.type === 'resync') {
               fetchDevices();
             }
           } catch (e) {
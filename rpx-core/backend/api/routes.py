@@ -6,14 +6,16 @@ REST API routes for the backend system
 import logging
 import json
 import os
-import io
-import zipfile
 import tempfile
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Step screenshots are PNG or, with the compact parse profile, JPEG/WebP
+SCREENSHOT_SUFFIXES = ('.png', '.jpg', '.webp')
+SCREENSHOT_MIMETYPES = {'.png': 'image/png', '.jpg': 'image/jpeg', '.webp': 'image/webp'}
+
 
 class APIRoutes:
     """API routes handler"""
@@ -618,11 +620,12 @@ class APIRoutes:
                     tmp_path = tmp_file.name
 
                 try:
-                    # Pass OCR config if any parameters were provided
-                    if ocr_config:
-                        result = self.omniparser_client.analyze_screenshot(tmp_path, ocr_config=ocr_config)
-                    else:
-                        result = self.omniparser_client.analyze_screenshot(tmp_path)
+                    from modules.omniparser_client import PARSE_PRIORITY_INTERACTIVE
+
+                    # Interactive (workflow builder) parses go ahead of queued automation steps
+                    result = self.omniparser_client.analyze_screenshot(
+                        tmp_path, ocr_config=ocr_config or None, priority=PARSE_PRIORITY_INTERACTIVE
+                    )
                     
                     if result.success:
                         response_data = {
@@ -917,6 +920,7 @@ class APIRoutes:
             """
             try:
                 import requests as http_requests
+                from ..core.sut_inventory import get_sut_inventory
 
                 sut_ip = request.args.get('sut_ip')
                 if not sut_ip:
@@ -932,26 +936,20 @@ class APIRoutes:
 
                 config_steam_app_id = getattr(game_config, 'steam_app_id', None)
 
-                # FAST PATH: Query SUT directly for installed games
+                # FAST PATH: Query SUT directly for installed games (mirrored per SUT)
                 try:
-                    response = http_requests.get(
-                        f"http://{sut_ip}:8080/installed_games",
-                        timeout=5
-                    )
-
-                    if response.status_code != 200:
+                    try:
+                        installed_games = get_sut_inventory(sut_ip).get_games(timeout=5)
+                    except http_requests.HTTPError as e:
                         return jsonify({
                             "available": False,
                             "game_name": game_name,
                             "steam_app_id": config_steam_app_id,
                             "sut_ip": sut_ip,
-                            "error": f"SUT returned status {response.status_code}",
+                            "error": f"SUT returned status {e.response.status_code}",
                             "match_method": None
                         })
 
-                    data = response.json()
-                    installed_games = data.get("games", [])
-
                     # PRIORITY 1: Match by Steam App ID (fastest, most reliable)
                     if config_steam_app_id:
                         for game in installed_games:
@@ -1194,19 +1192,17 @@ class APIRoutes:
 
                     # If online, get installed games
                     if sut_info["online"]:
-                        import requests
+                        from ..core.sut_inventory import get_sut_inventory
                         try:
-                            resp = requests.get(f"http://{sut_ip}:8080/installed_games", timeout=10)
-                            if resp.status_code == 200:
-                                installed = resp.json().get("games", [])
-                                installed_names = [g.get("name", "").lower() for g in installed]
-
-                                for game in games:
-                                    game_lower = game.lower().replace("-", " ")
-                                    if any(game_lower in name or name in game_lower for name in installed_names):
-                                        sut_info["installed_games"].append(game)
-                                    else:
-                                        sut_info["missing_games"].append(game)
+                            installed = get_sut_inventory(sut_ip).get_games(timeout=10)
+                            installed_names = [g.get("name", "").lower() for g in installed]
+
+                            for game in games:
+                                game_lower = game.lower().replace("-", " ")
+                                if any(game_lower in name or name in game_lower for name in installed_names):
+                                    sut_info["installed_games"].append(game)
+                                else:
+                                    sut_info["missing_games"].append(game)
                         except Exception as e:
                             logger.warning(f"Could not get installed games from {sut_ip}: {e}")
                             sut_info["missing_games"] = games
@@ -1543,7 +1539,6 @@ class APIRoutes:
         def get_run_timeline(run_id):
             """Get timeline events for a specific automation run"""
             try:
-                import json
                 from pathlib import Path
                 from ..core.run_manager import RunStatus
 
@@ -1572,7 +1567,7 @@ class APIRoutes:
                             "source": "active"
                         })
 
-                # Fall back to timeline.json file in run directory
+                # Fall back to timeline files in run directory
                 manifest = self.run_manager.storage.get_manifest(run_id)
                 if not manifest:
                     # Try reloading history - run might have just completed
@@ -1586,13 +1581,13 @@ class APIRoutes:
                 if not run_dir or not run_dir.exists():
                     return jsonify({"events": [], "message": "Run directory not found"})
 
-                timeline_file = run_dir / 'timeline.json'
-                if not timeline_file.exists():
-                    return jsonify({"events": [], "message": "Timeline not available for this run"})
+                from ..core.timeline_manager import TimelineManager
 
                 try:
-                    with open(timeline_file, 'r') as f:
-                        timeline_data = json.load(f)
+                    # Replays timeline.jsonl over the compacted timeline.json
+                    timeline_data = TimelineManager.read_events(run_dir)
+                    if timeline_data is None:
+                        return jsonify({"events": [], "message": "Timeline not available for this run"})
                     return jsonify({
                         "run_id": run_id,
                         "events": timeline_data.get('events', []),
@@ -1606,6 +1601,51 @@ class APIRoutes:
                 logger.error(f"Error getting timeline for run {run_id}: {e}")
                 return jsonify({"error": str(e)}), 500
 
+        @app.route('/api/runs/<run_id>/perf', methods=['GET'])
+        def get_run_perf(run_id):
+            """Get per-step latency histograms for a run
+
+            Query params:
+                spans: 'true' to include the raw spans of every iteration
+            """
+            try:
+                if not hasattr(self, 'run_manager') or self.run_manager is None:
+                    return jsonify({"error": "Run manager not available"}), 500
+
+                include_spans = request.args.get('spans', 'false').lower() == 'true'
+                perf = self.run_manager.storage.get_perf(run_id, include_spans=include_spans)
+                if perf is None:
+                    return jsonify({"error": f"Run {run_id} not found"}), 404
+                return jsonify(perf)
+
+            except Exception as e:
+                logger.error(f"Error getting perf for run {run_id}: {e}")
+                return jsonify({"error": str(e)}), 500
+
+        @app.route('/api/runs/perf/rollup', methods=['GET'])
+        def get_runs_perf_rollup():
+            """Per-game / per-step latency histograms merged across recent runs
+
+            Query params:
+                game: Filter by game name
+                sut_ip: Filter by SUT IP
+                limit: Max runs to include, newest first (default 50)
+            """
+            try:
+                if not hasattr(self, 'run_manager') or self.run_manager is None:
+                    return jsonify({"error": "Run manager not available"}), 500
+
+                rollup = self.run_manager.storage.get_perf_rollup(
+                    game=request.args.get('game'),
+                    sut_ip=request.args.get('sut_ip'),
+                    limit=request.args.get('limit', 50, type=int),
+                )
+                return jsonify(rollup)
+
+            except Exception as e:
+                logger.error(f"Error getting perf rollup: {e}")
+                return jsonify({"error": str(e)}), 500
+
         @app.route('/api/runs/<run_id>/story', methods=['GET'])
         def get_run_story(run_id):
             """Get comprehensive run story data for the Story View visualization.
@@ -1616,7 +1656,6 @@ class APIRoutes:
             - Run metadata (game, SUT, status)
             """
             try:
-                import json
                 from pathlib import Path
                 from ..core.run_manager import RunStatus
 
@@ -1683,17 +1722,13 @@ class APIRoutes:
                     # Get events from active run's timeline (in memory)
                     events = active_run.timeline.get_events_dict()
                 elif run_dir and run_dir.exists():
-                    # Load from timeline.json file
-                    timeline_file = run_dir / 'timeline.json'
-                    if timeline_file.exists():
-                        try:
-                            with open(timeline_file, 'r') as f:
-                                timeline_data = json.load(f)
-                            events = timeline_data.get('events', [])
-                        except Exception as e:
-                            logger.warning(f"Error reading timeline file: {e}")
-                            events = []
-                    else:
+                    # Load from timeline.json + timeline.jsonl journal
+                    from ..core.timeline_manager import TimelineManager
+                    try:
+                        timeline_data = TimelineManager.read_events(run_dir)
+                        events = timeline_data['events'] if timeline_data else []
+                    except Exception as e:
+                        logger.warning(f"Error reading timeline file: {e}")
                         events = []
                 else:
                     events = []
@@ -1742,7 +1777,9 @@ class APIRoutes:
                         if screenshots_dir.exists():
                             iteration_match = iter_dir.name  # e.g., "perf-run-1"
                             import re
-                            for screenshot_file in sorted(screenshots_dir.glob('screenshot_*.png')):
+                            for screenshot_file in sorted(screenshots_dir.glob('screenshot_*')):
+                                if screenshot_file.suffix not in SCREENSHOT_SUFFIXES:
+                                    continue
                                 # Extract step number from filename (handles screenshot_1.png, screenshot_1_retry1.png, etc.)
                                 stem = screenshot_file.stem.replace('screenshot_', '')
                                 # Use regex to extract just the leading number
@@ -1859,49 +1896,29 @@ class APIRoutes:
                     step_num = filename.replace('step_', '').replace('.png', '')
                     actual_filename = f"screenshot_{step_num}.png"
 
-                # Search in iteration directories for the screenshot
-                screenshot_path = None
-
-                # Check each *-run-* directory (perf-run-N, tracing-run-N, trace-run-N, etc.)
-                for iter_dir in sorted(run_dir.glob('*-run-*')):
-                    candidate = iter_dir / 'screenshots' / actual_filename
-                    if candidate.exists():
-                        screenshot_path = candidate
-                        break
-                    # Also check with original filename in case it matches
-                    candidate2 = iter_dir / 'screenshots' / filename
-                    if candidate2.exists():
-                        screenshot_path = candidate2
-                        break
-
-                # Also check trace-run if exists
-                if not screenshot_path:
-                    trace_dir = run_dir / 'trace-run' / 'screenshots'
-                    if trace_dir.exists():
-                        candidate = trace_dir / actual_filename
-                        if candidate.exists():
-                            screenshot_path = candidate
-                        candidate2 = trace_dir / filename
-                        if candidate2.exists():
-                            screenshot_path = candidate2
-
-                # Fallback: check root screenshots directory (old structure)
-                if not screenshot_path:
-                    root_screenshots = run_dir / 'screenshots'
-                    if root_screenshots.exists():
-                        candidate = root_screenshots / actual_filename
-                        if candidate.exists():
-                            screenshot_path = candidate
-                        candidate2 = root_screenshots / filename
-                        if candidate2.exists():
-                            screenshot_path = candidate2
+                # Step screenshots taken with the parse profile are JPEG/WebP
+                # but keep the step_N.png URL
+                candidate_names = [actual_filename, filename]
+                if filename.startswith('step_'):
+                    candidate_names[1:1] = [f"screenshot_{step_num}{suffix}"
+                                            for suffix in SCREENSHOT_SUFFIXES if suffix != '.png']
+
+                # Search iteration directories (perf-run-N, tracing-run-N, trace-run-N, etc.),
+                # then trace-run, then the root screenshots directory (old structure)
+                search_dirs = [iter_dir / 'screenshots' for iter_dir in sorted(run_dir.glob('*-run-*'))]
+                search_dirs += [run_dir / 'trace-run' / 'screenshots', run_dir / 'screenshots']
+                screenshot_path = next(
+                    (d / name for d in search_dirs for name in candidate_names if (d / name).exists()),
+                    None
+                )
 
                 if not screenshot_path or not screenshot_path.exists():
                     logger.warning(f"Screenshot not found: {filename} (tried {actual_filename}) in run {run_id}")
                     return jsonify({"error": f"Screenshot {filename} not found"}), 404
 
                 logger.debug(f"Serving screenshot: {screenshot_path}")
-                return send_file(str(screenshot_path), mimetype='image/png')
+                return send_file(str(screenshot_path),
+                                 mimetype=SCREENSHOT_MIMETYPES.get(screenshot_path.suffix, 'image/png'))
 
             except Exception as e:
                 logger.error(f"Error getting screenshot {filename} for run {run_id}: {e}")
@@ -1930,7 +1947,9 @@ class APIRoutes:
                 if traces_dir.exists() and traces_dir.is_dir():
                     for agent_dir in sorted(traces_dir.iterdir()):
                         if agent_dir.is_dir():
-                            files = sorted([f.name for f in agent_dir.iterdir() if f.is_file()])
+                            # .partial files are interrupted transfers kept for resume
+                            files = sorted([f.name for f in agent_dir.iterdir()
+                                            if f.is_file() and f.suffix != '.partial'])
                             if files:
                                 agents[agent_dir.name] = files
                                 total_files += len(files)
@@ -1945,8 +1964,8 @@ class APIRoutes:
                 logger.error(f"Error listing traces for run {run_id}: {e}")
                 return jsonify({"error": str(e)}), 500
 
-        def _package_traces(run_ids: list, agent_filter: str = None) -> tuple:
-            """Package trace files into a zip buffer.
+        def _collect_traces(run_ids: list, agent_filter: str = None) -> list:
+            """Collect trace files for packaging.
 
             Collects traces from one or more runs into a consistent folder structure:
                 <Agent>/<Game>/<trace_file>
@@ -1956,40 +1975,59 @@ class APIRoutes:
                 agent_filter: Optional agent name to filter by.
 
             Returns:
-                (BytesIO buffer, file_count) — the zip buffer and number of files added.
+                List of (arcname, Path) tuples, one per trace file.
             """
             from pathlib import Path
-            buf = io.BytesIO()
-            file_count = 0
+            files = []
 
-            with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
-                for run_id in run_ids:
-                    run_dir = self.run_manager.storage.get_run_dir(run_id)
-                    if not run_dir:
-                        continue
+            for run_id in run_ids:
+                run_dir = self.run_manager.storage.get_run_dir(run_id)
+                if not run_dir:
+                    continue
 
-                    traces_dir = Path(run_dir) / "traces"
-                    if not traces_dir.exists():
-                        continue
+                traces_dir = Path(run_dir) / "traces"
+                if not traces_dir.exists():
+                    continue
 
-                    manifest = self.run_manager.storage.get_manifest(run_id)
-                    game_name = (manifest.config.games[0] if manifest and manifest.config and manifest.config.games else 'unknown')
-                    safe_game = game_name.replace(' ', '_').replace(':', '').replace("'", '')
+                manifest = self.run_manager.storage.get_manifest(run_id)
+                game_name = (manifest.config.games[0] if manifest and manifest.config and manifest.config.games else 'unknown')
+                safe_game = game_name.replace(' ', '_').replace(':', '').replace("'", '')
 
-                    for agent_dir in sorted(traces_dir.iterdir()):
-                        if not agent_dir.is_dir():
-                            continue
-                        if agent_filter and agent_dir.name != agent_filter:
-                            continue
-                        agent_display = agent_dir.name.capitalize()
-                        for trace_file in sorted(agent_dir.iterdir()):
-                            if trace_file.is_file():
-                                arcname = f"{agent_display}/{safe_game}/{trace_file.name}"
-                                zf.write(str(trace_file), arcname)
-                                file_count += 1
+                for agent_dir in sorted(traces_dir.iterdir()):
+                    if not agent_dir.is_dir():
+                        continue
+                    if agent_filter and agent_dir.name != agent_filter:
+                        continue
+                    agent_display = agent_dir.name.capitalize()
+                    for trace_file in sorted(agent_dir.iterdir()):
+                        if trace_file.is_file() and trace_file.suffix != '.partial':
+                            files.append((f"{agent_display}/{safe_game}/{trace_file.name}", trace_file))
+
+            return files
+
+        def _get_trace_packager():
+            """Lazily create the trace package cache under the runs directory"""
+            if getattr(self, 'trace_packager', None) is None:
+                from ..core.trace_packager import TracePackager
+                cache_mb = int(os.getenv("TRACE_PACKAGE_CACHE_MB", "20480"))
+                self.trace_packager = TracePackager(
+                    self.run_manager.storage.base_dir / "_trace_packages",
+                    max_cache_bytes=cache_mb * 1024 * 1024,
+                )
+            return self.trace_packager
+
+        def _send_trace_package(files: list, zip_name: str):
+            """Serve a trace package: from the disk cache (with Range support) or streamed"""
+            packager = _get_trace_packager()
+            key = packager.cache_key(files)
+            cached = packager.get_cached(key)
+            if cached:
+                return send_file(str(cached), mimetype='application/zip', as_attachment=True,
+                                 download_name=zip_name, conditional=True, etag=key)
 
-            buf.seek(0)
-            return buf, file_count
+            response = Response(stream_with_context(packager.stream(files, key)), mimetype='application/zip')
+            response.headers['Content-Disposition'] = f'attachment; filename="{zip_name}"'
+            return response
 
         @app.route('/api/runs/<run_id>/traces/download', methods=['GET'])
         def download_run_traces(run_id):
@@ -2003,9 +2041,9 @@ class APIRoutes:
                     return jsonify({"error": f"Run {run_id} not found"}), 404
 
                 agent_filter = request.args.get('agent')
-                buf, file_count = _package_traces([run_id], agent_filter)
+                files = _collect_traces([run_id], agent_filter)
 
-                if file_count == 0:
+                if not files:
                     return jsonify({"error": "No trace files found"}), 404
 
                 manifest = self.run_manager.storage.get_manifest(run_id)
@@ -2013,7 +2051,7 @@ class APIRoutes:
                 safe_game = game_name.replace(' ', '_').replace(':', '').replace("'", '')
                 zip_name = f"traces_{safe_game}_{run_id[:8]}.zip"
 
-                return send_file(buf, mimetype='application/zip', as_attachment=True, download_name=zip_name)
+                return _send_trace_package(files, zip_name)
 
             except Exception as e:
                 logger.error(f"Error downloading traces for run {run_id}: {e}")
@@ -2066,13 +2104,13 @@ class APIRoutes:
                     return jsonify({"error": f"Campaign {campaign_id} not found"}), 404
 
                 agent_filter = request.args.get('agent')
-                buf, file_count = _package_traces(campaign.run_ids, agent_filter)
+                files = _collect_traces(campaign.run_ids, agent_filter)
 
-                if file_count == 0:
+                if not files:
                     return jsonify({"error": "No trace files found in this campaign"}), 404
 
                 zip_name = f"traces_campaign_{campaign_id[:8]}.zip"
-                return send_file(buf, mimetype='application/zip', as_attachment=True, download_name=zip_name)
+                return _send_trace_package(files, zip_name)
 
             except Exception as e:
                 logger.error(f"Error downloading campaign traces for {campaign_id}: {e}")
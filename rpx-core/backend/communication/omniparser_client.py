@@ -98,7 +98,8 @@ class OmniparserClient:
     def analyze_screenshot(
         self,
         image_path: str,
-        ocr_config: Optional[Dict[str, Any]] = None
+        ocr_config: Optional[Dict[str, Any]] = None,
+        priority: Optional[int] = None
     ) -> OmniparserResult:
         """
         Analyze a screenshot with Omniparser.
@@ -109,6 +110,7 @@ class OmniparserClient:
                 - use_paddleocr: bool (True=PaddleOCR, False=EasyOCR)
                 - text_threshold: float (0.0-1.0, lower = more lenient)
                 - box_threshold: float (0.0-1.0, lower = detect more elements)
+            priority: Optional queue service priority (1-10, lower = sooner)
         """
         event_id = self._track_call_start("/parse/", "POST")
         start_time = time.time()
@@ -129,6 +131,8 @@ class OmniparserClient:
             payload = {
                 "base64_image": image_data
             }
+            if priority is not None:
+                payload['priority'] = priority
 
             # Add OCR config parameters if provided
             if ocr_config:
@@ -415,7 +415,8 @@ class SUTClient:
         """Set request timeout"""
         self.timeout = timeout
 
-    def get_logs(self, ip: str, port: int = 8080, lines: int = 1000, since: str = None) -> ActionResult:
+    def get_logs(self, ip: str, port: int = 8080, lines: int = 1000, since: str = None,
+                 cursor: str = None) -> ActionResult:
         """
         Retrieve logs from SUT device.
 
@@ -424,14 +425,18 @@ class SUTClient:
             port: SUT port
             lines: Number of recent log lines to retrieve
             since: ISO timestamp - only return logs after this time
+            cursor: Cursor from a previous get_logs - only return newer lines
 
         Returns:
-            ActionResult with log lines in data['lines']
+            ActionResult with log lines in data['lines'] and the next cursor
+            in data['cursor'] (older SUT clients don't return one)
         """
         try:
             params = {'lines': lines}
             if since:
                 params['since'] = since
+            if cursor:
+                params['cursor'] = cursor
 
             response = self.session.get(
                 f"http://{ip}:{port}/logs",
@@ -30,7 +30,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +98,10 @@ class AccountScheduler:
         self.on_account_released: Optional[callable] = None
         self.on_account_waiting: Optional[callable] = None
 
+        # Release listeners (e.g. RunDispatcher) - called as listener(sut_ip, account_type)
+        # outside of self._lock so they may take their own locks safely
+        self._release_listeners: List[Callable[[str, str], None]] = []
+
         # Persistence file path - compute from module location
         # __file__ is rpx-core/backend/core/account_scheduler.py
         # We need rpx-core/logs/runs/account_locks.json
@@ -221,30 +225,52 @@ class AccountScheduler:
                     self.on_account_waiting(sut_ip, account_type.value, lock.holder_sut)
                 return False
 
+    def add_release_listener(self, listener: Callable[[str, str], None]):
+        """Register a callback fired whenever an account is released"""
+        with self._lock:
+            self._release_listeners.append(listener)
+
+    def _notify_released(self, released: List[Tuple[str, str]]):
+        """Fire release listeners. Must be called without holding self._lock."""
+        for sut_ip, account_type in released:
+            for listener in list(self._release_listeners):
+                try:
+                    listener(sut_ip, account_type)
+                except Exception as e:
+                    logger.error(f"Error in account release listener: {e}")
+
     def release(self, sut_ip: str, game_name: str):
         """Release the account after a game completes"""
+        released = []
         with self._lock:
             account_type = self.get_account_type(game_name)
             lock = self._get_lock(account_type)
 
             if lock.release(sut_ip):
                 self._save_locks()  # Persist lock release
+                released.append((sut_ip, account_type.value))
                 if self.on_account_released:
                     self.on_account_released(sut_ip, account_type.value)
+        self._notify_released(released)
 
     def release_all_for_sut(self, sut_ip: str):
         """Release all accounts held by a SUT (e.g., on disconnect/error)"""
+        released = []
         with self._lock:
-            self._af_lock.release(sut_ip)
-            self._gz_lock.release(sut_ip)
+            for lock in (self._af_lock, self._gz_lock):
+                if lock.release(sut_ip):
+                    released.append((sut_ip, lock.account_type.value))
+        self._notify_released(released)
 
     def release_all(self):
         """Release all account locks"""
+        released = []
         with self._lock:
-            if self._af_lock.holder_sut:
-                self._af_lock.release(self._af_lock.holder_sut)
-            if self._gz_lock.holder_sut:
-                self._gz_lock.release(self._gz_lock.holder_sut)
+            for lock in (self._af_lock, self._gz_lock):
+                holder = lock.holder_sut
+                if holder and lock.release(holder):
+                    released.append((holder, lock.account_type.value))
+        self._notify_released(released)
 
     def get_holder(self, game_name: str) -> Optional[str]:
         """Get the SUT currently holding the account for a game"""
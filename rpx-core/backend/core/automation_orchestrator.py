@@ -23,6 +23,8 @@ from .run_manager import AutomationRun, RunResult, RunStatus
 from .events import event_bus, EventType
 from .timeline_manager import TimelineManager
 from .account_pool import get_account_pool
+from .trace_pull_queue import TracePullJob, get_trace_pull_queue
+from .sut_inventory import get_sut_inventory
 
 # Steam dialogs config path
 STEAM_DIALOGS_CONFIG = Path(__file__).parent.parent.parent / "config" / "games" / "steam_dialogs.yaml"
@@ -51,6 +53,7 @@ class StepProgressCallback:
         self.completed_steps = 0
         self._current_step = 0
         self._step_map: Dict[int, Any] = {}  # step_number -> StepProgress
+        self._step_waits: Dict[int, list] = {}  # step_number -> measured settle waits
 
     def _get_screenshot_url(self, step_number: int) -> Optional[str]:
         """Get screenshot URL for a step"""
@@ -168,6 +171,31 @@ class StepProgressCallback:
             }
         })
 
+    def on_screen_match(self, step_number: int, hit: bool, distance: int = None):
+        """Called after a step's screenshot is checked against known screens"""
+        if self.timeline:
+            self.timeline.update_event(f"step_{step_number}", metadata={
+                'screen_hash': 'hit' if hit else 'miss',
+                'screen_hash_distance': distance,
+            })
+
+    def on_wait_measured(self, step_number: int, reason: str, waited: float, max_wait: float, settled: bool):
+        """Called after a screen-settle wait with how long it actually took"""
+        if not self.timeline or step_number is None:
+            return
+        waits = self._step_waits.setdefault(step_number, [])
+        waits.append({
+            'reason': reason,
+            'waited_s': round(waited, 2),
+            'max_s': max_wait,
+            'settled': settled,
+        })
+        self.timeline.update_event(f"step_{step_number}", metadata={'waits': waits})
+
+    def on_benchmark_active(self, active: bool):
+        """Called when a measured benchmark wait starts/ends on the SUT"""
+        get_trace_pull_queue(self.run.sut_ip).set_benchmark_active(active)
+
     def on_step_skip(self, step_number: int, reason: str = None):
         """Called when an optional step is skipped"""
         completed_at = datetime.now().isoformat()
@@ -254,12 +282,15 @@ class StepProgressCallback:
 class AutomationOrchestrator:
     """Orchestrates automation execution using the existing engine from modules/"""
 
-    def __init__(self, game_manager, device_registry, omniparser_client, discovery_client=None, websocket_handler=None):
+    def __init__(self, game_manager, device_registry, omniparser_client, discovery_client=None, websocket_handler=None,
+                 sut_gateway_url=None):
         self.game_manager = game_manager
         self.device_registry = device_registry
         self.omniparser_client = omniparser_client
         self.discovery_client = discovery_client
         self.websocket_handler = websocket_handler
+        # Discovery service URL to reach SUTs through (over their WebSocket); None = direct HTTP
+        self.sut_gateway_url = sut_gateway_url
 
         # Storage manager reference (set by RunManager)
         self.storage: Optional['RunStorageManager'] = None
@@ -446,6 +477,9 @@ class AutomationOrchestrator:
             successful_runs = 0
             error_logs = []
 
+            # Tracing agents whose traces have been queued for background pulling
+            queued_trace_agents = []
+
             # Run-level state for resolution (only change once, restore at end)
             run_resolution_changed = False
             run_original_resolution = None  # Will store (width, height) from first iteration
@@ -526,6 +560,11 @@ class AutomationOrchestrator:
                     timeline.error(error_msg, str(e))
                     timeline.iteration_completed(iteration + 1, success=False)
 
+                # Pull this agent's traces in the background while the next iteration runs
+                if iteration_type.startswith("tracing-"):
+                    self._queue_trace_pull(run, device, agent_name, timeline)
+                    queued_trace_agents.append(agent_name)
+
                 # Cooldown between iterations (if configured and not last iteration)
                 if run.cooldown_seconds > 0 and iteration < total_runs - 1:
                     # Check if run was stopped during iteration
@@ -586,53 +625,30 @@ class AutomationOrchestrator:
                 else:
                     timeline.run_failed(f"All {total_runs} iterations failed")
 
-            # Pull trace files from SUT if tracing was enabled
+            # Wait for background trace pulls (queued after each tracing iteration)
             if game_tracing_enabled and not run.disable_tracing and len(tracing_iterations) > 0:
                 try:
-                    from .trace_puller import pull_run_traces
                     from modules.tracing_config import get_tracing_config
 
-                    # Load centralized tracing config (config/tracing.yaml)
-                    # NOT the game's metadata.tracing (which only has enabled + agent names list)
-                    central_tracing_cfg = get_tracing_config()
-
-                    # Get trace output directory from centralized config
-                    trace_output_dir = central_tracing_cfg.output_dir
-
-                    # Get SSH settings from centralized config
-                    ssh_user = central_tracing_cfg.ssh_user
-                    ssh_timeout = central_tracing_cfg.ssh_timeout
-                    max_retries = central_tracing_cfg.ssh_max_retries
-
-                    # Get run storage directory
-                    run_storage_dir = self._get_run_directory(run)
-
-                    logger.info(f"Pulling trace files from SUT {device.ip} (ssh_user={ssh_user}, timeout={ssh_timeout}s, retries={max_retries})...")
-                    timeline.info("Pulling trace files from SUT...")
-
-                    # Pass agent configs dict (with output_fixed_dir, output_file_pattern, etc.)
-                    # from the centralized config — NOT the game's agents list
-                    agent_configs = central_tracing_cfg.agents
-
-                    pull_results = pull_run_traces(
-                        sut_ip=device.ip,
-                        run_id=run.run_id,
-                        game_name=run.game_name,
-                        trace_output_dir=trace_output_dir,
-                        local_storage_dir=run_storage_dir,
-                        trace_agents=[t[0] for t in tracing_iterations],  # Only pull agents that were used
-                        ssh_user=ssh_user,
-                        ssh_timeout=ssh_timeout,
-                        max_retries=max_retries,
-                        agent_configs=agent_configs
-                    )
-
-                    if pull_results.get("success"):
-                        total_files = pull_results.get("total_files", 0)
+                    # Agents whose iteration was cut short still get their traces pulled
+                    for agent_name, _ in tracing_iterations:
+                        if agent_name not in queued_trace_agents:
+                            self._queue_trace_pull(run, device, agent_name, timeline)
+
+                    wait_timeout = get_tracing_config().trace_pull_wait_timeout
+                    jobs = get_trace_pull_queue(device.ip).wait_for_run(run.run_id, timeout=wait_timeout)
+
+                    total_files = sum(job.to_dict()["files"] for job in jobs)
+                    pending = [job.agent for job in jobs if not job.done.is_set()]
+                    failed = [job for job in jobs if job.status == "failed"]
+                    if pending:
+                        logger.warning(f"Trace pulls still running after {wait_timeout}s: {pending}")
+                        timeline.warning(f"Trace pulls still running in background: {', '.join(pending)}")
+                    elif total_files > 0:
                         logger.info(f"Successfully pulled {total_files} trace files")
                         timeline.info(f"Pulled {total_files} trace files from SUT")
-                    else:
-                        error_msg = pull_results.get("error", "Unknown error")
+                    if failed:
+                        error_msg = "; ".join(f"{job.agent}: {job.error}" for job in failed)
                         logger.warning(f"Failed to pull trace files: {error_msg}")
                         timeline.warning(f"Could not pull trace files: {error_msg}")
 
@@ -667,6 +683,67 @@ class AutomationOrchestrator:
                 account_pool.release_account_pair(run.sut_ip)
                 logger.info(f"Released Steam account pair for SUT {run.sut_ip}")
 
+    def _queue_trace_pull(self, run: AutomationRun, device, agent_name: str,
+                          timeline: TimelineManager = None) -> Optional[TracePullJob]:
+        """
+        Queue a background pull of one tracing agent's files from the SUT.
+
+        The transfer runs on the SUT's TracePullQueue while the run continues;
+        its progress is recorded on the run manifest (trace_pulls).
+        """
+        try:
+            from modules.tracing_config import get_tracing_config
+
+            # Load centralized tracing config (config/tracing.yaml)
+            # NOT the game's metadata.tracing (which only has enabled + agent names list)
+            central_tracing_cfg = get_tracing_config()
+
+            storage = self.storage
+            run_id = run.run_id
+
+            def on_update(job: TracePullJob):
+                if storage:
+                    storage.record_trace_pull(run_id, job.to_dict())
+                if timeline and job.status == "completed":
+                    transfer = job.to_dict().get("transfer") or {}
+                    timeline.info(f"Pulled {job.to_dict()['files']} {job.agent} trace files from SUT "
+                                  f"({transfer.get('bytes', 0) / 1e6:.1f} MB in {transfer.get('seconds', 0)}s)")
+                elif timeline and job.status == "failed":
+                    timeline.warning(f"Could not pull {job.agent} trace files: {job.error}")
+
+            job = TracePullJob(
+                run_id=run_id,
+                agent=agent_name,
+                game_name=run.game_name,
+                trace_output_dir=central_tracing_cfg.output_dir,
+                local_storage_dir=self._get_run_directory(run),
+                # Agent configs dict (with output_fixed_dir, output_file_pattern, etc.)
+                # from the centralized config — NOT the game's agents list
+                agent_configs=central_tracing_cfg.agents,
+                puller_options={
+                    "ssh_user": central_tracing_cfg.ssh_user,
+                    "ssh_timeout": central_tracing_cfg.ssh_timeout,
+                    "max_retries": central_tracing_cfg.ssh_max_retries,
+                    **central_tracing_cfg.ssh_transfer_options,
+                },
+                on_update=on_update,
+            )
+
+            logger.info(f"Queueing background {agent_name} trace pull from SUT {device.ip}")
+            if timeline:
+                timeline.info(f"Pulling {agent_name} trace files from SUT in the background...")
+
+            pull_queue = get_trace_pull_queue(
+                device.ip, benchmark_throttle_kbps=central_tracing_cfg.ssh_benchmark_throttle_kbps
+            )
+            return pull_queue.submit(job)
+
+        except Exception as e:
+            logger.warning(f"Could not queue {agent_name} trace pull: {e}")
+            if timeline:
+                timeline.warning(f"Could not queue {agent_name} trace pull: {e}")
+            return None
+
     def _execute_single_iteration(self, run: AutomationRun, game_config, device, iteration_num: int, timeline: TimelineManager = None, skip_resolution_change: bool = False, disable_tracing: bool = False, tracing_agents_override: list = None, iteration_type: str = "performance", start_step: int = None, end_step: int = None) -> tuple:
         """Execute a single automation iteration
 
@@ -711,7 +788,8 @@ class AutomationOrchestrator:
             if timeline:
                 timeline.sut_connecting(device.ip, device.port)
             logger.info(f"Connecting to SUT at {device.ip}:{device.port}")
-            network = NetworkManager(device.ip, device.port)
+            network = NetworkManager(device.ip, device.port, gateway_url=self.sut_gateway_url,
+                                     sut_id=getattr(device, 'unique_id', None))
             # Wire up timeline for service call tracking (Story View)
             if timeline:
                 network.set_timeline(timeline)
@@ -1718,7 +1796,12 @@ class AutomationOrchestrator:
 
                 # Get screenshot from SUT
                 try:
-                    screenshot_resp = requests.get(f"{sut_base_url}/screenshot", timeout=10)
+                    from modules.network import NetworkManager
+                    screenshot_resp = requests.get(
+                        f"{sut_base_url}/screenshot",
+                        params=NetworkManager.SCREENSHOT_PROFILES["parse"],
+                        timeout=10
+                    )
                     if screenshot_resp.status_code != 200:
                         logger.warning(f"Failed to get screenshot: {screenshot_resp.status_code}")
                         continue
@@ -1729,10 +1812,13 @@ class AutomationOrchestrator:
 
                 # Parse with OmniParser via queue service
                 try:
+                    from modules.omniparser_client import PARSE_PRIORITY_BACKGROUND
+
                     img_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
+                    # Background priority - step-critical parses go first
                     parse_resp = requests.post(
                         f"{queue_service_url}/parse/",
-                        json={"base64_image": img_base64},
+                        json={"base64_image": img_base64, "priority": PARSE_PRIORITY_BACKGROUND},
                         timeout=omniparser_timeout
                     )
                     if parse_resp.status_code != 200:
@@ -2007,53 +2093,44 @@ class AutomationOrchestrator:
         config_steam_app_id = getattr(game_config, 'steam_app_id', None)
 
         try:
-            # Try to get installed games from SUT
-            response = network.session.get(
-                f"{network.base_url}/installed_games",
-                timeout=10
-            )
+            # Installed games from the SUT (mirrored per SUT, revalidated by ETag)
+            installed_games = get_sut_inventory(network.sut_ip, network.sut_port).get_games(timeout=10)
 
-            if response.status_code == 200:
-                data = response.json()
-                installed_games = data.get("games", [])
-
-                # PRIORITY 1: Match by Steam App ID from YAML config
-                if config_steam_app_id:
-                    for game in installed_games:
-                        sut_app_id = game.get("steam_app_id")
-                        if sut_app_id and str(sut_app_id) == str(config_steam_app_id):
-                            if game.get("exists", True):
-                                logger.info(f"Found game '{game.get('name')}' on SUT via Steam App ID: {config_steam_app_id}")
-                                # Always return steam_app_id - SUT will resolve actual exe path
-                                # using resolve_steam_app_path() with process_id
-                                return config_steam_app_id
-
-                    # steam_app_id in config but game not installed on SUT
-                    logger.warning(f"Steam App ID {config_steam_app_id} from config not found in SUT's installed games")
-
-                # PRIORITY 2: Match by game name (fallback for configs without steam_app_id)
-                game_name_lower = game_config.name.lower()
+            # PRIORITY 1: Match by Steam App ID from YAML config
+            if config_steam_app_id:
                 for game in installed_games:
-                    installed_name = game.get("name", "").lower()
-                    steam_app_id = game.get("steam_app_id")
-                    install_path = game.get("install_path", "")
-
-                    # Check if game names match (case-insensitive)
-                    if game_name_lower in installed_name or installed_name in game_name_lower:
+                    sut_app_id = game.get("steam_app_id")
+                    if sut_app_id and str(sut_app_id) == str(config_steam_app_id):
                         if game.get("exists", True):
-                            # Prefer Steam App ID - SUT launcher resolves exe path
-                            if steam_app_id:
-                                logger.info(f"Discovered game '{game.get('name')}' on SUT with Steam App ID: {steam_app_id}")
-                                return steam_app_id
-
-                            # Fallback to install path for non-Steam games
-                            if install_path:
-                                logger.info(f"Discovered game '{game.get('name')}' on SUT at: {install_path}")
-                                return install_path
-
-                logger.info(f"Game '{game_config.name}' not found in SUT installed games")
-            else:
-                logger.warning(f"Could not get installed games from SUT (status {response.status_code})")
+                            logger.info(f"Found game '{game.get('name')}' on SUT via Steam App ID: {config_steam_app_id}")
+                            # Always return steam_app_id - SUT will resolve actual exe path
+                            # using resolve_steam_app_path() with process_id
+                            return config_steam_app_id
+
+                # steam_app_id in config but game not installed on SUT
+                logger.warning(f"Steam App ID {config_steam_app_id} from config not found in SUT's installed games")
+
+            # PRIORITY 2: Match by game name (fallback for configs without steam_app_id)
+            game_name_lower = game_config.name.lower()
+            for game in installed_games:
+                installed_name = game.get("name", "").lower()
+                steam_app_id = game.get("steam_app_id")
+                install_path = game.get("install_path", "")
+
+                # Check if game names match (case-insensitive)
+                if game_name_lower in installed_name or installed_name in game_name_lower:
+                    if game.get("exists", True):
+                        # Prefer Steam App ID - SUT launcher resolves exe path
+                        if steam_app_id:
+                            logger.info(f"Discovered game '{game.get('name')}' on SUT with Steam App ID: {steam_app_id}")
+                            return steam_app_id
+
+                        # Fallback to install path for non-Steam games
+                        if install_path:
+                            logger.info(f"Discovered game '{game.get('name')}' on SUT at: {install_path}")
+                            return install_path
+
+            logger.info(f"Game '{game_config.name}' not found in SUT installed games")
 
         except Exception as e:
             logger.warning(f"Error discovering game path from SUT: {e}")
@@ -22,10 +22,13 @@ class BackendConfig:
     discovery_service_url: str = "http://localhost:5001"  # SUT Discovery Service
     queue_service_url: str = "http://localhost:9000"  # Queue Service (OmniParser)
     preset_manager_url: str = "http://localhost:5002"  # Preset-Manager
+    sut_via_gateway: bool = False  # Reach SUTs through the Discovery Service's RPC passthrough
 
     # Discovery settings (used when use_external_discovery=False)
     discovery_interval: float = 2.0  # Fast discovery rate in seconds
     discovery_timeout: float = 3.0   # Timeout for SUT ping
+    discovery_concurrency: int = 256  # Concurrent connect probes per scan
+    discovery_max_hosts: int = 4096  # Largest network range scanned (addresses)
     sut_port: int = 8080
 
     # Enhanced pairing mode settings (used when use_external_discovery=False)
@@ -74,6 +77,8 @@ class ConfigManager:
         
         config.discovery_interval = float(os.getenv("DISCOVERY_INTERVAL", config.discovery_interval))
         config.discovery_timeout = float(os.getenv("DISCOVERY_TIMEOUT", config.discovery_timeout))
+        config.discovery_concurrency = int(os.getenv("DISCOVERY_CONCURRENCY", config.discovery_concurrency))
+        config.discovery_max_hosts = int(os.getenv("DISCOVERY_MAX_HOSTS", config.discovery_max_hosts))
         config.sut_port = int(os.getenv("SUT_PORT", config.sut_port))
 
         # Pairing mode settings
@@ -90,6 +95,7 @@ class ConfigManager:
         config.discovery_service_url = os.getenv("DISCOVERY_SERVICE_URL", config.discovery_service_url)
         config.queue_service_url = os.getenv("QUEUE_SERVICE_URL", config.queue_service_url)
         config.preset_manager_url = os.getenv("PRESET_MANAGER_URL", config.preset_manager_url)
+        config.sut_via_gateway = os.getenv("SUT_VIA_GATEWAY", "false").lower() == "true"
 
         config.log_level = os.getenv("LOG_LEVEL", config.log_level)
         config.log_file = os.getenv("LOG_FILE", config.log_file)
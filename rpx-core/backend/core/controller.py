@@ -118,7 +118,9 @@ class BackendController:
             self.device_registry,
             self.omniparser_client,
             discovery_client=self.discovery_client if self.use_external_discovery else None,
-            websocket_handler=self.websocket_handler
+            websocket_handler=self.websocket_handler,
+            sut_gateway_url=self.config.discovery_service_url
+            if self.use_external_discovery and self.config.sut_via_gateway else None
         )
         self.run_manager = RunManager(
             max_concurrent_runs=5,
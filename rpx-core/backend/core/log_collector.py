@@ -9,6 +9,8 @@ This module provides functionality to:
 
 Architecture:
 - Run ID is the correlation key
+- SUT Client logs are read incrementally: the SUT seeks to the requested
+  range and returns a cursor, so repeat collections skip what was already read
 - Services log their blackbox logs to local files
 - At run completion, this collector gathers all relevant logs
 - Future: Intel SocWatch/PTAT traces will use the same mechanism
@@ -22,7 +24,7 @@ import logging
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +64,10 @@ class LogCollector:
             project_root = Path(__file__).parent.parent.parent.parent
         self.project_root = project_root
 
+        # Per-SUT cursor into the SUT Client log and when it was taken, so the
+        # next collection only reads what was logged since
+        self._sut_log_cursors: Dict[str, Tuple[str, datetime]] = {}
+
         logger.debug(f"LogCollector initialized with project_root: {project_root}")
 
     def collect_all_logs(
@@ -112,18 +118,38 @@ class LogCollector:
         sut_ip: str,
         since_iso: str = None
     ) -> dict:
-        """Pull logs from SUT Client via HTTP API."""
+        """
+        Pull logs from SUT Client via HTTP API.
+
+        When the previous collection from this SUT ended before since_iso, its
+        cursor is sent along so the SUT skips everything already collected.
+        """
         try:
+            cursor = None
+            previous = self._sut_log_cursors.get(sut_ip)
+            if previous and since_iso:
+                try:
+                    if previous[1] <= datetime.fromisoformat(since_iso):
+                        cursor = previous[0]
+                except (ValueError, TypeError):
+                    pass
+
+            collected_at = datetime.now()
             result = self.sut_client.get_logs(
                 ip=sut_ip,
                 port=8080,
                 lines=5000,  # Get last 5000 lines
-                since=since_iso
+                since=since_iso,
+                cursor=cursor
             )
 
             if result.success and result.data:
                 lines = result.data.get('lines', [])
                 hostname = result.data.get('hostname', sut_ip)
+                if result.data.get('cursor'):
+                    self._sut_log_cursors[sut_ip] = (result.data['cursor'], collected_at)
+                if result.data.get('truncated'):
+                    logger.warning(f"SUT Client log for run {run_id} exceeded 5000 lines, older lines skipped")
 
                 if lines:
                     saved_path = self.run_storage.save_service_logs(
@@ -0,0 +1,257 @@
+"""
+Event-driven run dispatcher for RunManager workers
+
+Replaces the shared FIFO queue + requeue loop. Each SUT has its own ready
+queue, and a SUT is only offered to workers when it is idle and the Steam
+account needed by the run at the head of its queue can be acquired. SUTs whose
+head run is blocked on an account are parked on that account and woken by the
+AccountScheduler release event, so workers sleep until something actually
+frees up instead of spinning on requeues.
+
+Usage:
+    dispatcher = RunDispatcher(get_account_scheduler())
+    dispatcher.submit(run_id, sut_ip, game_name)
+
+    # Worker thread
+    run_id = dispatcher.next_run(timeout=0.5)   # SUT + account now held
+    ...
+    dispatcher.release_sut(sut_ip, run_id)
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _QueuedRun:
+    """A run waiting in a SUT's ready queue"""
+    seq: int
+    run_id: str
+    game_name: str
+    account_key: str
+
+
+class RunDispatcher:
+    """
+    Per-SUT ready queues with account-aware, event-driven dispatch.
+
+    Ordering: among SUTs that can start a run right now, the one whose head
+    run was submitted first wins, so dispatch stays FIFO across the fleet.
+    Within a SUT runs are strictly FIFO.
+    """
+
+    def __init__(self, account_scheduler):
+        self.account_scheduler = account_scheduler
+
+        self._cond = threading.Condition(threading.Lock())
+        self._seq = itertools.count()
+        self._shutdown = False
+
+        self._queues: Dict[str, Deque[_QueuedRun]] = {}   # sut_ip -> queued runs
+        self._run_sut: Dict[str, str] = {}                # run_id -> sut_ip
+        self._busy: Dict[str, _QueuedRun] = {}            # sut_ip -> executing run
+
+        # Min-heap of (head seq, sut_ip) for idle SUTs that may be dispatchable.
+        # Entries are validated lazily when popped.
+        self._ready: List[Tuple[int, str]] = []
+        self._ready_since: Dict[str, float] = {}
+
+        # account_key -> SUTs whose head run is waiting for that account
+        self._parked: Dict[str, Set[str]] = {}
+
+        # Stats
+        self._dispatched = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+        account_scheduler.add_release_listener(self.account_released)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, run_id: str, sut_ip: str, game_name: str):
+        """Add a run to its SUT's ready queue"""
+        account_key = self.account_scheduler.get_account_type(game_name).value
+        with self._cond:
+            if run_id in self._run_sut:
+                return
+            q = self._queues.setdefault(sut_ip, deque())
+            q.append(_QueuedRun(next(self._seq), run_id, game_name, account_key))
+            self._run_sut[run_id] = sut_ip
+            if len(q) == 1:
+                self._mark_ready(sut_ip)
+
+    def cancel(self, run_id: str) -> bool:
+        """Remove a queued run. Returns False if it was not queued."""
+        with self._cond:
+            sut_ip = self._run_sut.pop(run_id, None)
+            if sut_ip is None:
+                return False
+            q = self._queues[sut_ip]
+            was_head = q and q[0].run_id == run_id
+            for item in q:
+                if item.run_id == run_id:
+                    q.remove(item)
+                    break
+            if was_head:
+                # New head may need a different account
+                self._unpark(sut_ip)
+                if q:
+                    self._mark_ready(sut_ip)
+            if not q:
+                del self._queues[sut_ip]
+            return True
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def next_run(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Block until a run can start, then return its run_id.
+
+        On return the run's SUT is marked busy and its Steam account has been
+        acquired; the caller must call release_sut() when the run finishes.
+        Returns None on timeout or shutdown.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._shutdown:
+                run_id = self._dispatch_locked()
+                if run_id is not None:
+                    return run_id
+
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+        return None
+
+    def _dispatch_locked(self) -> Optional[str]:
+        while self._ready:
+            seq, sut_ip = heapq.heappop(self._ready)
+            q = self._queues.get(sut_ip)
+            if not q or sut_ip in self._busy or self._is_parked(sut_ip):
+                continue
+            head = q[0]
+            if head.seq != seq:
+                # Stale entry (head was cancelled); a fresh one was pushed
+                continue
+
+            # Lock order is always dispatcher -> account scheduler. Release
+            # notifications come back outside the account scheduler's lock.
+            if not self.account_scheduler.try_acquire(sut_ip, head.game_name):
+                holder = self.account_scheduler.get_holder(head.game_name)
+                logger.info(f"SUT {sut_ip} waiting for {head.account_key.upper()} account "
+                            f"(held by {holder}) for '{head.game_name}'")
+                self._parked.setdefault(head.account_key, set()).add(sut_ip)
+                self._ready_since.pop(sut_ip, None)
+                continue
+
+            q.popleft()
+            if not q:
+                del self._queues[sut_ip]
+            del self._run_sut[head.run_id]
+            self._busy[sut_ip] = head
+
+            latency = time.monotonic() - self._ready_since.pop(sut_ip, time.monotonic())
+            self._dispatched += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+            return head.run_id
+        return None
+
+    def release_sut(self, sut_ip: str, run_id: str = None):
+        """Mark a SUT idle again (no-op if it's running a different run)"""
+        with self._cond:
+            current = self._busy.get(sut_ip)
+            if current is None or (run_id is not None and current.run_id != run_id):
+                return
+            del self._busy[sut_ip]
+            if self._queues.get(sut_ip):
+                self._mark_ready(sut_ip)
+
+    def abandon(self, run_id: str):
+        """Give back the SUT and account of a dispatched run that won't execute"""
+        with self._cond:
+            for sut_ip, current in self._busy.items():
+                if current.run_id == run_id:
+                    break
+            else:
+                return
+        # Account release re-enters via account_released(); keep it outside our lock
+        self.account_scheduler.release(sut_ip, current.game_name)
+        self.release_sut(sut_ip, run_id)
+
+    def account_released(self, sut_ip: str, account_key: str):
+        """AccountScheduler release listener - wake SUTs parked on the account"""
+        with self._cond:
+            waiting = self._parked.pop(account_key, None)
+            if not waiting:
+                return
+            for parked_sut in waiting:
+                if self._queues.get(parked_sut) and parked_sut not in self._busy:
+                    self._mark_ready(parked_sut)
+            self._cond.notify(len(waiting))
+
+    def shutdown(self):
+        """Wake all workers and make next_run() return None"""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def qsize(self) -> int:
+        """Number of queued (not yet dispatched) runs"""
+        with self._cond:
+            return len(self._run_sut)
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                'queued': len(self._run_sut),
+                'suts_with_queue': len(self._queues),
+                'busy_suts': len(self._busy),
+                'parked_suts': sum(len(s) for s in self._parked.values()),
+                'dispatched': self._dispatched,
+                'avg_dispatch_latency_ms': round(
+                    self._latency_total / self._dispatched * 1000, 3) if self._dispatched else 0.0,
+                'max_dispatch_latency_ms': round(self._latency_max * 1000, 3),
+            }
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds self._cond)
+    # ------------------------------------------------------------------
+
+    def _mark_ready(self, sut_ip: str):
+        q = self._queues.get(sut_ip)
+        if not q:
+            return
+        heapq.heappush(self._ready, (q[0].seq, sut_ip))
+        self._ready_since.setdefault(sut_ip, time.monotonic())
+        self._cond.notify()
+
+    def _is_parked(self, sut_ip: str) -> bool:
+        q = self._queues.get(sut_ip)
+        if not q:
+            return False
+        return sut_ip in self._parked.get(q[0].account_key, ())
+
+    def _unpark(self, sut_ip: str):
+        for waiting in self._parked.values():
+            waiting.discard(sut_ip)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Run Index - SQLite index of runs stored on disk
+
+Maps run_id -> run folder plus the handful of fields needed for listing and
+filtering (status, game, SUT, campaign, timestamps), so RunStorageManager can
+resolve a run without walking the whole logs tree and parsing every
+manifest.json.
+
+The manifests on disk remain the source of truth. The index is kept in sync by
+RunStorageManager on every manifest write/delete and can be rebuilt from disk
+at any time with rebuild().
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RunIndex:
+    """Persistent run_id -> run folder index backed by SQLite"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        """Create the index table if needed"""
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    folder_name TEXT NOT NULL,
+                    status TEXT,
+                    game TEXT,
+                    sut_ip TEXT,
+                    sut_device_id TEXT,
+                    campaign_id TEXT,
+                    campaign_name TEXT,
+                    created_at TEXT,
+                    completed_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_campaign_id ON runs(campaign_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_sut_ip ON runs(sut_ip)")
+            conn.commit()
+
+    @contextmanager
+    def get_connection(self):
+        """Get database connection with automatic closing"""
+        conn = None
+        try:
+            conn = sqlite3.connect(str(self.db_path), timeout=10.0)
+            conn.row_factory = sqlite3.Row
+            yield conn
+        except sqlite3.Error as e:
+            logger.error(f"Run index database error: {e}")
+            if conn:
+                conn.rollback()
+            raise
+        finally:
+            if conn:
+                conn.close()
+
+    @staticmethod
+    def _row_from_manifest(manifest) -> Dict[str, Any]:
+        """Extract indexed fields from a RunManifest (or manifest dict)"""
+        data = manifest if isinstance(manifest, dict) else manifest.to_dict()
+        sut = data.get('sut') or {}
+        config = data.get('config') or {}
+        games = config.get('games') or []
+        return {
+            'run_id': data.get('run_id'),
+            'folder_name': data.get('folder_name', ''),
+            'status': data.get('status'),
+            'game': games[0] if games else None,
+            'sut_ip': sut.get('ip'),
+            'sut_device_id': sut.get('device_id'),
+            'campaign_id': data.get('campaign_id'),
+            'campaign_name': data.get('campaign_name'),
+            'created_at': data.get('created_at'),
+            'completed_at': data.get('completed_at'),
+        }
+
+    _UPSERT_SQL = """
+        INSERT INTO runs (run_id, folder_name, status, game, sut_ip, sut_device_id,
+                          campaign_id, campaign_name, created_at, completed_at)
+        VALUES (:run_id, :folder_name, :status, :game, :sut_ip, :sut_device_id,
+                :campaign_id, :campaign_name, :created_at, :completed_at)
+        ON CONFLICT(run_id) DO UPDATE SET
+            folder_name = excluded.folder_name,
+            status = excluded.status,
+            game = excluded.game,
+            sut_ip = excluded.sut_ip,
+            sut_device_id = excluded.sut_device_id,
+            campaign_id = excluded.campaign_id,
+            campaign_name = excluded.campaign_name,
+            created_at = excluded.created_at,
+            completed_at = excluded.completed_at
+    """
+
+    def upsert(self, manifest) -> bool:
+        """Insert or update the index row for a manifest"""
+        row = self._row_from_manifest(manifest)
+        if not row['run_id']:
+            return False
+        try:
+            with self._lock, self.get_connection() as conn:
+                conn.execute(self._UPSERT_SQL, row)
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to index run {row['run_id']}: {e}")
+            return False
+
+    def delete(self, run_id: str) -> bool:
+        """Remove a run from the index"""
+        try:
+            with self._lock, self.get_connection() as conn:
+                conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+                conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Failed to remove run {run_id} from index: {e}")
+            return False
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get the index row for a run"""
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_folder_name(self, run_id: str) -> Optional[str]:
+        """Get a run's folder (relative to the runs base dir)"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT folder_name FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return row['folder_name'] if row else None
+
+    def list_runs(
+        self,
+        status: str = None,
+        game: str = None,
+        sut_ip: str = None,
+        campaign_id: str = None,
+        limit: int = None,
+    ) -> List[Dict[str, Any]]:
+        """List indexed runs, newest first, optionally filtered"""
+        clauses = []
+        params: List[Any] = []
+        for column, value in (('status', status), ('game', game),
+                              ('sut_ip', sut_ip), ('campaign_id', campaign_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self.get_connection() as conn:
+            return [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+    def count(self) -> int:
+        """Number of indexed runs"""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def replace_all(self, manifests: Iterable[Dict[str, Any]]) -> int:
+        """Atomically replace the whole index with the given manifests"""
+        rows = [self._row_from_manifest(m) for m in manifests]
+        rows = [r for r in rows if r['run_id']]
+        with self._lock, self.get_connection() as conn:
+            conn.execute("DELETE FROM runs")
+            conn.executemany(self._UPSERT_SQL, rows)
+            conn.commit()
+        return len(rows)
+
+    def rebuild(self, base_dir: Path) -> int:
+        """Repopulate the index by scanning base_dir for run manifests.
+
+        Returns:
+            Number of runs indexed
+        """
+        base_dir = Path(base_dir)
+        manifests = []
+        for manifest_path in base_dir.rglob("manifest.json"):
+            # Skip campaign_manifest.json (only index run manifests)
+            if manifest_path.name != "manifest.json":
+                continue
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read manifest {manifest_path}: {e}")
+                continue
+            if 'run_id' not in data:
+                continue
+            # Folder on disk wins over whatever the manifest recorded
+            data['folder_name'] = manifest_path.parent.relative_to(base_dir).as_posix()
+            manifests.append(data)
+
+        count = self.replace_all(manifests)
+        logger.info(f"Rebuilt run index from {base_dir}: {count} runs")
+        return count
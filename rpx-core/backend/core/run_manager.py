@@ -13,10 +13,10 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
-import queue
 import copy
 
 from .run_storage import RunStorageManager, SUTInfo, RunConfig, RunManifest
+from .run_dispatcher import RunDispatcher
 from .log_collector import LogCollector
 
 logger = logging.getLogger(__name__)
@@ -183,7 +183,6 @@ class RunManager:
         self.sut_client = sut_client  # For fetching SUT system_info
         self.active_runs: Dict[str, AutomationRun] = {}
         self.run_history: List[AutomationRun] = []
-        self.run_queue = queue.Queue()
         self.worker_threads: List[threading.Thread] = []
         self.running = False
         self._lock = threading.RLock()  # Use RLock to allow nested locking (e.g., stop_run -> _save_queued_runs)
@@ -195,6 +194,9 @@ class RunManager:
         from .account_scheduler import get_account_scheduler
         self.account_scheduler = get_account_scheduler()
 
+        # Per-SUT ready queues; wakes workers only when a SUT or account frees up
+        self.run_queue = RunDispatcher(self.account_scheduler)
+
         # Persistent storage manager
         self.storage = RunStorageManager()
 
@@ -206,7 +208,7 @@ class RunManager:
 
         # Queue persistence file and tracking list
         self._queue_file = self.storage.base_dir / 'queued_runs.json'
-        self._queued_run_ids: List[str] = []  # Track queue order (Queue doesn't allow iteration)
+        self._queued_run_ids: List[str] = []  # Track queue order for persistence
 
         # Active runs persistence file (for crash recovery)
         self._active_runs_file = self.storage.base_dir / 'active_runs.json'
@@ -352,13 +354,12 @@ class RunManager:
                 clean = re.sub(r'^\[.*?\]\s*', '', err)
                 if clean not in errors:
                     errors.append(clean)
-            # Fallback: extract error from timeline.json if manifest has no error data
+            # Fallback: extract error from the timeline if manifest has no error data
             if not errors and manifest.status in ('failed', 'stopped'):
                 try:
-                    tl_path = self.storage.base_dir / manifest.folder_name / 'timeline.json'
-                    if tl_path.exists():
-                        with open(tl_path, 'r', encoding='utf-8') as tl_f:
-                            tl_data = json.load(tl_f)
+                    from .timeline_manager import TimelineManager
+                    tl_data = TimelineManager.read_events(self.storage.base_dir / manifest.folder_name)
+                    if tl_data:
                         for evt in tl_data.get('events', []):
                             etype = evt.get('event_type', '')
                             msg = evt.get('message', '')
@@ -458,6 +459,7 @@ class RunManager:
             
         logger.info("Stopping RunManager...")
         self.running = False
+        self.run_queue.shutdown()
         
         # Stop all active runs
         with self._lock:
@@ -474,12 +476,6 @@ class RunManager:
                 if thread.is_alive():
                     logger.warning(f"Worker thread {thread.name} did not shut down gracefully")
         
-        # Clear the queue to help threads exit
-        try:
-            while not self.run_queue.empty():
-                self.run_queue.get_nowait()
-        except:
-            pass
         
         logger.info("RunManager stopped")
     
@@ -544,7 +540,7 @@ class RunManager:
                 logger.info(f"Added run {run_id} to active runs. Current active runs: {len(self.active_runs)}")
 
             logger.info(f"Adding run {run_id} to queue")
-            self.run_queue.put(run_id)
+            self.run_queue.submit(run_id, sut_ip, game_name)
 
             # Persist queue immediately to prevent data loss
             self._save_queued_runs()
@@ -584,6 +580,7 @@ class RunManager:
                     # Release the SUT lock so other runs can use this SUT
                     if self._sut_current_run.get(run.sut_ip) == run_id:
                         del self._sut_current_run[run.sut_ip]
+                        self.run_queue.release_sut(run.sut_ip, run_id)
                         logger.info(f"Released SUT {run.sut_ip} lock for stopped run")
                         self._save_sut_locks()
 
@@ -603,6 +600,9 @@ class RunManager:
                     run.error_message = "Cancelled before starting"
                     run.progress.end_time = datetime.now()
 
+                    # Drop from the dispatcher's SUT queue
+                    self.run_queue.cancel(run_id)
+
                     # Release account lock if somehow acquired while queued
                     self.account_scheduler.release(run.sut_ip, run.game_name)
 
@@ -889,15 +889,13 @@ class RunManager:
         worker_name = threading.current_thread().name
         logger.info(f"Worker thread {worker_name} started")
 
-        requeued_runs = set()  # Track runs we've requeued to avoid infinite loops
-
         while self.running:
+            run = None
             try:
-                # Wait for a run to process
-                try:
-                    run_id = self.run_queue.get(timeout=0.5)
-                except queue.Empty:
-                    requeued_runs.clear()  # Clear requeue tracking on empty queue
+                # Block until some SUT is idle and its head run's Steam account
+                # is acquired. The dispatcher marks the SUT busy atomically.
+                run_id = self.run_queue.next_run(timeout=0.5)
+                if run_id is None:
                     continue
 
                 # Double-check we're still running
@@ -905,39 +903,15 @@ class RunManager:
                     logger.info(f"Worker thread {worker_name} stopping")
                     break
 
-                # ATOMIC CHECK: Both SUT-busy and account checks must be atomic
-                # to prevent race conditions where two workers grab the same SUT
                 with self._lock:
-                    if run_id not in self.active_runs:
-                        continue
-                    run = self.active_runs[run_id]
-
-                    # Check 1: Is another run already executing on this SUT?
-                    current_run_on_sut = self._sut_current_run.get(run.sut_ip)
-                    if current_run_on_sut and current_run_on_sut != run_id:
-                        # SUT is busy, requeue this run (always requeue to avoid losing runs)
-                        if run_id not in requeued_runs:
-                            logger.debug(f"SUT {run.sut_ip} busy with run {current_run_on_sut[:8]}, "
-                                       f"requeueing {run_id[:8]} ({run.game_name})")
-                            requeued_runs.add(run_id)
-                        self.run_queue.put(run_id)  # Always put back in queue
-                        continue
-
-                    # Check 2: Can we acquire the Steam account for this game?
-                    if not self.account_scheduler.try_acquire(run.sut_ip, run.game_name):
-                        # Account is held by another SUT, requeue this run (always requeue)
-                        if run_id not in requeued_runs:
-                            holder = self.account_scheduler.get_holder(run.game_name)
-                            account_type = self.account_scheduler.get_account_type(run.game_name).value.upper()
-                            logger.info(f"SUT {run.sut_ip} waiting for {account_type} account "
-                                      f"(held by {holder}), requeueing '{run.game_name}'")
-                            requeued_runs.add(run_id)
-                        self.run_queue.put(run_id)  # Always put back in queue
-                        continue
-
-                    # BOTH checks passed - atomically mark SUT as busy BEFORE releasing lock
-                    self._sut_current_run[run.sut_ip] = run_id
-                    requeued_runs.discard(run_id)
+                    run = self.active_runs.get(run_id)
+                    if run is not None:
+                        self._sut_current_run[run.sut_ip] = run_id
+
+                if run is None:
+                    # Cancelled between dispatch and pickup - give back what the dispatcher took
+                    self.run_queue.abandon(run_id)
+                    continue
 
                 # Run is about to execute - remove from queued list and persist
                 self._remove_from_queued_list(run_id)
@@ -960,6 +934,7 @@ class RunManager:
                     with self._lock:
                         if self._sut_current_run.get(run.sut_ip) == run_id:
                             del self._sut_current_run[run.sut_ip]
+                    self.run_queue.release_sut(run.sut_ip, run_id)
                     # Persist SUT lock release
                     self._save_sut_locks()
 
@@ -968,17 +943,18 @@ class RunManager:
 
                 # Cleanup on error
                 try:
-                    if 'run' in locals() and run:
+                    if run:
                         self.account_scheduler.release(run.sut_ip, run.game_name)
                         with self._lock:
                             if self._sut_current_run.get(run.sut_ip) == run.run_id:
                                 del self._sut_current_run[run.sut_ip]
+                        self.run_queue.release_sut(run.sut_ip, run.run_id)
                         self.complete_run(run.run_id, False, error_message=f"Worker thread error: {str(e)}")
                 except Exception as cleanup_error:
                     logger.error(f"Error during worker thread cleanup: {cleanup_error}")
 
         logger.info(f"Worker thread {worker_name} ended")
-    
+
     def _execute_run(self, run: AutomationRun):
         """Execute a single automation run"""
         logger.info(f"Starting execution of run {run.run_id}: {run.game_name} on {run.sut_ip}")
@@ -1233,6 +1209,7 @@ class RunManager:
                 'completed_runs': completed_count,
                 'failed_runs': failed_count,
                 'worker_threads': len(self.worker_threads),
+                'dispatcher': self.run_queue.get_stats(),
                 'running': self.running,
                 'active_games': active_games  # For debugging
             }
@@ -1327,7 +1304,7 @@ class RunManager:
                     # Add to active_runs and queue
                     self.active_runs[run.run_id] = run
                     self._queued_run_ids.append(run.run_id)
-                    self.run_queue.put(run.run_id)
+                    self.run_queue.submit(run.run_id, run.sut_ip, run.game_name)
                     restored_count += 1
 
                     logger.info(f"Restored queued run {run.run_id[:8]}: {run.game_name} on {run.sut_ip}")
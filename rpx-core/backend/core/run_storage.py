@@ -8,6 +8,7 @@ Handles:
 - Per-iteration folder management (perf-run-1, perf-run-2, etc.)
 - Screenshot, log, and results storage
 - Run history loading from disk
+- SQLite run index (run_id -> folder) so lookups don't walk the logs tree
 """
 
 import json
@@ -15,11 +16,14 @@ import logging
 import os
 import re
 import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field, asdict
 
+from .run_index import RunIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -206,6 +210,9 @@ class RunManifest:
     # Timeline events for replay
     timeline_events: List[Dict[str, Any]] = field(default_factory=list)
 
+    # Background trace pulls, one entry per agent
+    trace_pulls: List[Dict[str, Any]] = field(default_factory=list)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -223,6 +230,7 @@ class RunManifest:
             'campaign_id': self.campaign_id,
             'campaign_name': self.campaign_name,
             'timeline_events': self.timeline_events,
+            'trace_pulls': list(self.trace_pulls),
         }
 
     @classmethod
@@ -240,6 +248,7 @@ class RunManifest:
             campaign_id=data.get('campaign_id'),
             campaign_name=data.get('campaign_name'),
             timeline_events=data.get('timeline_events', []),
+            trace_pulls=data.get('trace_pulls', []),
         )
 
         if data.get('sut'):
@@ -284,6 +293,12 @@ class RunStorageManager:
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
         self._run_cache: Dict[str, RunManifest] = {}
+        self._manifest_lock = threading.RLock()
+
+        # Persistent run index - populate from disk on first use
+        self.index = RunIndex(self.base_dir / "run_index.db")
+        if self.index.count() == 0:
+            self.rebuild_index()
 
         logger.info(f"RunStorageManager initialized with base_dir: {self.base_dir}")
 
@@ -455,27 +470,49 @@ class RunStorageManager:
         if manifest:
             return self.base_dir / manifest.folder_name
 
-        # Try to find run on disk if not in cache
-        # This handles cases where cache might be out of sync
+        # Not in cache - resolve through the run index
+        manifest = self._load_indexed_manifest(run_id)
+        if manifest:
+            return self.base_dir / manifest.folder_name
+
+        return None
+
+    def _load_indexed_manifest(self, run_id: str) -> Optional[RunManifest]:
+        """Load a single run's manifest via the run index and cache it"""
         try:
-            for manifest_path in self.base_dir.rglob("manifest.json"):
-                if manifest_path.name != "manifest.json":
-                    continue
-                try:
-                    with open(manifest_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    if data.get('run_id') == run_id:
-                        # Found it - load into cache and return
-                        loaded_manifest = RunManifest.from_dict(data)
-                        self._run_cache[run_id] = loaded_manifest
-                        logger.debug(f"Loaded run {run_id} from disk into cache")
-                        return manifest_path.parent
-                except Exception:
-                    continue
+            folder_name = self.index.get_folder_name(run_id)
         except Exception as e:
-            logger.warning(f"Error searching for run {run_id} on disk: {e}")
+            logger.warning(f"Run index lookup failed for {run_id}: {e}")
+            return None
+        if folder_name is None:
+            return None
 
-        return None
+        manifest_path = self.base_dir / folder_name / "manifest.json"
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            # Folder was removed outside of RPX - drop the stale row
+            logger.warning(f"Indexed run {run_id} missing on disk, removing from index")
+            self.index.delete(run_id)
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to load manifest for run {run_id}: {e}")
+            return None
+
+        manifest = RunManifest.from_dict(data)
+        manifest.folder_name = folder_name
+        self._run_cache[run_id] = manifest
+        logger.debug(f"Loaded run {run_id} from disk into cache")
+        return manifest
+
+    def rebuild_index(self) -> int:
+        """Repopulate the run index from the manifests on disk"""
+        try:
+            return self.index.rebuild(self.base_dir)
+        except Exception as e:
+            logger.error(f"Failed to rebuild run index: {e}")
+            return 0
 
     def get_iteration_dir(self, run_id: str, iteration: int, iteration_type: str = "performance") -> Optional[Path]:
         """Get the iteration directory path
@@ -543,7 +580,9 @@ class RunStorageManager:
                 if iter_dir:
                     screenshots_dir = iter_dir / "screenshots"
                     if screenshots_dir.exists():
-                        iter_info.screenshots_count = len(list(screenshots_dir.glob("*.png")))
+                        iter_info.screenshots_count = sum(
+                            1 for f in screenshots_dir.iterdir() if f.suffix in ('.png', '.jpg', '.webp')
+                        )
 
                 self._save_manifest(manifest)
                 return True
@@ -702,9 +741,33 @@ class RunStorageManager:
         self._save_manifest(manifest)
         return True
 
+    def record_trace_pull(self, run_id: str, pull: Dict[str, Any]) -> bool:
+        """Add or update a background trace pull entry (keyed by agent)"""
+        manifest = self.get_manifest(run_id)
+        if not manifest:
+            return False
+
+        with self._manifest_lock:
+            for i, existing in enumerate(manifest.trace_pulls):
+                if existing.get('agent') == pull.get('agent'):
+                    manifest.trace_pulls[i] = pull
+                    break
+            else:
+                manifest.trace_pulls.append(pull)
+
+            if pull.get('status') == 'failed':
+                manifest.errors.append(
+                    f"[{datetime.now().isoformat()}] Trace pull failed for {pull.get('agent')}: {pull.get('error')}"
+                )
+
+        return self._save_manifest(manifest)
+
     def get_manifest(self, run_id: str) -> Optional[RunManifest]:
         """Get manifest for a run"""
-        return self._run_cache.get(run_id)
+        manifest = self._run_cache.get(run_id)
+        if manifest is None:
+            manifest = self._load_indexed_manifest(run_id)
+        return manifest
 
     def load_run_history(self) -> List[RunManifest]:
         """
@@ -718,25 +781,12 @@ class RunStorageManager:
         if not self.base_dir.exists():
             return runs
 
-        # Find all manifest.json files recursively (handles both standalone and campaign runs)
-        for manifest_path in self.base_dir.rglob("manifest.json"):
-            # Skip campaign_manifest.json (only load run manifests)
-            if manifest_path.name != "manifest.json":
-                continue
-
-            try:
-                with open(manifest_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Skip if this is not a run manifest (no run_id field)
-                if 'run_id' not in data:
-                    continue
-
-                manifest = RunManifest.from_dict(data)
+        # Resolve runs through the index (covers both standalone and campaign runs)
+        for row in self.index.list_runs():
+            run_id = row['run_id']
+            manifest = self._run_cache.get(run_id) or self._load_indexed_manifest(run_id)
+            if manifest:
                 runs.append(manifest)
-                self._run_cache[manifest.run_id] = manifest
-            except Exception as e:
-                logger.warning(f"Failed to load manifest from {manifest_path}: {e}")
 
         # Sort by creation date (newest first)
         runs.sort(key=lambda r: r.created_at, reverse=True)
@@ -846,13 +896,26 @@ class RunStorageManager:
         run_dir = self.base_dir / manifest.folder_name
         manifest_path = run_dir / "manifest.json"
 
-        try:
-            with open(manifest_path, 'w', encoding='utf-8') as f:
-                json.dump(manifest.to_dict(), f, indent=2)
-            return True
-        except Exception as e:
-            logger.error(f"Failed to save manifest: {e}")
-            return False
+        # Background trace pulls save from their own thread; the index is
+        # updated under the same lock so it can't lag behind (or overtake)
+        # the file when two saves race
+        with self._manifest_lock:
+            tmp_path = manifest_path.with_suffix('.json.tmp')
+            try:
+                # Write aside and swap in, so readers never see a torn manifest
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest.to_dict(), f, indent=2)
+                os.replace(tmp_path, manifest_path)
+            except Exception as e:
+                logger.error(f"Failed to save manifest: {e}")
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
+
+            self.index.upsert(manifest)
+        return True
 
     def update_manifest(self, manifest: RunManifest) -> bool:
         """Update an existing manifest (status, error, completed_at, etc.)"""
@@ -868,7 +931,7 @@ class RunStorageManager:
 
     def delete_run(self, run_id: str) -> bool:
         """Delete a run and all its files"""
-        manifest = self._run_cache.get(run_id)
+        manifest = self.get_manifest(run_id)
         if not manifest:
             return False
 
@@ -876,7 +939,8 @@ class RunStorageManager:
         if run_dir.exists():
             shutil.rmtree(run_dir)
 
-        del self._run_cache[run_id]
+        self._run_cache.pop(run_id, None)
+        self.index.delete(run_id)
         logger.info(f"Deleted run: {manifest.folder_name}")
         return True
 
@@ -1090,17 +1154,8 @@ class RunStorageManager:
 
     def get_timeline_events(self, run_id: str) -> List[Dict[str, Any]]:
         """Get all timeline events for a run"""
-        manifest = self._run_cache.get(run_id)
+        manifest = self.get_manifest(run_id)
         if not manifest:
-            # Try loading from disk
-            for run_dir in self.base_dir.rglob('manifest.json'):
-                try:
-                    with open(run_dir, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    if data.get('run_id') == run_id:
-                        return data.get('timeline_events', [])
-                except Exception:
-                    continue
             return []
 
         return manifest.timeline_events
@@ -1112,6 +1167,87 @@ class RunStorageManager:
             return False
         return self._save_manifest(manifest)
 
+    # =========================================================================
+    # Step Latency (perf spans written by SimpleAutomation per iteration)
+    # =========================================================================
+
+    def get_perf(self, run_id: str, include_spans: bool = False) -> Optional[Dict[str, Any]]:
+        """Get merged step latency histograms for a run (all iterations)
+
+        Args:
+            run_id: Run identifier
+            include_spans: Also return the raw spans of every iteration
+
+        Returns:
+            {'run_id', 'iterations', 'summary', ['spans']} or None if the run is unknown
+        """
+        from modules.perf_spans import SPANS_FILENAME, SUMMARY_FILENAME, merge_summaries
+
+        run_dir = self.get_run_dir(run_id)
+        if not run_dir or not run_dir.exists():
+            return None
+
+        summaries = []
+        spans: List[Dict[str, Any]] = []
+        for summary_path in sorted(run_dir.rglob(SUMMARY_FILENAME)):
+            try:
+                with open(summary_path, 'r', encoding='utf-8') as f:
+                    summaries.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Failed to read {summary_path}: {e}")
+                continue
+            if include_spans:
+                iteration = summary_path.parent.relative_to(run_dir).as_posix()
+                spans_path = summary_path.parent / SPANS_FILENAME
+                try:
+                    with open(spans_path, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            if line.strip():
+                                spans.append(dict(json.loads(line), iteration=iteration))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Failed to read {spans_path}: {e}")
+
+        result = {
+            'run_id': run_id,
+            'iterations': len(summaries),
+            'summary': merge_summaries(summaries),
+        }
+        if include_spans:
+            result['spans'] = spans
+        return result
+
+    def get_perf_rollup(self, game: str = None, sut_ip: str = None, limit: int = 50) -> Dict[str, Any]:
+        """Merge step latency histograms across the most recent runs
+
+        Args:
+            game: Only include runs of this game
+            sut_ip: Only include runs on this SUT
+            limit: Maximum number of runs to include (newest first)
+        """
+        from modules.perf_spans import SUMMARY_FILENAME, merge_summaries
+
+        summaries = []
+        run_ids = []
+        for row in self.index.list_runs(game=game, sut_ip=sut_ip, limit=limit):
+            run_dir = self.base_dir / row['folder_name']
+            found = False
+            for summary_path in run_dir.rglob(SUMMARY_FILENAME):
+                try:
+                    with open(summary_path, 'r', encoding='utf-8') as f:
+                        summaries.append(json.load(f))
+                    found = True
+                except Exception as e:
+                    logger.warning(f"Failed to read {summary_path}: {e}")
+            if found:
+                run_ids.append(row['run_id'])
+
+        return {
+            'filters': {'game': game, 'sut_ip': sut_ip, 'limit': limit},
+            'runs': run_ids,
+            'iterations': len(summaries),
+            'summary': merge_summaries(summaries),
+        }
+
     # =========================================================================
     # Service Logs Collection
     # =========================================================================
@@ -0,0 +1,220 @@
+"""
+SSH Session - One persistent SSH connection per SUT, shared by every remote call
+
+The Win32-OpenSSH client on Windows Masters has no ControlMaster support, so
+each ssh/scp/sftp subprocess pays for a full TCP + key exchange + auth
+handshake. SSHSession keeps a single paramiko transport open instead; remote
+commands and SFTP transfers each open a channel on it, which costs one round
+trip. Channels are independent, so parallel transfers share the connection.
+
+paramiko is optional (pip install rpx[ssh]); available() reports whether it
+can be used.
+"""
+
+import locale
+import logging
+import subprocess
+import threading
+import time
+from typing import Optional
+
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+logger = logging.getLogger(__name__)
+
+
+class _DrainingReader:
+    """stdout of a RemoteCommand. Both streams share the channel's flow-control
+    window, so stderr is drained between short polls for stdout; otherwise a
+    chatty command could fill the window and stall the stream."""
+
+    def __init__(self, command: "RemoteCommand"):
+        self._command = command
+
+    def read(self, size: int = -1) -> bytes:
+        """Up to size bytes (fewer as they arrive), or b"" at EOF"""
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(SSHSession.READ_SIZE), b""))
+        channel = self._command._channel
+        while True:
+            self._command.drain_stderr()
+            try:
+                return channel.recv(size)
+            except TimeoutError:
+                if channel.closed:
+                    return b""
+
+    def close(self):
+        pass  # The channel is closed by RemoteCommand.kill()/wait()
+
+
+class RemoteCommand:
+    """
+    A command running on a session channel, with the subset of the
+    subprocess.Popen interface TracePuller uses for streamed output.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, channel, stderr=None):
+        """
+        Args:
+            channel: paramiko channel the command was started on
+            stderr: Binary file the command's stderr is copied to as it arrives
+        """
+        self._channel = channel
+        self._stderr = stderr
+        self.returncode: Optional[int] = None
+        # Short recv timeouts let stdout reads interleave with draining stderr
+        channel.settimeout(self.POLL_INTERVAL)
+        self.stdout = _DrainingReader(self)
+
+    def kill(self):
+        """Close the channel; the remote command gets EOF/SIGPIPE on its output."""
+        self._channel.close()
+
+    def drain_stderr(self):
+        """Move whatever stderr has arrived off the channel (it shares stdout's window)."""
+        while self._channel.recv_stderr_ready():
+            data = self._channel.recv_stderr(65536)
+            if self._stderr is not None:
+                self._stderr.write(data)
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """Wait for the command to exit (-1 if it was killed)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._channel.exit_status_ready():
+            self.drain_stderr()
+            if self._channel.closed:
+                self.returncode = -1
+                return self.returncode
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired("ssh", timeout)
+            time.sleep(self.POLL_INTERVAL)
+        self.returncode = self._channel.recv_exit_status()
+        self.drain_stderr()
+        self._channel.close()
+        return self.returncode
+
+
+class SSHSession:
+    """Persistent SSH connection to one host, reconnected on demand."""
+
+    KEEPALIVE_INTERVAL = 15
+    READ_SIZE = 65536
+
+    def __init__(self, host: str, user: str, timeout: int = 60, port: int = 22,
+                 key_filename: Optional[str] = None):
+        """
+        Args:
+            host: Host name or IP address
+            user: SSH username
+            timeout: Connect, banner and auth timeout in seconds
+            port: SSH port (default: 22)
+            key_filename: Private key to use (default: agent and ~/.ssh keys)
+        """
+        self.host = host
+        self.user = user
+        self.timeout = timeout
+        self.port = port
+        self.key_filename = key_filename
+        self.connects = 0
+        self._client = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        """Whether paramiko is installed."""
+        return paramiko is not None
+
+    def _transport(self):
+        """The live transport, connecting (or reconnecting) if needed."""
+        with self._lock:
+            if self._client is not None:
+                transport = self._client.get_transport()
+                if transport is not None and transport.is_active():
+                    return transport
+                self._client.close()
+                self._client = None
+
+            client = paramiko.SSHClient()
+            # Same trust model as the OpenSSH path (StrictHostKeyChecking=no)
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client.connect(
+                self.host, port=self.port, username=self.user,
+                timeout=self.timeout, banner_timeout=self.timeout, auth_timeout=self.timeout,
+                key_filename=self.key_filename,
+                allow_agent=self.key_filename is None, look_for_keys=self.key_filename is None,
+            )
+            transport = client.get_transport()
+            transport.set_keepalive(self.KEEPALIVE_INTERVAL)
+            self._client = client
+            self.connects += 1
+            logger.info(f"Opened persistent SSH session to {self.user}@{self.host}")
+            return transport
+
+    def _open_command(self, command: str, timeout: Optional[float]):
+        channel = self._transport().open_session(timeout=self.timeout)
+        channel.settimeout(timeout)
+        channel.exec_command(command)
+        return channel
+
+    def run(self, command: str, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run a command and collect its output, like subprocess.run(text=True).
+
+        Raises:
+            subprocess.TimeoutExpired: If the command doesn't finish within timeout
+        """
+        # Short recv timeouts so stderr is drained while waiting for stdout
+        channel = self._open_command(command, RemoteCommand.POLL_INTERVAL)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stdout, stderr = bytearray(), bytearray()
+        try:
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise subprocess.TimeoutExpired(command, timeout)
+                # Drain both streams so a chatty stderr can't stall the channel window
+                while channel.recv_stderr_ready():
+                    stderr += channel.recv_stderr(self.READ_SIZE)
+                try:
+                    data = channel.recv(self.READ_SIZE)
+                except TimeoutError:
+                    if channel.closed:
+                        break
+                    continue
+                if not data:
+                    break
+                stdout += data
+            returncode = channel.recv_exit_status()
+            while channel.recv_stderr_ready():
+                stderr += channel.recv_stderr(self.READ_SIZE)
+        finally:
+            channel.close()
+
+        encoding = locale.getpreferredencoding(False)
+        return subprocess.CompletedProcess(
+            command, returncode,
+            stdout.decode(encoding, errors="replace"),
+            stderr.decode(encoding, errors="replace"),
+        )
+
+    def popen(self, command: str, stderr=None) -> RemoteCommand:
+        """Start a command whose stdout is read as a stream."""
+        return RemoteCommand(self._open_command(command, None), stderr)
+
+    def open_sftp(self):
+        """Open an SFTP client on its own channel of the shared connection."""
+        sftp = self._transport().open_sftp_client()
+        sftp.get_channel().settimeout(self.timeout)
+        return sftp
+
+    def close(self):
+        """Close the connection (the next call reconnects)."""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
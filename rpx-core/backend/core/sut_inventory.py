@@ -0,0 +1,119 @@
+"""
+SUT Inventory - per-SUT mirror of installed games
+
+Game availability checks, preset validation and game path discovery all ask
+a SUT for /installed_games, often several times for the same run. The SUT
+caches its scan and versions it with an ETag, so the Master keeps the last
+list it got from each SUT and revalidates it instead of refetching:
+- If-None-Match with the mirrored ETag gets a 304 when nothing changed
+- since=<etag> gets only the added, updated and removed games otherwise
+
+SUTs without the cached inventory ignore both and send the full list, which
+replaces the mirror as before.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUT_PORT = 8080
+
+
+class SUTInventory:
+    """Installed games of one SUT, kept in sync with its /installed_games"""
+
+    def __init__(self, sut_ip: str, port: int = DEFAULT_SUT_PORT):
+        self.sut_ip = sut_ip
+        self.url = f"http://{sut_ip}:{port}/installed_games"
+        self.session = requests.Session()
+        self.etag: Optional[str] = None
+        self._games: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"full": 0, "not_modified": 0, "delta": 0, "resync": 0}
+
+    def get_games(self, timeout: float = 10, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Installed games on the SUT, revalidated against it.
+
+        Args:
+            timeout: Request timeout in seconds
+            refresh: Ask the SUT to rescan its libraries and replace the mirror
+
+        Returns:
+            List of installed game dicts (as returned by the SUT)
+
+        Raises:
+            requests.RequestException: SUT unreachable, or requests.HTTPError
+                if it answered with an error status
+        """
+        with self._lock:
+            if refresh or self.etag is None:
+                self._fetch_full(timeout, refresh)
+                return list(self._games.values())
+
+            response = self.session.get(self.url, params={"since": self.etag},
+                                        headers={"If-None-Match": f'"{self.etag}"'}, timeout=timeout)
+            if response.status_code == 304:
+                self.stats["not_modified"] += 1
+                return list(self._games.values())
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get("delta") and data.get("since") == self.etag and self._apply_delta(data):
+                self.stats["delta"] += 1
+                logger.debug(f"Installed games on {self.sut_ip}: +{len(data.get('added', []))} "
+                             f"~{len(data.get('updated', []))} -{len(data.get('removed', []))}")
+            elif data.get("delta"):
+                # Mirror and SUT disagree; start over from the full list
+                self.stats["resync"] += 1
+                logger.warning(f"Installed games delta from {self.sut_ip} did not apply, refetching")
+                self._fetch_full(timeout)
+            else:
+                self._replace(data)
+            return list(self._games.values())
+
+    def _fetch_full(self, timeout: float, refresh: bool = False):
+        response = self.session.get(self.url, params={"refresh": 1} if refresh else None, timeout=timeout)
+        response.raise_for_status()
+        self._replace(response.json())
+
+    def _replace(self, data: Dict[str, Any]):
+        self.stats["full"] += 1
+        games = data.get("games", [])
+        self._games = OrderedDict((game.get("install_path") or str(i), game) for i, game in enumerate(games))
+        self.etag = data.get("etag")
+
+    def _apply_delta(self, data: Dict[str, Any]) -> bool:
+        """Apply a delta; False if the result doesn't match the SUT's order and count"""
+        games = dict(self._games)
+        for path in data.get("removed", []):
+            games.pop(path, None)
+        for game in data.get("added", []) + data.get("updated", []):
+            games[game.get("install_path")] = game
+
+        order = data.get("order", [])
+        if len(order) != data.get("count") or any(path not in games for path in order):
+            return False
+        self._games = OrderedDict((path, games[path]) for path in order)
+        self.etag = data.get("etag")
+        return True
+
+
+_inventories: Dict[str, SUTInventory] = {}
+_inventories_lock = threading.Lock()
+
+
+def get_sut_inventory(sut_ip: str, port: int = DEFAULT_SUT_PORT) -> SUTInventory:
+    """Get (or create) the installed games mirror for a SUT."""
+    key = f"{sut_ip}:{port}"
+    with _inventories_lock:
+        inventory = _inventories.get(key)
+        if inventory is None:
+            inventory = SUTInventory(sut_ip, port)
+            _inventories[key] = inventory
+        return inventory
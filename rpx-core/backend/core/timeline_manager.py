@@ -14,12 +14,15 @@ The timeline shows the entire automation flow:
 - Game exit
 - Run completion
 
-Events are stored in timeline.json in the blackbox directory for persistence.
+Events are appended to timeline.jsonl (one event snapshot per line) as they
+happen and periodically compacted into timeline.json. Readers should go through
+TimelineManager.read_events() which replays the journal on top of the snapshot.
 """
 
 import json
 import logging
 import os
+import threading
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
@@ -183,6 +186,12 @@ class TimelineManager:
         timeline.sut_connected("192.168.1.100", port=8080)
     """
 
+    TIMELINE_FILENAME = 'timeline.json'
+    JOURNAL_FILENAME = 'timeline.jsonl'
+
+    # Compact the journal into timeline.json after this many appended records
+    COMPACT_EVERY = 200
+
     def __init__(self, run_id: str, run_dir: str, on_event: Callable[[TimelineEvent], None] = None):
         self.run_id = run_id
         self.run_dir = run_dir
@@ -192,8 +201,12 @@ class TimelineManager:
         self._event_order: List[str] = []  # Maintain insertion order
         self._event_counter = 0
 
-        # Timeline file path - save directly in run directory (not in blackbox subfolder)
-        self.timeline_file = os.path.join(run_dir, 'timeline.json')
+        # Timeline file paths - save directly in run directory (not in blackbox subfolder)
+        # timeline.json is the compacted snapshot, timeline.jsonl the append-only journal
+        self.timeline_file = os.path.join(run_dir, self.TIMELINE_FILENAME)
+        self.journal_file = os.path.join(run_dir, self.JOURNAL_FILENAME)
+        self._journal_records = 0
+        self._io_lock = threading.Lock()
 
         # Ensure run directory exists
         os.makedirs(run_dir, exist_ok=True)
@@ -238,8 +251,8 @@ class TimelineManager:
             duration = (event.timestamp - old_event.timestamp).total_seconds() * 1000
             event.duration_ms = int(duration)
 
-        # Save and notify
-        self._save()
+        # Persist and notify
+        self._append(event)
         self._notify(event)
 
         logger.debug(f"Timeline [{self.run_id}]: {message}")
@@ -270,7 +283,7 @@ class TimelineManager:
         if metadata:
             event.metadata.update(metadata)
 
-        self._save()
+        self._append(event)
         self._notify(event)
         return event
 
@@ -291,18 +304,42 @@ class TimelineManager:
         """Get all events as dictionaries"""
         return [e.to_dict() for e in self.get_events()]
 
-    def _save(self):
-        """Save timeline to file"""
+    def _append(self, event: TimelineEvent):
+        """Append an event snapshot to the journal, compacting periodically"""
         try:
-            data = {
-                'run_id': self.run_id,
-                'updated_at': datetime.now().isoformat(),
-                'events': self.get_events_dict(),
-            }
-            with open(self.timeline_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            line = json.dumps(event.to_dict()) + '\n'
+            with self._io_lock:
+                with open(self.journal_file, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self._journal_records += 1
+                if self._journal_records >= self.COMPACT_EVERY:
+                    self._compact_locked()
         except Exception as e:
-            logger.error(f"Failed to save timeline: {e}")
+            logger.error(f"Failed to append timeline event: {e}")
+
+    def compact(self):
+        """Write the full timeline to timeline.json and truncate the journal"""
+        try:
+            with self._io_lock:
+                self._compact_locked()
+        except Exception as e:
+            logger.error(f"Failed to compact timeline: {e}")
+
+    def _compact_locked(self):
+        data = {
+            'run_id': self.run_id,
+            'updated_at': datetime.now().isoformat(),
+            'events': self.get_events_dict(),
+        }
+        # Write snapshot atomically, then drop the journal. If we crash in
+        # between, replaying the journal over the new snapshot is idempotent.
+        tmp_file = self.timeline_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_file, self.timeline_file)
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_records = 0
 
     def _notify(self, event: TimelineEvent):
         """Notify listeners of event update"""
@@ -313,22 +350,78 @@ class TimelineManager:
                 logger.error(f"Error in timeline event callback: {e}")
 
     @classmethod
-    def load(cls, run_dir: str) -> Optional['TimelineManager']:
-        """Load timeline from file"""
+    def read_events(cls, run_dir) -> Optional[Dict[str, Any]]:
+        """Read timeline data from disk, replaying the journal over the snapshot.
+
+        Returns:
+            Dict with 'run_id' and 'events' (list of event dicts), or None if
+            the run has no timeline on disk.
+        """
+        run_dir = str(run_dir)
         # Timeline is saved directly in run_dir (not in blackbox subfolder)
-        timeline_file = os.path.join(run_dir, 'timeline.json')
-        if not os.path.exists(timeline_file):
+        timeline_file = os.path.join(run_dir, cls.TIMELINE_FILENAME)
+        journal_file = os.path.join(run_dir, cls.JOURNAL_FILENAME)
+        if not os.path.exists(timeline_file) and not os.path.exists(journal_file):
             # Fallback to old location for backwards compatibility
-            timeline_file = os.path.join(run_dir, 'blackbox', 'timeline.json')
+            timeline_file = os.path.join(run_dir, 'blackbox', cls.TIMELINE_FILENAME)
             if not os.path.exists(timeline_file):
                 return None
 
+        for attempt in range(2):
+            run_id = None
+            events: Dict[str, Dict[str, Any]] = {}
+            order: List[str] = []
+            journal_existed = os.path.exists(journal_file)
+
+            if os.path.exists(timeline_file):
+                with open(timeline_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                run_id = data.get('run_id')
+                for event_data in data.get('events', []):
+                    eid = event_data['event_id']
+                    if eid not in events:
+                        order.append(eid)
+                    events[eid] = event_data
+
+            try:
+                f = open(journal_file, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                if journal_existed and attempt == 0:
+                    # Compacted since we read the snapshot - it now holds the journal's events
+                    continue
+                break
+            with f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        event_data = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from a crash mid-write
+                        logger.warning(f"Skipping corrupt timeline journal line in {journal_file}")
+                        continue
+                    eid = event_data['event_id']
+                    if eid not in events:
+                        order.append(eid)
+                    events[eid] = event_data
+            break
+
+        return {
+            'run_id': run_id or os.path.basename(run_dir),
+            'events': [events[eid] for eid in order],
+        }
+
+    @classmethod
+    def load(cls, run_dir: str) -> Optional['TimelineManager']:
+        """Load timeline from file"""
         try:
-            with open(timeline_file, 'r') as f:
-                data = json.load(f)
+            data = cls.read_events(run_dir)
+            if data is None:
+                return None
 
             manager = cls(data['run_id'], run_dir)
-            for event_data in data.get('events', []):
+            for event_data in data['events']:
                 event = TimelineEvent.from_dict(event_data)
                 manager._events[event.event_id] = event
                 manager._event_order.append(event.event_id)
@@ -354,7 +447,7 @@ class TimelineManager:
 
     def run_completed(self, success_count: int, total: int):
         """Log run completed"""
-        return self.add_event(
+        event = self.add_event(
             "run_complete",
             TimelineEventType.RUN_COMPLETED,
             f"Run completed: {success_count}/{total} iterations successful",
@@ -362,13 +455,16 @@ class TimelineManager:
             metadata={'success_count': success_count, 'total': total},
             replaces="run_start"
         )
+        # Run is over - fold the journal into timeline.json
+        self.compact()
+        return event
 
     def run_failed(self, error: str):
         """Log run failed and mark all in-progress events as failed"""
         # First, fail all in-progress events
         self._fail_all_in_progress()
 
-        return self.add_event(
+        event = self.add_event(
             "run_failed",
             TimelineEventType.RUN_FAILED,
             f"Run failed: {error}",
@@ -376,13 +472,16 @@ class TimelineManager:
             metadata={'error': error},
             replaces="run_start"
         )
+        # Run is over - fold the journal into timeline.json
+        self.compact()
+        return event
 
     def run_cancelled(self, reason: str = "User cancelled"):
         """Log run cancelled by user and mark all in-progress events as cancelled"""
         # Mark all in-progress events as failed (cancelled is a type of failure)
         self._fail_all_in_progress()
 
-        return self.add_event(
+        event = self.add_event(
             "run_cancelled",
             TimelineEventType.RUN_CANCELLED,
             f"Run cancelled: {reason}",
@@ -390,10 +489,13 @@ class TimelineManager:
             metadata={'reason': reason, 'cancelled_by': 'user'},
             replaces="run_start"
         )
+        # Run is over - fold the journal into timeline.json
+        self.compact()
+        return event
 
     def _fail_all_in_progress(self):
         """Mark all in-progress events as failed"""
-        changed = False
+        failed = []
         for event in self._events.values():
             if event.status == TimelineEventStatus.IN_PROGRESS:
                 event.status = TimelineEventStatus.FAILED
@@ -401,9 +503,10 @@ class TimelineManager:
                 duration = (datetime.now() - event.timestamp).total_seconds() * 1000
                 event.duration_ms = int(duration)
                 logger.debug(f"Marked event '{event.event_id}' as failed")
-                changed = True
-        if changed:
-            self._save()
+                failed.append(event)
+        if failed:
+            for event in failed:
+                self._append(event)
             # Notify for each failed event
             for event in self._events.values():
                 if event.status == TimelineEventStatus.FAILED:
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Trace Packager - streaming ZIP packaging of run/campaign traces
+
+SOCWatch/PTAT traces for a campaign can run to several gigabytes, so packages
+are never built in memory. The ZIP is written to a non-seekable sink that
+hands finished chunks to the HTTP response as each file is read from disk;
+entries use data descriptors so no seeking back is needed.
+
+Files that are already compressed (archives, images) are stored rather than
+deflated. While a package streams it is also teed to a temp file in the cache
+directory. Once it completes it becomes the cached package, and repeat
+downloads are served from disk with HTTP Range support. The cache key covers
+every file's path, size and mtime, so a package is rebuilt when any trace
+changes.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Extensions whose content is already compressed - deflating them wastes CPU
+STORED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.zst', '.lz4', '.cab', '.rar',
+    '.png', '.jpg', '.jpeg', '.webp', '.mp4', '.etl.zip',
+}
+
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+PACKAGE_SUFFIX = '.zip'
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting ZIP output for streaming"""
+
+    def __init__(self, tee=None):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self._tee = tee
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        if data:
+            self._chunks.append(data)
+            self._position += len(data)
+            if self._tee:
+                self._tee.write(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class TracePackager:
+    """Streams trace packages and keeps completed ones in a size-bounded disk cache"""
+
+    def __init__(self, cache_dir: Path, max_cache_bytes: int = 20 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_cache_bytes = max_cache_bytes
+        self._lock = threading.Lock()
+
+        # Leftovers from interrupted downloads
+        for tmp in self.cache_dir.glob('*.tmp'):
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def cache_key(files: List[Tuple[str, Path]]) -> str:
+        """Key identifying a package by its entries and their on-disk versions"""
+        h = hashlib.sha256()
+        for arcname, path in files:
+            st = path.stat()
+            h.update(f"{arcname}\0{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode('utf-8'))
+        return h.hexdigest()[:32]
+
+    def get_cached(self, key: str) -> Optional[Path]:
+        """Path of a completed cached package, or None"""
+        path = self.cache_dir / f"{key}{PACKAGE_SUFFIX}"
+        if not path.exists():
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        return path
+
+    @staticmethod
+    def _compression_for(path: Path) -> int:
+        name = path.name.lower()
+        if any(name.endswith(ext) for ext in STORED_EXTENSIONS):
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+
+    def stream(self, files: List[Tuple[str, Path]], key: str = None) -> Iterator[bytes]:
+        """Yield the ZIP of files chunk by chunk.
+
+        If key is given the package is also written to the cache and published
+        there once complete. An aborted download leaves nothing behind.
+        """
+        tmp_path = None
+        tee = None
+        if key:
+            tmp_path = self.cache_dir / f"{key}.{uuid.uuid4().hex[:8]}.tmp"
+            tee = open(tmp_path, 'wb')
+
+        completed = False
+        total_bytes = 0
+        start = time.monotonic()
+        try:
+            sink = _ChunkSink(tee)
+            with zipfile.ZipFile(sink, 'w', allowZip64=True) as zf:
+                for arcname, path in files:
+                    try:
+                        st = path.stat()
+                    except OSError as e:
+                        logger.warning(f"Skipping trace file {path}: {e}")
+                        continue
+                    zinfo = zipfile.ZipInfo.from_file(str(path), arcname)
+                    zinfo.compress_type = self._compression_for(path)
+                    # Known size lets zipfile decide on ZIP64 up front
+                    zinfo.file_size = st.st_size
+                    with open(path, 'rb') as src, zf.open(zinfo, 'w') as dst:
+                        while True:
+                            chunk = src.read(READ_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            dst.write(chunk)
+                            data = sink.drain()
+                            if data:
+                                total_bytes += len(data)
+                                yield data
+                    data = sink.drain()
+                    if data:
+                        total_bytes += len(data)
+                        yield data
+            # Central directory written on close
+            data = sink.drain()
+            if data:
+                total_bytes += len(data)
+                yield data
+            completed = True
+            logger.info(f"Streamed trace package: {len(files)} files, "
+                        f"{total_bytes / 1024 ** 2:.1f} MB in {time.monotonic() - start:.1f}s")
+        finally:
+            if tee:
+                tee.close()
+                if completed:
+                    self._publish(tmp_path, self.cache_dir / f"{key}{PACKAGE_SUFFIX}")
+                else:
+                    try:
+                        tmp_path.unlink()
+                    except OSError:
+                        pass
+
+    def _publish(self, tmp_path: Path, final_path: Path):
+        try:
+            os.replace(tmp_path, final_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache trace package: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used packages until the cache fits its budget"""
+        with self._lock:
+            packages = []
+            for path in self.cache_dir.glob(f"*{PACKAGE_SUFFIX}"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                packages.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in packages)
+            for _, size, path in sorted(packages):
+                if total <= self.max_cache_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                    logger.info(f"Evicted cached trace package {path.name}")
+                except OSError:
+                    pass
@@ -0,0 +1,219 @@
+"""
+Trace Pull Queue - background trace transfers per SUT
+
+Pulling traces used to block the run until every file was on the Master.
+The SUT is idle apart from serving files while the next iteration cools
+down, launches the game and navigates menus, so the orchestrator now queues
+one pull per tracing agent as soon as that agent's iteration finishes. A
+worker thread per SUT performs the pulls in order.
+
+While a benchmark is measuring on the SUT, transfers are throttled (see
+TransferLimiter.set_throttle) so they don't disturb the results. Each job
+reports its progress through an on_update callback, which the orchestrator
+uses to record it on the run manifest.
+"""
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .trace_puller import TracePuller
+
+logger = logging.getLogger(__name__)
+
+# Throttle applied while a benchmark is active (Kbit/s, 0 pauses transfers)
+DEFAULT_BENCHMARK_THROTTLE_KBPS = 4000
+
+# Worker threads exit after this long without jobs
+WORKER_IDLE_TIMEOUT = 60
+
+
+@dataclass
+class TracePullJob:
+    """One agent's trace pull for a run."""
+    run_id: str
+    agent: str
+    game_name: str
+    trace_output_dir: str
+    local_storage_dir: str
+    agent_configs: Dict[str, Any] = field(default_factory=dict)
+    puller_options: Dict[str, Any] = field(default_factory=dict)  # TracePuller kwargs
+    on_update: Optional[Callable[['TracePullJob'], None]] = None
+
+    status: str = "queued"  # queued, running, completed, failed
+    queued_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    throttled_seconds: float = 0.0
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _throttled_since: Optional[float] = field(default=None, repr=False)
+
+    def mark_throttled(self, active: bool):
+        """Start/stop accounting time spent throttled."""
+        if active and self._throttled_since is None:
+            self._throttled_since = time.monotonic()
+        elif not active and self._throttled_since is not None:
+            self.throttled_seconds += time.monotonic() - self._throttled_since
+            self._throttled_since = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        agent_result = self.result.get(self.agent, {}) if self.result else {}
+        return {
+            "agent": self.agent,
+            "status": self.status,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "files": len(agent_result.get("files", [])),
+            "checksums": agent_result.get("checksums", {}),
+            "transfer": agent_result.get("transfer"),
+            "throttled_seconds": round(self.throttled_seconds, 1),
+            "error": self.error,
+        }
+
+
+class TracePullQueue:
+    """Serial background trace pulls for one SUT."""
+
+    def __init__(self, sut_ip: str, benchmark_throttle_kbps: int = DEFAULT_BENCHMARK_THROTTLE_KBPS):
+        self.sut_ip = sut_ip
+        self.benchmark_throttle_kbps = benchmark_throttle_kbps
+        self._queue: "queue.Queue[TracePullJob]" = queue.Queue()
+        self._jobs: List[TracePullJob] = []
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._current_job: Optional[TracePullJob] = None
+        self._current_puller: Optional[TracePuller] = None
+        self._benchmark_active = False
+
+    def submit(self, job: TracePullJob) -> TracePullJob:
+        """Queue a job and make sure the worker is running."""
+        with self._lock:
+            self._jobs.append(job)
+            self._queue.put(job)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f"trace-pull-{self.sut_ip}", daemon=True
+                )
+                self._worker.start()
+        logger.info(f"Queued background {job.agent} trace pull for run {job.run_id} on {self.sut_ip}")
+        self._notify(job)
+        return job
+
+    def set_benchmark_active(self, active: bool):
+        """Throttle transfers while a benchmark is measuring on the SUT."""
+        with self._lock:
+            if active == self._benchmark_active:
+                return
+            self._benchmark_active = active
+            job, puller = self._current_job, self._current_puller
+        if puller:
+            self._apply_throttle(puller, active)
+            job.mark_throttled(active)
+        logger.info(f"Trace transfers on {self.sut_ip} {'throttled for benchmark' if active else 'resumed'}")
+
+    def _apply_throttle(self, puller: TracePuller, active: bool):
+        puller.limiter.set_throttle(self.benchmark_throttle_kbps if active else None)
+
+    def jobs_for_run(self, run_id: str) -> List[TracePullJob]:
+        with self._lock:
+            return [j for j in self._jobs if j.run_id == run_id]
+
+    def wait_for_run(self, run_id: str, timeout: Optional[float] = None) -> List[TracePullJob]:
+        """Block until all of a run's jobs finish (or timeout). Returns the jobs."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        jobs = self.jobs_for_run(run_id)
+        for job in jobs:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not job.done.wait(remaining):
+                logger.warning(f"Timed out waiting for {job.agent} trace pull of run {run_id}")
+                break
+        return jobs
+
+    def _notify(self, job: TracePullJob):
+        if job.on_update:
+            try:
+                job.on_update(job)
+            except Exception as e:
+                logger.warning(f"Trace pull update callback failed: {e}")
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=WORKER_IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+
+            try:
+                self._execute(job)
+            finally:
+                self._queue.task_done()
+                with self._lock:
+                    # Keep only unfinished jobs and the most recent history
+                    finished = [j for j in self._jobs if j.done.is_set()]
+                    if len(finished) > 50:
+                        drop = set(id(j) for j in finished[:-50])
+                        self._jobs = [j for j in self._jobs if id(j) not in drop]
+
+    def _execute(self, job: TracePullJob):
+        puller = TracePuller(self.sut_ip, **job.puller_options)
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        with self._lock:
+            self._current_job, self._current_puller = job, puller
+            if self._benchmark_active:
+                self._apply_throttle(puller, True)
+                job.mark_throttled(True)
+        self._notify(job)
+
+        try:
+            job.result = puller.pull_traces(
+                job.run_id, job.game_name, job.trace_output_dir, job.local_storage_dir,
+                trace_agents=[job.agent], agent_configs=job.agent_configs,
+            )
+            agent_result = job.result.get(job.agent, {})
+            if agent_result.get("success"):
+                job.status = "completed"
+            else:
+                job.status = "failed"
+                job.error = agent_result.get("error") or job.result.get("error") or "No trace files pulled"
+        except Exception as e:
+            logger.error(f"Background {job.agent} trace pull for run {job.run_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            puller.close()
+            with self._lock:
+                self._current_job, self._current_puller = None, None
+            job.mark_throttled(False)
+            job.completed_at = datetime.now().isoformat()
+            logger.info(f"Background {job.agent} trace pull for run {job.run_id}: {job.status}"
+                        f"{f' ({job.error})' if job.error else ''}")
+            self._notify(job)
+            job.done.set()
+
+
+_queues: Dict[str, TracePullQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_trace_pull_queue(sut_ip: str, benchmark_throttle_kbps: Optional[int] = None) -> TracePullQueue:
+    """Get (or create) the background trace pull queue for a SUT."""
+    with _queues_lock:
+        pull_queue = _queues.get(sut_ip)
+        if pull_queue is None:
+            pull_queue = TracePullQueue(sut_ip)
+            _queues[sut_ip] = pull_queue
+        if benchmark_throttle_kbps is not None:
+            pull_queue.benchmark_throttle_kbps = benchmark_throttle_kbps
+        return pull_queue
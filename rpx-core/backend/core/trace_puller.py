@@ -6,6 +6,15 @@ from the SUT to the Master's run storage directory.
 
 Primary method: SSH/SCP (requires key-based authentication)
 Fallback method: SUT client HTTP API (/list_directory, /file_download)
+
+All SSH/SCP calls to a SUT share one connection, so only the first call pays
+for the handshake: an OpenSSH ControlMaster on POSIX Masters, and a persistent
+paramiko session (see ssh_session.py) on Windows Masters, whose Win32-OpenSSH
+client has no ControlMaster support.
+Agents are pulled in parallel through a per-SUT TransferLimiter that
+raises concurrency while aggregate throughput keeps improving. Large file
+sets are fetched as a single gzip-compressed tar stream rather than one scp
+per file.
 """
 
 import subprocess
@@ -13,14 +22,165 @@ import logging
 import os
 import time
 import socket
+import stat
+import fnmatch
+import hashlib
+import tarfile
+import tempfile
+import threading
 import requests
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path, PureWindowsPath
 from typing import Optional, List, Tuple, Dict, Any
 from datetime import datetime
 
+from .ssh_session import SSHSession
+
 logger = logging.getLogger(__name__)
 
 
+class TransferLimiter:
+    """
+    Caps concurrent transfers to one SUT.
+
+    Starts with a small number of slots and adds one each measurement window
+    while aggregate throughput keeps rising by more than GROWTH_THRESHOLD,
+    backing off when it drops. An optional bandwidth cap is shared evenly
+    between the slots.
+
+    set_throttle() temporarily overrides this (e.g. while a benchmark is
+    measuring): one slot at a fixed rate, or no new transfers at all.
+    """
+
+    WINDOW_SECONDS = 2.0
+    GROWTH_THRESHOLD = 1.1
+    BACKOFF_THRESHOLD = 0.75
+
+    def __init__(self, max_concurrent: int = 4, initial: int = 2,
+                 bandwidth_limit_kbps: Optional[int] = None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.limit = max(1, min(initial, self.max_concurrent))
+        self.bandwidth_limit_kbps = bandwidth_limit_kbps
+        self.throttle_kbps: Optional[int] = None
+        self.peak_limit = self.limit
+        self._cond = threading.Condition()
+        self._active = 0
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._best_rate = 0.0
+
+    @property
+    def paused(self) -> bool:
+        return self.throttle_kbps == 0
+
+    def _effective_limit(self) -> int:
+        if self.throttle_kbps is None:
+            return self.limit
+        return 0 if self.paused else 1
+
+    def set_throttle(self, kbps: Optional[int]):
+        """Throttle to one transfer at kbps (0 pauses new transfers), or None to lift it."""
+        with self._cond:
+            self.throttle_kbps = kbps
+            # Throughput measured while throttled says nothing about the link
+            self._window_start = time.monotonic()
+            self._window_bytes = 0
+            self._cond.notify_all()
+
+    def wait_unpaused(self):
+        """Block while transfers are paused."""
+        with self._cond:
+            while self.paused:
+                self._cond.wait()
+
+    @contextmanager
+    def slot(self):
+        """Hold one transfer slot for the duration of the block."""
+        with self._cond:
+            while self._active >= self._effective_limit():
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def per_transfer_kbps(self) -> Optional[int]:
+        """Bandwidth share for one transfer, or None when uncapped."""
+        if self.throttle_kbps:
+            return self.throttle_kbps
+        if not self.bandwidth_limit_kbps:
+            return None
+        return max(64, self.bandwidth_limit_kbps // self.limit)
+
+    def record(self, nbytes: int):
+        """Account transferred bytes and adjust the slot count once per window."""
+        with self._cond:
+            self._window_bytes += nbytes
+            now = time.monotonic()
+            elapsed = now - self._window_start
+            if elapsed < self.WINDOW_SECONDS or self.throttle_kbps is not None:
+                return
+            rate = self._window_bytes / elapsed
+            if rate > self._best_rate * self.GROWTH_THRESHOLD and self.limit < self.max_concurrent:
+                self.limit += 1
+                self.peak_limit = max(self.peak_limit, self.limit)
+                logger.debug(f"Transfer concurrency raised to {self.limit} ({rate * 8 / 1e6:.1f} Mbit/s)")
+            elif rate < self._best_rate * self.BACKOFF_THRESHOLD and self.limit > 1:
+                self.limit -= 1
+                logger.debug(f"Transfer concurrency lowered to {self.limit} ({rate * 8 / 1e6:.1f} Mbit/s)")
+            self._best_rate = max(self._best_rate, rate)
+            self._window_start = now
+            self._window_bytes = 0
+            self._cond.notify_all()
+
+
+class _ThrottledReader:
+    """Wraps a pipe, counting bytes read and pacing reads to the limiter's current cap."""
+
+    def __init__(self, raw, limiter: TransferLimiter, record: bool = True):
+        self._raw = raw
+        self._limiter = limiter
+        self._record = record
+        self._next_read = time.monotonic()
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        # Not reading lets the pipe fill, which stalls the sender
+        self._limiter.wait_unpaused()
+        data = self._raw.read(size)
+        self.bytes_read += len(data)
+        if self._record:
+            self._limiter.record(len(data))
+        kbps = self._limiter.per_transfer_kbps()
+        if kbps:
+            now = time.monotonic()
+            self._next_read = max(self._next_read, now) + len(data) * 8 / (kbps * 1000)
+            if self._next_read > now:
+                time.sleep(self._next_read - now)
+        return data
+
+
+def _sha256_file(path: str) -> str:
+    """Hex SHA-256 of a local file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1024 * 1024)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _format_rate(nbytes: int, seconds: float) -> float:
+    """Throughput in Mbit/s."""
+    return round(nbytes * 8 / 1e6 / seconds, 2) if seconds > 0 else 0.0
+
+
 class TracePuller:
     """Pulls trace files from SUT to Master via SSH/SCP"""
 
@@ -41,8 +201,22 @@ class TracePuller:
         "-o", "ConnectionAttempts=2",
     ]
 
+    # Keep the multiplexed master connection alive between calls and runs
+    CONTROL_PERSIST = "120s"
+
+    # Longest remote tar command line (cmd.exe caps command lines at 8191 chars)
+    MAX_TAR_COMMAND = 7000
+
+    # Range size for chunked HTTP downloads (each chunk is hash-checked)
+    HTTP_CHUNK_SIZE = 8 * 1024 * 1024
+
+    # Suffix of partially transferred files, kept so retries can resume
+    PARTIAL_SUFFIX = ".partial"
+
     def __init__(self, sut_ip: str, ssh_user: Optional[str] = None, ssh_timeout: int = 60,
-                 max_retries: int = 3, retry_delay: int = 5):
+                 max_retries: int = 3, retry_delay: int = 5, max_parallel_transfers: int = 4,
+                 tar_threshold: int = 16, multiplex: Optional[bool] = None,
+                 bandwidth_limit_kbps: Optional[int] = None):
         """
         Initialize trace puller.
 
@@ -52,13 +226,36 @@ class TracePuller:
             ssh_timeout: SSH connection timeout in seconds (default: 60)
             max_retries: Maximum connection retry attempts (default: 3)
             retry_delay: Initial delay between retries in seconds (default: 5)
+            max_parallel_transfers: Upper bound on concurrent transfers to the SUT (default: 4)
+            tar_threshold: Pull an agent's files as one tar stream when it has at
+                least this many (default: 16, 0 disables)
+            multiplex: Share one SSH connection between calls (default: on).
+                Uses ControlMaster, or a paramiko session on Windows, whose
+                OpenSSH client lacks it; off there if paramiko isn't installed
+            bandwidth_limit_kbps: Total bandwidth cap for transfers in Kbit/s (default: none)
         """
         self.sut_ip = sut_ip
         self.ssh_user = ssh_user or os.getenv("USERNAME", os.getenv("USER", "user"))
         self.ssh_timeout = ssh_timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.tar_threshold = tar_threshold
+        self.multiplex = True if multiplex is None else multiplex
+        # Windows OpenSSH can't multiplex, so share a paramiko session instead
+        self._session: Optional[SSHSession] = None
+        if self.multiplex and os.name == "nt":
+            if SSHSession.available():
+                self._session = SSHSession(sut_ip, self.ssh_user, timeout=ssh_timeout)
+            else:
+                logger.warning("paramiko is not installed - each SSH call to the SUT will "
+                               "open its own connection (pip install rpx[ssh])")
+                self.multiplex = False
+        self.limiter = TransferLimiter(max_parallel_transfers, bandwidth_limit_kbps=bandwidth_limit_kbps)
+        self._control_path = os.path.join(tempfile.gettempdir(), "rpx-ssh-%C")
         self._sut_username_cache: Optional[str] = None
+        self._sut_profiles_cache: Optional[List[str]] = None
+        # SHA-256 of each verified local file, by local path
+        self.checksums: Dict[str, str] = {}
 
     def _get_sut_username(self) -> Optional[str]:
         """
@@ -72,13 +269,7 @@ class TracePuller:
             return self._sut_username_cache
 
         try:
-            result = subprocess.run(
-                ["ssh"] + self._get_ssh_options() + [
-                    f"{self.ssh_user}@{self.sut_ip}",
-                    "whoami"
-                ],
-                capture_output=True, text=True, timeout=self.ssh_timeout + 10
-            )
+            result = self._ssh_run("whoami", timeout=self.ssh_timeout + 10)
             if result.returncode == 0:
                 # whoami may return DOMAIN\user or just user — take the last part
                 raw = result.stdout.strip()
@@ -126,25 +317,8 @@ class TracePuller:
             # The tracing agent runs as the interactive desktop user, which may
             # differ from the SSH user. Try all user profiles on the SUT.
             suffix = path.split("%USERPROFILE%", 1)[1]  # e.g. \Documents\iPTAT\log
-            try:
-                # List user profile directories on SUT
-                cmd = 'powershell -Command "Get-ChildItem C:\\Users -Directory | Select-Object -ExpandProperty Name"'
-                result = subprocess.run(
-                    ["ssh"] + self._get_ssh_options() + [
-                        f"{self.ssh_user}@{self.sut_ip}",
-                        cmd
-                    ],
-                    capture_output=True, text=True, timeout=self.ssh_timeout + 10
-                )
-                if result.returncode == 0:
-                    users = [u.strip() for u in result.stdout.strip().split('\n') if u.strip()]
-                    # Filter out system dirs
-                    skip = {'Public', 'Default', 'Default User', 'All Users'}
-                    for user in users:
-                        if user not in skip:
-                            candidates.append(f"C:\\Users\\{user}{suffix}")
-            except Exception as e:
-                logger.warning(f"Error listing SUT user profiles: {e}")
+            for user in self._get_sut_profiles():
+                candidates.append(f"C:\\Users\\{user}{suffix}")
 
             # Fallback: use SSH username
             if not candidates:
@@ -154,9 +328,74 @@ class TracePuller:
 
         return candidates
 
+    def _get_sut_profiles(self) -> List[str]:
+        """
+        List user profile directory names on the SUT (cached).
+
+        Returns:
+            Profile names excluding system profiles (may be empty)
+        """
+        if self._sut_profiles_cache is not None:
+            return self._sut_profiles_cache
+
+        try:
+            cmd = 'powershell -Command "Get-ChildItem C:\\Users -Directory | Select-Object -ExpandProperty Name"'
+            result = self._ssh_run(cmd, timeout=self.ssh_timeout + 10)
+            if result.returncode == 0:
+                users = [u.strip() for u in result.stdout.strip().split('\n') if u.strip()]
+                # Filter out system dirs
+                skip = {'Public', 'Default', 'Default User', 'All Users'}
+                self._sut_profiles_cache = [u for u in users if u not in skip]
+                return self._sut_profiles_cache
+        except Exception as e:
+            logger.warning(f"Error listing SUT user profiles: {e}")
+
+        return []
+
     def _get_ssh_options(self) -> List[str]:
-        """Get SSH options with current timeout."""
-        return self.SSH_OPTIONS + ["-o", f"ConnectTimeout={self.ssh_timeout}"]
+        """Get SSH options with current timeout (and connection sharing when enabled)."""
+        options = self.SSH_OPTIONS + ["-o", f"ConnectTimeout={self.ssh_timeout}"]
+        if self.multiplex and self._session is None:
+            options += [
+                "-o", "ControlMaster=auto",
+                "-o", f"ControlPath={self._control_path}",
+                "-o", f"ControlPersist={self.CONTROL_PERSIST}",
+            ]
+        return options
+
+    def close(self):
+        """Shut down the shared SSH connection, if one is running."""
+        if self._session is not None:
+            self._session.close()
+            return
+        if not self.multiplex:
+            return
+        try:
+            subprocess.run(
+                ["ssh", "-O", "exit", "-o", f"ControlPath={self._control_path}",
+                 f"{self.ssh_user}@{self.sut_ip}"],
+                capture_output=True, text=True, timeout=10
+            )
+        except Exception as e:
+            logger.debug(f"Error closing SSH master connection: {e}")
+
+    def _ssh_run(self, command: str, timeout: float) -> subprocess.CompletedProcess:
+        """Run a command on the SUT over the shared session or an ssh subprocess."""
+        if self._session is not None:
+            return self._session.run(command, timeout=timeout)
+        return subprocess.run(
+            ["ssh"] + self._get_ssh_options() + [f"{self.ssh_user}@{self.sut_ip}", command],
+            capture_output=True, text=True, timeout=timeout
+        )
+
+    def _ssh_popen(self, command: str, stderr):
+        """Start a command on the SUT whose stdout is streamed (Popen-like)."""
+        if self._session is not None:
+            return self._session.popen(command, stderr=stderr)
+        return subprocess.Popen(
+            ["ssh"] + self._get_ssh_options() + [f"{self.ssh_user}@{self.sut_ip}", command],
+            stdout=subprocess.PIPE, stderr=stderr
+        )
 
     def diagnose_connection(self) -> dict:
         """
@@ -255,13 +494,7 @@ class TracePuller:
             try:
                 logger.debug(f"SSH connection attempt {attempt}/{attempts} to {self.sut_ip}")
 
-                result = subprocess.run(
-                    ["ssh"] + self._get_ssh_options() + [
-                        f"{self.ssh_user}@{self.sut_ip}",
-                        "echo SSH_OK"
-                    ],
-                    capture_output=True, text=True, timeout=self.ssh_timeout + 10
-                )
+                result = self._ssh_run("echo SSH_OK", timeout=self.ssh_timeout + 10)
 
                 if result.returncode == 0 and "SSH_OK" in result.stdout:
                     if attempt > 1:
@@ -279,6 +512,14 @@ class TracePuller:
             except Exception as e:
                 last_error = str(e)
                 logger.warning(f"SSH attempt {attempt} error: {e}")
+                if self._session is not None and not isinstance(e, OSError):
+                    # Auth/protocol failure in paramiko (network errors are OSErrors):
+                    # OpenSSH may still get in, one handshake per call
+                    logger.warning("Persistent SSH session unavailable, falling back to the ssh client")
+                    self._session.close()
+                    self._session = None
+                    self.multiplex = False
+                    return self.test_connection(with_retry)
 
             # Wait before retry with exponential backoff
             if attempt < attempts:
@@ -304,13 +545,7 @@ class TracePuller:
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                result = subprocess.run(
-                    ["ssh"] + self._get_ssh_options() + [
-                        f"{self.ssh_user}@{self.sut_ip}",
-                        cmd
-                    ],
-                    capture_output=True, text=True, timeout=self.ssh_timeout + 30
-                )
+                result = self._ssh_run(cmd, timeout=self.ssh_timeout + 30)
 
                 if result.returncode == 0:
                     files = [f.strip() for f in result.stdout.strip().split('\n') if f.strip()]
@@ -328,14 +563,225 @@ class TracePuller:
 
         return []
 
+    def list_remote_entries(self, remote_dir: str) -> Optional[Dict[str, int]]:
+        """
+        List all files in a remote directory with their sizes in one round trip.
+
+        Patterns are matched locally (see _match_files), so probing several
+        patterns costs a single SSH call.
+
+        Args:
+            remote_dir: Remote directory path
+
+        Returns:
+            Dict of filename -> size in bytes (empty if the directory is empty
+            or missing), or None if the listing failed
+        """
+        cmd = (f'powershell -Command "Get-ChildItem -LiteralPath \'{remote_dir}\' -File -ErrorAction SilentlyContinue'
+               f' | ForEach-Object {{ $_.Length.ToString() + [char]9 + $_.Name }}"')
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                result = self._ssh_run(cmd, timeout=self.ssh_timeout + 30)
+
+                if result.returncode == 0:
+                    entries = {}
+                    for line in result.stdout.splitlines():
+                        size, _, name = line.strip().partition("\t")
+                        if name:
+                            entries[name] = int(size) if size.isdigit() else 0
+                    return entries
+                else:
+                    logger.warning(f"Failed to list remote directory (attempt {attempt}): {result.stderr}")
+
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Timeout listing remote directory (attempt {attempt})")
+            except Exception as e:
+                logger.error(f"Error listing remote directory (attempt {attempt}): {e}")
+
+            if attempt < self.max_retries:
+                time.sleep(self.retry_delay)
+
+        return None
+
+    @staticmethod
+    def _match_files(entries: Dict[str, int], pattern: str) -> List[str]:
+        """Filenames in entries matching a glob pattern (case-insensitive, like Windows)."""
+        pattern = pattern.lower()
+        return [name for name in sorted(entries) if fnmatch.fnmatch(name.lower(), pattern)]
+
+    def _get_scp_limit(self) -> List[str]:
+        """scp bandwidth limit option for this transfer's share of the cap."""
+        kbps = self.limiter.per_transfer_kbps()
+        return ["-l", str(kbps)] if kbps else []
+
+    def _tar_batches(self, remote_dir: str, filenames: List[str]) -> List[List[str]]:
+        """Split filenames so each remote tar command stays under MAX_TAR_COMMAND."""
+        batches, batch, length = [], [], len(remote_dir) + 32
+        for name in filenames:
+            if batch and length + len(name) + 3 > self.MAX_TAR_COMMAND:
+                batches.append(batch)
+                batch, length = [], len(remote_dir) + 32
+            batch.append(name)
+            length += len(name) + 3
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def pull_files_as_tar(self, remote_dir: str, filenames: List[str], local_dir: str,
+                          expected_sizes: Optional[Dict[str, int]] = None,
+                          stream_timeout: int = 1800) -> Tuple[List[str], int]:
+        """
+        Pull several files from one remote directory as a gzip-compressed tar stream.
+
+        Uses the tar.exe that ships with Windows 10+. Each file is written as
+        <name>.part and renamed once complete, so a broken stream only leaves
+        whole files behind; the caller pulls whatever is missing individually.
+        gzip's CRC covers the stream, and each file's size is checked against
+        expected_sizes; its SHA-256 is recorded in self.checksums.
+
+        Args:
+            remote_dir: Remote directory containing the files
+            filenames: Names of files in remote_dir to pull
+            local_dir: Local destination directory
+            expected_sizes: Remote file sizes from the listing, if known
+            stream_timeout: Timeout per tar stream in seconds (default: 30 min)
+
+        Returns:
+            Tuple of (filenames extracted, compressed bytes received)
+        """
+        Path(local_dir).mkdir(parents=True, exist_ok=True)
+        wanted = set(filenames)
+        extracted = []
+        wire_bytes = 0
+
+        for batch in self._tar_batches(remote_dir, filenames):
+            cmd = f'tar -czf - -C "{remote_dir}" ' + " ".join(f'"{name}"' for name in batch)
+            part_path = None
+            with tempfile.TemporaryFile() as stderr:
+                proc = self._ssh_popen(cmd, stderr)
+                watchdog = threading.Timer(stream_timeout, proc.kill)
+                watchdog.start()
+                reader = _ThrottledReader(proc.stdout, self.limiter)
+                try:
+                    with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+                        for member in tar:
+                            name = PureWindowsPath(member.name).name
+                            if not member.isfile() or name not in wanted:
+                                continue
+                            part_path = Path(local_dir) / f"{name}.part"
+                            src = tar.extractfile(member)
+                            digest = hashlib.sha256()
+                            with open(part_path, "wb") as dst:
+                                while True:
+                                    chunk = src.read(1024 * 1024)
+                                    if not chunk:
+                                        break
+                                    digest.update(chunk)
+                                    dst.write(chunk)
+                            expected = (expected_sizes or {}).get(name)
+                            if expected is not None and part_path.stat().st_size != expected:
+                                logger.warning(f"Size mismatch for {name} in tar stream "
+                                               f"({part_path.stat().st_size} != {expected}), skipping")
+                                part_path.unlink()
+                                part_path = None
+                                continue
+                            final_path = Path(local_dir) / name
+                            os.replace(part_path, final_path)
+                            part_path = None
+                            self.checksums[str(final_path)] = digest.hexdigest()
+                            extracted.append(name)
+                except (tarfile.TarError, OSError, EOFError) as e:
+                    logger.warning(f"Tar stream from {remote_dir} failed after {len(extracted)} files: {e}")
+                finally:
+                    watchdog.cancel()
+                    proc.stdout.close()
+                    try:
+                        proc.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+                        proc.wait()
+                    if part_path and part_path.exists():
+                        part_path.unlink()
+                    wire_bytes += reader.bytes_read
+
+                if proc.returncode != 0:
+                    stderr.seek(0)
+                    message = stderr.read().decode(errors="replace").strip()[:200]
+                    logger.warning(f"Remote tar exited with {proc.returncode}: {message}")
+
+        return extracted, wire_bytes
+
+    @staticmethod
+    def _sftp_path(remote_path: str) -> str:
+        """Windows path in the form the SUT's sftp-server expects (/C:/dir/file)."""
+        path = remote_path.replace("\\", "/")
+        return f"/{path}" if len(path) > 1 and path[1] == ":" else path
+
+    def remote_checksum(self, remote_path: str) -> Optional[str]:
+        """
+        SHA-256 of a file on the SUT via SSH.
+
+        Returns:
+            Lowercase hex digest, or None if it couldn't be computed
+        """
+        cmd = f'powershell -Command "(Get-FileHash -Algorithm SHA256 -LiteralPath \'{remote_path}\').Hash"'
+        try:
+            result = self._ssh_run(cmd, timeout=self.ssh_timeout + 120)
+            digest = result.stdout.strip().lower()
+            if result.returncode == 0 and len(digest) == 64:
+                return digest
+            logger.warning(f"Could not hash {remote_path} on SUT: {result.stderr.strip()[:200]}")
+        except Exception as e:
+            logger.warning(f"Error hashing {remote_path} on SUT: {e}")
+        return None
+
+    def _sftp_reget(self, remote_path: str, partial_path: str, timeout: int) -> subprocess.CompletedProcess:
+        """Download remote_path into partial_path, continuing from its current size."""
+        if self._session is None:
+            # sftp batch files treat backslashes as escapes - use forward slashes locally too
+            batch = f'reget "{self._sftp_path(remote_path)}" "{Path(partial_path).as_posix()}"\n'
+            return subprocess.run(
+                ["sftp", "-b", "-"] + self._get_ssh_options() + self._get_scp_limit() + [
+                    f"{self.ssh_user}@{self.sut_ip}"
+                ],
+                input=batch, capture_output=True, text=True, timeout=timeout
+            )
+
+        deadline = time.monotonic() + timeout
+        path = self._sftp_path(remote_path)
+        with self._session.open_sftp() as sftp:
+            size = sftp.stat(path).st_size
+            offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+            if offset > size:
+                offset = 0
+            with sftp.open(path, "rb") as src, open(partial_path, "ab" if offset else "wb") as dst:
+                src.seek(offset)
+                src.prefetch(size)
+                # pull_one records the file's size once it lands, so only pace here
+                reader = _ThrottledReader(src, self.limiter, record=False)
+                while True:
+                    if time.monotonic() > deadline:
+                        raise subprocess.TimeoutExpired("sftp", timeout)
+                    chunk = reader.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+        return subprocess.CompletedProcess("sftp", 0, "", "")
+
     def pull_file(self, remote_path: str, local_path: str, file_timeout: int = 300) -> bool:
         """
         Pull a single file from SUT with retry logic.
 
+        Uses sftp's reget into <local_path>.partial, so a retry (or a later
+        pull) continues from where the previous attempt stopped instead of
+        starting over. The file is checked against the SUT's SHA-256 before
+        it is renamed into place.
+
         Args:
             remote_path: Full path to file on SUT
             local_path: Local destination path
-            file_timeout: Timeout for file transfer in seconds (default: 5 min)
+            file_timeout: Timeout for each transfer attempt in seconds (default: 5 min)
 
         Returns:
             True if successful
@@ -344,39 +790,59 @@ class TracePuller:
         local_dir = Path(local_path).parent
         local_dir.mkdir(parents=True, exist_ok=True)
 
-        # Convert backslashes to forward slashes for SCP compatibility
-        scp_remote_path = remote_path.replace("\\", "/")
+        partial_path = local_path + self.PARTIAL_SUFFIX
+        expected = None
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                # Use SCP to copy file
-                result = subprocess.run(
-                    ["scp"] + self._get_ssh_options() + [
-                        f"{self.ssh_user}@{self.sut_ip}:{scp_remote_path}",
-                        local_path
-                    ],
-                    capture_output=True, text=True, timeout=file_timeout
-                )
+                if os.path.exists(partial_path):
+                    logger.info(f"Resuming {remote_path} from {os.path.getsize(partial_path)} bytes")
+
+                result = self._sftp_reget(remote_path, partial_path, file_timeout)
 
                 if result.returncode == 0:
-                    logger.info(f"Successfully pulled: {remote_path} -> {local_path}")
-                    return True
+                    if expected is None:
+                        expected = self.remote_checksum(remote_path)
+                    actual = _sha256_file(partial_path)
+                    if expected and actual != expected:
+                        # Corrupt partial data - resuming would keep it, so start over
+                        logger.warning(f"Checksum mismatch for {remote_path} (attempt {attempt}), restarting transfer")
+                        os.remove(partial_path)
+                    else:
+                        if not expected:
+                            logger.warning(f"Pulled {remote_path} without checksum verification")
+                        os.replace(partial_path, local_path)
+                        self.checksums[local_path] = actual
+                        logger.info(f"Successfully pulled: {remote_path} -> {local_path}")
+                        return True
                 else:
-                    logger.warning(f"SCP failed (attempt {attempt}): {result.stderr}")
+                    logger.warning(f"SFTP failed (attempt {attempt}): {result.stderr.strip()}")
 
-            except subprocess.TimeoutExpired:
-                logger.warning(f"SCP timed out for {remote_path} (attempt {attempt})")
+            except (subprocess.TimeoutExpired, TimeoutError):
+                logger.warning(f"SFTP timed out for {remote_path} (attempt {attempt}), partial file kept for resume")
             except Exception as e:
                 logger.error(f"Error pulling file (attempt {attempt}): {e}")
 
             if attempt < self.max_retries:
                 delay = self.retry_delay * attempt
-                logger.info(f"Retrying SCP in {delay}s...")
+                logger.info(f"Retrying SFTP in {delay}s...")
                 time.sleep(delay)
 
         logger.error(f"Failed to pull {remote_path} after {self.max_retries} attempts")
         return False
 
+    def _sftp_get_tree(self, sftp, remote_dir: str, local_dir: Path, deadline: float):
+        """Recursively download a remote directory's contents over an open SFTP client."""
+        local_dir.mkdir(parents=True, exist_ok=True)
+        for entry in sftp.listdir_attr(remote_dir):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out pulling {remote_dir}")
+            remote_path = f"{remote_dir}/{entry.filename}"
+            if stat.S_ISDIR(entry.st_mode or 0):
+                self._sftp_get_tree(sftp, remote_path, local_dir / entry.filename, deadline)
+            else:
+                sftp.get(remote_path, str(local_dir / entry.filename))
+
     def pull_directory(self, remote_dir: str, local_dir: str, dir_timeout: int = 600) -> int:
         """
         Pull entire directory from SUT with retry logic.
@@ -397,14 +863,20 @@ class TracePuller:
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                # Use SCP -r for recursive copy
-                result = subprocess.run(
-                    ["scp", "-r"] + self._get_ssh_options() + [
-                        f"{self.ssh_user}@{self.sut_ip}:{scp_remote_dir}/*",
-                        local_dir
-                    ],
-                    capture_output=True, text=True, timeout=dir_timeout
-                )
+                if self._session is not None:
+                    with self._session.open_sftp() as sftp:
+                        self._sftp_get_tree(sftp, self._sftp_path(remote_dir), Path(local_dir),
+                                            time.monotonic() + dir_timeout)
+                    result = subprocess.CompletedProcess("sftp", 0, "", "")
+                else:
+                    # Use SCP -r for recursive copy
+                    result = subprocess.run(
+                        ["scp", "-r"] + self._get_ssh_options() + [
+                            f"{self.ssh_user}@{self.sut_ip}:{scp_remote_dir}/*",
+                            local_dir
+                        ],
+                        capture_output=True, text=True, timeout=dir_timeout
+                    )
 
                 if result.returncode == 0:
                     # Count pulled files
@@ -414,7 +886,7 @@ class TracePuller:
                 else:
                     logger.warning(f"SCP recursive failed (attempt {attempt}): {result.stderr}")
 
-            except subprocess.TimeoutExpired:
+            except (subprocess.TimeoutExpired, TimeoutError):
                 logger.warning(f"SCP timed out for directory {remote_dir} (attempt {attempt})")
             except Exception as e:
                 logger.error(f"Error pulling directory (attempt {attempt}): {e}")
@@ -475,11 +947,89 @@ class TracePuller:
 
         return []
 
+    def _get_checksums_via_http(self, remote_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch whole-file and per-chunk SHA-256 from the SUT's /file_checksum.
+
+        Returns:
+            Checksum dict, {} if the SUT reported an error, or None if the SUT
+            client predates /file_checksum
+        """
+        response = requests.post(self._get_sut_client_url("/file_checksum"), json={
+            "path": remote_path,
+            "chunk_size": self.HTTP_CHUNK_SIZE,
+        }, timeout=300)
+
+        if "application/json" not in response.headers.get("Content-Type", ""):
+            return None
+        data = response.json()
+        if response.status_code == 200 and data.get("success"):
+            return data
+        logger.warning(f"[HTTP] file_checksum failed: {data.get('error')}")
+        return {}
+
+    def _resume_offset(self, partial_path: str, checksums: Dict[str, Any]) -> int:
+        """
+        Verify the chunks already in a partial file and drop anything after the
+        last good one.
+
+        Returns:
+            Offset to resume downloading from
+        """
+        if not os.path.exists(partial_path):
+            return 0
+
+        chunk_size = checksums["chunk_size"]
+        good = 0
+        with open(partial_path, 'r+b') as f:
+            for expected in checksums["chunks"]:
+                block = f.read(chunk_size)
+                if not block or hashlib.sha256(block).hexdigest() != expected:
+                    break
+                good += len(block)
+            f.truncate(good)
+
+        if good:
+            logger.info(f"[HTTP] Resuming {partial_path} from {good} verified bytes")
+        return good
+
+    def _fetch_chunk_via_http(self, remote_path: str, offset: int, length: int,
+                              expected: str) -> Optional[bytes]:
+        """Fetch one byte range with retries, checking it against its SHA-256."""
+        url = self._get_sut_client_url("/file_download")
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                response = requests.post(url, json={
+                    "path": remote_path,
+                    "offset": offset,
+                    "length": length,
+                }, timeout=120)
+
+                if response.status_code == 206:
+                    if hashlib.sha256(response.content).hexdigest() == expected:
+                        return response.content
+                    logger.warning(f"[HTTP] Chunk at {offset} failed checksum (attempt {attempt})")
+                else:
+                    logger.warning(f"[HTTP] Ranged file_download returned status {response.status_code} (attempt {attempt})")
+
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"[HTTP] Error fetching chunk at {offset} (attempt {attempt}): {e}")
+
+            if attempt < self.max_retries:
+                time.sleep(self.retry_delay * attempt)
+
+        return None
+
     def pull_file_via_http(self, remote_path: str, local_path: str) -> bool:
         """
-        Download a file from SUT via HTTP API (fallback when SCP fails).
+        Download a file from SUT via HTTP API (fallback when SFTP fails).
 
-        Uses the SUT client's /file_download endpoint.
+        Gets the file's chunk checksums from /file_checksum, then fetches it in
+        HTTP_CHUNK_SIZE ranges from /file_download, checking each chunk. Good
+        chunks are appended to <local_path>.partial, so a failed attempt
+        resumes from the last verified chunk. The whole-file SHA-256 is checked
+        before the file is renamed into place. SUT clients without
+        /file_checksum get a plain whole-file download.
 
         Args:
             remote_path: Full path to file on SUT
@@ -493,29 +1043,36 @@ class TracePuller:
             local_dir = Path(local_path).parent
             local_dir.mkdir(parents=True, exist_ok=True)
 
-            url = self._get_sut_client_url("/file_download")
-            response = requests.post(url, json={
-                "path": remote_path
-            }, timeout=300, stream=True)
-
-            if response.status_code == 200:
-                content_type = response.headers.get("Content-Type", "")
-                # Check if it's an error response (JSON)
-                if "application/json" in content_type:
-                    data = response.json()
-                    logger.warning(f"[HTTP] file_download error: {data.get('error')}")
-                    return False
-
-                # Write file content
-                with open(local_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-
-                file_size = os.path.getsize(local_path)
-                logger.info(f"[HTTP] Successfully pulled: {remote_path} -> {local_path} ({file_size} bytes)")
-                return True
-            else:
-                logger.warning(f"[HTTP] file_download returned status {response.status_code}")
+            checksums = self._get_checksums_via_http(remote_path)
+            if checksums is None:
+                return self._pull_whole_file_via_http(remote_path, local_path)
+            if not checksums:
+                return False
+
+            partial_path = local_path + self.PARTIAL_SUFFIX
+            chunk_size = checksums["chunk_size"]
+            offset = self._resume_offset(partial_path, checksums)
+
+            with open(partial_path, 'ab') as f:
+                for index in range(offset // chunk_size, len(checksums["chunks"])):
+                    chunk = self._fetch_chunk_via_http(remote_path, index * chunk_size, chunk_size,
+                                                       checksums["chunks"][index])
+                    if chunk is None:
+                        logger.warning(f"[HTTP] Giving up on {remote_path} at {index * chunk_size} bytes, "
+                                       f"partial file kept for resume")
+                        return False
+                    f.write(chunk)
+
+            actual = _sha256_file(partial_path)
+            if actual != checksums["sha256"]:
+                logger.warning(f"[HTTP] Checksum mismatch for {remote_path}, discarding download")
+                os.remove(partial_path)
+                return False
+
+            os.replace(partial_path, local_path)
+            self.checksums[local_path] = actual
+            logger.info(f"[HTTP] Successfully pulled: {remote_path} -> {local_path} ({checksums['size']} bytes, verified)")
+            return True
 
         except requests.exceptions.ConnectionError:
             logger.warning(f"[HTTP] Cannot connect to SUT client for file download")
@@ -524,12 +1081,255 @@ class TracePuller:
 
         return False
 
+    def _pull_whole_file_via_http(self, remote_path: str, local_path: str) -> bool:
+        """Unverified whole-file download for SUT clients without /file_checksum."""
+        url = self._get_sut_client_url("/file_download")
+        response = requests.post(url, json={
+            "path": remote_path
+        }, timeout=300, stream=True)
+
+        if response.status_code == 200:
+            content_type = response.headers.get("Content-Type", "")
+            # Check if it's an error response (JSON)
+            if "application/json" in content_type:
+                data = response.json()
+                logger.warning(f"[HTTP] file_download error: {data.get('error')}")
+                return False
+
+            # Write file content
+            with open(local_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+
+            self.checksums[local_path] = _sha256_file(local_path)
+            file_size = os.path.getsize(local_path)
+            logger.info(f"[HTTP] Successfully pulled: {remote_path} -> {local_path} ({file_size} bytes)")
+            return True
+
+        logger.warning(f"[HTTP] file_download returned status {response.status_code}")
+        return False
+
+    def _transfer_files(self, agent: str, remote_dir: str, files: List[str], sizes: Dict[str, int],
+                        agent_dir: Path, use_ssh: bool) -> Dict[str, Any]:
+        """
+        Pull one agent's files, as a tar stream or concurrently file by file.
+
+        Args:
+            agent: Agent name (for logging)
+            remote_dir: Remote directory containing the files
+            files: Filenames to pull
+            sizes: Known remote sizes (largest files are started first)
+            agent_dir: Local destination directory
+            use_ssh: Whether SSH transfers may be used (else HTTP only)
+
+        Returns:
+            Dict with pulled filenames, their SHA-256 checksums and throughput stats
+        """
+        start = time.monotonic()
+        methods = set()
+        pulled = set()
+        wire_bytes = 0
+        pending = sorted(files, key=lambda f: sizes.get(f, 0), reverse=True)
+
+        if use_ssh and self.tar_threshold and len(pending) >= self.tar_threshold:
+            with self.limiter.slot():
+                extracted, tar_bytes = self.pull_files_as_tar(remote_dir, pending, str(agent_dir), sizes)
+            if extracted:
+                methods.add("tar")
+                pulled.update(extracted)
+                wire_bytes += tar_bytes
+            pending = [f for f in pending if f not in pulled]
+            if pending:
+                logger.info(f"Tar stream missed {len(pending)} {agent} files, pulling them individually")
+
+        def pull_one(filename: str) -> Tuple[str, Optional[str], int]:
+            remote_path = f"{remote_dir}\\{filename}"
+            local_path = str(agent_dir / filename)
+            method = None
+            with self.limiter.slot():
+                # Try SFTP first, then HTTP fallback
+                if use_ssh and self.pull_file(remote_path, local_path):
+                    method = "sftp"
+                elif self.pull_file_via_http(remote_path, local_path):
+                    method = "http"
+            if not method:
+                return filename, None, 0
+            size = os.path.getsize(local_path)
+            self.limiter.record(size)
+            return filename, method, size
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.limiter.max_concurrent) as pool:
+                for filename, method, size in pool.map(pull_one, pending):
+                    if method:
+                        methods.add(method)
+                        pulled.add(filename)
+                        wire_bytes += size
+
+        seconds = time.monotonic() - start
+        total_bytes = sum(os.path.getsize(agent_dir / f) for f in pulled)
+        stats = {
+            "method": "+".join(sorted(methods)) or None,
+            "bytes": total_bytes,
+            "wire_bytes": wire_bytes,
+            "seconds": round(seconds, 2),
+            "throughput_mbps": _format_rate(wire_bytes, seconds),
+        }
+        logger.info(f"Pulled {len(pulled)}/{len(files)} {agent} files: {total_bytes / 1e6:.1f} MB "
+                    f"({wire_bytes / 1e6:.1f} MB on the wire) in {seconds:.1f}s, "
+                    f"{stats['throughput_mbps']} Mbit/s via {stats['method']}")
+        pulled_files = [f for f in files if f in pulled]
+        return {
+            "files": pulled_files,
+            "checksums": {f: self.checksums.get(str(agent_dir / f)) for f in pulled_files},
+            "transfer": stats,
+        }
+
+    def _pull_agent(self, agent: str, acfg: dict, run_trace_dir: str, traces_dir: Path,
+                    ssh_available: bool) -> dict:
+        """
+        Locate and pull trace files for one agent.
+
+        Args:
+            agent: Agent name
+            acfg: Agent YAML config (for fallback dirs and patterns)
+            run_trace_dir: Run-specific trace directory on the SUT
+            traces_dir: Local traces directory for the run
+            ssh_available: Whether the SSH connection test succeeded
+
+        Returns:
+            Agent result dict: {"files": [...], "checksums": {...}, "success": bool, "transfer": {...}}
+        """
+        agent_results = {"files": [], "success": False}
+
+        try:
+            # Determine file pattern from config or defaults
+            config_pattern = acfg.get("output_file_pattern", "")
+            default_pattern = f"*{agent}*.csv"
+
+            if agent == "socwatch":
+                file_pattern = default_pattern
+            elif config_pattern:
+                file_pattern = config_pattern
+            else:
+                file_pattern = default_pattern
+
+            remote_search_dir = run_trace_dir
+            used_http = False  # Track which method found files
+            sizes: Dict[str, int] = {}
+
+            logger.info(f"Searching for {agent} traces in {remote_search_dir} with pattern {file_pattern}")
+
+            # --- Phase 1: Try SSH-based file listing ---
+            files = []
+            if ssh_available:
+                sizes = self.list_remote_entries(remote_search_dir) or {}
+                files = self._match_files(sizes, file_pattern)
+
+                if not files and file_pattern != default_pattern:
+                    files = self._match_files(sizes, default_pattern)
+
+                # Diagnostic: list ALL files in trace dir (log only, don't claim them)
+                if not files:
+                    if sizes:
+                        logger.info(f"[SSH] No {agent} files matched '{file_pattern}', dir contains: {sorted(sizes)}")
+                    else:
+                        logger.info(f"[SSH] Trace dir {remote_search_dir} appears empty or inaccessible")
+
+            # --- Phase 2: HTTP fallback for trace dir listing ---
+            if not files:
+                logger.info(f"[HTTP] Trying SUT client API to list {remote_search_dir}...")
+                files = self.list_remote_files_via_http(remote_search_dir, file_pattern)
+
+                if not files and file_pattern != default_pattern:
+                    files = self.list_remote_files_via_http(remote_search_dir, default_pattern)
+
+                # Diagnostic: list ALL files via HTTP (log only, don't claim them)
+                if not files:
+                    all_files = self.list_remote_files_via_http(remote_search_dir, "*")
+                    if all_files:
+                        logger.info(f"[HTTP] No {agent} files matched '{file_pattern}', dir contains: {all_files}")
+                    else:
+                        logger.info(f"[HTTP] Trace dir {remote_search_dir} is empty or does not exist")
+
+                if files:
+                    used_http = True
+
+            # --- Phase 3: Fallback to agent's fixed output directory ---
+            if not files:
+                fallback_dir_raw = acfg.get("output_fixed_dir", "")
+                if fallback_dir_raw:
+                    # Try SSH first
+                    if ssh_available:
+                        fallback_candidates = self._expand_remote_path(fallback_dir_raw)
+                        fallback_patterns = []
+                        if config_pattern:
+                            fallback_patterns.append(config_pattern)
+                        fallback_patterns.append(default_pattern)
+                        fallback_patterns.append("*.csv")
+                        seen = set()
+                        fallback_patterns = [p for p in fallback_patterns if p not in seen and not seen.add(p)]
+
+                        for fallback_dir in fallback_candidates:
+                            entries = self.list_remote_entries(fallback_dir) or {}
+                            for fb_pattern in fallback_patterns:
+                                logger.info(f"[SSH] Checking fallback: {fallback_dir} with '{fb_pattern}'")
+                                files = self._match_files(entries, fb_pattern)
+                                if files:
+                                    remote_search_dir = fallback_dir
+                                    sizes = entries
+                                    logger.info(f"[SSH] Found {len(files)} files in fallback: {files}")
+                                    break
+                            if files:
+                                break
+
+                    # Try HTTP fallback for fixed dir
+                    if not files:
+                        # HTTP endpoint expands %USERPROFILE% on the SUT side
+                        logger.info(f"[HTTP] Checking fallback dir: {fallback_dir_raw}")
+                        for fb_pattern in [config_pattern, default_pattern, "*.csv"]:
+                            if not fb_pattern:
+                                continue
+                            files = self.list_remote_files_via_http(fallback_dir_raw, fb_pattern)
+                            if files:
+                                remote_search_dir = fallback_dir_raw
+                                used_http = True
+                                logger.info(f"[HTTP] Found {len(files)} files in fallback with '{fb_pattern}': {files}")
+                                break
+
+            # Filter out unwanted files
+            if agent == "socwatch":
+                files = [f for f in files if "WakeupAnalysis" not in f]
+
+            if files:
+                logger.info(f"Found {len(files)} {agent} trace files (via {'HTTP' if used_http else 'SSH'})")
+
+                # Create agent subdirectory
+                agent_dir = traces_dir / agent
+                agent_dir.mkdir(exist_ok=True)
+
+                transfer = self._transfer_files(agent, remote_search_dir, files, sizes, agent_dir,
+                                                use_ssh=ssh_available and not used_http)
+                agent_results.update(transfer)
+                agent_results["success"] = len(agent_results["files"]) > 0
+            else:
+                logger.warning(f"No {agent} trace files found via SSH or HTTP")
+
+        except Exception as e:
+            logger.error(f"Error pulling {agent} traces: {e}")
+            agent_results["error"] = str(e)
+
+        return agent_results
+
     def pull_traces(self, run_id: str, game_name: str, trace_output_dir: str,
                     local_storage_dir: str, trace_agents: List[str] = None,
                     agent_configs: dict = None) -> dict:
         """
         Pull all trace files for a run.
 
+        Agents are pulled in parallel; all transfers share this puller's
+        TransferLimiter and SSH connection.
+
         Args:
             run_id: Run ID for organizing files
             game_name: Game name for filename matching
@@ -539,7 +1339,8 @@ class TracePuller:
             agent_configs: Dict of agent YAML configs (for fallback dirs). Optional.
 
         Returns:
-            Dict with results per agent: {"ptat": {"files": [...], "success": True}, ...}
+            Dict with results per agent: {"ptat": {"files": [...], "success": True,
+            "transfer": {...}}, ...} plus overall "transfer" throughput stats
         """
         results = {}
         trace_agents = trace_agents or ["ptat", "socwatch"]
@@ -550,7 +1351,8 @@ class TracePuller:
             logger.warning(f"agent_configs is {type(agent_configs).__name__}, expected dict — ignoring (fallback patterns will be used)")
             agent_configs = {}
 
-        # Test SSH connection (non-fatal - we can fall back to HTTP)
+        # Test SSH connection (non-fatal - we can fall back to HTTP).
+        # With multiplexing this also starts the shared master connection.
         ssh_available = False
         connected, conn_msg = self.test_connection()
         if connected:
@@ -566,152 +1368,39 @@ class TracePuller:
         # simple_automation.py creates: {trace_output_dir}\{run_id}\
         run_trace_dir = f"{trace_output_dir}\\{run_id}"
 
-        # Pull traces for each agent
-        for agent in trace_agents:
-            agent_results = {"files": [], "success": False}
-
-            try:
-                # Get agent-specific config for fallback dirs
-                acfg = agent_configs.get(agent, {})
-
-                # Determine file pattern from config or defaults
-                config_pattern = acfg.get("output_file_pattern", "")
-
-                if agent == "socwatch":
-                    file_pattern = f"*{agent}*.csv"
-                elif config_pattern:
-                    file_pattern = config_pattern
-                else:
-                    file_pattern = f"*{agent}*.csv"
-
-                remote_search_dir = run_trace_dir
-                used_http = False  # Track which method found files
-
-                logger.info(f"Searching for {agent} traces in {remote_search_dir} with pattern {file_pattern}")
-
-                # --- Phase 1: Try SSH-based file listing ---
-                files = []
-                if ssh_available:
-                    files = self.list_remote_files(remote_search_dir, file_pattern)
-
-                    if not files and file_pattern != f"*{agent}*.csv":
-                        files = self.list_remote_files(remote_search_dir, f"*{agent}*.csv")
-
-                    # Diagnostic: list ALL files in trace dir (log only, don't claim them)
-                    if not files:
-                        all_files = self.list_remote_files(remote_search_dir, "*")
-                        if all_files:
-                            logger.info(f"[SSH] No {agent} files matched '{file_pattern}', dir contains: {all_files}")
-                        else:
-                            logger.info(f"[SSH] Trace dir {remote_search_dir} appears empty or inaccessible")
-
-                # --- Phase 2: HTTP fallback for trace dir listing ---
-                if not files:
-                    logger.info(f"[HTTP] Trying SUT client API to list {remote_search_dir}...")
-                    files = self.list_remote_files_via_http(remote_search_dir, file_pattern)
-
-                    if not files and file_pattern != f"*{agent}*.csv":
-                        files = self.list_remote_files_via_http(remote_search_dir, f"*{agent}*.csv")
-
-                    # Diagnostic: list ALL files via HTTP (log only, don't claim them)
-                    if not files:
-                        all_files = self.list_remote_files_via_http(remote_search_dir, "*")
-                        if all_files:
-                            logger.info(f"[HTTP] No {agent} files matched '{file_pattern}', dir contains: {all_files}")
-                        else:
-                            logger.info(f"[HTTP] Trace dir {remote_search_dir} is empty or does not exist")
-
-                    if files:
-                        used_http = True
-
-                # --- Phase 3: Fallback to agent's fixed output directory ---
-                if not files:
-                    fallback_dir_raw = acfg.get("output_fixed_dir", "")
-                    if fallback_dir_raw:
-                        # Try SSH first
-                        if ssh_available:
-                            fallback_candidates = self._expand_remote_path(fallback_dir_raw)
-                            fallback_patterns = []
-                            if config_pattern:
-                                fallback_patterns.append(config_pattern)
-                            fallback_patterns.append(f"*{agent}*.csv")
-                            fallback_patterns.append("*.csv")
-                            seen = set()
-                            fallback_patterns = [p for p in fallback_patterns if p not in seen and not seen.add(p)]
-
-                            for fallback_dir in fallback_candidates:
-                                for fb_pattern in fallback_patterns:
-                                    logger.info(f"[SSH] Checking fallback: {fallback_dir} with '{fb_pattern}'")
-                                    files = self.list_remote_files(fallback_dir, fb_pattern)
-                                    if files:
-                                        remote_search_dir = fallback_dir
-                                        logger.info(f"[SSH] Found {len(files)} files in fallback: {files}")
-                                        break
-                                if files:
-                                    break
-
-                        # Try HTTP fallback for fixed dir
-                        if not files:
-                            # HTTP endpoint expands %USERPROFILE% on the SUT side
-                            logger.info(f"[HTTP] Checking fallback dir: {fallback_dir_raw}")
-                            for fb_pattern in [config_pattern, f"*{agent}*.csv", "*.csv"]:
-                                if not fb_pattern:
-                                    continue
-                                files = self.list_remote_files_via_http(fallback_dir_raw, fb_pattern)
-                                if files:
-                                    remote_search_dir = fallback_dir_raw
-                                    used_http = True
-                                    logger.info(f"[HTTP] Found {len(files)} files in fallback with '{fb_pattern}': {files}")
-                                    break
-
-                # Filter out unwanted files
-                if agent == "socwatch":
-                    files = [f for f in files if "WakeupAnalysis" not in f]
-
-                if files:
-                    logger.info(f"Found {len(files)} {agent} trace files (via {'HTTP' if used_http else 'SSH'})")
-
-                    # Create agent subdirectory
-                    agent_dir = traces_dir / agent
-                    agent_dir.mkdir(exist_ok=True)
-
-                    # Pull each file
-                    for filename in files:
-                        remote_path = f"{remote_search_dir}\\{filename}"
-                        local_path = str(agent_dir / filename)
-
-                        # Try SCP first, then HTTP fallback
-                        pulled = False
-                        if ssh_available and not used_http:
-                            pulled = self.pull_file(remote_path, local_path)
-
-                        if not pulled:
-                            # HTTP fallback for file transfer
-                            pulled = self.pull_file_via_http(remote_path, local_path)
-
-                        if pulled:
-                            agent_results["files"].append(filename)
-
-                    agent_results["success"] = len(agent_results["files"]) > 0
-                else:
-                    logger.warning(f"No {agent} trace files found via SSH or HTTP")
-
-            except Exception as e:
-                logger.error(f"Error pulling {agent} traces: {e}")
-                agent_results["error"] = str(e)
-
-            results[agent] = agent_results
+        # Pull traces for all agents in parallel
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, len(trace_agents))) as pool:
+            futures = {
+                agent: pool.submit(self._pull_agent, agent, agent_configs.get(agent, {}),
+                                   run_trace_dir, traces_dir, ssh_available)
+                for agent in trace_agents
+            }
+            for agent, future in futures.items():
+                results[agent] = future.result()
+        elapsed = time.monotonic() - start
 
         # Summary
         total_files = sum(len(r.get("files", [])) for r in results.values() if isinstance(r, dict))
+        total_bytes = sum(r.get("transfer", {}).get("bytes", 0) for r in results.values())
+        wire_bytes = sum(r.get("transfer", {}).get("wire_bytes", 0) for r in results.values())
         results["total_files"] = total_files
         results["success"] = total_files > 0
         results["storage_dir"] = str(traces_dir)
+        results["transfer"] = {
+            "seconds": round(elapsed, 2),
+            "bytes": total_bytes,
+            "wire_bytes": wire_bytes,
+            "throughput_mbps": _format_rate(wire_bytes, elapsed),
+            "concurrency": self.limiter.peak_limit,
+            "multiplexed": self.multiplex,
+        }
         if not results["success"]:
             agents_searched = [a for a in trace_agents if a in results]
             results["error"] = f"No trace files found on SUT for agents: {', '.join(agents_searched)}"
 
-        logger.info(f"Trace pulling complete: {total_files} files pulled to {traces_dir}")
+        logger.info(f"Trace pulling complete: {total_files} files pulled to {traces_dir} in {elapsed:.1f}s "
+                    f"({results['transfer']['throughput_mbps']} Mbit/s)")
 
         return results
 
@@ -720,7 +1409,9 @@ def pull_run_traces(sut_ip: str, run_id: str, game_name: str,
                     trace_output_dir: str, local_storage_dir: str,
                     trace_agents: List[str] = None, ssh_user: str = None,
                     ssh_timeout: int = 60, max_retries: int = 3,
-                    agent_configs: dict = None) -> dict:
+                    agent_configs: dict = None, max_parallel_transfers: int = 4,
+                    tar_threshold: int = 16, multiplex: Optional[bool] = None,
+                    bandwidth_limit_kbps: Optional[int] = None) -> dict:
     """
     Convenience function to pull traces for a run.
 
@@ -735,14 +1426,23 @@ def pull_run_traces(sut_ip: str, run_id: str, game_name: str,
         ssh_timeout: SSH connection timeout in seconds (default: 60)
         max_retries: Maximum retry attempts (default: 3)
         agent_configs: Dict of agent YAML configs for fallback dirs (optional)
+        max_parallel_transfers: Upper bound on concurrent transfers (default: 4)
+        tar_threshold: File count at which an agent is pulled as a tar stream (default: 16)
+        multiplex: Share one SSH connection (default: auto)
+        bandwidth_limit_kbps: Total bandwidth cap in Kbit/s (optional)
 
     Returns:
         Result dict with pulled files and status
     """
-    puller = TracePuller(sut_ip, ssh_user, ssh_timeout=ssh_timeout, max_retries=max_retries)
-    return puller.pull_traces(run_id, game_name, trace_output_dir,
-                              local_storage_dir, trace_agents,
-                              agent_configs=agent_configs)
+    puller = TracePuller(sut_ip, ssh_user, ssh_timeout=ssh_timeout, max_retries=max_retries,
+                         max_parallel_transfers=max_parallel_transfers, tar_threshold=tar_threshold,
+                         multiplex=multiplex, bandwidth_limit_kbps=bandwidth_limit_kbps)
+    try:
+        return puller.pull_traces(run_id, game_name, trace_output_dir,
+                                  local_storage_dir, trace_agents,
+                                  agent_configs=agent_configs)
+    finally:
+        puller.close()
 
 
 def diagnose_sut_ssh(sut_ip: str, ssh_user: str = None) -> dict:
@@ -757,4 +1457,7 @@ def diagnose_sut_ssh(sut_ip: str, ssh_user: str = None) -> dict:
         Diagnostic results dict
     """
     puller = TracePuller(sut_ip, ssh_user)
-    return puller.diagnose_connection()
+    try:
+        return puller.diagnose_connection()
+    finally:
+        puller.close()
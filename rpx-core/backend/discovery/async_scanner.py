@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous subnet scanner for SUT discovery
+
+Probes the SUT port of a whole subnet with concurrent asyncio connects
+instead of a small pool of blocking ones, and remembers every host between
+scans:
+- the connect timeout adapts to the round-trip times seen on the network
+  (smoothed RTT + 4 x deviation, as TCP does), so an empty address on a LAN
+  costs a fraction of a second instead of the full timeout
+- hosts with nothing listening back off exponentially and are skipped until
+  due again, so a repeated scan only pays for new and live addresses
+- priority hosts (paired, or seen recently) are probed first on every scan,
+  with the full timeout
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Connect timeout for priority hosts, and the ceiling of the adaptive one
+CONNECT_TIMEOUT = 1.0
+
+# Floor of the adaptive connect timeout
+MIN_CONNECT_TIMEOUT = 0.25
+
+
+@dataclass
+class HostState:
+    """What the scanner knows about one address"""
+    failures: int = 0
+    next_probe: float = 0.0
+    last_probe: Optional[float] = None
+    last_seen: Optional[float] = None
+
+
+class SubnetScanner:
+    """Concurrent connect probes with adaptive timeouts and per-host backoff"""
+
+    def __init__(self, port: int, concurrency: int = 256, connect_timeout: float = CONNECT_TIMEOUT,
+                 min_timeout: float = MIN_CONNECT_TIMEOUT, backoff_base: float = 10.0,
+                 backoff_max: float = 300.0, recent_window: float = 300.0):
+        self.port = port
+        self.concurrency = concurrency
+        self.connect_timeout = connect_timeout
+        self.min_timeout = min_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.recent_window = recent_window
+        self._hosts: Dict[str, HostState] = {}
+        self._srtt: Optional[float] = None
+        self._rttvar = 0.0
+        self.last_scan: Dict[str, Any] = {}
+
+    @property
+    def adaptive_timeout(self) -> float:
+        """Connect timeout for hosts not known to be there"""
+        if self._srtt is None:
+            return self.connect_timeout
+        return min(self.connect_timeout, max(self.min_timeout, self._srtt + 4 * self._rttvar))
+
+    def _observe_rtt(self, rtt: float):
+        # RFC 6298 smoothing
+        if self._srtt is None:
+            self._srtt, self._rttvar = rtt, rtt / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+            self._srtt = 0.875 * self._srtt + 0.125 * rtt
+
+    def _is_recent(self, state: Optional[HostState], now: float) -> bool:
+        return state is not None and state.last_seen is not None and now - state.last_seen < self.recent_window
+
+    def plan(self, ips: Iterable[str], priority: Iterable[str] = (), force: bool = False) -> List[str]:
+        """
+        Order the hosts to probe this scan.
+
+        Args:
+            ips: Candidate addresses
+            priority: Addresses probed first, even while backing off
+            force: Probe every address, ignoring backoff
+
+        Returns:
+            Priority and recently seen hosts, then the other due hosts
+        """
+        now = time.time()
+        priority = set(priority)
+        first, recent, due = [], [], []
+        for ip in ips:
+            state = self._hosts.get(ip)
+            if ip in priority:
+                first.append(ip)
+            elif self._is_recent(state, now):
+                recent.append(ip)
+            elif force or state is None or state.next_probe <= now:
+                due.append((state.next_probe if state else 0.0, ip))
+        due.sort()
+        return sorted(first) + sorted(recent) + [ip for _, ip in due]
+
+    async def probe(self, ip: str, timeout: float) -> bool:
+        """True if the port accepts a connection"""
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, self.port), timeout)
+        except ConnectionRefusedError:
+            # The host answered, just not on this port
+            self._observe_rtt(time.perf_counter() - start)
+            return False
+        except (asyncio.TimeoutError, OSError):
+            return False
+        self._observe_rtt(time.perf_counter() - start)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    def _record(self, ip: str, is_open: bool):
+        now = time.time()
+        state = self._hosts.setdefault(ip, HostState())
+        state.last_probe = now
+        if is_open:
+            state.failures = 0
+            state.next_probe = 0.0
+            state.last_seen = now
+        else:
+            state.failures += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (state.failures - 1))
+            state.next_probe = now + delay * random.uniform(0.8, 1.2)
+
+    async def scan(self, ips: Iterable[str], priority: Iterable[str] = (), force: bool = False) -> List[str]:
+        """
+        Probe the hosts due this scan (see plan()).
+
+        Returns:
+            Addresses with the port open, in probe order
+        """
+        start = time.time()
+        priority = set(priority)
+        order = self.plan(ips, priority, force)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(ip: str) -> Optional[str]:
+            async with semaphore:
+                known = ip in priority or self._is_recent(self._hosts.get(ip), time.time())
+                is_open = await self.probe(ip, self.connect_timeout if known else self.adaptive_timeout)
+            self._record(ip, is_open)
+            return ip if is_open else None
+
+        results = await asyncio.gather(*(run(ip) for ip in order))
+        open_ips = [ip for ip in results if ip]
+        self.last_scan = {
+            "probed": len(order),
+            "open": len(open_ips),
+            "duration": round(time.time() - start, 3),
+            "timeout": round(self.adaptive_timeout, 3),
+        }
+        logger.debug(f"Probed {len(order)} hosts in {self.last_scan['duration']}s: {len(open_ips)} open")
+        return open_ips
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "hosts_tracked": len(self._hosts),
+            "backing_off": sum(1 for state in self._hosts.values() if state.next_probe > now),
+            "recently_seen": sum(1 for state in self._hosts.values() if self._is_recent(state, now)),
+            "srtt_ms": round(self._srtt * 1000, 2) if self._srtt is not None else None,
+            "adaptive_timeout": round(self.adaptive_timeout, 3),
+            "concurrency": self.concurrency,
+            "last_scan": self.last_scan,
+        }
@@ -5,7 +5,6 @@ Network SUT discovery service with unique identification
 
 import asyncio
 import logging
-import socket
 import threading
 import time
 from typing import List, Set, Optional, Dict, Any
@@ -14,6 +13,7 @@ import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
+    from .async_scanner import SubnetScanner
     from .device_registry import DeviceRegistry, SUTDevice, SUTStatus
     from .network_utils import NetworkDiscovery
     from ..core.config import BackendConfig
@@ -23,6 +23,7 @@ except ImportError:
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from discovery.async_scanner import SubnetScanner
     from discovery.device_registry import DeviceRegistry, SUTDevice, SUTStatus
     from discovery.network_utils import NetworkDiscovery
     from core.config import BackendConfig
@@ -45,6 +46,7 @@ class SUTDiscoveryService:
         # Network scanning
         self.target_ips: Set[str] = set()
         self._initialize_target_ips()
+        self.scanner = SubnetScanner(config.sut_port, concurrency=config.discovery_concurrency)
 
         # Priority discovery tracking
         self.priority_scan_count = 0
@@ -79,7 +81,7 @@ class SUTDiscoveryService:
         for network_range in network_ranges:
             try:
                 network = ipaddress.ip_network(network_range, strict=False)
-                if network.num_addresses <= 256:  # Only scan small networks
+                if network.num_addresses <= self.config.discovery_max_hosts:
                     for ip in network.hosts():
                         self.target_ips.add(str(ip))
                     logger.info(f"Added network range: {network_range} ({network.num_addresses-2} hosts)")
@@ -169,37 +171,44 @@ class SUTDiscoveryService:
         logger.info("Discovery loop ended")
         
     def _perform_discovery_scan(self):
-        """Perform a discovery scan across all target IPs"""
+        """Perform a discovery scan across all target IPs, including hosts backing off"""
         with self._discovery_lock:
-            online_count = 0
-            
-            # Use ThreadPoolExecutor for concurrent scanning
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                # Submit all scan tasks
-                future_to_ip = {
-                    executor.submit(self._scan_ip, ip): ip 
-                    for ip in self.target_ips
-                }
-                
-                # Process results as they complete
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            online_count += 1
-                    except Exception as e:
-                        logger.debug(f"Error scanning {ip}: {e}")
-                        
+            online_count = self._scan_hosts(self.target_ips, self._known_ips(), force=True)
             logger.debug(f"Discovery scan complete: {online_count} SUTs found")
-            
-    def _scan_ip(self, ip: str) -> Optional[SUTDevice]:
-        """Scan a single IP for SUT service"""
+
+    def _known_ips(self) -> Set[str]:
+        """Paired and online SUT addresses, probed first on every scan"""
+        known = set(self.registry.get_paired_device_ips())
+        known.update(device.ip for device in self.registry.get_online_devices())
+        return known
+
+    def _scan_hosts(self, ips: Set[str], priority: Set[str], force: bool = False) -> int:
+        """
+        Probe the SUT port across ips (see SubnetScanner), then ask each host
+        that answered for its /status.
+
+        Returns:
+            Number of SUTs found
+        """
+        open_ips = asyncio.run(self.scanner.scan(ips, priority, force=force))
+        if not open_ips:
+            return 0
+
+        online_count = 0
+        with ThreadPoolExecutor(max_workers=min(32, len(open_ips))) as executor:
+            future_to_ip = {executor.submit(self._query_sut, ip): ip for ip in open_ips}
+            for future in as_completed(future_to_ip):
+                ip = future_to_ip[future]
+                try:
+                    if future.result():
+                        online_count += 1
+                except Exception as e:
+                    logger.debug(f"Error scanning {ip}: {e}")
+        return online_count
+
+    def _query_sut(self, ip: str) -> Optional[SUTDevice]:
+        """Register the SUT at ip if its service answers /status"""
         try:
-            # Quick port check first
-            if not self._is_port_open(ip, self.config.sut_port):
-                return None
-                
             # Try to contact the SUT service
             response = requests.get(
                 f"http://{ip}:{self.config.sut_port}/status",
@@ -223,14 +232,6 @@ class SUTDiscoveryService:
             
         return None
         
-    def _is_port_open(self, ip: str, port: int) -> bool:
-        """Quick port connectivity check"""
-        try:
-            with socket.create_connection((ip, port), timeout=1):
-                return True
-        except (socket.error, OSError):
-            return False
-            
     def _is_rpx_sut(self, response_data: Dict[str, Any]) -> bool:
         """Check if response indicates an RPX SUT (supports both new and legacy signatures)"""
         # Check for new RPX identifier
@@ -293,52 +294,15 @@ class SUTDiscoveryService:
 
         logger.debug(f"Starting priority scan for {len(paired_ips)} paired devices")
         with self._discovery_lock:
-            online_count = 0
-
-            # Use ThreadPoolExecutor for concurrent scanning
-            with ThreadPoolExecutor(max_workers=10) as executor:  # More workers for faster paired scanning
-                future_to_ip = {
-                    executor.submit(self._scan_ip, ip): ip
-                    for ip in paired_ips
-                }
-
-                # Process results as they complete
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            online_count += 1
-                    except Exception as e:
-                        logger.debug(f"Error scanning paired device {ip}: {e}")
-
+            online_count = self._scan_hosts(paired_ips, paired_ips)
             self.priority_scan_count += 1
             logger.debug(f"Priority scan complete: {online_count}/{len(paired_ips)} paired SUTs online")
 
     def _perform_general_discovery_scan(self):
-        """Perform general network discovery scan for all IPs"""
+        """Perform general network discovery scan (hosts backing off are skipped until due)"""
         logger.debug(f"Starting general discovery scan for {len(self.target_ips)} IPs")
         with self._discovery_lock:
-            online_count = 0
-
-            # Use ThreadPoolExecutor for concurrent scanning
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                # Submit all scan tasks
-                future_to_ip = {
-                    executor.submit(self._scan_ip, ip): ip
-                    for ip in self.target_ips
-                }
-
-                # Process results as they complete
-                for future in as_completed(future_to_ip):
-                    ip = future_to_ip[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            online_count += 1
-                    except Exception as e:
-                        logger.debug(f"Error scanning {ip}: {e}")
-
+            online_count = self._scan_hosts(self.target_ips, self._known_ips())
             self.general_scan_count += 1
             logger.debug(f"General discovery scan complete: {online_count} SUTs found")
 
@@ -389,5 +353,6 @@ class SUTDiscoveryService:
             },
             "discovery_interval": self.config.discovery_interval,
             "discovery_timeout": self.config.discovery_timeout,
+            "scanner": self.scanner.stats(),
             **self.registry.get_device_stats()
         }
\ No newline at end of file
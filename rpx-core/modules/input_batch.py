@@ -0,0 +1,166 @@
+"""
+Input batches for SimpleAutomation.
+
+Key sequences, typed text and runs of action-only steps used to go to the SUT
+one /action request at a time, with the delays between them slept on this
+side - so LAN jitter ended up in the input timing. compile_action turns a
+workflow action into the SUT actions it sends, each with the "delay" to wait
+before it, so the whole run can go to /action_batch and execute on the SUT
+with local timing.
+
+Only plain input is compiled. Anything that needs the master in between -
+conditional actions, waits with conditions or tracing, drags (which need a
+parsed target) - returns None and runs through the regular handlers.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Longest delay compiled into a batch; longer waits stay on the master where
+# they can be interrupted by the stop event and refocus the game
+MAX_BATCH_DELAY = 10.0
+
+# Workflow key names -> names understood by the SUT input controller
+KEY_MAPPING = {
+    "enter": "enter",
+    "return": "return",
+    "space": "space",
+    "tab": "Tab",
+    "escape": "Escape",
+    "esc": "Escape",
+    "delete": "Delete",
+    "backspace": "BackSpace",
+    "shift": "Shift_L",
+    "ctrl": "Control_L",
+    "alt": "Alt_L",
+    "win": "Super_L",
+    "f1": "F1", "f2": "F2", "f3": "F3", "f4": "F4",
+    "f5": "F5", "f6": "F6", "f7": "F7", "f8": "F8",
+    "f9": "F9", "f10": "F10", "f11": "F11", "f12": "F12",
+    "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+    "home": "Home", "end": "End", "pageup": "Page_Up", "pagedown": "Page_Down"
+}
+
+# Characters typed as named keys
+CHAR_KEYS = {" ": "space", "\n": "Return", "\t": "Tab"}
+
+
+def _element_point(action_config: Dict[str, Any], target_element, default=(0, 0)):
+    """Center of the target element, else the action's x/y"""
+    if target_element:
+        return (target_element.x + target_element.width // 2,
+                target_element.y + target_element.height // 2)
+    return action_config.get("x", default[0]), action_config.get("y", default[1])
+
+
+def text_actions(text: str, char_delay: float = 0.05, clear_first: bool = False) -> List[Dict[str, Any]]:
+    """Key presses typing text one character at a time"""
+    actions = []
+    if clear_first:
+        # Ctrl+A to select all, then type over it
+        actions.append({"type": "hotkey", "keys": ["ctrl", "a"]})
+    for char in text:
+        action = {"type": "key", "key": CHAR_KEYS.get(char, char)}
+        if actions:
+            action["delay"] = 0.1 if len(actions) == 1 and clear_first else char_delay
+        actions.append(action)
+    return actions
+
+
+def compile_action(action_config: Union[str, Dict[str, Any]], target_element=None,
+                   allow_waits: bool = True) -> Optional[List[Dict[str, Any]]]:
+    """
+    SUT actions for a workflow action, in order.
+
+    Args:
+        action_config: Step action (as in the workflow YAML)
+        target_element: Element found for the step, if any
+        allow_waits: Compile short wait actions into SUT-side sleeps (off when
+                     waits should end early on a settled screen)
+
+    Returns:
+        List of /action bodies with an optional "delay" (seconds after the
+        previous action), or None if the action can't run as part of a batch
+    """
+    if not isinstance(action_config, dict):
+        return None
+    action_type = action_config.get("type", "").lower()
+
+    if action_type == "click":
+        x, y = _element_point(action_config, target_element)
+        return [{
+            "type": "click",
+            "x": x + action_config.get("offset_x", 0),
+            "y": y + action_config.get("offset_y", 0),
+            "button": action_config.get("button", "left").lower(),
+            "move_duration": action_config.get("move_duration", 0.5),
+            "click_delay": action_config.get("click_delay", 0.1),
+        }]
+
+    if action_type == "hotkey":
+        keys = action_config.get("keys", [])
+        return [{"type": "hotkey", "keys": keys}] if keys else None
+
+    if action_type in ("key", "keypress"):
+        key = action_config.get("key", "")
+        if not key:
+            return None
+        action = {"type": "key", "key": KEY_MAPPING.get(key.lower(), key)}
+        count = action_config.get("count", 1)
+        if count > 1:
+            action["count"] = count
+            action["interval"] = action_config.get("interval", 1.0)
+        return [action]
+
+    if action_type in ("type", "text", "input"):
+        text = action_config.get("text", "")
+        if not text:
+            return None
+        return text_actions(text, action_config.get("char_delay", 0.05), action_config.get("clear_first", False))
+
+    if action_type in ("double_click", "right_click", "middle_click"):
+        x, y = _element_point(action_config, target_element)
+        if action_type == "double_click":
+            return [{"type": "double_click", "x": x, "y": y, "button": action_config.get("button", "left")}]
+        return [{"type": "click", "x": x, "y": y, "button": action_type.split("_")[0]}]
+
+    if action_type == "scroll":
+        x, y = _element_point(action_config, target_element, default=(500, 400))
+        return [{"type": "scroll", "x": x, "y": y,
+                 "direction": action_config.get("direction", "down"),
+                 "clicks": action_config.get("clicks", 3)}]
+
+    if action_type == "hold_click":
+        if not target_element and not ("x" in action_config and "y" in action_config):
+            return None
+        x, y = _element_point(action_config, target_element)
+        return [{"type": "hold_click", "x": x, "y": y,
+                 "button": action_config.get("button", "left").lower(),
+                 "duration": action_config.get("duration", 2.0),
+                 "move_duration": action_config.get("move_duration", 0.3)}]
+
+    if action_type == "hold_key":
+        key = action_config.get("key", "")
+        return [{"type": "hold_key", "key": key, "duration": action_config.get("duration", 2.0)}] if key else None
+
+    if action_type == "wait":
+        duration = action_config.get("duration", 1)
+        if not allow_waits or action_config.get("condition") or duration > MAX_BATCH_DELAY:
+            return None
+        return [{"type": "wait", "duration": duration}]
+
+    if action_type == "sequence":
+        actions = []
+        delay_between = action_config.get("delay_between", 0.5)
+        for child in action_config.get("actions", []):
+            compiled = compile_action(child, target_element, allow_waits)
+            if compiled is None:
+                return None
+            if actions and delay_between > 0:
+                compiled[0] = dict(compiled[0], delay=compiled[0].get("delay", 0) + delay_between)
+            actions.extend(compiled)
+        return actions or None
+
+    return None
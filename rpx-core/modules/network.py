@@ -9,22 +9,40 @@ import logging
 import requests
 from typing import Dict, Any, Optional, List
 
+from modules import perf_spans
+
 logger = logging.getLogger(__name__)
 
 class NetworkManager:
     """Manages network communication with the SUT."""
 
-    def __init__(self, sut_ip: str, sut_port: int):
+    # SUT /screenshot encoding per purpose. Archival shots are kept as the run
+    # record; parse shots only feed OmniParser, and JPEG encodes an order of
+    # magnitude faster and smaller than PNG at 4K without hurting detection.
+    SCREENSHOT_PROFILES = {
+        "archival": {"format": "png"},
+        "parse": {"format": "jpeg", "quality": 90},
+        "preview": {"format": "jpeg", "quality": 70, "scale": 0.5},
+    }
+
+    def __init__(self, sut_ip: str, sut_port: int, gateway_url: Optional[str] = None, sut_id: Optional[str] = None):
         """
         Initialize the network manager.
 
         Args:
             sut_ip: IP address of the system under test
             sut_port: Port number for communication
+            gateway_url: SUT Discovery Service URL; with sut_id, SUT calls go
+                through its RPC passthrough (the SUT's WebSocket) instead of
+                straight to sut_ip:sut_port
+            sut_id: The SUT's unique ID in the discovery service
         """
         self.sut_ip = sut_ip
         self.sut_port = sut_port
-        self.base_url = f"http://{sut_ip}:{sut_port}"
+        if gateway_url and sut_id:
+            self.base_url = f"{gateway_url.rstrip('/')}/api/suts/{sut_id}/rpc"
+        else:
+            self.base_url = f"http://{sut_ip}:{sut_port}"
         self.session = requests.Session()
         logger.info(f"NetworkManager initialized with SUT at {self.base_url}")
 
@@ -32,6 +50,10 @@ class NetworkManager:
         self._timeline = None
         self._linked_event_id = None
 
+        # Whether the SUT client has /step_snapshot and /action_batch (None until first tried)
+        self._step_snapshot_supported: Optional[bool] = None
+        self._action_batch_supported: Optional[bool] = None
+
         # Verify connection
         try:
             self._check_connection()
@@ -231,13 +253,112 @@ class NetworkManager:
             logger.error(f"Failed to send action {action}: {str(e)}")
             raise
     
-    def get_screenshot(self, process_name: str = None) -> bytes:
+    def send_action_batch(self, actions: List[Dict[str, Any]], stop_on_error: bool = True) -> Dict[str, Any]:
+        """
+        Send an ordered list of actions for the SUT to execute with their own timing.
+
+        Each action is an /action body plus optional "delay" (seconds after the
+        previous action finished) or "at" (seconds after the batch started).
+        SUT clients without /action_batch get the actions one by one instead,
+        with the delays slept here.
+
+        Args:
+            actions: Actions in execution order
+            stop_on_error: Skip the remaining actions after one fails
+
+        Returns:
+            Dict with status, completed (number of successful actions),
+            results (per-action status, message and timings) and total_ms
+
+        Raises:
+            RequestException: If the batch request fails
+        """
+        if self._action_batch_supported is not False:
+            # Worst case the SUT sleeps through every delay and hold
+            budget = sum(float(a.get("delay", 0)) + float(a.get("duration", 0)) + 1 for a in actions)
+            budget = max([budget] + [float(a["at"]) + 1 for a in actions if a.get("at") is not None])
+            event_id = self._track_service_call("/action_batch")
+            try:
+                with perf_spans.span("action_batch", actions=len(actions)):
+                    response = self.session.post(
+                        f"{self.base_url}/action_batch",
+                        json={"actions": actions, "stop_on_error": stop_on_error},
+                        timeout=10 + budget
+                    )
+                if response.status_code == 404:
+                    self._action_batch_supported = False
+                    self._complete_service_call(event_id, False, error="not supported")
+                    logger.info("SUT client has no /action_batch, sending actions one by one")
+                else:
+                    response.raise_for_status()
+                    self._action_batch_supported = True
+                    result = response.json()
+                    late = max((r.get("late_ms", 0) for r in result.get("results", [])), default=0)
+                    logger.debug(f"Action batch: {result.get('completed')}/{len(actions)} in "
+                                 f"{result.get('total_ms')}ms (max {late}ms late)")
+                    self._complete_service_call(event_id, True,
+                                                response_summary=f"{result.get('completed')}/{len(actions)} actions")
+                    return result
+            except requests.RequestException as e:
+                self._complete_service_call(event_id, False, error=str(e))
+                logger.error(f"Failed to send action batch: {str(e)}")
+                raise
+
+        return self._send_actions_one_by_one(actions, stop_on_error)
+
+    def _send_actions_one_by_one(self, actions: List[Dict[str, Any]], stop_on_error: bool) -> Dict[str, Any]:
+        """send_action_batch for SUT clients without /action_batch"""
+        import time
+
+        started = time.perf_counter()
+        previous_end = started
+        results = []
+        completed = 0
+        for index, action in enumerate(actions):
+            if action.get("at") is not None:
+                due = started + float(action["at"])
+            else:
+                due = previous_end + float(action.get("delay", 0))
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+            action_start = time.perf_counter()
+            body = {k: v for k, v in action.items() if k not in ("delay", "at")}
+            entry = {"index": index, "type": body.get("type") or body.get("action"),
+                     "start_ms": round((action_start - started) * 1000, 1),
+                     "late_ms": round(max(0.0, action_start - due) * 1000, 1)}
+            try:
+                outcome = self.send_action(body)
+                entry.update(status="success", message=outcome.get("message"))
+                completed += 1
+            except requests.RequestException as e:
+                entry.update(status="error", message=str(e))
+            previous_end = time.perf_counter()
+            entry["duration_ms"] = round((previous_end - action_start) * 1000, 1)
+            results.append(entry)
+            if entry["status"] == "error" and stop_on_error:
+                break
+
+        return {
+            "status": "success" if completed == len(actions) else "error",
+            "completed": completed,
+            "results": results,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def get_screenshot(self, process_name: str = None, scale: float = None,
+                       profile: str = "archival") -> bytes:
         """
         Request a screenshot from the SUT.
 
         Args:
             process_name: Optional process name to focus before capturing (e.g., 'RDR2.exe').
                          This ensures the game window is in foreground for a valid screenshot.
+            scale: Optional downscale factor (0-1) applied on the SUT before encoding,
+                   overriding the profile's. Older SUT services ignore it and return full resolution.
+            profile: Key of SCREENSHOT_PROFILES selecting the encoding (archival, parse, preview).
+                     Older SUT services ignore the encoding options and return PNG.
 
         Returns:
             Raw screenshot data as bytes
@@ -245,23 +366,35 @@ class NetworkManager:
         Raises:
             RequestException: If the request fails
         """
+        params = dict(self.SCREENSHOT_PROFILES[profile])
+        if scale:
+            params["scale"] = scale
+        preview = profile != "archival" or bool(scale)
         try:
             # Use POST with JSON body if process_name specified, else simple GET
             if process_name:
-                logger.info(f"Requesting screenshot with focus on {process_name}")
-                response = self.session.post(
-                    f"{self.base_url}/screenshot",
-                    json={"process_name": process_name, "format": "png"},
-                    timeout=15
-                )
+                logger.info(f"Requesting {profile} screenshot with focus on {process_name}")
+                with perf_spans.span("transfer"):
+                    response = self.session.post(
+                        f"{self.base_url}/screenshot",
+                        json={"process_name": process_name, **params},
+                        timeout=15
+                    )
             else:
-                logger.info("Requesting screenshot without process focus")
-                response = self.session.get(
-                    f"{self.base_url}/screenshot",
-                    timeout=15
-                )
+                if preview:
+                    logger.debug(f"Requesting {profile} screenshot: {params}")
+                else:
+                    logger.info("Requesting screenshot without process focus")
+                with perf_spans.span("preview_transfer" if scale else "transfer"):
+                    response = self.session.get(
+                        f"{self.base_url}/screenshot",
+                        params=params,
+                        timeout=15
+                    )
             response.raise_for_status()
-            logger.info(f"Screenshot retrieved: {len(response.content)} bytes")
+            log = logger.debug if preview else logger.info
+            log(f"Screenshot retrieved: {len(response.content)} bytes "
+                f"({response.headers.get('Content-Type', 'unknown type')})")
             return response.content
         except requests.RequestException as e:
             logger.error(f"Failed to get screenshot: {str(e)}")
@@ -318,6 +451,110 @@ class NetworkManager:
 
         return False
 
+    def get_step_snapshot(self, process_name: str = None, check_process: bool = False,
+                          require_running: bool = True, focus: bool = True, focus_process: str = None,
+                          capture: bool = True, profile: str = "parse", settle_ms: int = 200) -> Dict[str, Any]:
+        """
+        Check the game, focus its window and capture the screen in one SUT round trip.
+
+        Falls back to the separate status/focus/screenshot calls on SUT clients
+        without /step_snapshot (remembered after the first 404).
+
+        Args:
+            process_name: Process to check when check_process is set (e.g., 'RDR2.exe')
+            check_process: Check process_name directly instead of the SUT's tracked game
+                           (for games that were not launched through the SUT)
+            require_running: Skip focus and capture if the game is not running
+            focus: Bring the game window to the foreground first
+            focus_process: Process to focus (default: the checked game)
+            capture: Take a screenshot after focusing
+            profile: Key of SCREENSHOT_PROFILES for the screenshot
+            settle_ms: Delay after a focus change before capturing
+
+        Returns:
+            Dict with running, focused (bool or None), screenshot (bytes or None),
+            screenshot_error, state (SUT response, if any) and fallback
+        """
+        if self._step_snapshot_supported is not False:
+            payload = {
+                "require_running": require_running,
+                "focus": focus,
+                "settle_ms": settle_ms,
+                "screenshot": capture,
+                **(self.SCREENSHOT_PROFILES[profile] if capture else {}),
+            }
+            if check_process and process_name:
+                payload["process_name"] = process_name
+            if focus_process:
+                payload["focus_process"] = focus_process
+
+            event_id = self._track_service_call("/step_snapshot")
+            try:
+                with perf_spans.span("snapshot"):
+                    response = self.session.post(f"{self.base_url}/step_snapshot", json=payload, timeout=20)
+                if response.status_code == 404 and "X-Step-State" not in response.headers:
+                    self._step_snapshot_supported = False
+                    self._complete_service_call(event_id, False, error="not supported")
+                    logger.info("SUT client has no /step_snapshot, using separate status/focus/screenshot calls")
+                else:
+                    response.raise_for_status()
+                    self._step_snapshot_supported = True
+                    is_image = "X-Step-State" in response.headers
+                    state = json.loads(response.headers["X-Step-State"]) if is_image else response.json()
+                    focus_result = state.get("focus", {}).get("result")
+                    result = {
+                        "running": state.get("game", {}).get("running", False),
+                        "focused": None if focus_result is None else focus_result in ("success", "already"),
+                        "screenshot": response.content if is_image else None,
+                        "screenshot_error": None,
+                        "state": state,
+                        "fallback": False,
+                    }
+                    if capture and result["screenshot"] is None and (result["running"] or not require_running):
+                        result["screenshot_error"] = state.get("message", "SUT returned no screenshot")
+                    logger.debug(f"Step snapshot: running={result['running']} focus={focus_result} "
+                                 f"timings={state.get('timings_ms')}")
+                    self._complete_service_call(event_id, True, response_summary=f"focus={focus_result}")
+                    return result
+            except requests.RequestException as e:
+                self._complete_service_call(event_id, False, error=str(e))
+                logger.warning(f"Step snapshot failed ({e}), using separate calls")
+
+        return self._step_snapshot_fallback(process_name, check_process, require_running, focus,
+                                            focus_process, capture, profile, settle_ms)
+
+    def _step_snapshot_fallback(self, process_name, check_process, require_running, focus,
+                                focus_process, capture, profile, settle_ms) -> Dict[str, Any]:
+        """get_step_snapshot via /check_process or /status, /focus and /screenshot"""
+        import time
+
+        result = {"running": True, "focused": None, "screenshot": None, "screenshot_error": None,
+                  "state": None, "fallback": True}
+        try:
+            if check_process and process_name:
+                result["running"] = self.check_process(process_name)
+            else:
+                result["running"] = self.get_sut_status().get("game", {}).get("running", False)
+        except Exception as e:
+            # Can't tell - carry on as if it were running
+            logger.warning(f"Could not check game status: {e}")
+
+        if not result["running"] and require_running:
+            return result
+
+        if focus:
+            with perf_spans.span("focus"):
+                result["focused"] = self.focus_game(process_name=focus_process)
+            if settle_ms:
+                time.sleep(settle_ms / 1000)
+
+        if capture:
+            try:
+                result["screenshot"] = self.get_screenshot(profile=profile)
+            except Exception as e:
+                result["screenshot_error"] = str(e)
+        return result
+
     def launch_game(self, game_path: str, process_id: str = '', startup_wait: int = 15, launch_args: str = None, use_direct_exe: bool = False) -> Dict[str, Any]:
         """
         Request the SUT to launch a game.
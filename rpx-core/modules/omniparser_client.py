@@ -15,6 +15,7 @@ from dataclasses import dataclass
 from io import BytesIO
 from PIL import Image
 
+from modules import perf_spans
 from modules.vision_client import BoundingBox  # Reuse the BoundingBox class
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,12 @@ class OmniparserResult:
     response_time: Optional[float] = None
     error: Optional[str] = None
 
+# Queue service priorities (1-10, lower = served first). Ignored when talking
+# to OmniParser directly.
+PARSE_PRIORITY_INTERACTIVE = 1   # Workflow builder / user-driven parses
+PARSE_PRIORITY_STEP = 5          # Automation step parses
+PARSE_PRIORITY_BACKGROUND = 8    # Steam dialog checks and other opportunistic parses
+
 # Default OCR configuration
 DEFAULT_OCR_CONFIG = {
     "box_threshold": 0.05,
@@ -55,7 +62,8 @@ FALLBACK_OCR_CONFIGS = [
 class OmniparserClient:
     """Client for the Omniparser API server with streamlined annotation handling."""
 
-    def __init__(self, api_url: str = "http://localhost:8000", screen_width: int = 1920, screen_height: int = 1080):
+    def __init__(self, api_url: str = "http://localhost:8000", screen_width: int = 1920, screen_height: int = 1080,
+                 priority: int = PARSE_PRIORITY_STEP):
         """
         Initialize the Omniparser client.
 
@@ -63,8 +71,10 @@ class OmniparserClient:
             api_url: URL of the Omniparser API server
             screen_width: Screen width for coordinate scaling (optional)
             screen_height: Screen height for coordinate scaling (optional)
+            priority: Queue service priority for parse requests (1-10, lower = sooner)
         """
         self.api_url = api_url
+        self.priority = priority
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.session = requests.Session()
@@ -315,7 +325,8 @@ class OmniparserClient:
                 logger.debug(f"Loaded image {image_path} with size: {image_size}")
 
             # Encode the image
-            base64_image = self._encode_image(image_path)
+            with perf_spans.span("encode"):
+                base64_image = self._encode_image(image_path)
 
             # Merge default config with provided overrides
             effective_config = DEFAULT_OCR_CONFIG.copy()
@@ -331,6 +342,7 @@ class OmniparserClient:
                 "text_threshold": effective_config.get("text_threshold", 0.8),
                 "use_local_semantics": effective_config.get("use_local_semantics", True),
                 "scale_img": effective_config.get("scale_img", False),
+                "priority": self.priority,
             }
             # Only include imgsz if explicitly set
             if effective_config.get("imgsz") is not None:
@@ -346,13 +358,15 @@ class OmniparserClient:
             service_call_id = self._track_service_call("/parse/", "POST")
 
             try:
-                response = self.session.post(
-                    f"{self.api_url}/parse/",
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=300  # Longer timeout for image processing
-                )
+                with perf_spans.span("parse_request"):
+                    response = self.session.post(
+                        f"{self.api_url}/parse/",
+                        json=payload,
+                        headers={"Content-Type": "application/json"},
+                        timeout=300  # Longer timeout for image processing
+                    )
                 response.raise_for_status()
+                self._record_queue_timing(response.headers)
 
                 # Parse the response
                 response_data = response.json()
@@ -393,7 +407,9 @@ class OmniparserClient:
                     # Backward compatibility: save with old naming convention for non-SimpleAutomation usage
                     try:
                         annotated_dir = os.path.dirname(image_path)
-                        fallback_path = os.path.join(annotated_dir, f"omniparser_{os.path.basename(image_path)}")
+                        # SOM image is always PNG, whatever the screenshot's encoding
+                        image_stem = os.path.splitext(os.path.basename(image_path))[0]
+                        fallback_path = os.path.join(annotated_dir, f"omniparser_{image_stem}.png")
                         img_data = base64.b64decode(response_data["som_image_base64"])
                         with open(fallback_path, "wb") as f:
                             f.write(img_data)
@@ -417,6 +433,17 @@ class OmniparserClient:
             logger.error(f"Failed to parse Omniparser response: {str(e)}")
             raise ValueError(f"Invalid response from Omniparser API: {str(e)}")
     
+    @staticmethod
+    def _record_queue_timing(headers):
+        """Record queue service timing headers (absent when talking to OmniParser directly)."""
+        cache = headers.get("X-Cache")
+        try:
+            if "X-Queue-Wait-Ms" in headers:
+                perf_spans.record("queue_wait", float(headers["X-Queue-Wait-Ms"]), cache=cache)
+                perf_spans.record("omniparser", float(headers["X-Processing-Ms"]), cache=cache)
+        except (TypeError, ValueError):
+            pass
+
     def _save_clean_json_response(self, response_data: Dict, image_path: str):
         """Save JSON response without base64 image data for debugging."""
         clean_response = response_data.copy()
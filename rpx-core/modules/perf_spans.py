@@ -0,0 +1,232 @@
+"""
+Per-step latency spans for automation runs.
+
+SimpleAutomation activates a PerfRecorder for the duration of a run. Code on
+the same thread (NetworkManager, OmniparserClient) records timed spans with
+span()/record() without needing a reference to it; when no recorder is
+active these calls are no-ops.
+
+Spans are tagged with the game and the current step and written to
+perf_spans.jsonl in the iteration directory. The mergeable summary, a
+histogram per game / step / span name, goes to perf_summary.json. The
+backend serves both per run and rolls summaries up across runs.
+
+Span names:
+    step          whole step, focus to completion
+    snapshot      combined game check, focus and capture before the step (one SUT call)
+    focus         window focus before the step (older SUT clients)
+    capture       screenshot capture, including transfer and save
+    transfer      HTTP transfer of the screenshot from the SUT
+    preview_transfer  HTTP transfer of a downscaled frame (settle detection)
+    encode        base64 encoding of the screenshot
+    parse         UI detection as seen by SimpleAutomation (all attempts)
+    parse_request one HTTP round trip to OmniParser / the queue service
+    queue_wait    time queued in the queue service (from response headers)
+    omniparser    OmniParser processing in the queue service (from response headers)
+    match         element matching
+    action        action dispatch to the SUT
+    action_batch  HTTP round trip of an input batch (SUT executes the inputs with their timing)
+    delay         post-action delay / settle wait
+"""
+
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SPANS_FILENAME = "perf_spans.jsonl"
+SUMMARY_FILENAME = "perf_summary.json"
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+BUCKET_BOUNDS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+_active: contextvars.ContextVar[Optional["PerfRecorder"]] = contextvars.ContextVar(
+    "perf_recorder", default=None
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram that can be merged across runs."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def add(self, duration_ms: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = duration_ms if self.min_ms is None else min(self.min_ms, duration_ms)
+        self.max_ms = duration_ms if self.max_ms is None else max(self.max_ms, duration_ms)
+
+    def merge(self, other: "Histogram"):
+        if len(other.counts) != len(self.counts):
+            return
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        if other.min_ms is not None:
+            self.min_ms = other.min_ms if self.min_ms is None else min(self.min_ms, other.min_ms)
+        if other.max_ms is not None:
+            self.max_ms = other.max_ms if self.max_ms is None else max(self.max_ms, other.max_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Approximate percentile (upper bound of the bucket it falls in, capped at max)."""
+        if not self.count:
+            return None
+        target = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                bound = BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "min_ms": round(self.min_ms, 1) if self.min_ms is not None else None,
+            "max_ms": round(self.max_ms, 1) if self.max_ms is not None else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets": self.counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        hist = cls()
+        hist.counts = list(data.get("buckets", hist.counts))
+        hist.count = data.get("count", 0)
+        hist.total_ms = data.get("total_ms", 0.0)
+        hist.min_ms = data.get("min_ms")
+        hist.max_ms = data.get("max_ms")
+        return hist
+
+
+def build_summary(spans: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate spans into {game: {step: {span_name: histogram}}}."""
+    games: Dict[str, Dict[str, Dict[str, Histogram]]] = {}
+    for span in spans:
+        step = str(span.get("step")) if span.get("step") is not None else "run"
+        steps = games.setdefault(span.get("game") or "unknown", {})
+        hist = steps.setdefault(step, {}).setdefault(span["name"], Histogram())
+        hist.add(span["duration_ms"])
+    return summary_to_dict(games)
+
+
+def summary_to_dict(games: Dict[str, Dict[str, Dict[str, Histogram]]]) -> Dict[str, Any]:
+    return {
+        "bucket_bounds_ms": BUCKET_BOUNDS_MS,
+        "games": {
+            game: {step: {name: h.to_dict() for name, h in names.items()}
+                   for step, names in steps.items()}
+            for game, steps in games.items()
+        },
+    }
+
+
+def merge_summaries(summaries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge several perf_summary.json documents into one."""
+    games: Dict[str, Dict[str, Dict[str, Histogram]]] = {}
+    for summary in summaries:
+        if summary.get("bucket_bounds_ms") != BUCKET_BOUNDS_MS:
+            continue
+        for game, steps in summary.get("games", {}).items():
+            for step, names in steps.items():
+                target = games.setdefault(game, {}).setdefault(step, {})
+                for name, data in names.items():
+                    target.setdefault(name, Histogram()).merge(Histogram.from_dict(data))
+    return summary_to_dict(games)
+
+
+class PerfRecorder:
+    """Collects spans for one automation run (iteration)."""
+
+    def __init__(self, game: str, run_id: str = None):
+        self.game = game
+        self.run_id = run_id
+        self.step: Optional[int] = None
+        self._lock = threading.Lock()
+        self._spans: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def activate(self):
+        """Make this the recorder for span()/record() calls on this thread."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def add(self, name: str, duration_ms: float, **tags):
+        span = {
+            "name": name,
+            "duration_ms": round(duration_ms, 2),
+            "ts": time.time(),
+            "game": self.game,
+            "step": self.step,
+        }
+        span.update(tags)
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    def save(self, run_dir: str):
+        """Write raw spans and the histogram summary to run_dir."""
+        spans = self.spans()
+        if not spans:
+            return
+        try:
+            os.makedirs(run_dir, exist_ok=True)
+            with open(os.path.join(run_dir, SPANS_FILENAME), "w", encoding="utf-8") as f:
+                for span in spans:
+                    f.write(json.dumps(span) + "\n")
+            summary = build_summary(spans)
+            summary["run_id"] = self.run_id
+            with open(os.path.join(run_dir, SUMMARY_FILENAME), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+            logger.info(f"Saved {len(spans)} perf spans to {run_dir}")
+        except OSError as e:
+            logger.warning(f"Failed to save perf spans: {e}")
+
+
+def get_recorder() -> Optional[PerfRecorder]:
+    """The recorder active on this thread, if any."""
+    return _active.get()
+
+
+def record(name: str, duration_ms: float, **tags):
+    """Record an already-measured span on the active recorder."""
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.add(name, duration_ms, **tags)
+
+
+@contextmanager
+def span(name: str, **tags):
+    """Time the enclosed block as a span on the active recorder."""
+    recorder = _active.get()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, (time.perf_counter() - start) * 1000, **tags)
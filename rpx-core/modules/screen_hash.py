@@ -0,0 +1,192 @@
+"""
+Perceptual-hash screen recognition for SimpleAutomation.
+
+Game menus look the same every time they are visited, so parsing them with
+OmniParser on every step and retry is mostly redundant. Each parsed screenshot
+is reduced to a difference hash (dHash); when a later screenshot of the same
+game at the same resolution hashes within a Hamming distance of 0-1 bits of a
+stored one (and was parsed with the same OCR config), its bounding boxes are reused.
+
+Stores are shared per process, keyed by game + resolution, and persisted as
+JSON in the run directory next to successful_ocr_configs.yaml.
+"""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from modules.vision_client import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_SIZE = 16      # 16x16 = 256-bit hash
+# Max differing bits to treat two screens as identical. One added label on a 1080p
+# menu moves the hash by ~3 bits, so anything looser reuses a changed screen's boxes.
+DEFAULT_MAX_DISTANCE = 1
+MAX_ENTRIES_PER_SCREEN_SET = 500
+
+
+def dhash(image_path: str, hash_size: int = DEFAULT_HASH_SIZE) -> Tuple[int, Tuple[int, int]]:
+    """Compute the difference hash of an image.
+
+    Returns:
+        Tuple of (hash as int, (width, height) of the original image)
+    """
+    with Image.open(image_path) as img:
+        size = img.size
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value, size
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+def ocr_config_key(ocr_config: Optional[Dict[str, Any]]) -> str:
+    """Stable key for an OCR config (same config -> same boxes)."""
+    return json.dumps(ocr_config or {}, sort_keys=True, default=str)
+
+
+class ScreenHashStore:
+    """Known screens of one game at one resolution."""
+
+    def __init__(self, hash_size: int = DEFAULT_HASH_SIZE):
+        self.hash_size = hash_size
+        self._lock = threading.Lock()
+        # Each entry: {'hash': int, 'ocr': str, 'boxes': [dict, ...], 'label': str}
+        self._entries: List[Dict[str, Any]] = []
+
+    def lookup(self, screen_hash: int, ocr_key: str, max_distance: int) -> Tuple[Optional[List[BoundingBox]], Optional[int]]:
+        """Find the closest stored screen parsed with the same OCR config.
+
+        Returns:
+            (bounding boxes, distance) if within max_distance, else (None, closest distance or None)
+        """
+        best = None
+        best_distance = None
+        with self._lock:
+            for entry in self._entries:
+                if entry['ocr'] != ocr_key:
+                    continue
+                distance = hamming(screen_hash, entry['hash'])
+                if best_distance is None or distance < best_distance:
+                    best, best_distance = entry, distance
+                    if distance == 0:
+                        break
+        if best is None or best_distance > max_distance:
+            return None, best_distance
+        return [BoundingBox(**b) for b in best['boxes']], best_distance
+
+    def add(self, screen_hash: int, ocr_key: str, boxes: List[BoundingBox], label: str = ""):
+        """Remember the parse result of a screen."""
+        entry = {
+            'hash': screen_hash,
+            'ocr': ocr_key,
+            'boxes': [asdict(b) for b in boxes],
+            'label': label,
+        }
+        with self._lock:
+            # Replace an exact duplicate rather than growing the list
+            self._entries = [e for e in self._entries
+                             if not (e['hash'] == screen_hash and e['ocr'] == ocr_key)]
+            self._entries.append(entry)
+            if len(self._entries) > MAX_ENTRIES_PER_SCREEN_SET:
+                self._entries = self._entries[-MAX_ENTRIES_PER_SCREEN_SET:]
+
+    def discard(self, screen_hash: int, ocr_key: str, max_distance: int) -> int:
+        """Forget the stored screens a lookup would match (e.g. their boxes proved stale).
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            before = len(self._entries)
+            self._entries = [e for e in self._entries
+                             if not (e['ocr'] == ocr_key and hamming(screen_hash, e['hash']) <= max_distance)]
+            return before - len(self._entries)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hash_size': self.hash_size,
+                'entries': [dict(e, hash=format(e['hash'], 'x')) for e in self._entries],
+            }
+
+    def load_dict(self, data: Dict[str, Any]):
+        """Merge entries from a persisted store (ignored if hash size differs)."""
+        if data.get('hash_size') != self.hash_size:
+            return
+        for entry in data.get('entries', []):
+            try:
+                self.add(int(entry['hash'], 16), entry['ocr'],
+                         [BoundingBox(**b) for b in entry['boxes']], entry.get('label', ''))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+
+# Process-wide stores so consecutive iterations of a run share known screens
+_stores: Dict[str, ScreenHashStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(game_name: str, resolution: Tuple[int, int], hash_size: int = DEFAULT_HASH_SIZE) -> ScreenHashStore:
+    """Get the shared store for a game at a resolution."""
+    key = f"{game_name}@{resolution[0]}x{resolution[1]}"
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ScreenHashStore(hash_size)
+        return store
+
+
+def load_stores(path: str, hash_size: int = DEFAULT_HASH_SIZE):
+    """Merge a persisted screen_hashes.json into the shared stores."""
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to load screen hashes from {path}: {e}")
+        return
+    for key, store_data in data.items():
+        game_name, _, res = key.rpartition('@')
+        try:
+            width, height = (int(v) for v in res.split('x'))
+        except ValueError:
+            continue
+        get_store(game_name, (width, height), hash_size).load_dict(store_data)
+
+
+def save_stores(path: str, game_name: str):
+    """Persist the shared stores of one game to screen_hashes.json."""
+    prefix = f"{game_name}@"
+    with _stores_lock:
+        data = {key: store.to_dict() for key, store in _stores.items()
+                if key.startswith(prefix) and len(store)}
+    if not data:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        logger.info(f"Saved screen hashes to {path}")
+    except OSError as e:
+        logger.warning(f"Failed to save screen hashes: {e}")
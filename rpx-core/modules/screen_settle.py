@@ -0,0 +1,109 @@
+"""
+Screen-settle detection for SimpleAutomation waits.
+
+Workflows use fixed sleeps (expected_delay after an action, retry_delay between
+retries, wait actions) sized for the slowest case. ScreenSettleWaiter instead
+polls small, downscaled frames from the SUT's /screenshot endpoint and returns
+as soon as consecutive frames stop changing, using the configured delay only as
+an upper bound.
+"""
+
+import io
+import logging
+import time
+from dataclasses import dataclass
+
+from PIL import Image, ImageChops, ImageStat
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 2.0      # Mean absolute pixel difference (0-255) treated as "no change"
+DEFAULT_INTERVAL = 0.25      # Seconds between polled frames
+DEFAULT_MIN_WAIT = 0.3       # Always wait at least this long (lets the action start changing the UI)
+DEFAULT_STABLE_FRAMES = 2    # Consecutive unchanged comparisons required
+DEFAULT_SCALE = 0.1          # Frame downscale requested from the SUT
+COMPARE_SIZE = (96, 54)      # Frames are compared at this size regardless of what the SUT returns
+
+
+@dataclass
+class SettleResult:
+    """Outcome of a settle wait."""
+    settled: bool
+    waited: float
+    frames: int
+
+
+def frame_difference(a: Image.Image, b: Image.Image) -> float:
+    """Mean absolute difference between two same-size grayscale frames (0-255)."""
+    return ImageStat.Stat(ImageChops.difference(a, b)).mean[0]
+
+
+class ScreenSettleWaiter:
+    """Waits until the SUT screen stops changing, bounded by a maximum wait."""
+
+    def __init__(
+        self,
+        network,
+        threshold: float = DEFAULT_THRESHOLD,
+        interval: float = DEFAULT_INTERVAL,
+        min_wait: float = DEFAULT_MIN_WAIT,
+        stable_frames: int = DEFAULT_STABLE_FRAMES,
+        scale: float = DEFAULT_SCALE,
+        stop_event=None,
+    ):
+        self.network = network
+        self.threshold = threshold
+        self.interval = interval
+        self.min_wait = min_wait
+        self.stable_frames = stable_frames
+        self.scale = scale
+        self.stop_event = stop_event
+
+    def _grab(self) -> Image.Image:
+        data = self.network.get_screenshot(scale=self.scale)
+        with Image.open(io.BytesIO(data)) as img:
+            return img.convert("L").resize(COMPARE_SIZE, Image.Resampling.BILINEAR)
+
+    def _sleep(self, seconds: float) -> bool:
+        """Sleep unless stopped. Returns False if the stop event fired."""
+        if seconds <= 0:
+            return not (self.stop_event and self.stop_event.is_set())
+        if self.stop_event:
+            return not self.stop_event.wait(seconds)
+        time.sleep(seconds)
+        return True
+
+    def wait(self, max_wait: float) -> SettleResult:
+        """Block until the screen settles or max_wait elapses.
+
+        Falls back to sleeping out the remainder of max_wait if frames can't be
+        fetched, so behaviour is never worse than a fixed sleep.
+        """
+        start = time.monotonic()
+        deadline = start + max_wait
+        frames = 0
+
+        if not self._sleep(min(self.min_wait, max_wait)):
+            return SettleResult(False, time.monotonic() - start, frames)
+
+        try:
+            previous = self._grab()
+            frames += 1
+            stable = 0
+            while time.monotonic() < deadline:
+                if not self._sleep(min(self.interval, deadline - time.monotonic())):
+                    break
+                current = self._grab()
+                frames += 1
+                if frame_difference(previous, current) <= self.threshold:
+                    stable += 1
+                    if stable >= self.stable_frames:
+                        return SettleResult(True, time.monotonic() - start, frames)
+                else:
+                    stable = 0
+                previous = current
+        except Exception as e:
+            logger.debug(f"Settle detection unavailable, sleeping out the delay: {e}")
+            self._sleep(deadline - time.monotonic())
+
+        return SettleResult(False, time.monotonic() - start, frames)
@@ -11,6 +11,13 @@ from modules.network import NetworkManager
 
 logger = logging.getLogger(__name__)
 
+# File extension for each SUT screenshot encoding
+FORMAT_EXTENSIONS = {
+    "png": ".png",
+    "jpeg": ".jpg",
+    "webp": ".webp",
+}
+
 class ScreenshotManager:
     """Manages screenshot operations."""
     
@@ -24,14 +31,31 @@ class ScreenshotManager:
         self.network_manager = network_manager
         logger.info("ScreenshotManager initialized")
     
-    def capture(self, output_path: str, process_name: str = None) -> bool:
+    def screenshot_path(self, base_path: str, profile: str = "archival") -> str:
+        """
+        Path for a screenshot taken with the given profile.
+
+        Args:
+            base_path: Path without extension (e.g. .../screenshots/screenshot_3)
+            profile: NetworkManager.SCREENSHOT_PROFILES key
+
+        Returns:
+            base_path with the extension of the profile's encoding
+        """
+        encoding = self.network_manager.SCREENSHOT_PROFILES[profile]["format"]
+        return base_path + FORMAT_EXTENSIONS[encoding]
+
+    def capture(self, output_path: str, process_name: str = None, profile: str = "archival") -> bool:
         """
         Capture a screenshot from the SUT and save it to the specified path.
 
         Args:
-            output_path: Path where the screenshot should be saved
+            output_path: Path where the screenshot should be saved (see screenshot_path
+                         for one matching the profile's encoding)
             process_name: Optional process name to focus before capture (e.g., 'RDR2.exe').
                          Ensures the game window is in foreground for valid screenshots.
+            profile: Encoding profile - archival (lossless PNG) where exact pixels matter,
+                     parse (compact JPEG) for screenshots fed to OmniParser
 
         Returns:
             True if the screenshot was successfully captured and saved
@@ -40,23 +64,31 @@ class ScreenshotManager:
             IOError: If there's an error saving the screenshot
         """
         try:
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
             # Get screenshot from the SUT (with optional window focus)
-            screenshot_data = self.network_manager.get_screenshot(process_name=process_name)
-
-            # Save the screenshot
-            with open(output_path, 'wb') as f:
-                f.write(screenshot_data)
-
-            logger.info(f"Screenshot saved to {output_path}")
-            return True
+            screenshot_data = self.network_manager.get_screenshot(process_name=process_name, profile=profile)
+            return self.save(output_path, screenshot_data)
 
         except Exception as e:
             logger.error(f"Failed to capture or save screenshot: {str(e)}")
             raise IOError(f"Screenshot capture failed: {str(e)}")
     
+    def save(self, output_path: str, screenshot_data: bytes) -> bool:
+        """
+        Save screenshot bytes already fetched from the SUT (e.g. by NetworkManager.get_step_snapshot).
+
+        Args:
+            output_path: Path where the screenshot should be saved
+            screenshot_data: Encoded image
+
+        Returns:
+            True once saved
+        """
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(screenshot_data)
+        logger.info(f"Screenshot saved to {output_path}")
+        return True
+
     def capture_region(self, output_path: str, x: int, y: int, width: int, height: int) -> bool:
         """
         Capture a specific region of the screen from the SUT.
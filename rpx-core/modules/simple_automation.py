@@ -5,13 +5,18 @@ Includes hooks, sideload, and tracing support for SOCWatch/PTAT.
 """
 
 import os
+import copy
 import time
 import logging
 import yaml
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 
 from modules.vision_client import BoundingBox
+from modules import input_batch, perf_spans, screen_hash
+from modules import screen_settle
+from modules.screen_settle import ScreenSettleWaiter
+from modules.step_pipeline import SpeculativeParser, DEFAULT_MATCH_DISTANCE, DEFAULT_SETTLE_INTERVAL, worker_client
 from modules.tracing_config import get_tracing_config, get_tracing_agents_dict
 
 logger = logging.getLogger(__name__)
@@ -95,6 +100,13 @@ class SimpleAutomation:
         # Retry configuration
         self.retry_delay = self.config.get("metadata", {}).get("retry_delay", 2.0)
 
+        # Encoding of screenshots sent to OmniParser (metadata.screenshot_profile);
+        # "archival" keeps lossless PNGs for games where JPEG hurts detection
+        self.screenshot_profile = self.config.get("metadata", {}).get("screenshot_profile", "parse")
+        if self.screenshot_profile not in self.network.SCREENSHOT_PROFILES:
+            logger.warning(f"Unknown screenshot_profile '{self.screenshot_profile}', using 'parse'")
+            self.screenshot_profile = "parse"
+
         # OCR configuration (game-level defaults)
         self.ocr_config = self.config.get("metadata", {}).get("ocr_config", {})
         if self.ocr_config:
@@ -103,6 +115,67 @@ class SimpleAutomation:
         # Track successful OCR configs per step for learning
         self.successful_ocr_configs = {}
 
+        # Perceptual-hash screen recognition: reuse bounding boxes of screens
+        # already parsed for this game (metadata.screen_hash: {enabled, max_distance}).
+        # Off unless a game opts in: a small UI change can stay within max_distance.
+        screen_hash_config = self.config.get("metadata", {}).get("screen_hash", {})
+        if not isinstance(screen_hash_config, dict):
+            screen_hash_config = {"enabled": bool(screen_hash_config)}
+        self.screen_hash_enabled = screen_hash_config.get("enabled", False)
+        self.screen_hash_max_distance = screen_hash_config.get("max_distance", screen_hash.DEFAULT_MAX_DISTANCE)
+        self.screen_hash_stats = {"hits": 0, "misses": 0}
+        self._pending_screen = None  # (store, hash, ocr_key) of the last unmatched screenshot
+        self._matched_screen = None  # (store, hash, ocr_key) of the last matched screenshot
+
+        # Pipelined execution (metadata.pipeline: {enabled, settle_interval, max_distance}):
+        # the next step's screenshot is captured and parsed during the current step's delay
+        pipeline_config = self.config.get("metadata", {}).get("pipeline", {})
+        if not isinstance(pipeline_config, dict):
+            pipeline_config = {"enabled": bool(pipeline_config)}
+        self.speculative_parser = None
+        self._speculation_target = None  # (step_num, step) to speculate on after the current action
+        self.pipeline_parse_timeout = pipeline_config.get("parse_timeout", 30)
+        if pipeline_config.get("enabled", False):
+            # The worker polls and parses while the main thread does the same:
+            # give it its own SUT and vision clients rather than sharing sessions
+            speculative_screens = copy.copy(self.screenshot_mgr)
+            speculative_screens.network_manager = worker_client(self.screenshot_mgr.network_manager)
+            speculative_vision = worker_client(self.vision_model)
+            self.speculative_parser = SpeculativeParser(
+                capture=lambda path: speculative_screens.capture(path, profile=self.screenshot_profile),
+                detect=lambda path, step, ocr_config: self._parse_screen(speculative_vision, path, step, ocr_config),
+                settle_interval=pipeline_config.get("settle_interval", DEFAULT_SETTLE_INTERVAL),
+                max_distance=pipeline_config.get("max_distance", DEFAULT_MATCH_DISTANCE),
+            )
+            logger.info("Pipelined step execution enabled")
+
+        # Screen-settle waits (metadata.screen_settle: {enabled, threshold, interval, min_wait,
+        # stable_frames, scale}): expected_delay, retry_delay and wait actions become upper
+        # bounds and end as soon as the SUT screen stops changing
+        settle_config = self.config.get("metadata", {}).get("screen_settle", {})
+        if not isinstance(settle_config, dict):
+            settle_config = {"enabled": bool(settle_config)}
+        self.settle_waiter = None
+        self._current_step_num = None
+        if settle_config.get("enabled", False):
+            self.settle_waiter = ScreenSettleWaiter(
+                network,
+                threshold=settle_config.get("threshold", screen_settle.DEFAULT_THRESHOLD),
+                interval=settle_config.get("interval", screen_settle.DEFAULT_INTERVAL),
+                min_wait=settle_config.get("min_wait", screen_settle.DEFAULT_MIN_WAIT),
+                stable_frames=settle_config.get("stable_frames", screen_settle.DEFAULT_STABLE_FRAMES),
+                scale=settle_config.get("scale", screen_settle.DEFAULT_SCALE),
+                stop_event=stop_event,
+            )
+            logger.info("Screen-settle waits enabled")
+
+        # Input batching (metadata.batch_actions): sequences, typed text and runs of
+        # action-only steps go to the SUT as one /action_batch and keep their timing there.
+        # Off unless a game opts in, like the other step-engine changes
+        self.batch_actions = self.config.get("metadata", {}).get("batch_actions", False)
+        if self.batch_actions:
+            logger.info("Input batching enabled")
+
         # Enable fallback OCR attempts
         self.use_ocr_fallback = self.config.get("metadata", {}).get("use_ocr_fallback", True)
         
@@ -132,6 +205,9 @@ class SimpleAutomation:
         # Run ID for trace output organization (use passed run_id or generate one)
         self.run_id = run_id or self.config.get("metadata", {}).get("run_id") or datetime.now().strftime("%Y%m%d_%H%M%S")
 
+        # Per-step latency spans (saved to run_dir at the end of run())
+        self.perf = perf_spans.PerfRecorder(self.game_name, self.run_id)
+
         if self._disable_tracing_override:
             logger.info("Tracing disabled via run configuration")
         elif self._tracing_agents_override is not None:
@@ -145,6 +221,9 @@ class SimpleAutomation:
 
         # Path to save successful OCR configs
         self.ocr_config_cache_path = os.path.join(self.run_dir, "successful_ocr_configs.yaml")
+        self.screen_hash_path = os.path.join(self.run_dir, "screen_hashes.json")
+        if self.screen_hash_enabled:
+            screen_hash.load_stores(self.screen_hash_path)
 
         # Log SUT resolution for debugging
         try:
@@ -198,6 +277,50 @@ class SimpleAutomation:
             # Assume game is still running if we can't check
             return True
 
+    def _step_snapshot(self, screenshot_path: Optional[str]) -> Tuple[bool, bool]:
+        """Check the game, focus its window and capture the screen before a step.
+
+        Uses the SUT's combined /step_snapshot (NetworkManager falls back to the
+        separate calls on older SUT clients). Game checks follow _is_game_running:
+        the tracked game normally, a direct process check in debug mode, and no
+        check at all without a process_id.
+
+        Args:
+            screenshot_path: Where to save the screenshot, or None to skip capture
+
+        Returns:
+            (game running, screenshot saved to screenshot_path)
+        """
+        is_debug_mode = self.start_step is not None and self.start_step > 1
+        try:
+            snapshot = self.network.get_step_snapshot(
+                process_name=self.process_id,
+                check_process=is_debug_mode,
+                require_running=bool(self.process_id),
+                focus_process=self.process_name,
+                capture=screenshot_path is not None,
+                profile=self.screenshot_profile,
+            )
+        except Exception as e:
+            logger.warning(f"Step snapshot failed: {e}")
+            return True, False
+
+        running = snapshot["running"] or not self.process_id
+        if not running:
+            logger.warning(f"Game process '{self.process_id}' is no longer running on SUT")
+        elif snapshot["focused"] is False:
+            logger.warning("Could not focus game window")
+
+        if screenshot_path and snapshot["screenshot"] is not None:
+            try:
+                self.screenshot_mgr.save(screenshot_path, snapshot["screenshot"])
+                return running, True
+            except OSError as e:
+                logger.warning(f"Could not save step screenshot: {e}")
+        elif screenshot_path and running and snapshot["screenshot_error"]:
+            logger.warning(f"Step snapshot had no screenshot: {snapshot['screenshot_error']}")
+        return running, False
+
     def _save_successful_ocr_configs(self):
         """Save successful OCR configs to file for future reference."""
         if self.successful_ocr_configs:
@@ -209,6 +332,129 @@ class SimpleAutomation:
             except Exception as e:
                 logger.warning(f"Failed to save OCR configs: {e}")
 
+    def _effective_ocr_config(self, step: Dict[str, Any], step_num: int) -> Dict[str, Any]:
+        """Game-level OCR config overridden by the step's and by any learned config."""
+        # Get step-level OCR config (overrides game-level)
+        step_ocr_config = step.get("ocr_config", {})
+        effective_ocr_config = {**self.ocr_config, **step_ocr_config}
+
+        # Check if we have a cached successful config for this step
+        step_key_for_cache = f"{self.game_name}_step_{step_num}"
+        if step_key_for_cache in self.successful_ocr_configs:
+            cached_config = self.successful_ocr_configs[step_key_for_cache]
+            logger.info(f"Using cached OCR config for step {step_num}: {cached_config}")
+            effective_ocr_config.update(cached_config)
+        return effective_ocr_config
+
+    def _detect_elements(self, screenshot_path: str, step: Dict[str, Any], step_num: int) -> List[BoundingBox]:
+        """Parse a screenshot for a step, with OCR config fallback when enabled."""
+        bounding_boxes, successful_config = self._parse_screen(
+            self.vision_model, screenshot_path, step, self._effective_ocr_config(step, step_num)
+        )
+        self._learn_ocr_config(step_num, successful_config)
+        return bounding_boxes
+
+    def _learn_ocr_config(self, step_num: int, successful_config: Optional[Dict[str, Any]]):
+        """Cache an OCR config that found a step's target (main thread only)."""
+        if successful_config:
+            step_key_for_cache = f"{self.game_name}_step_{step_num}"
+            self.successful_ocr_configs[step_key_for_cache] = successful_config
+            logger.info(f"Cached successful OCR config for step {step_num}: {successful_config}")
+
+    def _parse_screen(self, vision_model, screenshot_path: str, step: Dict[str, Any],
+                      effective_ocr_config: Dict[str, Any]) -> Tuple[List[BoundingBox], Optional[Dict[str, Any]]]:
+        """Parse a screenshot with the given client; touches no SimpleAutomation state.
+
+        Returns:
+            (bounding boxes, OCR config the fallback succeeded with, or None)
+        """
+        # Get target text for fallback matching
+        target_text = step.get("find", {}).get("text", "")
+        if isinstance(target_text, list):
+            target_text = target_text[0] if target_text else ""
+        # YAML parses unquoted Yes/No/On/Off as booleans - coerce to string
+        if not isinstance(target_text, str):
+            target_text = str(target_text)
+
+        # Try with fallback if enabled and we have a target
+        if self.use_ocr_fallback and target_text and hasattr(vision_model, 'detect_ui_elements_with_fallback'):
+            return vision_model.detect_ui_elements_with_fallback(
+                screenshot_path,
+                target_text,
+                ocr_config=effective_ocr_config if effective_ocr_config else None
+            )
+
+        # Standard detection without fallback
+        return vision_model.detect_ui_elements(
+            screenshot_path,
+            ocr_config=effective_ocr_config if effective_ocr_config else None
+        ), None
+
+    def _start_speculation(self, expected_delay: float):
+        """Pipelined mode: start parsing the next step's screen during the post-action delay."""
+        if not self.speculative_parser or not self._speculation_target or expected_delay <= 0:
+            return
+        next_num, next_step = self._speculation_target
+        self._speculation_target = None
+        path = self.screenshot_mgr.screenshot_path(
+            f"{self.run_dir}/screenshots/speculative_{next_num}", self.screenshot_profile
+        )
+        # Keep polling until the next step would start, plus time for its focus/optional checks
+        self.speculative_parser.start(next_num, next_step, path, max_wait=expected_delay + 2.0,
+                                      ocr_config=self._effective_ocr_config(next_step, next_num))
+
+    def _match_known_screen(self, screenshot_path: str, ocr_config: Dict[str, Any], step_num: int,
+                            retry: bool = False) -> Optional[List[BoundingBox]]:
+        """Return stored bounding boxes if this screenshot matches an already parsed screen.
+
+        On a miss the screen is remembered as pending so _remember_screen() can
+        store its parse result. On a retry the store is not consulted, so the
+        screen is always parsed afresh and the new result replaces the old one.
+        """
+        self._pending_screen = None
+        self._matched_screen = None
+        if not self.screen_hash_enabled:
+            return None
+        try:
+            value, resolution = screen_hash.dhash(screenshot_path)
+        except Exception as e:
+            logger.debug(f"Screen hash failed: {e}")
+            return None
+
+        store = screen_hash.get_store(self.game_name, resolution)
+        ocr_key = screen_hash.ocr_config_key(ocr_config)
+        if retry:
+            self._pending_screen = (store, value, ocr_key)
+            return None
+        boxes, distance = store.lookup(value, ocr_key, self.screen_hash_max_distance)
+        hit = boxes is not None
+        if hit:
+            self.screen_hash_stats["hits"] += 1
+            self._matched_screen = (store, value, ocr_key)
+            logger.info(f"Screen matches a known screen (distance {distance}), reusing {len(boxes)} elements")
+        else:
+            self.screen_hash_stats["misses"] += 1
+            self._pending_screen = (store, value, ocr_key)
+
+        if self.progress_callback and hasattr(self.progress_callback, 'on_screen_match'):
+            self.progress_callback.on_screen_match(step_num, hit, distance)
+        return boxes
+
+    def _remember_screen(self, bounding_boxes: List[BoundingBox], step_num: int):
+        """Store the parse result of the last unmatched screenshot."""
+        if self._pending_screen and bounding_boxes:
+            store, value, ocr_key = self._pending_screen
+            store.add(value, ocr_key, bounding_boxes, label=f"step_{step_num}")
+        self._pending_screen = None
+
+    def _forget_matched_screen(self, step_num: int):
+        """Drop the stored screen whose boxes the failed step was given."""
+        if self._matched_screen:
+            store, value, ocr_key = self._matched_screen
+            removed = store.discard(value, ocr_key, self.screen_hash_max_distance)
+            logger.info(f"Step {step_num} failed on a known screen, forgot {removed} stored parse(s)")
+        self._matched_screen = None
+
     # =========================================================================
     # TRACING SUPPORT (SOCWatch, PTAT)
     # =========================================================================
@@ -689,6 +935,15 @@ class SimpleAutomation:
             logger.info("Waiting 5s for file system sync...")
             time.sleep(5)
 
+    def _is_benchmark_wait(self, action_config: Dict) -> bool:
+        """A wait action of 30s or more is the measured benchmark run."""
+        if not isinstance(action_config, dict):
+            return False
+
+        action_type = action_config.get("type", "").lower()
+        duration = action_config.get("duration", 0)
+        return action_type == "wait" and duration >= 30
+
     def _is_benchmark_step(self, action_config: Dict, step: Dict) -> bool:
         """
         Determine if a step is a benchmark step that should have tracing.
@@ -698,13 +953,7 @@ class SimpleAutomation:
         - action.duration >= 30 seconds AND
         - (step has tracing config OR game-level tracing is enabled)
         """
-        if not isinstance(action_config, dict):
-            return False
-
-        action_type = action_config.get("type", "").lower()
-        duration = action_config.get("duration", 0)
-
-        if action_type != "wait" or duration < 30:
+        if not self._is_benchmark_wait(action_config):
             return False
 
         # Check for step-level tracing config
@@ -950,7 +1199,20 @@ class SimpleAutomation:
         time.sleep(fallback.get("expected_delay", 1))
             
     def run(self):
-        """Run the enhanced step-by-step automation with optional step handling."""
+        """Run the enhanced step-by-step automation with optional step handling.
+
+        Step latency spans are recorded for the whole run and saved to the run
+        directory (perf_spans.jsonl / perf_summary.json) when it ends.
+        """
+        with self.perf.activate():
+            try:
+                return self._run_steps()
+            finally:
+                self.perf.step = None
+                self.perf.save(self.run_dir)
+
+    def _run_steps(self):
+        """Execute the configured step range (see run())."""
         # Get steps from configuration
         steps = self.config.get("steps", {})
 
@@ -1013,6 +1275,7 @@ class SimpleAutomation:
         current_step = actual_start
         max_retries = 3
         retries = 0
+        batch_failed_at = None  # Step whose input batch failed - rerun it on its own
 
         while current_step <= actual_end:
             step_key = str(current_step)
@@ -1023,6 +1286,9 @@ class SimpleAutomation:
 
             step = steps[step_key]
             step_description = step.get('description', 'No description')
+            self._current_step_num = current_step
+            self.perf.step = current_step
+            step_start = time.perf_counter()
 
             # Check if this is an optional step (either field-based or description-based)
             # Method 1: Check for 'optional: true' field in YAML
@@ -1054,38 +1320,74 @@ class SimpleAutomation:
                 logger.info("Stop event detected, ending automation")
                 break
 
-            # Check if game process is still running (fail fast on game closure)
-            if not self._is_game_running():
+            # Check if this step requires UI parsing (has a 'find' section)
+            # Steps like wait, key press without target element don't need parsing
+            needs_parsing = "find" in step
+            screenshot_path = None
+            if needs_parsing:
+                # Include retry suffix to preserve all attempts for debugging
+                retry_suffix = f"_retry{retries}" if retries > 0 else ""
+                screenshot_path = self.screenshot_mgr.screenshot_path(
+                    f"{self.run_dir}/screenshots/screenshot_{current_step}{retry_suffix}", self.screenshot_profile
+                )
+            elif self.optional_steps:
+                screenshot_path = self.screenshot_mgr.screenshot_path(
+                    f"{self.run_dir}/screenshots/optional_check", self.screenshot_profile
+                )
+
+            # Check the game is still running (fail fast on game closure), focus its window
+            # to prevent focus loss and capture the screen - one round trip to the SUT
+            game_running, snapshot_saved = self._step_snapshot(screenshot_path)
+            if not game_running:
                 logger.error(f"Game process is no longer running, failing automation")
                 if self.progress_callback and hasattr(self.progress_callback, 'on_step_complete'):
                     self.progress_callback.on_step_complete(current_step, success=False, error_message="Game process terminated")
                 return False
 
-            # Focus game window before each step to prevent focus loss
-            try:
-                self.network.focus_game(process_name=self.process_name)
-                time.sleep(0.2)  # Brief delay after focusing
-            except Exception as e:
-                logger.warning(f"Could not focus game window: {e}")
-
             # Handle optional steps (popups, interruptions)
-            if self._handle_optional_steps():
+            if self._handle_optional_steps(screenshot_path if snapshot_saved else None):
                 logger.info("Optional step handled, continuing with current step")
                 continue
 
-            # Check if this step requires UI parsing (has a 'find' section)
-            # Steps like wait, key press without target element don't need parsing
-            needs_parsing = "find" in step
+            # Consecutive action-only steps run on the SUT as one input batch
+            # (not while waiting for a launcher to spawn the game process)
+            if (not needs_parsing and self.batch_actions and current_step != batch_failed_at
+                    and not (self.game_process and not self._game_process_switched)):
+                batch = self._compile_step_batch(steps, current_step, actual_end)
+                if len(batch) > 1:
+                    completed, batch_error = self._run_step_batch(batch)
+                    perf_spans.record("step", (time.perf_counter() - step_start) * 1000,
+                                      success=completed == len(batch), retry=retries, batched=len(batch))
+                    for step_num, batched_step, _ in batch[:completed]:
+                        if self.progress_callback:
+                            if step_num != current_step and hasattr(self.progress_callback, 'on_step_start'):
+                                self.progress_callback.on_step_start(step_num, batched_step.get('description', 'No description'))
+                            self.progress_callback.completed_steps = step_num
+                            if hasattr(self.progress_callback, 'on_step_complete'):
+                                self.progress_callback.on_step_complete(step_num, success=True)
+                    if completed:
+                        logger.info(f">> Steps {current_step}-{current_step + completed - 1} completed successfully")
+                    if batch_error:
+                        failed_step = batch[completed][0]
+                        logger.error(f"Step {failed_step} failed: {batch_error}")
+                        if self.progress_callback and hasattr(self.progress_callback, 'on_step_complete'):
+                            self.progress_callback.on_step_complete(failed_step, success=False, error_message=batch_error)
+                        return False
+                    if completed < len(batch):
+                        batch_failed_at = batch[completed][0]
+                    current_step += completed
+                    retries = 0
+                    continue
 
             if needs_parsing:
-                # Capture screenshot (include retry suffix to preserve all attempts for debugging)
-                retry_suffix = f"_retry{retries}" if retries > 0 else ""
-                screenshot_path = f"{self.run_dir}/screenshots/screenshot_{current_step}{retry_suffix}.png"
                 try:
-                    # Skip window focus before screenshot when no_refocus is set
-                    # (prevents cursor lock in games like FC6 that use ClipCursor/raw input)
-                    screenshot_process = None if step.get("no_refocus") else self.process_id
-                    self.screenshot_mgr.capture(screenshot_path, process_name=screenshot_process)
+                    if not snapshot_saved:
+                        # Skip window focus before screenshot when no_refocus is set
+                        # (prevents cursor lock in games like FC6 that use ClipCursor/raw input)
+                        screenshot_process = None if step.get("no_refocus") else self.process_id
+                        with perf_spans.span("capture"):
+                            self.screenshot_mgr.capture(screenshot_path, process_name=screenshot_process,
+                                                        profile=self.screenshot_profile)
                 except Exception as e:
                     logger.error(f"Failed to capture screenshot: {str(e)}")
                     # Handle optional step failure - skip instead of failing automation
@@ -1113,47 +1415,36 @@ class SimpleAutomation:
                         if self.progress_callback and hasattr(self.progress_callback, 'on_step_complete'):
                             self.progress_callback.on_step_complete(current_step, success=False, error_message="Game process terminated")
                         return False
-                    time.sleep(self.retry_delay)
+                    self._settle_wait(self.retry_delay, "retry_delay", current_step)
                     continue
 
                 # Detect UI elements with OCR config
                 try:
-                    # Get step-level OCR config (overrides game-level)
-                    step_ocr_config = step.get("ocr_config", {})
-                    effective_ocr_config = {**self.ocr_config, **step_ocr_config}
-
-                    # Check if we have a cached successful config for this step
-                    step_key_for_cache = f"{self.game_name}_step_{current_step}"
-                    if step_key_for_cache in self.successful_ocr_configs:
-                        cached_config = self.successful_ocr_configs[step_key_for_cache]
-                        logger.info(f"Using cached OCR config for step {current_step}: {cached_config}")
-                        effective_ocr_config.update(cached_config)
-
-                    # Get target text for fallback matching
-                    target_text = step.get("find", {}).get("text", "")
-                    if isinstance(target_text, list):
-                        target_text = target_text[0] if target_text else ""
-                    # YAML parses unquoted Yes/No/On/Off as booleans - coerce to string
-                    if not isinstance(target_text, str):
-                        target_text = str(target_text)
-
-                    # Try with fallback if enabled and we have a target
-                    if self.use_ocr_fallback and target_text and hasattr(self.vision_model, 'detect_ui_elements_with_fallback'):
-                        bounding_boxes, successful_config = self.vision_model.detect_ui_elements_with_fallback(
-                            screenshot_path,
-                            target_text,
-                            ocr_config=effective_ocr_config if effective_ocr_config else None
+                    effective_ocr_config = self._effective_ocr_config(step, current_step)
+
+                    parse_start = time.perf_counter()
+                    parse_source = "screen_hash"
+
+                    # Reuse the parse of a visually identical screen if we have one
+                    known_boxes = self._match_known_screen(
+                        screenshot_path, effective_ocr_config, current_step, retry=retries > 0
+                    )
+                    # Pipelined mode: use the parse made during the previous step's delay
+                    if known_boxes is None and self.speculative_parser:
+                        parse_source = "speculative"
+                        speculation = self.speculative_parser.take(
+                            current_step, screenshot_path, timeout=self.pipeline_parse_timeout
                         )
-                        # Cache successful config for future runs
-                        if successful_config:
-                            self.successful_ocr_configs[step_key_for_cache] = successful_config
-                            logger.info(f"Cached successful OCR config for step {current_step}: {successful_config}")
+                        if speculation is not None:
+                            known_boxes, learned_config = speculation
+                            self._learn_ocr_config(current_step, learned_config)
+                    if known_boxes is not None:
+                        bounding_boxes = known_boxes
                     else:
-                        # Standard detection without fallback
-                        bounding_boxes = self.vision_model.detect_ui_elements(
-                            screenshot_path,
-                            ocr_config=effective_ocr_config if effective_ocr_config else None
-                        )
+                        parse_source = "omniparser"
+                        bounding_boxes = self._detect_elements(screenshot_path, step, current_step)
+                    perf_spans.record("parse", (time.perf_counter() - parse_start) * 1000, source=parse_source)
+                    self._remember_screen(bounding_boxes, current_step)
                 except Exception as e:
                     logger.error(f"Failed to detect UI elements: {str(e)}")
                     # Handle optional step failure - skip instead of failing automation
@@ -1181,7 +1472,7 @@ class SimpleAutomation:
                         if self.progress_callback and hasattr(self.progress_callback, 'on_step_complete'):
                             self.progress_callback.on_step_complete(current_step, success=False, error_message="Game process terminated")
                         return False
-                    time.sleep(self.retry_delay)
+                    self._settle_wait(self.retry_delay, "retry_delay", current_step)
                     continue
 
                 # Annotate screenshot if annotator available
@@ -1196,8 +1487,20 @@ class SimpleAutomation:
                 logger.info(f"Skipping screenshot/parsing for action-only step")
                 bounding_boxes = []
 
+            # Pipelined mode: the next step's screen can be parsed during this step's delay
+            if self.speculative_parser and current_step < actual_end:
+                next_step = steps.get(str(current_step + 1))
+                if next_step and "find" in next_step:
+                    self._speculation_target = (current_step + 1, next_step)
+
             # Process step using modular action system
             success = self._process_step_modular(step, bounding_boxes, current_step, retries)
+            self._speculation_target = None
+            if not success:
+                self._forget_matched_screen(current_step)
+            self._matched_screen = None
+            perf_spans.record("step", (time.perf_counter() - step_start) * 1000,
+                              success=success, retry=retries)
 
             if success:
                 logger.info(f">> Step {current_step} completed successfully")
@@ -1259,7 +1562,7 @@ class SimpleAutomation:
                              if self.progress_callback and hasattr(self.progress_callback, 'on_step_complete'):
                                  self.progress_callback.on_step_complete(current_step, success=False, error_message="Game process terminated")
                              return False
-                         time.sleep(self.retry_delay)
+                         self._settle_wait(self.retry_delay, "retry_delay", current_step)
 
                     self._execute_fallback()
 
@@ -1283,8 +1586,18 @@ class SimpleAutomation:
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
 
+        if self.speculative_parser:
+            self.speculative_parser.cancel()
+            stats = self.speculative_parser.stats
+            logger.info(f"Pipeline: {stats['used']}/{stats['started']} speculative parses used, "
+                        f"{stats['saved_seconds']:.1f}s saved")
+
         # Save successful OCR configs for future reference
         self._save_successful_ocr_configs()
+        if self.screen_hash_enabled:
+            screen_hash.save_stores(self.screen_hash_path, self.game_name)
+            logger.info(f"Screen hash: {self.screen_hash_stats['hits']} hits, "
+                        f"{self.screen_hash_stats['misses']} misses")
 
         return current_step > actual_end
     
@@ -1295,7 +1608,8 @@ class SimpleAutomation:
         
         # 1. FIND ELEMENT (if specified)
         if "find" in step:
-            target_element = self._find_matching_element(step["find"], bounding_boxes)
+            with perf_spans.span("match"):
+                target_element = self._find_matching_element(step["find"], bounding_boxes)
             if not target_element:
                 target_text = step["find"].get('text', 'Unknown')
                 target_type = step["find"].get('type', 'Unknown')
@@ -1344,7 +1658,8 @@ class SimpleAutomation:
         
         # 2. EXECUTE ACTION
         if "action" in step:
-            success = self._execute_modular_action(step["action"], target_element, step_num, step)
+            with perf_spans.span("action"):
+                success = self._execute_modular_action(step["action"], target_element, step_num, step)
             if not success:
                 return False
         else:
@@ -1359,9 +1674,11 @@ class SimpleAutomation:
 
         # Wait for expected delay
         expected_delay = step.get("expected_delay", 1)
+        self._start_speculation(expected_delay)
         if expected_delay > 0:
-            logger.info(f"Waiting {expected_delay} seconds after action...")
-            time.sleep(expected_delay)
+            logger.info(f"Waiting up to {expected_delay} seconds after action...")
+            with perf_spans.span("delay"):
+                self._settle_wait(expected_delay, "expected_delay", step_num, enabled=step.get("settle", True))
 
         # 4. VERIFY SUCCESS (if specified)
         if "verify_success" in step:
@@ -1508,27 +1825,7 @@ class SimpleAutomation:
                 return False
             
             # Support for special key names
-            key_mapping = {
-                "enter": "enter",
-                "return": "return",
-                "space": "space",
-                "tab": "Tab",
-                "escape": "Escape",
-                "esc": "Escape",
-                "delete": "Delete",
-                "backspace": "BackSpace",
-                "shift": "Shift_L",
-                "ctrl": "Control_L",
-                "alt": "Alt_L",
-                "win": "Super_L",
-                "f1": "F1", "f2": "F2", "f3": "F3", "f4": "F4",
-                "f5": "F5", "f6": "F6", "f7": "F7", "f8": "F8",
-                "f9": "F9", "f10": "F10", "f11": "F11", "f12": "F12",
-                "up": "Up", "down": "Down", "left": "Left", "right": "Right",
-                "home": "Home", "end": "End", "pageup": "Page_Up", "pagedown": "Page_Down"
-            }
-            
-            mapped_key = key_mapping.get(key.lower(), key)
+            mapped_key = input_batch.KEY_MAPPING.get(key.lower(), key)
 
             # Support repeat key presses with count and interval
             count = action_config.get("count", 1)
@@ -1558,6 +1855,16 @@ class SimpleAutomation:
         
         # Clear existing text if specified
         clear_first = action_config.get("clear_first", False)
+        char_delay = action_config.get("char_delay", 0.05)
+
+        # Type on the SUT in one batch so the character timing isn't subject to network jitter
+        if self.batch_actions:
+            actions = input_batch.text_actions(text, char_delay, clear_first)
+            if self._send_action_batch(actions, "text input"):
+                logger.info(f"Typed text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+                return True
+            return False
+
         if clear_first:
             try:
                 # Ctrl+A to select all, then type
@@ -1567,8 +1874,6 @@ class SimpleAutomation:
                 logger.warning(f"Failed to clear existing text: {str(e)}")
         
         # Type character by character with optional delay
-        char_delay = action_config.get("char_delay", 0.05)
-        
         try:
             for char in text:
                 if self.stop_event and self.stop_event.is_set():
@@ -1729,6 +2034,11 @@ class SimpleAutomation:
         is_benchmark = step and self._is_benchmark_step(action_config, step)
         tracing_config = step.get("tracing", {}) if step else {}
 
+        # Let background work (e.g. trace transfers) back off while measuring
+        measuring = self._is_benchmark_wait(action_config)
+        if measuring and self.progress_callback and hasattr(self.progress_callback, 'on_benchmark_active'):
+            self.progress_callback.on_benchmark_active(True)
+
         # Start tracing for benchmark steps
         if is_benchmark:
             logger.info("=========================================================")
@@ -1752,6 +2062,10 @@ class SimpleAutomation:
                 logger.info(f"Waiting up to {max_wait}s for condition: {condition}")
                 # Note: Condition checking would require additional implementation
                 self._interruptible_wait(max_wait, no_refocus=no_refocus)
+            elif self.settle_waiter and not measuring and action_config.get("settle", True):
+                # Screen-settle wait: duration is an upper bound
+                logger.info(f"Waiting up to {duration} seconds for the screen to settle")
+                self._settle_wait(duration, "wait_action", self._current_step_num)
             else:
                 # Simple wait
                 logger.info(f"Waiting for {duration} seconds")
@@ -1760,6 +2074,9 @@ class SimpleAutomation:
             return True
 
         finally:
+            if measuring and self.progress_callback and hasattr(self.progress_callback, 'on_benchmark_active'):
+                self.progress_callback.on_benchmark_active(False)
+
             # Stop tracing for benchmark steps
             if is_benchmark:
                 logger.info("Benchmark wait complete, stopping tracing agents...")
@@ -1842,7 +2159,16 @@ class SimpleAutomation:
         """Handle sequence of actions."""
         actions = action_config.get("actions", [])
         delay_between = action_config.get("delay_between", 0.5)
-        
+
+        # Plain input sequences run on the SUT in one batch, keeping their timing
+        compiled = input_batch.compile_action(action_config, target_element, allow_waits=self.settle_waiter is None) \
+            if self.batch_actions else None
+        if compiled:
+            if not self._send_action_batch(compiled, "sequence"):
+                return False
+            logger.info(f"Completed sequence of {len(actions)} actions ({len(compiled)} inputs in one batch)")
+            return True
+
         for i, action in enumerate(actions):
             logger.info(f"Executing sequence action {i+1}/{len(actions)}")
             success = self._execute_modular_action(action, target_element, 0)
@@ -1856,15 +2182,130 @@ class SimpleAutomation:
         logger.info(f"Completed sequence of {len(actions)} actions")
         return True
     
-    def _handle_optional_steps(self) -> bool:
-        """Handle optional steps (popups, interruptions)."""
+    def _send_action_batch(self, actions: List[Dict[str, Any]], description: str) -> bool:
+        """Send compiled input actions as one batch; True if all of them succeeded."""
+        try:
+            with perf_spans.span("action"):
+                result = self.network.send_action_batch(actions)
+        except Exception as e:
+            logger.error(f"Failed to send {description}: {str(e)}")
+            return False
+
+        if result.get("status") != "success":
+            failed = next((r for r in result.get("results", []) if r.get("status") == "error"), {})
+            logger.error(f"{description.capitalize()} failed at input {failed.get('index')}: {failed.get('message')}")
+            return False
+        return True
+
+    def _compile_step_batch(self, steps: Dict[str, Any], start: int, end: int) -> List[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]]:
+        """Consecutive action-only steps from start that can run on the SUT as one batch.
+
+        A step qualifies if it has no find, verify_success, sideload or tracing, is
+        not optional, and its action compiles to plain input. The expected_delay of
+        every step but the last becomes a SUT-side delay, so a step whose delay
+        must stay here (screen-settle, or longer than MAX_BATCH_DELAY) ends the batch.
+
+        Returns:
+            (step number, step, compiled actions) per step
+        """
+        allow_waits = self.settle_waiter is None
+        batch = []
+        for step_num in range(start, end + 1):
+            step = steps.get(str(step_num))
+            if (not step or "find" in step or "action" not in step or "verify_success" in step
+                    or "sideload" in step or step.get("tracing") or step.get("optional")
+                    or '[OPTIONAL]' in step.get("description", "").upper()):
+                break
+            actions = input_batch.compile_action(step["action"], allow_waits=allow_waits)
+            if actions is None:
+                break
+            if batch:
+                previous = batch[-1][1]
+                delay = previous.get("expected_delay", 1)
+                if delay > input_batch.MAX_BATCH_DELAY or (self.settle_waiter and previous.get("settle", True)):
+                    break
+                actions[0] = dict(actions[0], delay=actions[0].get("delay", 0) + delay)
+            batch.append((step_num, step, actions))
+        return batch
+
+    def _run_step_batch(self, batch: List[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]]) -> Tuple[int, Optional[str]]:
+        """Run compiled steps as one SUT batch, then wait the last step's expected_delay.
+
+        If a step fails after some of its inputs went through, the rest of
+        that step is retried from the failed input rather than replaying it.
+
+        Returns:
+            (number of steps that completed, error if the next step must fail
+            rather than be rerun because some of its inputs were already sent)
+        """
+        actions = []
+        owners = []  # Step index of each action
+        for index, (_, _, step_actions) in enumerate(batch):
+            actions.extend(step_actions)
+            owners.extend([index] * len(step_actions))
+
+        first, last = batch[0][0], batch[-1][0]
+        logger.info(f"Running steps {first}-{last} as one input batch ({len(actions)} inputs)")
+        try:
+            with perf_spans.span("action", steps=len(batch)):
+                result = self.network.send_action_batch(actions)
+        except Exception as e:
+            logger.error(f"Input batch for steps {first}-{last} failed: {str(e)}")
+            return 0, None
+
+        completed_actions = result.get("completed", 0)
+        completed = len(batch) if completed_actions >= len(actions) else owners[completed_actions]
+        if completed < len(batch):
+            failed = next((r for r in result.get("results", []) if r.get("status") == "error"), {})
+            step_num = batch[completed][0]
+            logger.warning(f"Input batch stopped at step {step_num}: {failed.get('message')}")
+            step_begin = owners.index(completed)
+            if completed_actions == step_begin:
+                return completed, None  # None of the step's inputs went through - rerun it on its own
+
+            # Replaying the step would repeat its inputs that already went through
+            step_end = step_begin + len(batch[completed][2])
+            remaining = [dict(actions[completed_actions], delay=0)] + actions[completed_actions + 1:step_end]
+            logger.info(f"Resuming step {step_num} from input {completed_actions - step_begin + 1}")
+            try:
+                retry = self.network.send_action_batch(remaining)
+            except Exception as e:
+                retry = {"completed": 0, "results": [{"status": "error", "message": str(e)}]}
+            if retry.get("completed", 0) < len(remaining):
+                failed = next((r for r in retry.get("results", []) if r.get("status") == "error"), {})
+                return completed, f"Input failed after part of the step was sent: {failed.get('message')}"
+            completed += 1
+            if completed < len(batch):
+                return completed, None
+
+        # The last step's delay runs here as usual (settle wait, speculative parse of the next screen)
+        last_step = batch[-1][1]
+        expected_delay = last_step.get("expected_delay", 1)
+        self._start_speculation(expected_delay)
+        if expected_delay > 0:
+            logger.info(f"Waiting up to {expected_delay} seconds after action...")
+            with perf_spans.span("delay"):
+                self._settle_wait(expected_delay, "expected_delay", last, enabled=last_step.get("settle", True))
+        return completed, None
+
+    def _handle_optional_steps(self, screenshot_path: Optional[str] = None) -> bool:
+        """Handle optional steps (popups, interruptions).
+
+        Args:
+            screenshot_path: Screenshot already taken for this step, captured fresh if None
+        """
         if not self.optional_steps:
             return False
         
         try:
-            # Capture current screenshot for optional step checking
-            optional_screenshot = f"{self.run_dir}/screenshots/optional_check.png"
-            self.screenshot_mgr.capture(optional_screenshot, process_name=self.process_id)
+            optional_screenshot = screenshot_path
+            if optional_screenshot is None:
+                # Capture current screenshot for optional step checking
+                optional_screenshot = self.screenshot_mgr.screenshot_path(
+                    f"{self.run_dir}/screenshots/optional_check", self.screenshot_profile
+                )
+                self.screenshot_mgr.capture(optional_screenshot, process_name=self.process_id,
+                                            profile=self.screenshot_profile)
             optional_boxes = self.vision_model.detect_ui_elements(optional_screenshot)
             
             # Check each optional step
@@ -1888,6 +2329,21 @@ class SimpleAutomation:
         trigger = step_config.get("trigger", {})
         return self._find_matching_element(trigger, bounding_boxes) is not None
     
+    def _settle_wait(self, max_wait: float, reason: str, step_num: int = None, enabled: bool = True):
+        """Wait up to max_wait, returning early once the screen settles (if enabled).
+
+        The actual time waited is reported to the progress callback for the timeline.
+        """
+        if not self.settle_waiter or not enabled:
+            time.sleep(max_wait)
+            return
+
+        result = self.settle_waiter.wait(max_wait)
+        logger.info(f"{reason}: waited {result.waited:.2f}s of {max_wait}s "
+                    f"({'settled' if result.settled else 'not settled'}, {result.frames} frames)")
+        if self.progress_callback and hasattr(self.progress_callback, 'on_wait_measured'):
+            self.progress_callback.on_wait_measured(step_num, reason, result.waited, max_wait, result.settled)
+
     def _interruptible_wait(self, duration: int, no_refocus: bool = False):
         """Wait that can be interrupted by stop event. Optionally refocuses game.
 
@@ -1975,11 +2431,14 @@ class SimpleAutomation:
 
         # Include retry suffix to preserve all verification attempts for debugging
         retry_suffix = f"_retry{retries}" if retries > 0 else ""
-        verify_path = f"{self.run_dir}/screenshots/verify_{step_num}{retry_suffix}.png"
+        verify_path = self.screenshot_mgr.screenshot_path(
+            f"{self.run_dir}/screenshots/verify_{step_num}{retry_suffix}", self.screenshot_profile
+        )
         try:
             # Skip window focus when no_refocus is set (prevents cursor lock in FC6 etc.)
             screenshot_process = None if step.get("no_refocus") else self.process_id
-            self.screenshot_mgr.capture(verify_path, process_name=screenshot_process)
+            self.screenshot_mgr.capture(verify_path, process_name=screenshot_process,
+                                        profile=self.screenshot_profile)
             verify_boxes = self.vision_model.detect_ui_elements(verify_path)
 
             if self.annotator:
@@ -0,0 +1,208 @@
+"""
+Speculative capture/parse for pipelined step execution in SimpleAutomation.
+
+In the serial engine every step pays for its own screenshot upload and
+OmniParser parse after the previous step's expected_delay sleep has fully
+elapsed. In pipelined mode, as soon as a step's action is done, a background
+worker starts polling the SUT for the next step's screen. Once two consecutive
+frames agree (the screen has settled) it parses that frame while the main
+thread is still sleeping.
+
+When the next step begins, the main thread still captures its own screenshot
+and only uses the speculative result if that screenshot hashes within
+max_distance bits of the frame that was parsed. Otherwise the speculation is
+discarded and the step parses normally, so correctness never depends on the
+speculation.
+
+The worker runs alongside the main thread's own captures and parses, so it
+must not share their clients (see worker_client). OCR configs it learns are
+handed back with the result for the main thread to record.
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from modules.screen_hash import dhash, hamming
+from modules.vision_client import BoundingBox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_INTERVAL = 0.25  # Seconds between polled frames while waiting for the screen to settle
+DEFAULT_SETTLE_DISTANCE = 2     # Max differing bits between consecutive frames to count as settled
+DEFAULT_MATCH_DISTANCE = 1      # Max differing bits between the parsed frame and the step's screenshot
+
+
+def worker_client(client):
+    """Shallow copy of an HTTP client (NetworkManager, OmniparserClient, ...) with
+    its own requests.Session, so a worker thread never shares the caller's."""
+    clone = copy.copy(client)
+    session = getattr(client, "session", None)
+    if isinstance(session, requests.Session):
+        clone.session = requests.Session()
+        clone.session.headers.update(session.headers)
+    return clone
+
+
+class SpeculativeParser:
+    """Parses the next step's screen in the background during the post-action delay."""
+
+    def __init__(
+        self,
+        capture: Callable[[str], Any],
+        detect: Callable[[str, Dict[str, Any], Dict[str, Any]], Tuple[List[BoundingBox], Optional[Dict[str, Any]]]],
+        settle_interval: float = DEFAULT_SETTLE_INTERVAL,
+        settle_distance: int = DEFAULT_SETTLE_DISTANCE,
+        max_distance: int = DEFAULT_MATCH_DISTANCE,
+    ):
+        """
+        Args:
+            capture: Saves a screenshot of the SUT to the given path
+            detect: Parses a screenshot for a step: detect(path, step, ocr_config)
+                    -> (boxes, OCR config learned by fallback or None)
+            settle_interval: Seconds between polled frames
+            settle_distance: Frame-to-frame Hamming distance treated as settled
+            max_distance: Max distance between the parsed frame and the step's
+                          own screenshot for the result to be used. Keep this
+                          at 0-1: a menu that gained a label is ~3 bits away
+        """
+        self._capture = capture
+        self._detect = detect
+        self.settle_interval = settle_interval
+        self.settle_distance = settle_distance
+        self.max_distance = max_distance
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._step_num: Optional[int] = None
+        self._settled_hash: Optional[int] = None
+        self._boxes: Optional[List[BoundingBox]] = None
+        self._learned_config: Optional[Dict[str, Any]] = None
+        self._parse_time = 0.0
+
+        self.stats = {"started": 0, "used": 0, "discarded": 0, "saved_seconds": 0.0}
+
+    def start(self, step_num: int, step: Dict[str, Any], screenshot_path: str, max_wait: float,
+              ocr_config: Optional[Dict[str, Any]] = None):
+        """Begin speculating on step_num's screen (cancels any previous speculation).
+
+        ocr_config is resolved by the caller, so the worker never reads its state.
+        """
+        self.cancel()
+        with self._lock:
+            self._cancel = threading.Event()
+            self._step_num = step_num
+            self._settled_hash = None
+            self._boxes = None
+            self._learned_config = None
+            self._parse_time = 0.0
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(step, step_num, screenshot_path, max_wait, ocr_config or {}, self._cancel),
+                name=f"speculate-step-{step_num}",
+                daemon=True,
+            )
+            self.stats["started"] += 1
+            self._thread.start()
+
+    def take(self, step_num: int, screenshot_path: str,
+             timeout: float) -> Optional[Tuple[List[BoundingBox], Optional[Dict[str, Any]]]]:
+        """Return the speculative parse for step_num if it matches the step's screenshot.
+
+        Waits up to timeout for an in-progress parse of a matching frame.
+
+        Returns:
+            (boxes, learned OCR config or None), or None (and discards the
+            speculation) if there is no usable parse
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._step_num != step_num:
+                return None
+            settled_hash = self._settled_hash
+
+        if settled_hash is None:
+            # Screen hadn't settled yet - nothing useful to wait for
+            self._discard("screen not settled")
+            return None
+
+        try:
+            current_hash, _ = dhash(screenshot_path)
+        except Exception as e:
+            self._discard(f"hash failed: {e}")
+            return None
+
+        distance = hamming(current_hash, settled_hash)
+        if distance > self.max_distance:
+            self._discard(f"screen changed (distance {distance})")
+            return None
+
+        thread.join(timeout)
+        with self._lock:
+            boxes, learned, parse_time = self._boxes, self._learned_config, self._parse_time
+            self._thread = None
+        if boxes is None:
+            self._discard("parse did not finish")
+            return None
+
+        self.stats["used"] += 1
+        self.stats["saved_seconds"] += parse_time
+        logger.info(f"Using speculative parse for step {step_num} "
+                    f"(distance {distance}, saved {parse_time:.2f}s)")
+        return boxes, learned
+
+    def cancel(self):
+        """Stop any running speculation without waiting for it."""
+        with self._lock:
+            self._cancel.set()
+            self._thread = None
+            self._step_num = None
+
+    def _discard(self, reason: str):
+        logger.debug(f"Discarding speculative parse: {reason}")
+        self.stats["discarded"] += 1
+        self.cancel()
+
+    def _run(self, step: Dict[str, Any], step_num: int, screenshot_path: str,
+             max_wait: float, ocr_config: Dict[str, Any], cancelled: threading.Event):
+        deadline = time.monotonic() + max_wait
+        previous = None
+        settled = None
+        try:
+            while not cancelled.is_set() and time.monotonic() < deadline:
+                self._capture(screenshot_path)
+                current, _ = dhash(screenshot_path)
+                if previous is not None and hamming(current, previous) <= self.settle_distance:
+                    settled = current
+                    break
+                previous = current
+                cancelled.wait(self.settle_interval)
+
+            if settled is None or cancelled.is_set():
+                return
+            with self._lock:
+                if cancelled.is_set():
+                    return
+                self._settled_hash = settled
+
+            start = time.monotonic()
+            boxes, learned = self._detect(screenshot_path, step, ocr_config)
+            with self._lock:
+                if not cancelled.is_set():
+                    self._boxes = boxes
+                    self._learned_config = learned
+                    self._parse_time = time.monotonic() - start
+        except Exception as e:
+            logger.debug(f"Speculative parse for step {step_num} failed: {e}")
+        finally:
+            if cancelled.is_set() and os.path.exists(screenshot_path):
+                try:
+                    os.remove(screenshot_path)
+                except OSError:
+                    pass
@@ -25,6 +25,12 @@ FALLBACK_CONFIG = {
         "max_retries": 3,
         "retry_delay": 5,
         "user": "",
+        "max_parallel_transfers": 4,
+        "tar_threshold": 16,
+        "multiplex": None,
+        "bandwidth_limit_kbps": None,
+        "benchmark_throttle_kbps": 4000,
+        "pull_wait_timeout": 1800,
     },
     "agents": {
         "socwatch": {
@@ -104,6 +110,27 @@ class TracingConfig:
         """Maximum SSH retry attempts."""
         return self.ssh_config.get("max_retries", 3)
 
+    @property
+    def ssh_transfer_options(self) -> Dict[str, Any]:
+        """Trace transfer tuning passed through to pull_run_traces."""
+        ssh = self.ssh_config
+        return {
+            "max_parallel_transfers": ssh.get("max_parallel_transfers", 4),
+            "tar_threshold": ssh.get("tar_threshold", 16),
+            "multiplex": ssh.get("multiplex"),
+            "bandwidth_limit_kbps": ssh.get("bandwidth_limit_kbps"),
+        }
+
+    @property
+    def ssh_benchmark_throttle_kbps(self) -> int:
+        """Trace transfer rate while a benchmark is measuring (0 pauses transfers)."""
+        return self.ssh_config.get("benchmark_throttle_kbps", 4000)
+
+    @property
+    def trace_pull_wait_timeout(self) -> int:
+        """Seconds a run waits at the end for background trace pulls."""
+        return self.ssh_config.get("pull_wait_timeout", 1800)
+
     @property
     def ssh_user(self) -> Optional[str]:
         """SSH username (None to use current Windows user)."""
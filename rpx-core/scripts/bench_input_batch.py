@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched vs one-by-one input actions.
+
+Runs a workflow of action-only steps (key presses, a typed string and a key
+sequence) through SimpleAutomation and a real NetworkManager against an
+in-process fake SUT on loopback. Every request to the fake SUT is delayed by
+a random one-way latency to stand in for the LAN. The fake SUT timestamps
+each input it executes, so the gaps between inputs can be compared with the
+gaps the workflow asked for.
+
+Usage:
+    python bench_input_batch.py [--keys 8] [--text "hello world"] [--latency-ms 5-40]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+import yaml
+from fastapi import FastAPI, Request
+
+# Make the modules package importable when run from the scripts folder
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.network import NetworkManager  # noqa: E402
+from modules.screenshot import ScreenshotManager  # noqa: E402
+from modules.simple_automation import SimpleAutomation  # noqa: E402
+
+PORT = 18095
+
+
+class FakeSUT:
+    """Input log plus the two action endpoints, behind a simulated network"""
+
+    def __init__(self, latency_ms):
+        self.latency_ms = latency_ms
+        self.inputs = []  # (monotonic time, action)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def lag(self):
+        time.sleep(random.uniform(*self.latency_ms) / 1000)
+
+    def execute(self, action):
+        with self.lock:
+            self.inputs.append((time.monotonic(), action))
+        if action.get("type") == "wait":
+            time.sleep(action.get("duration", 0))
+
+    def app(self, batching: bool) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def network(request: Request, call_next):
+            self.requests += 1
+            return await call_next(request)
+
+        @app.get("/status")
+        def status():
+            return {"status": "online", "game": {"running": True}}
+
+        @app.get("/display/current")
+        def display_current():
+            return {"status": "success", "width": 1920, "height": 1080}
+
+        @app.post("/step_snapshot")
+        def step_snapshot():
+            self.lag()
+            return {"status": "success", "game": {"running": True}, "focus": {"result": "already"}}
+
+        @app.post("/action")
+        def action(body: dict):
+            self.lag()
+            self.execute(body)
+            self.lag()
+            return {"status": "success", "action": body.get("type")}
+
+        if batching:
+            @app.post("/action_batch")
+            def action_batch(body: dict):
+                self.lag()
+                started = previous = time.monotonic()
+                for item in body["actions"]:
+                    due = started + item["at"] if item.get("at") is not None else previous + item.get("delay", 0)
+                    if due > time.monotonic():
+                        time.sleep(due - time.monotonic())
+                    self.execute(item)
+                    previous = time.monotonic()
+                self.lag()
+                n = len(body["actions"])
+                return {"status": "success", "completed": n, "results": [], "total_ms": 0}
+
+        return app
+
+
+def write_workflow(path: str, keys: int, text: str, delay: float):
+    steps = {}
+    for i in range(1, keys + 1):
+        steps[i] = {"description": f"Press Down {i}", "action": {"type": "key", "key": "down"},
+                    "expected_delay": delay}
+    steps[keys + 1] = {"description": "Type name", "action": {"type": "type", "text": text, "char_delay": 0.05},
+                       "expected_delay": delay}
+    steps[keys + 2] = {"description": "Confirm", "action": {
+        "type": "sequence", "delay_between": 0.2,
+        "actions": [{"type": "key", "key": "enter"}, {"type": "key", "key": "down"}, {"type": "key", "key": "enter"}],
+    }, "expected_delay": delay}
+    config = {"metadata": {"game_name": "Input Bench", "screen_hash": False}, "steps": steps}
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+
+
+def intended_gaps(keys: int, text: str, delay: float):
+    """Seconds between consecutive inputs the workflow asks for"""
+    return [delay] * keys + [0.05] * (len(text) - 1) + [delay, 0.2, 0.2]
+
+
+def run(name: str, batching: bool, args, workdir: str):
+    sut = FakeSUT(args.latency)
+    server = uvicorn.Server(uvicorn.Config(sut.app(batching), host="127.0.0.1", port=PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        config_path = os.path.join(workdir, f"{name}.yaml")
+        write_workflow(config_path, args.keys, args.text, args.delay)
+        network = NetworkManager("127.0.0.1", PORT)
+        automation = SimpleAutomation(config_path, network, ScreenshotManager(network), vision_model=None,
+                                      run_dir=os.path.join(workdir, name), disable_tracing=True)
+        sut.requests = 0
+        start = time.perf_counter()
+        ok = automation.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    times = [t for t, _ in sut.inputs]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    errors = [abs(g - want) * 1000 for g, want in zip(gaps, intended_gaps(args.keys, args.text, args.delay))]
+    print(f"{name:<10} {'ok' if ok else 'FAILED':<6} {elapsed:6.2f}s  {sut.requests:4d} requests  "
+          f"{len(sut.inputs):3d} inputs  timing error mean {statistics.mean(errors):5.1f}ms "
+          f"max {max(errors):5.1f}ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched input actions")
+    parser.add_argument("--keys", type=int, default=8, help="action-only key steps")
+    parser.add_argument("--text", default="hello world")
+    parser.add_argument("--delay", type=float, default=0.3, help="expected_delay per step (seconds)")
+    parser.add_argument("--latency-ms", default="5-40", help="one-way latency range per request")
+    args = parser.parse_args()
+    low, high = (float(v) for v in args.latency_ms.split("-"))
+    args.latency = (low, high)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    random.seed(3)
+
+    print(f"{args.keys} key steps, {len(args.text)}-char text, 3-key sequence, "
+          f"expected_delay {args.delay}s, latency {args.latency_ms}ms each way")
+    with tempfile.TemporaryDirectory() as workdir:
+        ok = run("one-by-one", False, args, workdir)
+        ok = run("batched", True, args, workdir) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark RunManager dispatch: legacy FIFO requeue loop vs RunDispatcher.
+
+Simulates a fleet of SUTs with runs queued round-robin across them, sharing
+the two Steam accounts (AF/GZ). Each run "executes" for a short sleep. For
+every dispatch we measure the latency from the moment the run became
+startable (submitted, SUT idle and account free) to the moment a worker
+picked it up, plus the process CPU time spent over the whole benchmark.
+
+Usage:
+    python bench_run_dispatch.py [--suts 50] [--runs 500] [--workers 4] [--run-ms 5]
+"""
+
+import argparse
+import logging
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Make the backend package importable when run from the scripts folder
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.account_scheduler import AccountType  # noqa: E402
+from backend.core.run_dispatcher import RunDispatcher  # noqa: E402
+
+GAMES = ["Black Myth Wukong", "Counter-Strike 2", "Dota 2", "Far Cry 6",
+         "Hitman 3", "Red Dead Redemption 2", "Shadow of the Tomb Raider", "Tiny Tina's Wonderlands"]
+
+
+class InMemoryAccounts:
+    """AccountScheduler stand-in without persistence, recording free times"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._holders = {}
+        self._listeners = []
+        self.free_at = {t.value: 0.0 for t in AccountType}
+
+    def get_account_type(self, game_name):
+        return AccountType.AF if game_name[0].upper() <= 'F' else AccountType.GZ
+
+    def add_release_listener(self, listener):
+        self._listeners.append(listener)
+
+    def try_acquire(self, sut_ip, game_name):
+        key = self.get_account_type(game_name).value
+        with self._lock:
+            holder = self._holders.get(key)
+            if holder is None or holder == sut_ip:
+                self._holders[key] = sut_ip
+                return True
+            return False
+
+    def get_holder(self, game_name):
+        with self._lock:
+            return self._holders.get(self.get_account_type(game_name).value)
+
+    def release(self, sut_ip, game_name):
+        key = self.get_account_type(game_name).value
+        with self._lock:
+            if self._holders.get(key) != sut_ip:
+                return
+            del self._holders[key]
+            self.free_at[key] = time.perf_counter()
+        for listener in self._listeners:
+            listener(sut_ip, key)
+
+
+class Harness:
+    """Tracks when each run became startable and records dispatch latency"""
+
+    def __init__(self, runs, accounts):
+        self.runs = runs  # run_id -> (sut_ip, game)
+        self.accounts = accounts
+        self.submitted_at = {}
+        self.sut_free_at = {}
+        self.latencies = []
+        self.done = threading.Event()
+        self.remaining = len(runs)
+        self._lock = threading.Lock()
+
+    def on_dispatch(self, run_id):
+        now = time.perf_counter()
+        sut_ip, game = self.runs[run_id]
+        key = self.accounts.get_account_type(game).value
+        startable = max(self.submitted_at[run_id], self.sut_free_at.get(sut_ip, 0.0),
+                        self.accounts.free_at[key])
+        with self._lock:
+            self.latencies.append(now - startable)
+
+    def on_finish(self, sut_ip):
+        self.sut_free_at[sut_ip] = time.perf_counter()
+        with self._lock:
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+
+
+def run_legacy(harness, accounts, order, workers, run_s):
+    """The pre-dispatcher RunManager._worker_loop: shared FIFO + requeue"""
+    run_queue = queue.Queue()
+    rm_lock = threading.RLock()
+    sut_current = {}
+    stop = threading.Event()
+
+    def worker():
+        while not stop.is_set():
+            try:
+                run_id = run_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            sut_ip, game = harness.runs[run_id]
+            with rm_lock:
+                current = sut_current.get(sut_ip)
+                if current and current != run_id:
+                    run_queue.put(run_id)
+                    continue
+                if not accounts.try_acquire(sut_ip, game):
+                    run_queue.put(run_id)
+                    continue
+                sut_current[sut_ip] = run_id
+            harness.on_dispatch(run_id)
+            time.sleep(run_s)
+            accounts.release(sut_ip, game)
+            with rm_lock:
+                del sut_current[sut_ip]
+            harness.on_finish(sut_ip)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for run_id in order:
+        harness.submitted_at[run_id] = time.perf_counter()
+        run_queue.put(run_id)
+    harness.done.wait()
+    stop.set()
+
+
+def run_dispatcher(harness, accounts, order, workers, run_s):
+    """RunDispatcher-based worker loop as used by RunManager"""
+    dispatcher = RunDispatcher(accounts)
+
+    def worker():
+        while True:
+            run_id = dispatcher.next_run(timeout=0.5)
+            if run_id is None:
+                if harness.done.is_set():
+                    return
+                continue
+            sut_ip, game = harness.runs[run_id]
+            harness.on_dispatch(run_id)
+            time.sleep(run_s)
+            accounts.release(sut_ip, game)
+            dispatcher.release_sut(sut_ip, run_id)
+            harness.on_finish(sut_ip)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for run_id in order:
+        sut_ip, game = harness.runs[run_id]
+        harness.submitted_at[run_id] = time.perf_counter()
+        dispatcher.submit(run_id, sut_ip, game)
+    harness.done.wait()
+    dispatcher.shutdown()
+    return dispatcher.get_stats()
+
+
+def bench(name, fn, runs, order, workers, run_s):
+    accounts = InMemoryAccounts()
+    harness = Harness(runs, accounts)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    fn(harness, accounts, order, workers, run_s)
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    lat_ms = sorted(x * 1000 for x in harness.latencies)
+    p99 = lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * 0.99))]
+    print(f"{name:<12} wall={wall:7.2f}s  cpu={cpu:7.2f}s  "
+          f"dispatch p50={statistics.median(lat_ms):8.3f}ms  p99={p99:8.3f}ms  max={lat_ms[-1]:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark run dispatch latency')
+    parser.add_argument('--suts', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--run-ms', type=float, default=5.0, help='Simulated run duration')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rng = random.Random(args.seed)
+
+    runs = {}
+    for i in range(args.runs):
+        runs[f"run-{i:04d}"] = (f"10.0.{i % args.suts // 250}.{i % args.suts % 250 + 1}", rng.choice(GAMES))
+    order = list(runs)
+
+    print(f"{args.suts} SUTs, {args.runs} queued runs, {args.workers} workers, "
+          f"{args.run_ms}ms per run")
+    bench("legacy", run_legacy, runs, order, args.workers, args.run_ms / 1000)
+    bench("dispatcher", run_dispatcher, runs, order, args.workers, args.run_ms / 1000)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
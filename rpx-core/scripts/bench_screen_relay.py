@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark live screen monitoring through the discovery service relay.
+
+Runs on loopback with no real SUTs:
+  - a fake SUT server serves the SUT client's /screen_stream from synthetic
+    frames (each connection is a separate "SUT" with its own screen)
+  - the discovery service's ScreenRelayManager relays them over WebSocket
+  - every SUT is watched by several viewers
+
+All fake SUTs share this process and encode 1080p frames under one GIL, so
+keep --suts small; the relay itself is not the bottleneck.
+
+Bytes into and out of the relay are compared with what the same viewers
+would pull by polling full PNG screenshots at the same rate and scale.
+
+Usage:
+    python bench_screen_relay.py [--suts 4] [--viewers 2] [--seconds 10] [--fps 5] [--viewer-fps 5]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(root / "sut_client" / "src"))
+sys.path.insert(0, str(root / "sut_discovery_service" / "src"))
+
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+from fastapi import FastAPI, WebSocket  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from PIL import Image  # noqa: E402
+from starlette.concurrency import iterate_in_threadpool  # noqa: E402
+
+from sut_client.capture import SyntheticBackend  # noqa: E402
+from sut_client.screen_stream import stream_frames  # noqa: E402
+from sut_discovery_service.relay import get_screen_relay_manager  # noqa: E402
+
+SUT_PORT = 18080
+RELAY_PORT = 18081
+
+
+def make_sut_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/screen_stream")
+    async def screen_stream(fps: float = 5, scale: float = 0.5, quality: int = 70):
+        frames = stream_frames(SyntheticBackend(), fps=fps, scale=scale, quality=quality)
+        return StreamingResponse(iterate_in_threadpool(frames), media_type="application/octet-stream")
+
+    return app
+
+
+def make_relay_app(args) -> FastAPI:
+    app = FastAPI()
+
+    @app.websocket("/screen/{sut_id}")
+    async def screen(websocket: WebSocket, sut_id: str):
+        await websocket.accept()
+        manager = get_screen_relay_manager()
+        relay = manager.get_relay(sut_id, f"http://127.0.0.1:{SUT_PORT}/screen_stream",
+                                  {"fps": args.fps, "scale": args.scale, "quality": 70})
+        await manager.watch(relay, websocket, args.viewer_fps)
+
+    @app.get("/stats")
+    async def stats():
+        return get_screen_relay_manager().stats()
+
+    return app
+
+
+def serve(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def watch(sut_id: str, seconds: float, result: dict, canvas_check: bool):
+    """One viewer: count traffic and paint tiles onto a canvas like the UI does"""
+    canvas = None
+    async with websockets.connect(f"ws://127.0.0.1:{RELAY_PORT}/screen/{sut_id}", max_size=None) as ws:
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(ws.recv(), remaining)
+            except asyncio.TimeoutError:
+                break
+            result["bytes"] += len(message)
+            result["messages"] += 1
+            header_len = struct.unpack(">I", message[:4])[0]
+            header = json.loads(message[4:4 + header_len])
+            result["keyframes"] += bool(header["key"])
+            if canvas_check:
+                if header["key"] or canvas is None:
+                    canvas = Image.new("RGB", (header["width"], header["height"]))
+                offset = 4 + header_len
+                for x, y, w, h, nbytes in header["tiles"]:
+                    canvas.paste(Image.open(io.BytesIO(message[offset:offset + nbytes])), (x, y))
+                    offset += nbytes
+    result["canvas"] = canvas
+
+
+async def run_viewers(args) -> list:
+    results = []
+    tasks = []
+    for s in range(args.suts):
+        for v in range(args.viewers):
+            result = {"bytes": 0, "messages": 0, "keyframes": 0}
+            results.append(result)
+            tasks.append(watch(f"sut-{s:02d}", args.seconds, result, canvas_check=(s == 0 and v == 0)))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def polling_estimate(args) -> float:
+    """Bytes the same viewers would pull polling full PNG screenshots"""
+    frame = SyntheticBackend().grab()
+    frame = frame.resize((int(frame.width * args.scale), int(frame.height * args.scale)))
+    buf = io.BytesIO()
+    frame.save(buf, format="PNG")
+    return len(buf.getvalue()) * args.viewer_fps * args.seconds * args.suts * args.viewers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the discovery service screen relay")
+    parser.add_argument("--suts", type=int, default=4)
+    parser.add_argument("--viewers", type=int, default=2, help="viewers per SUT")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=5, help="upstream capture rate")
+    parser.add_argument("--viewer-fps", type=float, default=5)
+    parser.add_argument("--scale", type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    serve(make_sut_app(), SUT_PORT)
+    serve(make_relay_app(args), RELAY_PORT)
+
+    start = time.perf_counter()
+    results = asyncio.run(run_viewers(args))
+    elapsed = time.perf_counter() - start
+
+    relays = get_screen_relay_manager()._relays.values()
+    upstream = sum(r.bytes_received for r in relays)
+    downstream = sum(r["bytes"] for r in results)
+    polling = polling_estimate(args)
+    canvas = results[0]["canvas"]
+
+    print(f"{args.suts} SUTs x {args.viewers} viewers, {args.seconds:.0f}s at {args.viewer_fps} fps, "
+          f"scale {args.scale}")
+    print(f"upstream (SUTs -> relay)   {upstream / 1e6:7.2f} MB  {upstream * 8 / 1e6 / elapsed:7.2f} Mbit/s  "
+          f"({len(relays)} connections)")
+    print(f"downstream (relay -> UI)   {downstream / 1e6:7.2f} MB  {downstream * 8 / 1e6 / elapsed:7.2f} Mbit/s  "
+          f"({sum(r['messages'] for r in results)} messages, {sum(r['keyframes'] for r in results)} keyframes)")
+    print(f"full-PNG polling estimate  {polling / 1e6:7.2f} MB  {polling * 8 / 1e6 / args.seconds:7.2f} Mbit/s")
+    print(f"relay traffic is {(upstream + downstream) / polling:.1%} of polling; "
+          f"viewer canvas {canvas.size if canvas else 'missing'}")
+    return 0 if canvas and all(r["keyframes"] >= 1 for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark the discovery service's SSE fan-out (/api/suts/events).
+
+Runs on loopback: the SUT router serves /api/suts/events, next to a copy of
+the old endpoint (unbounded queue per client, a task per event) on
+/legacy/events. Both get the same SUT events from the event bus.
+
+A fleet of SUTs flaps online/offline as fast as the event loop allows while
+fast clients read both streams and slow clients open them but never read.
+The script reports what each client received and checks the fast clients
+still end up with every SUT's final state. A burst of distinct SUTs coming
+online (nothing to coalesce) then shows what piles up server-side for the
+slow clients once their socket buffers are full. Finally it drops a client,
+emits a few more events and reconnects with its last event ID to check the
+missed events are replayed.
+
+Usage:
+    python bench_sse_fanout.py [--suts 20] [--seconds 2] [--burst 50000] [--fast 3] [--slow 3]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(root / "sut_discovery_service" / "src"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from sut_discovery_service.api import suts_router  # noqa: E402
+from sut_discovery_service.discovery.events import event_bus, EventType  # noqa: E402
+from sut_discovery_service.utils import get_sse_broadcaster  # noqa: E402
+
+PORT = 18086
+BASE = f"http://127.0.0.1:{PORT}"
+
+
+def connection_info(sut_id: str, i: int) -> dict:
+    """Roughly what SUTConnection.to_dict() carries"""
+    return {"sut_id": sut_id, "ip": f"10.0.{i // 250}.{i % 250}", "hostname": f"BENCH-PC-{i:05d}",
+            "cpu_model": "Intel(R) Core(TM) i9-14900K", "display_name": f"Bench rig {i}",
+            "capabilities": ["preset_sync", "config_backup", "config_restore", "basic_clicks",
+                             "advanced_clicks", "hotkeys", "text_input", "pc_rename", "rpc"],
+            "status": "connected", "rpc": True, "connected_at": "2026-01-01T00:00:00",
+            "last_seen": "2026-01-01T00:00:00"}
+
+# The old fan-out
+legacy_clients = set()
+
+
+async def legacy_broadcast(event_type: str, data: dict):
+    event_data = json.dumps({"type": event_type, "data": data})
+    for queue in legacy_clients:
+        queue.put_nowait(event_data)
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(suts_router, prefix="/api")
+
+    event_bus.subscribe(EventType.WS_CONNECTED,
+                        lambda event: asyncio.create_task(legacy_broadcast("sut_online", event.data)))
+    event_bus.subscribe(EventType.WS_DISCONNECTED,
+                        lambda event: asyncio.create_task(legacy_broadcast("sut_offline", event.data)))
+
+    @app.get("/legacy/events")
+    async def legacy_events():
+        async def event_generator():
+            queue = asyncio.Queue()
+            legacy_clients.add(queue)
+            try:
+                while True:
+                    yield f"data: {await queue.get()}\n\n"
+            finally:
+                legacy_clients.discard(queue)
+        return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+    @app.post("/flap")
+    async def flap(suts: int, seconds: float):
+        """Flap every SUT as fast as the loop allows; returns each SUT's final state"""
+        final, emitted, deadline = {}, 0, time.perf_counter() + seconds
+        online = False
+        while time.perf_counter() < deadline:
+            online = not online
+            for i in range(suts):
+                sut_id = f"sut-{i:03d}"
+                event_bus.emit(EventType.WS_CONNECTED if online else EventType.WS_DISCONNECTED,
+                               connection_info(sut_id, i))
+                final[sut_id] = "sut_online" if online else "sut_offline"
+                emitted += 1
+            await asyncio.sleep(0.001)
+        return {"emitted": emitted, "final": final}
+
+    @app.post("/burst")
+    async def burst(events: int):
+        """Distinct SUTs coming online (nothing to coalesce), each from its own handler as a connect would"""
+        for i in range(events):
+            event_bus.emit(EventType.WS_CONNECTED, connection_info(f"burst-{i:05d}", i))
+            await asyncio.sleep(0)
+        return {"emitted": events}
+
+    @app.post("/emit")
+    async def emit(sut_id: str):
+        event_bus.emit(EventType.WS_CONNECTED, {"sut_id": sut_id})
+        return {"ok": True}
+
+    @app.get("/stats")
+    async def stats():
+        sizes = [queue.qsize() for queue in legacy_clients]
+        return {"sse": get_sse_broadcaster().stats(), "legacy_queued": sum(sizes), "legacy_max_queue": max(sizes),
+                "legacy_queued_bytes": sum(len(item) for queue in legacy_clients for item in queue._queue)}
+
+    return app
+
+
+class Reader:
+    """Reads an SSE stream on a thread, tracking each SUT's last state"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.events = 0
+        self.resyncs = 0
+        self.types = []
+        self.state = {}
+        self.last_event_id = None
+        self.stop = threading.Event()
+        self.connected = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        with httpx.Client(timeout=None) as client, client.stream("GET", self.url) as response:
+            self.connected.set()
+            for line in response.iter_lines():
+                if self.stop.is_set():
+                    return
+                if line.startswith("id: "):
+                    self.last_event_id = line[4:]
+                elif line.startswith("data: "):
+                    event = json.loads(line[6:])
+                    if event["type"] == "connected":
+                        continue
+                    self.events += 1
+                    self.types.append(event["type"])
+                    if event["type"] == "resync":
+                        self.resyncs += 1
+                    elif "sut_id" in event["data"]:
+                        self.state[event["data"]["sut_id"]] = event["type"]
+
+
+def settle(readers, seconds: float = 1.5):
+    """Wait until the readers stop receiving (coalescing windows closed)"""
+    last = None
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        time.sleep(seconds)
+        counts = [r.events for r in readers]
+        if counts == last:
+            return
+        last = counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SSE fan-out")
+    parser.add_argument("--suts", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--burst", type=int, default=50000, help="distinct SUTs coming online")
+    parser.add_argument("--fast", type=int, default=3, help="clients reading both streams")
+    parser.add_argument("--slow", type=int, default=3, help="clients that never read")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    server = uvicorn.Server(uvicorn.Config(make_app(), host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    fast = [Reader(f"{BASE}/api/suts/events") for _ in range(args.fast)]
+    legacy = [Reader(f"{BASE}/legacy/events") for _ in range(args.fast)]
+    slow_clients = [httpx.Client(timeout=None) for _ in range(args.slow)]
+    slow = [c.send(c.build_request("GET", url), stream=True) for c in slow_clients
+            for url in (f"{BASE}/api/suts/events", f"{BASE}/legacy/events")]
+    for reader in fast + legacy:
+        reader.connected.wait(5)
+    time.sleep(0.3)
+
+    result = httpx.post(f"{BASE}/flap", params={"suts": args.suts, "seconds": args.seconds}, timeout=60).json()
+    settle(fast + legacy)
+    stats = httpx.get(f"{BASE}/stats").json()
+    sse = stats["sse"]
+
+    print(f"{args.suts} SUTs flapping for {args.seconds:g}s: {result['emitted']} status events, "
+          f"{args.fast} fast + {args.slow} slow clients")
+    print(f"legacy   fast clients got {legacy[0].events:6d} events each")
+    print(f"bounded  fast clients got {fast[0].events:6d} events each ({sse['coalesced']} coalesced)")
+    final_ok = all(reader.state == result["final"] for reader in fast)
+    print(f"final SUT states correct on every bounded client: {final_ok}")
+
+    before = {id(r): (r.events, r.resyncs) for r in fast}
+    httpx.post(f"{BASE}/burst", params={"events": args.burst}, timeout=120).raise_for_status()
+    settle(fast + legacy)
+    stats = httpx.get(f"{BASE}/stats").json()
+    sse = stats["sse"]
+    received = [(r.events - before[id(r)][0], r.resyncs - before[id(r)][1]) for r in fast]
+    print(f"burst of {args.burst} SUTs coming online:")
+    print(f"legacy   {stats['legacy_queued']:6d} events queued server-side "
+          f"({stats['legacy_queued_bytes'] / 1e6:.1f} MB, max {stats['legacy_max_queue']} per client)")
+    print(f"bounded  {sse['queued']:6d} events queued server-side ({sse['dropped']} dropped)   "
+          f"fast clients got (events, resyncs) {received}")
+    # A reader that fell behind must have been told to resync
+    final_ok = final_ok and all(events == args.burst or resyncs > 0 for events, resyncs in received)
+
+    # Drop a client, miss a few events, reconnect from its last event ID
+    resumed_from = fast[0].last_event_id
+    fast[0].stop.set()
+    for i in range(5):
+        httpx.post(f"{BASE}/emit", params={"sut_id": f"late-{i}"})
+    resumed = Reader(f"{BASE}/api/suts/events?last_event_id={resumed_from}")
+    resumed.connected.wait(5)
+    settle([resumed], 0.5)
+    replay_ok = resumed.events == 5 and resumed.resyncs == 0
+    print(f"reconnect from {resumed_from}: {resumed.events} events replayed ({resumed.types})")
+
+    stale = Reader(f"{BASE}/api/suts/events?last_event_id=00000000-1")
+    stale.connected.wait(5)
+    settle([stale], 0.5)
+    print(f"reconnect from an unknown ID: {stale.types}")
+
+    for response in slow:
+        response.close()
+    return 0 if (final_ok and replay_ok and stale.types == ["resync"]
+                 and sse["queued"] <= args.slow * get_sse_broadcaster().queue_size) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
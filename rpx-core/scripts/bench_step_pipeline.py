@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark SimpleAutomation serial vs pipelined step execution.
+
+Runs a synthetic workflow of N "find text, click" steps against an in-process
+fake SUT and a fake OmniParser with configurable latencies. Each click moves
+the fake SUT to the next menu screen after a short animated transition. The
+same workflow runs once serially and once with metadata.pipeline enabled, and
+the wall-clock per iteration is compared.
+
+Usage:
+    python bench_step_pipeline.py [--steps 10] [--iterations 3] [--parse-ms 1200]
+                                  [--capture-ms 150] [--transition-ms 500] [--delay 2]
+"""
+
+import argparse
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+from PIL import Image, ImageDraw
+
+# Make the modules package importable when run from the scripts folder
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.network import NetworkManager  # noqa: E402
+from modules.screenshot import ScreenshotManager  # noqa: E402
+from modules.simple_automation import SimpleAutomation  # noqa: E402
+from modules.vision_client import BoundingBox  # noqa: E402
+
+WIDTH, HEIGHT = 640, 360
+
+
+def render_screen(index: int, noise: random.Random = None) -> bytes:
+    """PNG of menu screen `index` (pixel (0,0) encodes the index); noisy while animating"""
+    img = Image.new("RGB", (WIDTH, HEIGHT), (index % 256, 40, 90))
+    draw = ImageDraw.Draw(img)
+    layout = random.Random(index)
+    for _ in range(6):
+        x, y = layout.randrange(20, WIDTH - 200), layout.randrange(20, HEIGHT - 60)
+        draw.rectangle((x, y, x + 180, y + 40), fill=(230, 230, 230))
+    if noise:
+        for _ in range(40):
+            x, y = noise.randrange(WIDTH), noise.randrange(HEIGHT)
+            draw.rectangle((x, y, x + 60, y + 60), fill=tuple(noise.randrange(256) for _ in range(3)))
+    img.putpixel((0, 0), (index % 256, 40, 90))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class FakeSUT:
+    """NetworkManager stand-in: each click advances to the next menu screen"""
+
+    SCREENSHOT_PROFILES = NetworkManager.SCREENSHOT_PROFILES
+
+    def __init__(self, capture_s: float, transition_s: float):
+        self.capture_s = capture_s
+        self.transition_s = transition_s
+        self.screen = 0
+        self.transition_until = 0.0
+        self.noise = random.Random(7)
+
+    def reset(self):
+        self.screen = 0
+        self.transition_until = 0.0
+
+    def get_resolution(self):
+        return {"width": WIDTH, "height": HEIGHT}
+
+    def focus_game(self, process_name=None):
+        return {"status": "success"}
+
+    def get_screenshot(self, process_name=None, scale=None, profile="archival"):
+        # Always PNG (like an older SUT client) so FakeOmniParser can read the exact index pixel
+        time.sleep(self.capture_s)
+        animating = time.monotonic() < self.transition_until
+        return render_screen(self.screen, self.noise if animating else None)
+
+    def get_step_snapshot(self, process_name=None, check_process=False, require_running=True, focus=True,
+                          focus_process=None, capture=True, profile="parse", settle_ms=200):
+        # One round trip, like a current SUT client
+        return {"running": True, "focused": focus or None, "screenshot_error": None, "state": None,
+                "fallback": False, "screenshot": self.get_screenshot(profile=profile) if capture else None}
+
+    def send_action(self, action):
+        if action.get("type") == "click":
+            self.screen += 1
+            self.transition_until = time.monotonic() + self.transition_s
+        return {"status": "success"}
+
+
+class FakeOmniParser:
+    """Vision model stand-in: one 'Next <n>' element for screen n"""
+
+    def __init__(self, parse_s: float):
+        self.parse_s = parse_s
+        self.parses = 0
+
+    def detect_ui_elements(self, image_path, ocr_config=None):
+        time.sleep(self.parse_s)
+        self.parses += 1
+        with Image.open(image_path) as img:
+            index = img.getpixel((0, 0))[0]
+        return [BoundingBox(100, 100, 180, 40, 0.99, "text", f"Next {index}")]
+
+
+def write_workflow(path: str, steps: int, delay: float, pipeline: bool):
+    config = {
+        "metadata": {
+            "game_name": "Pipeline Bench",
+            "use_ocr_fallback": False,
+            "screen_hash": False,  # Measure the pipeline on its own
+            "pipeline": {"enabled": pipeline},
+        },
+        "steps": {
+            i: {
+                "description": f"Click Next {i - 1}",
+                "find": {"type": "any", "text": f"Next {i - 1}", "text_match": "exact"},
+                "action": {"type": "click", "move_duration": 0},
+                "expected_delay": delay,
+            }
+            for i in range(1, steps + 1)
+        },
+    }
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+
+
+def run_mode(name, args, workdir, pipeline):
+    sut = FakeSUT(args.capture_ms / 1000, args.transition_ms / 1000)
+    vision = FakeOmniParser(args.parse_ms / 1000)
+    config_path = os.path.join(workdir, f"{name}.yaml")
+    write_workflow(config_path, args.steps, args.delay, pipeline)
+
+    times = []
+    saved = 0.0
+    for i in range(args.iterations):
+        sut.reset()
+        automation = SimpleAutomation(config_path, sut, ScreenshotManager(sut), vision,
+                                      run_dir=os.path.join(workdir, f"{name}_{i}"),
+                                      disable_tracing=True)
+        start = time.perf_counter()
+        ok = automation.run()
+        times.append(time.perf_counter() - start)
+        if not ok:
+            print(f"{name}: iteration {i + 1} failed")
+        if automation.speculative_parser:
+            saved += automation.speculative_parser.stats["saved_seconds"]
+
+    avg = sum(times) / len(times)
+    print(f"{name:<10} {avg:7.2f}s per iteration  ({vision.parses} parses)")
+    return avg, saved / args.iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipelined step execution")
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--parse-ms", type=float, default=1200)
+    parser.add_argument("--capture-ms", type=float, default=150)
+    parser.add_argument("--transition-ms", type=float, default=500)
+    parser.add_argument("--delay", type=float, default=2, help="expected_delay per step (seconds)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{args.steps} steps, parse {args.parse_ms:.0f}ms, capture {args.capture_ms:.0f}ms, "
+          f"transition {args.transition_ms:.0f}ms, expected_delay {args.delay}s")
+    with tempfile.TemporaryDirectory() as workdir:
+        serial, _ = run_mode("serial", args, workdir, pipeline=False)
+        pipelined, speculated = run_mode("pipelined", args, workdir, pipeline=True)
+    print(f"saved {serial - pipelined:.2f}s per iteration ({(serial - pipelined) / serial:.0%}), "
+          f"{speculated:.2f}s of parsing overlapped with delays")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark SUT discovery scans over a simulated subnet.
+
+Builds a /22 on loopback (127.1.0.0/22, 1022 hosts) out of local listeners:
+  - SUTs: answer GET /status with the RPX signature
+  - other services: listen on the SUT port but aren't SUTs
+  - silent hosts: drop connection attempts (a listener with a full accept
+    queue), like an address with nothing behind it on a real LAN
+  - everything else refuses the connection
+
+and scans it with SUTDiscoveryService: first the old way (5 threads,
+blocking 1 s connect then /status per host), then with the async scanner -
+a cold scan, a warm one (dead hosts backing off) and a forced one (backoff
+ignored, as for a user-requested scan).
+
+Usage:
+    python bench_subnet_scan.py [--suts 20] [--others 10] [--silent 200] [--skip-legacy]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.core.config import BackendConfig  # noqa: E402
+from backend.discovery.device_registry import DeviceRegistry  # noqa: E402
+from backend.discovery.sut_discovery import SUTDiscoveryService  # noqa: E402
+
+SUBNET = "127.1.0.0/22"
+PORT = 18090
+
+
+class SimulatedSubnet:
+    """Listeners standing in for the hosts of a subnet"""
+
+    def __init__(self, args):
+        hosts = [f"127.1.{i // 256}.{i % 256}" for i in range(1, 1023)]
+        random.shuffle(hosts)
+        self.suts = hosts[:args.suts]
+        self.others = hosts[args.suts:args.suts + args.others]
+        self.silent = hosts[args.suts + args.others:args.suts + args.others + args.silent]
+        self._sockets = []
+        self.loop = asyncio.new_event_loop()
+
+    async def _serve(self, ip: str, body: bytes, status: bytes):
+        async def handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+                await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+        await asyncio.start_server(handle, ip, PORT)
+
+    def _silence(self, ip: str):
+        listener = socket.socket()
+        listener.bind((ip, PORT))
+        listener.listen(0)
+        self._sockets.append(listener)
+        # Fill the accept queue; further SYNs are dropped
+        for _ in range(2):
+            filler = socket.socket()
+            filler.setblocking(False)
+            try:
+                filler.connect((ip, PORT))
+            except BlockingIOError:
+                pass
+            self._sockets.append(filler)
+
+    def start(self):
+        async def setup():
+            for i, ip in enumerate(self.suts):
+                status = {"rpx_sut_signature": "rpx_sut_v1", "device_id": f"bench-sut-{i:03d}",
+                          "hostname": f"BENCH-{i:03d}", "version": "bench", "capabilities": ["basic_clicks"]}
+                await self._serve(ip, json.dumps(status).encode(), b"200 OK")
+            for ip in self.others:
+                await self._serve(ip, b'{"error": "not found"}', b"404 Not Found")
+
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(setup())
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(30)
+        for ip in self.silent:
+            self._silence(ip)
+        time.sleep(0.2)
+
+
+def make_service(tmp: str) -> SUTDiscoveryService:
+    config = BackendConfig()
+    config.network_ranges = [SUBNET]
+    config.sut_port = PORT
+    registry = DeviceRegistry(persistence_file=str(Path(tmp) / "paired_devices.json"))
+    return SUTDiscoveryService(config, registry)
+
+
+def legacy_scan(service: SUTDiscoveryService) -> int:
+    """The old general scan: 5 threads of blocking connect + /status"""
+    def scan_ip(ip: str):
+        try:
+            with socket.create_connection((ip, service.config.sut_port), timeout=1):
+                pass
+        except OSError:
+            return None
+        return service._query_sut(ip)
+
+    found = 0
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(scan_ip, ip) for ip in service.target_ips]
+        for future in as_completed(futures):
+            if future.result():
+                found += 1
+    return found
+
+
+def timed(name: str, service: SUTDiscoveryService, scan) -> int:
+    start = time.perf_counter()
+    found = scan()
+    elapsed = time.perf_counter() - start
+    last = service.scanner.last_scan
+    probed = f"probed {last['probed']:4d}  timeout {last['timeout'] * 1000:4.0f} ms" if last else ""
+    print(f"{name:<8} {elapsed:7.2f} s   {found:3d} SUTs found   {probed}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SUT discovery over a simulated subnet")
+    parser.add_argument("--suts", type=int, default=20)
+    parser.add_argument("--others", type=int, default=10, help="non-SUT services on the SUT port")
+    parser.add_argument("--silent", type=int, default=200, help="hosts that drop connection attempts")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    random.seed(7)
+
+    subnet = SimulatedSubnet(args)
+    subnet.start()
+    print(f"{SUBNET}: {args.suts} SUTs, {args.others} other services, {args.silent} silent hosts, "
+          f"{1022 - args.suts - args.others - args.silent} refusing")
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.skip_legacy:
+            legacy = make_service(tmp)
+            ok = timed("legacy", legacy, lambda: legacy_scan(legacy)) == args.suts
+
+        service = make_service(tmp)
+        ok = timed("cold", service, lambda: service._scan_hosts(service.target_ips, service._known_ips())) == args.suts and ok
+        ok = timed("warm", service, lambda: service._scan_hosts(service.target_ips, service._known_ips())) == args.suts and ok
+        ok = timed("forced", service, lambda: service._scan_hosts(service.target_ips, service._known_ips(),
+                                                                  force=True)) == args.suts and ok
+        stats = service.scanner.stats()
+        print(f"scanner: {stats['hosts_tracked']} hosts tracked, {stats['backing_off']} backing off, "
+              f"{stats['recently_seen']} recently seen, srtt {stats['srtt_ms']} ms")
+        ok = ok and len(service.registry.get_online_devices()) == args.suts
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark the discovery service SUT proxy.
+
+Runs on loopback with no real SUTs:
+  - a fake SUT serves /status (small JSON) and /screenshot (a large image),
+    counting the TCP connections it is asked to accept
+  - the discovery service's proxy router forwards to it, next to a copy of
+    the old per-call proxy (new AsyncClient per call, body buffered)
+
+The fake SUT stretches each screenshot over several chunks to stand in for a
+slow capture/encode, so time to first byte shows whether the proxy relays the
+body as it arrives or only after it has all of it. Finally the device's
+address is changed in the DeviceRegistry to check the pooled client is
+recycled.
+
+Usage:
+    python bench_sut_proxy.py [--calls 200] [--screenshots 20] [--image-mb 4]
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(root / "sut_discovery_service" / "src"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from sut_discovery_service.api import proxy_router  # noqa: E402
+from sut_discovery_service.discovery import get_device_registry  # noqa: E402
+
+SUT_PORT = 18082
+PROXY_PORT = 18083
+SUT_ID = "bench-sut"
+
+
+class FakeSUT:
+    def __init__(self, image_bytes: int):
+        self.image = bytes(range(256)) * (image_bytes // 256)
+        self.connections = set()
+
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def count_connections(request: Request, call_next):
+            self.connections.add((request.client.host, request.client.port))
+            return await call_next(request)
+
+        @app.get("/status")
+        async def status():
+            return {"status": "online", "game": {"running": False}}
+
+        @app.get("/screenshot")
+        async def screenshot():
+            async def body():
+                step = len(self.image) // 8
+                for i in range(0, len(self.image), step):
+                    yield self.image[i:i + step]
+                    await asyncio.sleep(0.01)
+            return StreamingResponse(body(), media_type="image/png",
+                                     headers={"Content-Length": str(len(self.image))})
+
+        return app
+
+
+def make_proxy_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(proxy_router, prefix="/api")
+
+    # The proxy as it was: a new client per call and the whole body buffered
+    @app.get("/legacy/suts/{unique_id}/status")
+    async def legacy_status(unique_id: str):
+        device = get_device_registry().get_device_by_id(unique_id)
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            return (await client.get(f"http://{device.ip}:{device.port}/status")).json()
+
+    @app.get("/legacy/suts/{unique_id}/screenshot")
+    async def legacy_screenshot(unique_id: str):
+        device = get_device_registry().get_device_by_id(unique_id)
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            raw = (await client.get(f"http://{device.ip}:{device.port}/screenshot")).content
+        return Response(content=raw, media_type="image/png")
+
+    @app.post("/register")
+    async def register(ip: str):
+        get_device_registry().register_device(ip=ip, port=SUT_PORT, unique_id=SUT_ID, hostname="bench")
+        return {"ok": True}
+
+    return app
+
+
+def serve(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def run(name: str, prefix: str, sut: FakeSUT, args):
+    sut.connections.clear()
+    base = f"http://127.0.0.1:{PROXY_PORT}{prefix}/suts/{SUT_ID}"
+    with httpx.Client(timeout=30.0) as client:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            client.get(f"{base}/status").raise_for_status()
+        status_ms = (time.perf_counter() - start) * 1000 / args.calls
+
+        ttfb, totals = [], []
+        for _ in range(args.screenshots):
+            start = time.perf_counter()
+            with client.stream("GET", f"{base}/screenshot") as response:
+                response.raise_for_status()
+                received = 0
+                for chunk in response.iter_raw():
+                    if not received:
+                        ttfb.append((time.perf_counter() - start) * 1000)
+                    received += len(chunk)
+            totals.append((time.perf_counter() - start) * 1000)
+            assert received == len(sut.image), received
+
+    print(f"{name:<8} status {status_ms:5.2f} ms/call   screenshot first byte {statistics.median(ttfb):6.1f} ms  "
+          f"complete {statistics.median(totals):6.1f} ms   SUT connections {len(sut.connections)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the discovery service SUT proxy")
+    parser.add_argument("--calls", type=int, default=200, help="small JSON calls")
+    parser.add_argument("--screenshots", type=int, default=20)
+    parser.add_argument("--image-mb", type=float, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    sut = FakeSUT(int(args.image_mb * 1024 * 1024))
+    serve(sut.app(), SUT_PORT)
+    serve(make_proxy_app(), PROXY_PORT)
+    httpx.post(f"http://127.0.0.1:{PROXY_PORT}/register", params={"ip": "127.0.0.1"}).raise_for_status()
+
+    print(f"{args.calls} status calls, {args.screenshots} screenshots of {args.image_mb} MB")
+    run("legacy", "/legacy", sut, args)
+    run("pooled", "/api", sut, args)
+
+    # Device moves: the next call must reach it through a new client
+    httpx.post(f"http://127.0.0.1:{PROXY_PORT}/register", params={"ip": "localhost"}).raise_for_status()
+    httpx.get(f"http://127.0.0.1:{PROXY_PORT}/api/suts/{SUT_ID}/status").raise_for_status()
+    stats = httpx.get(f"http://127.0.0.1:{PROXY_PORT}/api/proxy-stats").json()["suts"][0]
+    print(f"after IP change: client for {stats['ip']}:{stats['port']}, recycled {stats['recycled']}, "
+          f"{stats['requests']} requests, {stats['errors']} errors, latency {stats['latency_ms']}")
+    return 0 if stats["ip"] == "localhost" and stats["recycled"] == 1 and stats["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark SUT calls over the WebSocket RPC channel against direct HTTP.
+
+Runs on loopback with no real SUTs. The discovery service's SUT and proxy
+routers serve on one port; fake SUTs connect to its /ws/sut socket:
+  - "bench-rpc" advertises the "rpc" capability and answers rpc_request
+    messages; its HTTP port is unreachable, as for a SUT behind NAT
+  - "bench-http" has no RPC, so the passthrough falls back to its HTTP
+    server (through the pooled client)
+  - "bench-flask" (only if Flask is installed) answers through the SUT
+    client's own RPC handler and a Flask app with the same routes
+
+Both serve /status (small JSON), /echo (POST, JSON body) and /screenshot (a
+large body sent over several chunks to stand in for a slow capture). The
+script times sequential and concurrent calls through
+/api/suts/{id}/rpc/..., then drops the RPC SUT's socket to check a call
+fails cleanly instead of hanging.
+
+Usage:
+    python bench_sut_rpc.py [--calls 200] [--concurrent 20] [--screenshots 20] [--image-mb 4]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(root / "sut_discovery_service" / "src"))
+sys.path.insert(0, str(root / "sut_client" / "src"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+import websockets  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from sut_discovery_service.api import proxy_router, suts_router  # noqa: E402
+
+try:
+    from flask import Flask, Response, jsonify, request  # noqa: E402
+    from sut_client.ws_client import WebSocketClient  # noqa: E402
+    FLASK_AVAILABLE = True
+except ImportError:
+    FLASK_AVAILABLE = False
+
+GATEWAY_PORT = 18084
+SUT_HTTP_PORT = 18085
+UNREACHABLE_PORT = 1
+RPC_SUT = "bench-rpc"
+HTTP_SUT = "bench-http"
+FLASK_SUT = "bench-flask"
+CHUNKS = 8
+
+
+class FakeSUT:
+    """SUT API over HTTP and over the RPC protocol, with the same bodies"""
+
+    def __init__(self, image_bytes: int):
+        self.image = bytes(range(256)) * (image_bytes // 256)
+        self.http_connections = set()
+        self.loop = None
+        self.sockets = {}
+
+    def status(self):
+        return {"status": "online", "game": {"running": False}}
+
+    async def screenshot_chunks(self):
+        step = len(self.image) // CHUNKS
+        for i in range(0, len(self.image), step):
+            yield self.image[i:i + step]
+            await asyncio.sleep(0.01)
+
+    def http_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def count_connections(request: Request, call_next):
+            self.http_connections.add((request.client.host, request.client.port))
+            return await call_next(request)
+
+        @app.get("/status")
+        async def status():
+            return self.status()
+
+        @app.post("/echo")
+        async def echo(request: Request):
+            return {"echo": await request.json()}
+
+        @app.get("/screenshot")
+        async def screenshot():
+            return StreamingResponse(self.screenshot_chunks(), media_type="image/png",
+                                     headers={"Content-Length": str(len(self.image))})
+
+        return app
+
+    def flask_app(self):
+        app = Flask(__name__)
+
+        @app.route("/status")
+        def status():
+            return jsonify(self.status())
+
+        @app.route("/echo", methods=["POST"])
+        def echo():
+            return jsonify({"echo": request.get_json()})
+
+        @app.route("/screenshot")
+        def screenshot():
+            def chunks():
+                step = len(self.image) // CHUNKS
+                for i in range(0, len(self.image), step):
+                    yield self.image[i:i + step]
+                    time.sleep(0.01)
+            return Response(chunks(), mimetype="image/png", headers={"Content-Length": str(len(self.image))})
+
+        return app
+
+    async def connect(self, sut_id: str, rpc: bool, port: int, handler=None):
+        ws = await websockets.connect(f"ws://127.0.0.1:{GATEWAY_PORT}/api/ws/sut/{sut_id}", max_size=None)
+        await ws.send(json.dumps({"type": "register", "ip": "127.0.0.1", "port": port,
+                                  "hostname": sut_id, "capabilities": ["rpc"] if rpc else []}))
+        await ws.recv()  # register_ack
+        self.sockets[sut_id] = ws
+        asyncio.ensure_future(self._serve(ws, handler or self._answer))
+
+    async def _serve(self, ws, handler):
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                if message.get("type") == "rpc_request":
+                    asyncio.ensure_future(handler(ws, message))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _answer(self, ws, message):
+        request_id, path = message["id"], message["path"]
+        reply = {"type": "rpc_response", "id": request_id, "status": 200}
+        if path == "/status":
+            await ws.send(json.dumps(dict(reply, json=self.status())))
+        elif path == "/echo":
+            await ws.send(json.dumps(dict(reply, json={"echo": message.get("json")})))
+        elif path == "/screenshot":
+            await ws.send(json.dumps(dict(reply, headers={"Content-Type": "image/png"}, stream=True)))
+            async for chunk in self.screenshot_chunks():
+                await ws.send(request_id.encode("ascii") + chunk)
+            await ws.send(json.dumps({"type": "rpc_end", "id": request_id}))
+        else:
+            await ws.send(json.dumps(dict(reply, status=404, json={"error": "not found"})))
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.connect(RPC_SUT, True, UNREACHABLE_PORT))
+            self.loop.run_until_complete(self.connect(HTTP_SUT, False, SUT_HTTP_PORT))
+            if FLASK_AVAILABLE:
+                client = WebSocketClient(FLASK_SUT, "127.0.0.1", GATEWAY_PORT, rpc_app=self.flask_app())
+                self.loop.run_until_complete(self.connect(FLASK_SUT, True, UNREACHABLE_PORT, client._handle_rpc))
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait(10)
+
+    def drop(self, sut_id: str):
+        asyncio.run_coroutine_threadsafe(self.sockets[sut_id].close(), self.loop).result(5)
+
+
+def serve(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def run(sut_id: str, sut: FakeSUT, args) -> bool:
+    base = f"http://127.0.0.1:{GATEWAY_PORT}/api/suts/{sut_id}/rpc"
+    sut.http_connections.clear()
+    with httpx.Client(timeout=30.0) as client:
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            client.get(f"{base}/status").raise_for_status()
+        status_ms = (time.perf_counter() - start) * 1000 / args.calls
+
+        echo = client.post(f"{base}/echo", json={"action": "click", "x": 10, "y": 20})
+        echo_ok = echo.json() == {"echo": {"action": "click", "x": 10, "y": 20}}
+
+        with ThreadPoolExecutor(args.concurrent) as pool:
+            start = time.perf_counter()
+            list(pool.map(lambda _: client.get(f"{base}/status").raise_for_status(), range(args.calls)))
+            concurrent_ms = (time.perf_counter() - start) * 1000 / args.calls
+
+        ttfb, totals = [], []
+        for _ in range(args.screenshots):
+            start = time.perf_counter()
+            with client.stream("GET", f"{base}/screenshot") as response:
+                response.raise_for_status()
+                received = 0
+                for chunk in response.iter_raw():
+                    if not received:
+                        ttfb.append((time.perf_counter() - start) * 1000)
+                    received += len(chunk)
+            totals.append((time.perf_counter() - start) * 1000)
+            assert received == len(sut.image), received
+
+    print(f"{sut_id:<10} status {status_ms:5.2f} ms/call  x{args.concurrent} {concurrent_ms:5.2f} ms/call   "
+          f"screenshot first byte {statistics.median(ttfb):6.1f} ms  complete {statistics.median(totals):6.1f} ms   "
+          f"SUT HTTP connections {len(sut.http_connections)}   echo {'ok' if echo_ok else 'WRONG'}")
+    return echo_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SUT calls over WebSocket RPC vs HTTP")
+    parser.add_argument("--calls", type=int, default=200, help="small JSON calls")
+    parser.add_argument("--concurrent", type=int, default=20, help="callers for the concurrent run")
+    parser.add_argument("--screenshots", type=int, default=20)
+    parser.add_argument("--image-mb", type=float, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    gateway = FastAPI()
+    gateway.include_router(suts_router, prefix="/api")
+    gateway.include_router(proxy_router, prefix="/api")
+    sut = FakeSUT(int(args.image_mb * 1024 * 1024))
+    serve(sut.http_app(), SUT_HTTP_PORT)
+    serve(gateway, GATEWAY_PORT)
+    sut.start()
+
+    print(f"{args.calls} status calls, {args.screenshots} screenshots of {args.image_mb} MB")
+    ok = run(HTTP_SUT, sut, args)
+    ok = run(RPC_SUT, sut, args) and ok
+    if FLASK_AVAILABLE:
+        ok = run(FLASK_SUT, sut, args) and ok
+    else:
+        print(f"{FLASK_SUT}: skipped, Flask is not installed")
+    stats = {s["unique_id"]: s for s in httpx.get(f"http://127.0.0.1:{GATEWAY_PORT}/api/proxy-stats").json()["suts"]}
+    rpc_stats = stats[RPC_SUT]
+    print(f"{RPC_SUT}: {rpc_stats['rpc_requests']}/{rpc_stats['requests']} requests over RPC, "
+          f"{rpc_stats['errors']} errors, latency {rpc_stats['latency_ms']}")
+
+    # Socket gone and no reachable HTTP port: an error, not a hang
+    sut.drop(RPC_SUT)
+    time.sleep(0.2)
+    start = time.perf_counter()
+    response = httpx.get(f"http://127.0.0.1:{GATEWAY_PORT}/api/suts/{RPC_SUT}/rpc/status", timeout=30.0)
+    print(f"after disconnect: {response.status_code} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    return 0 if ok and rpc_stats["rpc_requests"] == rpc_stats["requests"] and response.status_code >= 400 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
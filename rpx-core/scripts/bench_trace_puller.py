@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark TracePuller against a loopback SUT stand-in.
+
+Real SUTs are Windows machines running OpenSSH, so the remote commands the
+puller sends (PowerShell listings, tar.exe) can't run against a local Linux
+sshd. Instead, `ssh`, `scp` and `sftp` shims are put first on PATH. They
+serve a fake SUT filesystem from a temp directory and simulate:
+  - a per-connection handshake cost (skipped when a ControlPath master
+    connection is already open, as with real ControlMaster multiplexing)
+  - a per-stream bandwidth cap (a single SSH channel rarely fills the link)
+  - optionally, every file's first sftp transfer dropping part way through
+    (--interrupt-kb), to exercise resume via reget
+
+The same run is pulled three times: serially without multiplexing or tar
+(one sftp per file), with the default parallel engine, and with the parallel
+engine but no multiplexing (as on a Windows Master without paramiko).
+Pulled files are checked against the source and per-agent throughput is
+printed.
+
+Usage:
+    python bench_trace_puller.py [--ptat-files 40] [--ptat-kb 512] [--socwatch-files 2]
+                                 [--socwatch-mb 8] [--handshake-ms 150] [--stream-mbps 200]
+                                 [--interrupt-kb 0]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import random
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Make the backend package importable when run from the scripts folder
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.trace_puller import TracePuller  # noqa: E402
+
+RUN_ID = "bench-run-0001"
+TRACE_ROOT = r"C:\Traces"
+
+SHIM = r'''#!{python}
+"""ssh/scp/sftp stand-in serving a fake Windows SUT from RPX_FAKE_SUT_ROOT"""
+import gzip, hashlib, os, re, shlex, shutil, sys, tarfile, time
+
+ROOT = os.environ["RPX_FAKE_SUT_ROOT"]
+HANDSHAKE = float(os.environ.get("RPX_FAKE_HANDSHAKE_MS", "150")) / 1000
+RATE = float(os.environ.get("RPX_FAKE_STREAM_MBPS", "200")) * 1e6 / 8
+INTERRUPT = int(os.environ.get("RPX_FAKE_INTERRUPT_KB", "0")) * 1024
+
+
+def local(path):
+    path = path.replace("\\", "/").lstrip("/")
+    drive, _, rest = path.partition(":")
+    return os.path.join(ROOT, drive.upper(), *[p for p in rest.split("/") if p])
+
+
+class Paced:
+    def __init__(self, out):
+        self.out, self.sent, self.start = out, 0, time.monotonic()
+
+    def write(self, data):
+        self.out.write(data)
+        self.sent += len(data)
+        ahead = self.sent / RATE - (time.monotonic() - self.start)
+        if ahead > 0:
+            time.sleep(ahead)
+        return len(data)
+
+    def flush(self):
+        self.out.flush()
+
+
+def connect(opts, target):
+    control = opts.get("ControlPath")
+    if control and opts.get("ControlMaster") == "auto":
+        marker = control.replace("%C", hashlib.sha1(target.encode()).hexdigest())
+        if os.path.exists(marker):
+            return
+        time.sleep(HANDSHAKE)
+        open(marker, "w").close()
+        return
+    time.sleep(HANDSHAKE)
+
+
+def main(prog, args):
+    opts, positional, control_cmd = {}, [], None
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a == "-o":
+            key, _, value = args[i + 1].partition("=")
+            opts[key] = value
+            i += 2
+        elif a in ("-O", "-l", "-b"):
+            if a == "-O":
+                control_cmd = args[i + 1]
+            i += 2
+        elif a.startswith("-"):
+            i += 1
+        else:
+            positional.append(a)
+            i += 1
+
+    if prog == "scp":
+        src, dst = positional
+        target, _, remote = src.partition(":")
+        connect(opts, target)
+        with open(local(remote), "rb") as f, open(dst, "wb") as out:
+            paced = Paced(out)
+            shutil.copyfileobj(f, paced, 64 * 1024)
+        return 0
+
+    if prog == "sftp":
+        connect(opts, positional[0])
+        for line in sys.stdin.read().splitlines():
+            words = shlex.split(line)
+            if not words or words[0] != "reget":
+                print(f"unsupported sftp command: {line}", file=sys.stderr)
+                return 1
+            src, dst = local(words[1]), words[2]
+            offset = os.path.getsize(dst) if os.path.exists(dst) else 0
+            # First transfer of each file drops after INTERRUPT bytes
+            marker = os.path.join(ROOT, ".interrupted-" + hashlib.sha1(src.encode()).hexdigest())
+            limit = None
+            if INTERRUPT and not os.path.exists(marker):
+                open(marker, "w").close()
+                limit = INTERRUPT
+            with open(src, "rb") as f, open(dst, "ab") as out:
+                f.seek(offset)
+                paced = Paced(out)
+                while True:
+                    chunk = f.read(64 * 1024 if limit is None else min(64 * 1024, limit - paced.sent))
+                    if not chunk:
+                        break
+                    paced.write(chunk)
+                if limit is not None and f.read(1):
+                    print("Connection closed", file=sys.stderr)
+                    return 1
+        return 0
+
+    target, command = positional[0], " ".join(positional[1:])
+    if control_cmd == "exit":
+        control = opts.get("ControlPath", "")
+        marker = control.replace("%C", hashlib.sha1(target.encode()).hexdigest())
+        if os.path.exists(marker):
+            os.remove(marker)
+        return 0
+    connect(opts, target)
+
+    if command == "echo SSH_OK":
+        print("SSH_OK")
+    elif command == "whoami":
+        print("sut\\labuser")
+    elif "Get-ChildItem -LiteralPath" in command:
+        path = local(re.search(r"-LiteralPath '([^']*)'", command).group(1))
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if os.path.isfile(full):
+                    print(f"{os.path.getsize(full)}\t{name}")
+    elif "Get-FileHash -Algorithm SHA256" in command:
+        path = local(re.search(r"-LiteralPath '([^']*)'", command).group(1))
+        with open(path, "rb") as f:
+            print(hashlib.sha256(f.read()).hexdigest().upper())
+    elif command.startswith("tar -czf - -C"):
+        parts = shlex.split(command)
+        base, names = local(parts[4]), parts[5:]
+        out = Paced(sys.stdout.buffer)
+        # Level 6 like tar.exe's gzip filter
+        with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
+            with tarfile.open(fileobj=gz, mode="w|") as tar:
+                for name in names:
+                    tar.add(os.path.join(base, name), arcname=name)
+        out.flush()
+    else:
+        print(f"unsupported command: {command}", file=sys.stderr)
+        return 1
+    return 0
+
+
+sys.exit(main(os.path.basename(sys.argv[0]), sys.argv[1:]))
+'''
+
+
+def write_csv(path: Path, size: int, rng: random.Random):
+    """Trace-like CSV of roughly `size` bytes"""
+    with open(path, "w") as f:
+        f.write("timestamp,package_power,cpu_util,temp\n")
+        written, t = 0, 0
+        while written < size:
+            line = f"{t},{rng.uniform(5, 45):.3f},{rng.uniform(0, 100):.2f},{rng.randint(40, 95)}\n"
+            f.write(line)
+            written += len(line)
+            t += 100
+
+
+def make_sut(root: Path, args) -> dict:
+    rng = random.Random(1)
+    run_dir = root / "C" / "Traces" / RUN_ID
+    run_dir.mkdir(parents=True)
+    for i in range(args.ptat_files):
+        write_csv(run_dir / f"ptat_{i:03d}.csv", args.ptat_kb * 1024, rng)
+    for i in range(args.socwatch_files):
+        write_csv(run_dir / f"{RUN_ID}_socwatch_{i}.csv", args.socwatch_mb * 1024 * 1024, rng)
+    return {p.name: hashlib.sha256(p.read_bytes()).hexdigest() for p in run_dir.iterdir()}
+
+
+def install_shims(shim_dir: Path):
+    shim_dir.mkdir()
+    for prog in ("ssh", "scp", "sftp"):
+        path = shim_dir / prog
+        path.write_text(SHIM.replace("{python}", sys.executable))
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = str(shim_dir) + os.pathsep + os.environ["PATH"]
+
+
+def run_mode(name: str, workdir: Path, expected: dict, **puller_args) -> float:
+    puller = TracePuller("127.0.0.1", "labuser", retry_delay=0, **puller_args)
+    puller._control_path = str(workdir / f"cm-{name}-%C")
+    local_dir = workdir / name
+    start = time.perf_counter()
+    results = puller.pull_traces(RUN_ID, "Bench", TRACE_ROOT, str(local_dir), ["ptat", "socwatch"])
+    elapsed = time.perf_counter() - start
+    puller.close()
+
+    pulled = {p.name: hashlib.sha256(p.read_bytes()).hexdigest()
+              for p in (local_dir / "traces").rglob("*") if p.is_file()}
+    reported = {f: sha for agent in ("ptat", "socwatch")
+                for f, sha in results[agent].get("checksums", {}).items()}
+    leftovers = list((local_dir / "traces").rglob("*.partial"))
+    ok = pulled == expected and reported == expected and not leftovers
+    print(f"{name:<9} {elapsed:6.2f}s  {results['transfer']['throughput_mbps']:7.1f} Mbit/s  "
+          f"peak concurrency {results['transfer']['concurrency']}  files {'OK' if ok else 'MISMATCH'}")
+    for agent in ("ptat", "socwatch"):
+        t = results[agent].get("transfer", {})
+        print(f"          {agent:<9} {len(results[agent]['files']):3d} files  {t.get('bytes', 0) / 1e6:6.1f} MB  "
+              f"{t.get('seconds', 0):5.2f}s  {t.get('throughput_mbps', 0):7.1f} Mbit/s  via {t.get('method')}")
+    if not ok:
+        raise SystemExit(f"{name}: pulled files do not match the SUT")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TracePuller on a loopback SUT stand-in")
+    parser.add_argument("--ptat-files", type=int, default=40)
+    parser.add_argument("--ptat-kb", type=int, default=512)
+    parser.add_argument("--socwatch-files", type=int, default=2)
+    parser.add_argument("--socwatch-mb", type=int, default=8)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--stream-mbps", type=float, default=200)
+    parser.add_argument("--interrupt-kb", type=int, default=0,
+                        help="drop each file's first sftp transfer after this many KB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        expected = make_sut(workdir / "sut", args)
+        install_shims(workdir / "bin")
+        os.environ["RPX_FAKE_SUT_ROOT"] = str(workdir / "sut")
+        os.environ["RPX_FAKE_HANDSHAKE_MS"] = str(args.handshake_ms)
+        os.environ["RPX_FAKE_STREAM_MBPS"] = str(args.stream_mbps)
+        os.environ["RPX_FAKE_INTERRUPT_KB"] = str(args.interrupt_kb)
+
+        print(f"{len(expected)} files, handshake {args.handshake_ms:.0f}ms, "
+              f"{args.stream_mbps:.0f} Mbit/s per stream")
+        serial = run_mode("serial", workdir, expected, multiplex=False,
+                          max_parallel_transfers=1, tar_threshold=0)
+        parallel = run_mode("parallel", workdir, expected, multiplex=True)
+        # What a Windows Master without paramiko gets: parallel and tar, no shared connection
+        windows = run_mode("no-mux", workdir, expected, multiplex=False)
+    print(f"speedup {serial / parallel:.1f}x ({serial / windows:.1f}x without multiplexing)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
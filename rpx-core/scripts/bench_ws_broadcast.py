@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark WebSocketManager.broadcast against a simulated fleet.
+
+Connects 200 simulated SUT sockets to the discovery service's
+WebSocketManager. Each send takes a random few milliseconds; a handful of
+sockets are half-dead (sends never complete) and a few fail outright.
+
+The sequential fan-out the manager used to do is replayed with the same
+per-send timeout for comparison (without the timeout, as before, the first
+half-dead socket would stall it for good).
+
+Usage:
+    python bench_ws_broadcast.py [--suts 200] [--hung 5] [--broken 3] [--send-ms 2-20]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(root / "sut_discovery_service" / "src"))
+
+from sut_discovery_service.discovery.websocket_manager import SEND_TIMEOUT, WebSocketManager  # noqa: E402
+
+
+class FakeSocket:
+    """Stands in for a SUT's WebSocket: healthy, hung or broken"""
+
+    def __init__(self, send_ms, mode: str = "ok"):
+        self.send_ms = send_ms
+        self.mode = mode
+        self.received = 0
+        self.closed = False
+
+    async def send_json(self, data):
+        if self.mode == "hung":
+            await asyncio.Event().wait()
+        if self.mode == "broken":
+            raise ConnectionResetError("connection reset by peer")
+        await asyncio.sleep(random.uniform(*self.send_ms) / 1000)
+        self.received += 1
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        if self.mode == "hung":
+            await asyncio.Event().wait()
+        self.closed = True
+
+
+async def connect_fleet(manager: WebSocketManager, args):
+    modes = ["hung"] * args.hung + ["broken"] * args.broken
+    modes += ["ok"] * (args.suts - len(modes))
+    random.shuffle(modes)
+    sockets = {}
+    for i, mode in enumerate(modes):
+        sut_id = f"sut-{i:03d}"
+        sockets[sut_id] = FakeSocket(args.send_ms, mode)
+        await manager.connect(sut_id, sockets[sut_id], {"ip": f"10.0.{i // 250}.{i % 250}"})
+    return sockets
+
+
+async def sequential(manager: WebSocketManager, command):
+    """The old broadcast: one send_command after another"""
+    results = {}
+    for sut_id in list(manager._connections.keys()):
+        results[sut_id] = await manager.send_command(sut_id, command)
+    return results
+
+
+async def run(args):
+    command = {"type": "update_available", "master_ip": "10.0.0.1", "version": "bench"}
+
+    manager = WebSocketManager()
+    await connect_fleet(manager, args)
+    start = time.perf_counter()
+    results = await sequential(manager, command)
+    old_s = time.perf_counter() - start
+    print(f"sequential  {old_s:7.2f}s  {sum(results.values())}/{len(results)} delivered")
+
+    manager = WebSocketManager()
+    sockets = await connect_fleet(manager, args)
+    start = time.perf_counter()
+    results = await manager.broadcast(command, concurrency=args.concurrency)
+    new_s = time.perf_counter() - start
+    ok = [r["latency_ms"] for r in results.values() if r["success"]]
+    print(f"concurrent  {new_s:7.2f}s  {len(ok)}/{len(results)} delivered  "
+          f"latency p50 {statistics.median(ok):.1f}ms max {max(ok):.1f}ms  "
+          f"({len(results) - len(ok)} evicted, {manager.online_count} still connected)")
+    print(f"speedup {old_s / new_s:.0f}x")
+
+    # A second broadcast only reaches the healthy sockets, without waiting on any timeout
+    start = time.perf_counter()
+    again = await manager.broadcast(command, concurrency=args.concurrency)
+    print(f"second broadcast {time.perf_counter() - start:.2f}s to {len(again)} SUTs")
+
+    healthy = [s for s in sockets.values() if s.mode == "ok"]
+    return (len(ok) == len(healthy) == manager.online_count and all(s.received == 2 for s in healthy)
+            and new_s < SEND_TIMEOUT + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent WebSocket broadcast")
+    parser.add_argument("--suts", type=int, default=200)
+    parser.add_argument("--hung", type=int, default=5, help="sockets whose sends never complete")
+    parser.add_argument("--broken", type=int, default=3, help="sockets whose sends fail")
+    parser.add_argument("--send-ms", default="2-20", help="send time range for healthy sockets")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    low, high = (float(v) for v in args.send_ms.split("-"))
+    args.send_ms = (low, high)
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger().setLevel(logging.CRITICAL)
+    random.seed(7)
+    print(f"{args.suts} SUTs ({args.hung} hung, {args.broken} broken), sends {args.send_ms[0]:g}-{args.send_ms[1]:g}ms, "
+          f"timeout {SEND_TIMEOUT:g}s, concurrency {args.concurrency}")
+    return 0 if asyncio.run(run(args)) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Check TracePuller's paramiko session path against a loopback SSH server.
+
+Windows Masters pull traces over one persistent paramiko session
+(backend/core/ssh_session.py) instead of the OpenSSH CLI, which
+bench_trace_puller.py shims. This script starts an in-process paramiko server
+on 127.0.0.1 that plays a Windows SUT:
+  - exec requests for the commands the puller sends (whoami, echo SSH_OK,
+    the PowerShell listing and Get-FileHash, tar -czf -)
+  - the sftp subsystem, serving a fake C: drive from a temp directory
+
+It then drives the puller through every remote call and checks that all of
+them shared a single connection. The tar command also writes --stderr-kb of
+stderr before its archive (more than a channel window by default), which
+stalls the stream unless stderr is drained while stdout is read.
+
+Requires paramiko (pip install rpx[ssh]). Exits non-zero on any failure.
+
+Usage:
+    python check_ssh_session.py [--files 20] [--file-kb 256] [--stderr-kb 4096]
+"""
+
+import argparse
+import hashlib
+import io
+import logging
+import os
+import re
+import socket
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import paramiko
+except ImportError:
+    sys.exit("paramiko is required: pip install rpx[ssh]")
+
+# Make the backend package importable when run from the scripts folder
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.ssh_session import SSHSession  # noqa: E402
+from backend.core.trace_puller import TracePuller  # noqa: E402
+
+REMOTE_DIR = r"C:\Traces\run-0001\ptat"
+
+
+class FakeSUT:
+    """Windows paths on a temp directory (C:\\x -> <root>/C/x)"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def local(self, path: str) -> str:
+        path = path.replace("\\", "/").lstrip("/")
+        drive, _, rest = path.partition(":")
+        return os.path.join(self.root, drive.upper(), *[p for p in rest.split("/") if p])
+
+
+class SFTPHandle(paramiko.SFTPHandle):
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+def make_sftp_interface(sut: FakeSUT):
+    class SFTPInterface(paramiko.SFTPServerInterface):
+        def stat(self, path):
+            try:
+                return paramiko.SFTPAttributes.from_stat(os.stat(sut.local(path)))
+            except OSError as e:
+                return paramiko.SFTPServer.convert_errno(e.errno)
+
+        lstat = stat
+
+        def list_folder(self, path):
+            try:
+                entries = []
+                for name in os.listdir(sut.local(path)):
+                    attr = paramiko.SFTPAttributes.from_stat(os.stat(os.path.join(sut.local(path), name)))
+                    attr.filename = name
+                    entries.append(attr)
+                return entries
+            except OSError as e:
+                return paramiko.SFTPServer.convert_errno(e.errno)
+
+        def open(self, path, flags, attr):
+            try:
+                handle = SFTPHandle(flags)
+                handle.readfile = open(sut.local(path), "rb")
+                handle.filename = sut.local(path)
+                return handle
+            except OSError as e:
+                return paramiko.SFTPServer.convert_errno(e.errno)
+
+    return SFTPInterface
+
+
+class Server(paramiko.ServerInterface):
+    """Accepts one user key and answers the puller's commands"""
+
+    def __init__(self, sut: FakeSUT, user_key: paramiko.PKey, stderr_bytes: int):
+        self.sut = sut
+        self.user_key = user_key
+        self.stderr_bytes = stderr_bytes
+
+    def get_allowed_auths(self, username):
+        return "publickey"
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL if key == self.user_key else paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self._run, args=(channel, command.decode()), daemon=True).start()
+        return True
+
+    def _run(self, channel, command: str):
+        # Let the exec reply reach the client before any output
+        time.sleep(0.05)
+        status = 0
+        try:
+            if command == "whoami":
+                channel.sendall(b"sut\\labuser\r\n")
+            elif command == "echo SSH_OK":
+                channel.sendall(b"SSH_OK\r\n")
+            elif "Get-FileHash" in command:
+                path = re.search(r"LiteralPath '([^']+)'", command).group(1)
+                digest = hashlib.sha256(Path(self.sut.local(path)).read_bytes()).hexdigest()
+                channel.sendall(digest.upper().encode() + b"\r\n")
+            elif "Get-ChildItem" in command:
+                path = re.search(r"LiteralPath '([^']+)'", command).group(1)
+                directory = Path(self.sut.local(path))
+                lines = [f"{p.stat().st_size}\t{p.name}" for p in sorted(directory.iterdir()) if p.is_file()]
+                channel.sendall(("\r\n".join(lines) + "\r\n").encode())
+            elif command.startswith("tar "):
+                directory = re.search(r'-C "([^"]+)"', command).group(1)
+                names = re.findall(r'"([^"]+)"', command.split(" -C ", 1)[1])[1:]
+                # A chatty command: its stderr must not block the archive behind it
+                channel.sendall_stderr(b"tar: warning\n" * (self.stderr_bytes // 13))
+                buffer = io.BytesIO()
+                with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+                    for name in names:
+                        tar.add(self.sut.local(f"{directory}\\{name}"), arcname=name)
+                channel.sendall(buffer.getvalue())
+            else:
+                channel.sendall_stderr(f"unsupported command: {command}\n".encode())
+                status = 1
+        except Exception as e:
+            logging.error(f"Fake SUT command failed: {e}")
+            status = 1
+        channel.send_exit_status(status)
+        channel.close()
+
+
+def serve(listener: socket.socket, sut: FakeSUT, host_key, user_key, stderr_bytes: int, connections: list):
+    while True:
+        try:
+            conn, _ = listener.accept()
+        except OSError:
+            return
+        connections.append(conn)
+        transport = paramiko.Transport(conn)
+        transport.add_server_key(host_key)
+        transport.set_subsystem_handler("sftp", paramiko.SFTPServer, make_sftp_interface(sut))
+        transport.start_server(server=Server(sut, user_key, stderr_bytes))
+
+
+def make_sut(root: Path, files: int, file_kb: int) -> dict:
+    """Trace files on the fake SUT; returns name -> sha256"""
+    sut = FakeSUT(root)
+    directory = Path(sut.local(REMOTE_DIR))
+    (directory / "sub").mkdir(parents=True)
+    expected = {}
+    for i in range(files):
+        data = os.urandom(file_kb * 1024)
+        (directory / f"trace_{i:03d}.csv").write_bytes(data)
+        expected[f"trace_{i:03d}.csv"] = hashlib.sha256(data).hexdigest()
+    (directory / "sub" / "nested.txt").write_bytes(b"nested")
+    return expected
+
+
+def check(name: str, ok: bool):
+    print(f"{name:<32} {'OK' if ok else 'FAILED'}")
+    if not ok:
+        raise SystemExit(f"{name} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the paramiko session path on a loopback SSH server")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--file-kb", type=int, default=256)
+    parser.add_argument("--stderr-kb", type=int, default=4096,
+                        help="stderr the tar command writes before its archive")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        expected = make_sut(workdir / "sut", args.files, args.file_kb)
+        sut = FakeSUT(workdir / "sut")
+        host_key = paramiko.RSAKey.generate(2048)
+        user_key = paramiko.RSAKey.generate(2048)
+        key_file = workdir / "id_rsa"
+        user_key.write_private_key_file(str(key_file))
+
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        port = listener.getsockname()[1]
+        connections = []
+        threading.Thread(target=serve, daemon=True,
+                         args=(listener, sut, host_key, user_key, args.stderr_kb * 1024, connections)).start()
+
+        puller = TracePuller("127.0.0.1", "labuser", ssh_timeout=10, max_retries=1, multiplex=False)
+        # What a Windows Master gets: every remote call over one paramiko session
+        puller._session = SSHSession("127.0.0.1", "labuser", timeout=10, port=port, key_filename=str(key_file))
+        puller.multiplex = True
+        local = workdir / "local"
+        names = sorted(expected)
+        try:
+            check("test_connection", puller.test_connection(with_retry=False)[0])
+            check("whoami", puller._get_sut_username() == "labuser")
+            entries = puller.list_remote_entries(REMOTE_DIR)
+            check("list_remote_entries", entries == {n: args.file_kb * 1024 for n in names})
+            check("remote_checksum",
+                  puller.remote_checksum(f"{REMOTE_DIR}\\{names[0]}") == expected[names[0]])
+
+            # Resume: a partial download continues from its current size
+            target = local / "single" / names[0]
+            target.parent.mkdir(parents=True)
+            source = Path(sut.local(f"{REMOTE_DIR}\\{names[0]}")).read_bytes()
+            Path(str(target) + TracePuller.PARTIAL_SUFFIX).write_bytes(source[:1000])
+            pulled = puller.pull_file(f"{REMOTE_DIR}\\{names[0]}", str(target))
+            check("pull_file (resumed)", pulled and target.read_bytes() == source)
+
+            start = time.monotonic()
+            extracted, _ = puller.pull_files_as_tar(REMOTE_DIR, names, str(local / "tar"), entries,
+                                                    stream_timeout=60)
+            tar_ok = (sorted(extracted) == names and all(
+                hashlib.sha256((local / "tar" / n).read_bytes()).hexdigest() == expected[n] for n in names))
+            check(f"tar stream ({args.stderr_kb} KB stderr)", tar_ok and time.monotonic() - start < 30)
+
+            count = puller.pull_directory(REMOTE_DIR, str(local / "dir"))
+            check("pull_directory", count == len(names) + 1
+                  and (local / "dir" / "sub" / "nested.txt").read_bytes() == b"nested")
+
+            check("one connection", len(connections) == 1 and puller._session.connects == 1)
+        finally:
+            puller.close()
+            listener.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
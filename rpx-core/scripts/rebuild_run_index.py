@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Rebuild the SQLite run index (logs/runs/run_index.db) from the run
+manifests on disk.
+
+Use this after copying, moving or deleting run folders by hand, or if the
+index is suspected to be out of sync. The backend must not be running.
+
+Usage:
+    python rebuild_run_index.py [--logs-dir PATH]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Make the backend package importable when run from the scripts folder
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.run_index import RunIndex  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rebuild the run index from manifests on disk'
+    )
+    parser.add_argument(
+        '--logs-dir', '-d',
+        type=Path,
+        default=None,
+        help='Path to logs/runs directory (default: rpx-core/logs/runs)'
+    )
+
+    args = parser.parse_args()
+
+    if args.logs_dir:
+        logs_dir = args.logs_dir
+    else:
+        # Default: look relative to script location
+        logs_dir = Path(__file__).parent.parent / "logs" / "runs"
+
+    if not logs_dir.exists():
+        logger.error(f"Logs directory not found: {logs_dir}")
+        return 1
+
+    index = RunIndex(logs_dir / "run_index.db")
+    count = index.rebuild(logs_dir)
+    logger.info(f"Indexed {count} runs in {index.db_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
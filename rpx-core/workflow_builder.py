@@ -24,7 +24,7 @@ from datetime import datetime
 # Import existing modules
 from modules.network import NetworkManager
 from modules.screenshot import ScreenshotManager
-from modules.omniparser_client import OmniparserClient
+from modules.omniparser_client import OmniparserClient, PARSE_PRIORITY_INTERACTIVE
 from modules.vision_client import VisionClient, BoundingBox
 
 logging.basicConfig(
@@ -1429,7 +1429,8 @@ class WorkflowBuilderGUI:
                 ip = self.omniparser_ip.get()
                 port = self.omniparser_port.get()
                 url = f"http://{ip}:{port}"
-                self.vision_model = OmniparserClient(url)
+                # Interactive parses jump ahead of queued campaign steps
+                self.vision_model = OmniparserClient(url, priority=PARSE_PRIORITY_INTERACTIVE)
                 # Save connection for this model
                 self.omniparser_connection = self.vision_model
                 model_name = "Omniparser"
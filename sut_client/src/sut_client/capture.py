@@ -0,0 +1,158 @@
+"""
+Screen Capture for SUT Client
+Frame sources and image encoding for the /screenshot endpoint
+
+Frames come from a CaptureBackend so the encoding path can run without a
+Windows desktop: SUT_CLIENT_CAPTURE_BACKEND=synthetic serves generated frames
+instead of ImageGrab (e.g. for testing on Linux).
+"""
+
+import io
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+logger = logging.getLogger(__name__)
+
+# encoding -> (PIL format, mimetype)
+ENCODINGS: Dict[str, Tuple[str, str]] = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+ENCODING_ALIASES = {"jpg": "jpeg"}
+
+
+class CaptureBackend(ABC):
+    """Source of screen frames"""
+
+    name = "base"
+
+    @abstractmethod
+    def grab(self, bbox: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+        """
+        Capture the screen.
+
+        Args:
+            bbox: (left, top, right, bottom) region, or None for the full screen
+        """
+
+
+class ImageGrabBackend(CaptureBackend):
+    """Desktop capture via PIL's ImageGrab"""
+
+    name = "imagegrab"
+
+    def grab(self, bbox=None) -> Image.Image:
+        from PIL import ImageGrab
+        return ImageGrab.grab(bbox=bbox)
+
+
+class SyntheticBackend(CaptureBackend):
+    """
+    Generated frames for testing without a desktop.
+
+    Each grab returns a UI-like frame (grainy gradient background, panels,
+    rows of "text") with a box that moves a little every frame, so encoders and
+    frame-difference checks see realistic content that changes over time.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, width: int = 1920, height: int = 1080):
+        self.width = width
+        self.height = height
+        self._frame = 0
+        self._lock = threading.Lock()
+        self._background = self._make_background()
+
+    def _make_background(self) -> Image.Image:
+        gradient = Image.linear_gradient("L").resize((self.width, self.height))
+        img = Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_90).resize(gradient.size),
+                                  Image.new("L", gradient.size, 96)))
+        # Grain so frames compress like rendered scenes rather than flat UI
+        img = Image.blend(img, Image.effect_noise((self.width, self.height), 48).convert("RGB"), 0.2)
+        draw = ImageDraw.Draw(img)
+        panel_w, panel_h = self.width // 3, self.height // 2
+        for i in range(3):
+            left = i * panel_w + 20
+            draw.rectangle([left, 60, left + panel_w - 40, 60 + panel_h], fill=(24, 28, 36), outline=(200, 200, 210))
+            for row in range(0, panel_h - 40, 28):
+                draw.text((left + 16, 80 + row), f"Option {i}.{row // 28}  Value {(row * 37) % 100:3d}",
+                          fill=(230, 230, 230))
+        return img
+
+    def grab(self, bbox=None) -> Image.Image:
+        with self._lock:
+            frame = self._frame
+            self._frame += 1
+
+        img = self._background.copy()
+        draw = ImageDraw.Draw(img)
+        x = (frame * 24) % (self.width - 200)
+        draw.rectangle([x, self.height - 260, x + 200, self.height - 60], fill=(220, 60, 40))
+        draw.text((20, 20), f"frame {frame}", fill=(255, 255, 255))
+        if bbox:
+            img = img.crop(bbox)
+        return img
+
+
+BACKENDS = {
+    ImageGrabBackend.name: ImageGrabBackend,
+    SyntheticBackend.name: SyntheticBackend,
+}
+
+_backend: Optional[CaptureBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_capture_backend(name: str = "imagegrab") -> CaptureBackend:
+    """Get the process-wide capture backend (created on first use)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None or _backend.name != name:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown capture backend '{name}' (expected one of {', '.join(BACKENDS)})")
+            _backend = BACKENDS[name]()
+            logger.info(f"Screen capture backend: {name}")
+        return _backend
+
+
+def normalize_encoding(encoding: str) -> Optional[str]:
+    """Canonical encoding name, or None if unsupported"""
+    encoding = ENCODING_ALIASES.get(encoding.lower(), encoding.lower())
+    return encoding if encoding in ENCODINGS else None
+
+
+def encode_frame(img: Image.Image, encoding: str = "png", quality: Optional[int] = None,
+                 compress_level: Optional[int] = None) -> Tuple[bytes, str]:
+    """
+    Encode a frame.
+
+    Args:
+        img: Frame to encode
+        encoding: png, jpeg or webp
+        quality: 1-100 for jpeg/webp (PIL defaults if None)
+        compress_level: 0-9 zlib level for png (PIL default 6 if None)
+
+    Returns:
+        Tuple of (encoded bytes, mimetype)
+    """
+    pil_format, mimetype = ENCODINGS[encoding]
+    options = {}
+    if encoding == "png":
+        if compress_level is not None:
+            options["compress_level"] = compress_level
+    else:
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        if quality is not None:
+            options["quality"] = quality
+
+    buffer = io.BytesIO()
+    img.save(buffer, format=pil_format, **options)
+    return buffer.getvalue(), mimetype
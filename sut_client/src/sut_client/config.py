@@ -46,6 +46,9 @@ class SUTSettings(BaseSettings):
     # Timeouts
     request_timeout: int = Field(default=30, description="HTTP request timeout")
 
+    # Screen capture source for /screenshot (imagegrab, or synthetic for testing without a desktop)
+    capture_backend: str = Field(default="imagegrab", description="Screen capture backend")
+
     # ==========================================================================
     # Game Launch Settings (from KATANA RPX v0.2)
     # ==========================================================================
@@ -0,0 +1,341 @@
+"""
+Installed Games Inventory for SUT Client
+Cached Steam library scan behind /installed_games
+
+A full scan reads libraryfolders.vdf, every appmanifest_*.acf and lists every
+steamapps/common folder. The master asks for it repeatedly (availability
+checks, readiness gating), so the scan result is kept and only the parts whose
+mtimes changed are redone:
+- the library list is re-read when libraryfolders.vdf changes
+- a library's manifests are re-listed when its steamapps folder changes, and a
+  manifest is re-parsed only when its own mtime or size changes
+- a common folder is re-listed when its mtime changes (install/uninstall)
+
+With watchdog installed, filesystem events mark the inventory dirty and the
+stat checks are skipped in between (with an occasional recheck in case an
+event was missed).
+
+Every version of the inventory has an ETag (hash of its content). Callers send
+it back as If-None-Match (304 if unchanged) or as since= to get only the
+games that were added, removed or updated.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .steam import get_steam_install_path, get_steam_library_folders
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# Repeat requests within this many seconds are served without any stat calls
+MIN_CHECK_INTERVAL = 2.0
+
+# With a watcher running, still verify mtimes this often
+WATCHED_RECHECK_INTERVAL = 60.0
+
+# Past inventory versions kept for since= deltas
+HISTORY_SIZE = 16
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a path, or None if it doesn't exist"""
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+@dataclass
+class _Manifest:
+    signature: Tuple[int, int]
+    app_id: str
+    name: Optional[str] = None
+    install_dir: Optional[str] = None
+
+
+@dataclass
+class _Library:
+    path: str
+    steamapps_signature: Optional[Tuple[int, int]] = None
+    manifest_files: List[str] = field(default_factory=list)
+    manifests: Dict[str, _Manifest] = field(default_factory=dict)
+    common_signature: Optional[Tuple[int, int]] = None
+    common_dirs: List[str] = field(default_factory=list)
+
+
+class GameInventory:
+    """Installed games, rescanned incrementally when the Steam libraries change"""
+
+    def __init__(self, min_check_interval: float = MIN_CHECK_INTERVAL, use_watcher: bool = True):
+        self.min_check_interval = min_check_interval
+        self._lock = threading.Lock()
+        self._steam_key: Optional[Tuple[Optional[str], Optional[Tuple[int, int]]]] = None
+        self._library_paths: List[str] = []
+        self._libraries: Dict[str, _Library] = {}
+        self._games: List[Dict[str, Any]] = []
+        self._etag: Optional[str] = None
+        self._history: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self._checked_at = 0.0
+        self._verified_at = 0.0
+        self._dirty = True
+        self._observer = None
+        self._watched: List[str] = []
+        self._use_watcher = use_watcher and WATCHDOG_AVAILABLE
+        self.stats = {"checks": 0, "cached": 0, "manifests_parsed": 0, "dirs_listed": 0, "versions": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, force: bool = False, since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Current inventory, refreshed if anything changed.
+
+        Args:
+            force: Drop all cached state and rescan everything
+            since: ETag of a version the caller already has
+
+        Returns:
+            Dict with games, etag and libraries_scanned, plus delta: the
+            changes since that version (see _delta), or None if it is unknown
+        """
+        with self._lock:
+            if force:
+                self._steam_key = None
+                self._libraries = {}
+                self._dirty = True
+            self._refresh()
+            return {"games": list(self._games), "etag": self._etag,
+                    "libraries_scanned": len(self._library_paths),
+                    "delta": self._delta(since) if since else None}
+
+    def close(self):
+        with self._lock:
+            self._stop_watcher()
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _refresh(self):
+        now = time.monotonic()
+        self.stats["checks"] += 1
+        if self._etag is not None and not self._dirty:
+            if now - self._checked_at < self.min_check_interval:
+                self.stats["cached"] += 1
+                return
+            if self._observer is not None and now - self._verified_at < WATCHED_RECHECK_INTERVAL:
+                self.stats["cached"] += 1
+                return
+        self._checked_at = self._verified_at = now
+        self._dirty = False
+
+        steam_path = get_steam_install_path()
+        vdf_path = os.path.join(steam_path, "steamapps", "libraryfolders.vdf") if steam_path else None
+        steam_key = (steam_path, _signature(vdf_path) if vdf_path else None)
+        if steam_key != self._steam_key:
+            self._steam_key = steam_key
+            self._library_paths = get_steam_library_folders()
+            logger.info(f"Steam libraries: {self._library_paths}")
+            self._libraries = {path: self._libraries.get(path) or _Library(path) for path in self._library_paths}
+            if self._use_watcher:
+                self._start_watcher()
+
+        for library in self._libraries.values():
+            self._refresh_library(library)
+
+        games = self._build_games()
+        by_path = OrderedDict((game["install_path"], game) for game in games)
+        etag = hashlib.sha1(json.dumps(games, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+        if etag != self._etag:
+            self._games = games
+            self._etag = etag
+            self._history[etag] = by_path
+            self._history.move_to_end(etag)
+            while len(self._history) > HISTORY_SIZE:
+                self._history.popitem(last=False)
+            self.stats["versions"] += 1
+            logger.info(f"Installed games inventory updated: {len(games)} games "
+                        f"({sum(1 for g in games if g['source'] == 'steam')} Steam, "
+                        f"{sum(1 for g in games if g['source'] == 'standalone')} standalone), etag {etag}")
+
+    def _delta(self, since: str) -> Optional[Dict[str, Any]]:
+        """Added and updated games, removed install paths and the current order of install paths"""
+        old = self._history.get(since)
+        if old is None:
+            return None
+        new = self._history[self._etag]
+        return {
+            "added": [game for key, game in new.items() if key not in old],
+            "updated": [game for key, game in new.items() if key in old and old[key] != game],
+            "removed": [key for key in old if key not in new],
+            "order": list(new),
+        }
+
+    def _refresh_library(self, library: _Library):
+        steamapps = os.path.join(library.path, "steamapps")
+        signature = _signature(steamapps)
+        if signature is None:
+            library.steamapps_signature = None
+            library.manifest_files, library.manifests = [], {}
+            library.common_signature, library.common_dirs = None, []
+            return
+
+        if signature != library.steamapps_signature:
+            library.steamapps_signature = signature
+            library.manifest_files = [name for name in os.listdir(steamapps)
+                                      if name.startswith("appmanifest_") and name.endswith(".acf")]
+            self.stats["dirs_listed"] += 1
+
+        manifests = {}
+        for filename in library.manifest_files:
+            path = os.path.join(steamapps, filename)
+            file_signature = _signature(path)
+            if file_signature is None:
+                continue
+            manifest = library.manifests.get(filename)
+            if manifest is None or manifest.signature != file_signature:
+                manifest = self._parse_manifest(path, filename, file_signature)
+            manifests[filename] = manifest
+        library.manifests = manifests
+
+        common = os.path.join(steamapps, "common")
+        common_signature = _signature(common)
+        if common_signature != library.common_signature:
+            library.common_signature = common_signature
+            library.common_dirs = []
+            if common_signature is not None:
+                library.common_dirs = [name for name in os.listdir(common)
+                                       if os.path.isdir(os.path.join(common, name))]
+            self.stats["dirs_listed"] += 1
+
+    def _parse_manifest(self, path: str, filename: str, signature: Tuple[int, int]) -> _Manifest:
+        manifest = _Manifest(signature=signature, app_id=filename.replace("appmanifest_", "").replace(".acf", ""))
+        self.stats["manifests_parsed"] += 1
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            name_match = re.search(r'"name"\s+"([^"]+)"', content)
+            installdir_match = re.search(r'"installdir"\s+"([^"]+)"', content)
+            if name_match and installdir_match:
+                manifest.name = name_match.group(1)
+                manifest.install_dir = installdir_match.group(1)
+        except Exception as e:
+            logger.warning(f"Failed to parse {filename}: {e}")
+        return manifest
+
+    def _build_games(self) -> List[Dict[str, Any]]:
+        """Game list from the cached library state (same rules as the original full scan)"""
+        installed = []
+        seen_dirs = set()  # Install dirs across libraries, to avoid duplicates
+        for path in self._library_paths:
+            library = self._libraries[path]
+            if library.steamapps_signature is None:
+                continue
+            steamapps = os.path.join(library.path, "steamapps")
+            common_dirs = {name.lower() for name in library.common_dirs}
+            seen_dirs_in_lib = set()
+
+            # Steam games with manifests
+            for filename in library.manifest_files:
+                manifest = library.manifests.get(filename)
+                if manifest is None or manifest.install_dir is None:
+                    continue
+                seen_dirs_in_lib.add(manifest.install_dir.lower())
+                seen_dirs.add(manifest.install_dir.lower())
+                installed.append({
+                    "steam_app_id": manifest.app_id,
+                    "name": manifest.name,
+                    "install_dir": manifest.install_dir,
+                    "install_path": os.path.join(steamapps, "common", manifest.install_dir),
+                    "exists": manifest.install_dir.lower() in common_dirs,
+                    "source": "steam"
+                })
+
+            # Standalone games in common without manifests
+            for folder in library.common_dirs:
+                folder_lower = folder.lower()
+                if folder_lower in seen_dirs_in_lib or folder_lower in seen_dirs:
+                    continue
+                seen_dirs.add(folder_lower)
+                installed.append({
+                    "steam_app_id": None,
+                    "name": folder,
+                    "install_dir": folder,
+                    "install_path": os.path.join(steamapps, "common", folder),
+                    "exists": True,
+                    "source": "standalone"
+                })
+        return installed
+
+    # ------------------------------------------------------------------
+    # Filesystem watcher (optional)
+    # ------------------------------------------------------------------
+
+    def _start_watcher(self):
+        """(Re)watch every steamapps and common folder plus the Steam library config"""
+        folders = []
+        if self._steam_key and self._steam_key[0]:
+            folders.append(os.path.join(self._steam_key[0], "steamapps"))
+        for path in self._library_paths:
+            for folder in (os.path.join(path, "steamapps"), os.path.join(path, "steamapps", "common")):
+                if os.path.isdir(folder) and folder not in folders:
+                    folders.append(folder)
+        if folders == self._watched and self._observer is not None:
+            return
+
+        self._stop_watcher()
+        inventory = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                inventory._dirty = True
+
+        try:
+            observer = Observer()
+            for folder in folders:
+                observer.schedule(_Handler(), folder, recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer, self._watched = observer, folders
+            logger.info(f"Watching {len(folders)} Steam folders for game changes")
+        except Exception as e:
+            logger.warning(f"Filesystem watcher unavailable, using mtime checks: {e}")
+            self._observer, self._watched = None, []
+
+    def _stop_watcher(self):
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+            except Exception:
+                pass
+            self._observer, self._watched = None, []
+
+
+_inventory: Optional[GameInventory] = None
+_inventory_lock = threading.Lock()
+
+
+def get_game_inventory() -> GameInventory:
+    """Get the process-wide installed games inventory"""
+    global _inventory
+    with _inventory_lock:
+        if _inventory is None:
+            _inventory = GameInventory()
+        return _inventory
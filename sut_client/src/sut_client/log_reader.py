@@ -0,0 +1,177 @@
+"""
+Log Reader for SUT Client
+Reads ranges of the client log without loading the whole file
+
+The log only grows (until /logs/clear truncates it), so the /logs endpoint
+seeks instead of reading every line: backwards from EOF for the last N lines,
+and by binary search over byte offsets for a `since` timestamp. Each read
+returns an opaque cursor marking where it stopped, so the next request only
+touches bytes written since.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 64 * 1024
+
+# Log lines start with e.g. "2025-12-31 10:30:45,123 - ..."
+TIMESTAMP_LEN = 23
+
+
+def parse_timestamp(line: bytes) -> Optional[datetime]:
+    """Timestamp at the start of a log line, or None for continuation lines"""
+    if len(line) < TIMESTAMP_LEN:
+        return None
+    try:
+        return datetime.fromisoformat(line[:TIMESTAMP_LEN].decode('ascii').replace(',', '.'))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    raw = json.dumps({"o": offset, "f": fingerprint}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[int, str]]:
+    """(offset, fingerprint) from a cursor, or None if it isn't one of ours"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return int(data["o"]), str(data["f"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class LogReader:
+    """Seeking reader over an append-only log file"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+
+    @staticmethod
+    def _fingerprint(f: BinaryIO) -> str:
+        """Identifies the log's current contents - changes when it is cleared or rotated"""
+        f.seek(0)
+        first_line = f.readline(256)
+        return hashlib.sha1(first_line).hexdigest()[:16]
+
+    @staticmethod
+    def _complete_end(f: BinaryIO, size: int) -> int:
+        """Offset just past the last complete line (a line still being written is left out)"""
+        pos = size
+        while pos > 0:
+            start = max(0, pos - BLOCK_SIZE)
+            f.seek(start)
+            block = f.read(pos - start)
+            idx = block.rfind(b'\n')
+            if idx >= 0:
+                return start + idx + 1
+            pos = start
+        return 0
+
+    @staticmethod
+    def _tail_start(f: BinaryIO, lo: int, end: int, lines: int) -> int:
+        """Offset of the first of the last `lines` lines in [lo, end)"""
+        # The newline at end-1 terminates the last line, so one more is needed
+        remaining = lines + 1
+        pos = end
+        while pos > lo:
+            start = max(lo, pos - BLOCK_SIZE)
+            f.seek(start)
+            block = f.read(pos - start)
+            idx = len(block)
+            while True:
+                idx = block.rfind(b'\n', 0, idx)
+                if idx < 0:
+                    break
+                remaining -= 1
+                if remaining == 0:
+                    return start + idx + 1
+            pos = start
+        return lo
+
+    @staticmethod
+    def _next_timestamped_line(f: BinaryIO, pos: int, lo: int, end: int) -> Tuple[int, Optional[datetime]]:
+        """Start and timestamp of the first timestamped line starting at or after pos"""
+        if pos > lo:
+            f.seek(pos - 1)
+            if f.read(1) != b'\n':
+                f.readline()  # Skip the rest of the line pos falls in
+        else:
+            f.seek(pos)
+        while True:
+            line_start = f.tell()
+            if line_start >= end:
+                return end, None
+            timestamp = parse_timestamp(f.readline())
+            if timestamp is not None:
+                return line_start, timestamp
+
+    def _find_since(self, f: BinaryIO, lo: int, end: int, since: datetime) -> int:
+        """Offset of the first line logged at or after `since`, by binary search"""
+        low, high = lo, end
+        while low < high:
+            mid = (low + high) // 2
+            _, timestamp = self._next_timestamped_line(f, mid, lo, end)
+            if timestamp is None or timestamp >= since:
+                high = mid
+            else:
+                low = mid + 1
+        return self._next_timestamped_line(f, low, lo, end)[0]
+
+    def read(self, lines: int = 1000, since: Optional[datetime] = None,
+             cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Read complete log lines.
+
+        Args:
+            lines: Return at most the last N lines of the range (0 = no limit)
+            since: Skip lines logged before this (local) time
+            cursor: Cursor from a previous read - skip everything it covered
+
+        Returns:
+            Dict with lines, the next cursor, whether the cursor had to be
+            reset (log cleared/rotated) and whether `lines` cut the range short
+        """
+        if since is not None and since.tzinfo is not None:
+            # Log timestamps are naive local time
+            since = since.astimezone().replace(tzinfo=None)
+
+        with open(self.path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            end = self._complete_end(f, size)
+            fingerprint = self._fingerprint(f)
+
+            start = 0
+            cursor_reset = False
+            if cursor:
+                decoded = decode_cursor(cursor)
+                if decoded and decoded[1] == fingerprint and decoded[0] <= end:
+                    start = decoded[0]
+                else:
+                    cursor_reset = True
+
+            if since is not None:
+                start = self._find_since(f, start, end, since)
+
+            range_start = start
+            if lines > 0:
+                start = self._tail_start(f, start, end, lines)
+
+            f.seek(start)
+            data = f.read(end - start)
+
+        return {
+            "lines": data.decode('utf-8', errors='replace').splitlines(),
+            "cursor": encode_cursor(end, fingerprint),
+            "cursor_reset": cursor_reset,
+            "truncated": start > range_start,
+        }
@@ -0,0 +1,167 @@
+"""
+Screen Stream for SUT Client
+Tile-delta encoding of the live screen for /screen_stream
+
+Frames are split into square tiles and only tiles that changed since they
+were last sent are JPEG-encoded, so a mostly static menu costs a few KB per
+frame instead of a full image. The first message (and any after a resolution
+change) is a keyframe carrying every tile.
+
+Wire format, repeated for each message:
+    4-byte big-endian length of the rest of the message
+    4-byte big-endian length of the JSON header
+    JSON header: {"seq", "key", "width", "height", "ts", "tiles": [[x, y, w, h, nbytes], ...]}
+    tile JPEGs, concatenated in header order
+
+The discovery service relays the same messages (without the outer length) to
+viewers over WebSocket.
+"""
+
+import io
+import json
+import logging
+import struct
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from PIL import Image, ImageChops
+
+from .capture import CaptureBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TILE_SIZE = 128
+
+# Per-channel difference below this is treated as capture noise
+DEFAULT_CHANGE_THRESHOLD = 12
+
+# Send an empty message this often on a static screen so the relay knows the stream is alive
+HEARTBEAT_INTERVAL = 5.0
+
+
+def pack_message(header: dict, payload: bytes) -> bytes:
+    """Message (without the outer length prefix) from a header and tile data"""
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    return struct.pack('>I', len(header_bytes)) + header_bytes + payload
+
+
+class TileEncoder:
+    """Encodes successive frames as changed-tile deltas"""
+
+    def __init__(self, tile_size: int = DEFAULT_TILE_SIZE, quality: int = 70,
+                 threshold: int = DEFAULT_CHANGE_THRESHOLD):
+        self.tile_size = tile_size
+        self.quality = quality
+        self.threshold = threshold
+        self.seq = 0
+        # What the viewer currently shows - tiles are only replaced when sent,
+        # so slow changes below the threshold still add up to an update
+        self._reference: Optional[Image.Image] = None
+        self._lut = [255 if v > threshold else 0 for v in range(256)]
+
+    def force_keyframe(self):
+        self._reference = None
+
+    def _tile_boxes(self, width: int, height: int) -> List[tuple]:
+        size = self.tile_size
+        return [(x, y, min(x + size, width), min(y + size, height))
+                for y in range(0, height, size) for x in range(0, width, size)]
+
+    def encode(self, frame: Image.Image) -> Optional[bytes]:
+        """
+        Encode a frame.
+
+        Returns:
+            Message with the changed tiles, or None if nothing changed
+        """
+        if frame.mode != "RGB":
+            frame = frame.convert("RGB")
+
+        key = self._reference is None or self._reference.size != frame.size
+        boxes = self._tile_boxes(*frame.size)
+        if key:
+            self._reference = frame.copy()
+            changed = boxes
+        else:
+            mask = ImageChops.difference(self._reference, frame).convert("L").point(self._lut)
+            changed = [box for box in boxes if mask.crop(box).getbbox() is not None]
+            if not changed:
+                return None
+
+        tiles = []
+        payload = io.BytesIO()
+        for box in changed:
+            tile = frame.crop(box)
+            if not key:
+                self._reference.paste(tile, box[:2])
+            start = payload.tell()
+            tile.save(payload, format="JPEG", quality=self.quality)
+            tiles.append([box[0], box[1], box[2] - box[0], box[3] - box[1], payload.tell() - start])
+
+        self.seq += 1
+        header = {
+            "seq": self.seq,
+            "key": key,
+            "width": frame.width,
+            "height": frame.height,
+            "ts": time.time(),
+            "tiles": tiles,
+        }
+        return pack_message(header, payload.getvalue())
+
+    def heartbeat(self, width: int, height: int) -> bytes:
+        """Empty message for a static screen"""
+        return pack_message({"seq": self.seq, "key": False, "width": width, "height": height,
+                             "ts": time.time(), "tiles": []}, b"")
+
+
+def stream_frames(backend: CaptureBackend, fps: float = 5.0, scale: float = 0.5, quality: int = 70,
+                  tile_size: int = DEFAULT_TILE_SIZE, stop: Optional[threading.Event] = None) -> Iterator[bytes]:
+    """
+    Capture and encode frames until stopped.
+
+    Args:
+        backend: Frame source
+        fps: Maximum frames captured per second
+        scale: Downscale factor (0-1] applied before tiling
+        quality: JPEG quality of tiles
+        tile_size: Tile edge in pixels
+        stop: Event that ends the stream when set
+
+    Yields:
+        Length-prefixed messages (see module docstring)
+    """
+    encoder = TileEncoder(tile_size=tile_size, quality=quality)
+    interval = 1.0 / fps
+    last_sent = 0.0
+    frames = sent_bytes = 0
+    started = time.monotonic()
+
+    try:
+        while not (stop and stop.is_set()):
+            tick = time.monotonic()
+            frame = backend.grab()
+            if scale < 1:
+                frame = frame.resize((max(1, int(frame.width * scale)), max(1, int(frame.height * scale))),
+                                     Image.Resampling.BILINEAR)
+
+            message = encoder.encode(frame)
+            if message is None and tick - last_sent >= HEARTBEAT_INTERVAL:
+                message = encoder.heartbeat(frame.width, frame.height)
+            if message is not None:
+                last_sent = tick
+                frames += 1
+                sent_bytes += len(message)
+                yield struct.pack('>I', len(message)) + message
+
+            remaining = interval - (time.monotonic() - tick)
+            if remaining > 0:
+                if stop:
+                    stop.wait(remaining)
+                else:
+                    time.sleep(remaining)
+    finally:
+        elapsed = time.monotonic() - started
+        logger.info(f"Screen stream ended after {elapsed:.0f}s: {frames} messages, "
+                    f"{sent_bytes / 1e6:.1f} MB ({sent_bytes * 8 / 1e6 / max(elapsed, 1e-6):.2f} Mbit/s)")
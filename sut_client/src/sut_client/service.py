@@ -10,30 +10,35 @@ import logging
 import os
 import socket
 import base64
-import io
-import re
+import gzip
+import hashlib
+import json
 import time
 import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from waitress import serve as waitress_serve
-from PIL import ImageGrab
+from PIL import Image
 
 from .config import get_settings
 from .backup import BackupService
 from .applier import PresetApplier
 from .discovery import DiscoveryThread
 from .ws_client import WebSocketClientThread
+from .log_reader import LogReader
+from .capture import encode_frame, get_capture_backend, normalize_encoding
+from .screen_stream import DEFAULT_TILE_SIZE, stream_frames
 from .input_controller import InputController
 from .launcher import launch_game, cancel_launch, terminate_game, get_game_status, get_current_game_info, find_process_by_name
-from .window import ensure_window_foreground_v2, minimize_other_windows
+from .window import ensure_window_foreground_v2, get_foreground_window, minimize_other_windows
 from .system import check_process, check_process_health, kill_process, get_interactive_session_id, get_process_session_id, is_in_interactive_session, get_interactive_username, find_process_by_name as system_find_process
-from .steam import login_steam, get_steam_library_folders, get_steam_auto_login_user, is_steam_running, verify_steam_login, find_standalone_game
+from .steam import login_steam, get_steam_auto_login_user, is_steam_running, verify_steam_login, find_standalone_game
 from .hardware import set_dpi_awareness, get_screen_resolution, get_cpu_model, get_gpu_model
 from .display import get_display_manager
+from .game_inventory import get_game_inventory
 from .update_handler import init_update_handler, get_update_handler
 from . import __version__
 
@@ -44,6 +49,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Concurrent /screen_stream responses (the discovery service relay needs one per SUT)
+MAX_SCREEN_STREAMS = 2
+
+# Input actions accepted by /action and /action_batch
+VALID_ACTIONS = ("click", "double_click", "hold_click", "drag", "scroll", "close_game", "terminate_game",
+                 "key", "hold_key", "hotkey", "type", "move", "wait")
+
+MAX_BATCH_ACTIONS = 1000
+
+# Largest byte range /file_download returns in one response
+MAX_DOWNLOAD_CHUNK = 64 * 1024 * 1024
+
+
+class ActionError(Exception):
+    """Invalid input action (reported as HTTP 400)"""
+
 
 def create_app() -> Flask:
     """Create Flask application"""
@@ -56,6 +77,11 @@ def create_app() -> Flask:
 
     # Initialize input controller (from RPX v0.2)
     input_controller = InputController()
+    # Keeps two requests' inputs from interleaving; held per input, never across waits
+    input_lock = threading.Lock()
+
+    # Each live screen stream holds a waitress thread for its whole lifetime
+    screen_streams = threading.BoundedSemaphore(MAX_SCREEN_STREAMS)
 
     # =========================================================================
     # HTTP REQUEST/RESPONSE LOGGING (debug mode)
@@ -118,7 +144,9 @@ def create_app() -> Flask:
                 "text_input",
                 "drag",
                 "scroll",
+                "action_batch",
                 "screenshot",
+                "step_snapshot",
                 "steam_login",
                 "process_control",
                 "performance_monitoring",
@@ -142,9 +170,14 @@ def create_app() -> Flask:
         """
         Retrieve SUT client logs.
 
+        Reads by seeking rather than loading the whole file, so cost doesn't
+        grow with uptime. JSON responses are gzip-compressed when the caller
+        sends Accept-Encoding: gzip.
+
         Query params:
-        - lines: Number of recent lines to return (default: 1000)
+        - lines: Number of recent lines to return (default: 1000, 0 = all in range)
         - since: ISO timestamp - return logs after this time (optional)
+        - cursor: Cursor from a previous response - return only newer lines (optional)
         - download: true to download as file, false for JSON (default: false)
 
         Returns:
@@ -152,7 +185,10 @@ def create_app() -> Flask:
             "status": "success",
             "log_file": "path/to/sut_client.log",
             "lines": [...],
-            "line_count": 1000
+            "line_count": 1000,
+            "cursor": "...",          # pass back to fetch only newer lines
+            "cursor_reset": false,    # cursor no longer valid (log cleared), read from start
+            "truncated": false        # more lines in range than `lines`
         }
         """
         try:
@@ -179,41 +215,36 @@ def create_app() -> Flask:
             lines_requested = int(request.args.get('lines', 1000))
             since_str = request.args.get('since')
 
-            with open(str(log_path), 'r', encoding='utf-8', errors='replace') as f:
-                all_lines = f.readlines()
-
-            # Filter by timestamp if provided
+            since_dt = None
             if since_str:
                 try:
                     since_dt = datetime.fromisoformat(since_str.replace('Z', '+00:00'))
-                    filtered_lines = []
-                    for line in all_lines:
-                        # Try to extract timestamp from log line
-                        # Format: 2025-12-31 10:30:45,123 - ...
-                        if len(line) >= 23:
-                            try:
-                                line_time = datetime.fromisoformat(line[:23].replace(',', '.'))
-                                if line_time >= since_dt:
-                                    filtered_lines.append(line)
-                            except ValueError:
-                                filtered_lines.append(line)  # Include lines without timestamp
-                        else:
-                            filtered_lines.append(line)
-                    all_lines = filtered_lines
                 except ValueError:
                     pass  # Invalid timestamp, ignore filter
 
-            # Get last N lines
-            recent_lines = all_lines[-lines_requested:] if lines_requested > 0 else all_lines
+            result = LogReader(str(log_path)).read(
+                lines=lines_requested,
+                since=since_dt,
+                cursor=request.args.get('cursor')
+            )
 
-            return jsonify({
+            body = json.dumps({
                 "status": "success",
                 "log_file": str(log_path),
                 "hostname": settings.hostname,
-                "lines": [line.rstrip('\n') for line in recent_lines],
-                "line_count": len(recent_lines),
-                "total_lines": len(all_lines)
-            })
+                "lines": result["lines"],
+                "line_count": len(result["lines"]),
+                "cursor": result["cursor"],
+                "cursor_reset": result["cursor_reset"],
+                "truncated": result["truncated"]
+            }).encode('utf-8')
+
+            response = Response(body, mimetype='application/json')
+            response.vary.add('Accept-Encoding')
+            if 'gzip' in request.headers.get('Accept-Encoding', '') and len(body) > 1024:
+                response.set_data(gzip.compress(body, compresslevel=6))
+                response.headers['Content-Encoding'] = 'gzip'
+            return response
 
         except Exception as e:
             logger.error(f"Error retrieving logs: {e}")
@@ -605,87 +636,42 @@ def create_app() -> Flask:
     @app.route('/installed_games', methods=['GET'])
     def installed_games():
         """
-        Scan Steam library folders for installed games.
+        Installed games from the Steam library folders.
         Detects Steam games (with manifests) and standalone games in steamapps/common/.
         Steam library paths are discovered dynamically from libraryfolders.vdf.
+
+        The scan is cached and redone only for what changed on disk (see
+        game_inventory.py). Query params:
+            refresh=1: Rescan everything
+            since=<etag>: Return only the changes since that version
+        Sends an ETag; If-None-Match with the current one gets a 304.
         """
         try:
-            libraries = get_steam_library_folders()
-            installed = []
-            seen_dirs = set()  # Track install dirs to avoid duplicates
-
-            logger.info(f"Scanning {len(libraries)} Steam libraries: {libraries}")
-
-            for lib in libraries:
-                steamapps = os.path.join(lib, "steamapps")
-                if not os.path.exists(steamapps):
-                    logger.debug(f"Steamapps not found: {steamapps}")
-                    continue
-
-                logger.debug(f"Scanning library: {lib}")
-                seen_dirs_in_lib = set()
-
-                # First pass: Get Steam games with manifests
-                for filename in os.listdir(steamapps):
-                    if filename.startswith("appmanifest_") and filename.endswith(".acf"):
-                        app_id = filename.replace("appmanifest_", "").replace(".acf", "")
-                        manifest_path = os.path.join(steamapps, filename)
-
-                        try:
-                            with open(manifest_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-
-                            name_match = re.search(r'"name"\s+"([^"]+)"', content)
-                            installdir_match = re.search(r'"installdir"\s+"([^"]+)"', content)
-
-                            if name_match and installdir_match:
-                                game_name = name_match.group(1)
-                                install_dir = installdir_match.group(1)
-                                full_path = os.path.join(steamapps, "common", install_dir)
-                                seen_dirs_in_lib.add(install_dir.lower())
-                                seen_dirs.add(install_dir.lower())
-
-                                installed.append({
-                                    "steam_app_id": app_id,
-                                    "name": game_name,
-                                    "install_dir": install_dir,
-                                    "install_path": full_path,
-                                    "exists": os.path.exists(full_path),
-                                    "source": "steam"
-                                })
-                        except Exception as e:
-                            logger.warning(f"Failed to parse {filename}: {e}")
-
-                # Second pass: Detect standalone games in common folder without manifests
-                common_path = os.path.join(steamapps, "common")
-                if os.path.exists(common_path):
-                    logger.debug(f"Scanning common folder: {common_path}")
-                    for folder in os.listdir(common_path):
-                        folder_lower = folder.lower()
-                        if folder_lower not in seen_dirs_in_lib:
-                            folder_path = os.path.join(common_path, folder)
-                            if os.path.isdir(folder_path):
-                                # Avoid duplicates across libraries
-                                if folder_lower not in seen_dirs:
-                                    seen_dirs.add(folder_lower)
-                                    installed.append({
-                                        "steam_app_id": None,
-                                        "name": folder,
-                                        "install_dir": folder,
-                                        "install_path": folder_path,
-                                        "exists": True,
-                                        "source": "standalone"
-                                    })
-                                    logger.info(f"Found standalone game: {folder} in {common_path}")
-
-            logger.info(f"Found {len(installed)} games ({len([g for g in installed if g['source'] == 'steam'])} Steam, {len([g for g in installed if g['source'] == 'standalone'])} standalone)")
-
-            return jsonify({
+            since = request.args.get('since')
+            current = get_game_inventory().get(
+                force=request.args.get('refresh', '').lower() in ('1', 'true'), since=since)
+            etag = current["etag"]
+
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            games = current["games"]
+            body = {
                 "success": True,
-                "games": installed,
-                "count": len(installed),
-                "libraries_scanned": len(libraries)
-            })
+                "etag": etag,
+                "count": len(games),
+                "libraries_scanned": current["libraries_scanned"]
+            }
+            if current["delta"] is not None:
+                body.update(delta=True, since=since, **current["delta"])
+            else:
+                body["games"] = games
+
+            response = jsonify(body)
+            response.set_etag(etag)
+            return response
 
         except Exception as e:
             logger.error(f"Error getting installed games: {e}")
@@ -812,17 +798,95 @@ def create_app() -> Flask:
             logger.error(f"Error listing directory: {e}")
             return jsonify({"success": False, "error": str(e)}), 500
 
+    # Chunk hashes per (path, size, mtime, chunk_size) so retries don't rehash
+    checksum_cache: Dict[tuple, Dict[str, Any]] = {}
+    checksum_cache_lock = threading.Lock()
+
+    def hash_file(file_path: str, chunk_size: int) -> Dict[str, Any]:
+        """SHA-256 of a whole file plus one per chunk_size chunk, in one pass."""
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_size, stat.st_mtime_ns, chunk_size)
+        with checksum_cache_lock:
+            cached = checksum_cache.get(key)
+        if cached:
+            return cached
+
+        whole = hashlib.sha256()
+        chunks = []
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                whole.update(block)
+                chunks.append(hashlib.sha256(block).hexdigest())
+
+        result = {"size": stat.st_size, "sha256": whole.hexdigest(), "chunk_size": chunk_size, "chunks": chunks}
+        with checksum_cache_lock:
+            if len(checksum_cache) > 64:
+                checksum_cache.clear()
+            checksum_cache[key] = result
+        return result
+
+    @app.route('/file_checksum', methods=['POST'])
+    def file_checksum_route():
+        """
+        Checksums of a file on this SUT, for verified/resumable downloads.
+
+        Request body:
+        {
+            "path": "C:\\Traces\\run-id-123\\trace.csv",
+            "chunk_size": 8388608       # Optional, default 8 MB
+        }
+
+        Response:
+        {
+            "success": true,
+            "size": 123456789,
+            "sha256": "<hex digest of the whole file>",
+            "chunk_size": 8388608,
+            "chunks": ["<hex digest of chunk 0>", ...]
+        }
+        """
+        try:
+            data = request.get_json() or {}
+            file_path = data.get('path', '')
+            chunk_size = int(data.get('chunk_size', 8 * 1024 * 1024))
+
+            if not file_path:
+                return jsonify({"success": False, "error": "path is required"}), 400
+            if chunk_size < 64 * 1024 or chunk_size > MAX_DOWNLOAD_CHUNK:
+                return jsonify({"success": False, "error": "chunk_size must be between 64 KB and 64 MB"}), 400
+
+            file_path = os.path.expandvars(file_path)
+            if not os.path.isfile(file_path):
+                return jsonify({"success": False, "error": f"File not found: {file_path}"}), 404
+
+            return jsonify({"success": True, **hash_file(file_path, chunk_size)})
+
+        except Exception as e:
+            logger.error(f"Error hashing file: {e}")
+            return jsonify({"success": False, "error": str(e)}), 500
+
     @app.route('/file_download', methods=['POST'])
     def file_download_route():
         """
-        Download a file from this SUT via HTTP.
+        Download a file (or a byte range of it) from this SUT via HTTP.
 
         Request body:
         {
-            "path": "C:\\Traces\\run-id-123\\trace.csv"
+            "path": "C:\\Traces\\run-id-123\\trace.csv",
+            "offset": 0,          # Optional: start of the range
+            "length": 8388608     # Optional: bytes to read from offset
         }
 
-        Response: The file content as an octet-stream attachment.
+        A "Range: bytes=start-end" header (or bytes=start- / bytes=-suffix) is
+        accepted as an alternative to offset/length. Ranges without an end
+        return at most 64 MB; fetch the rest from the next offset.
+
+        Response: The file content as an octet-stream attachment. Ranged
+        requests return 206 with Content-Range, X-File-Size and X-Chunk-SHA256
+        (SHA-256 of the returned bytes).
         """
         try:
             data = request.get_json() or {}
@@ -840,12 +904,57 @@ def create_app() -> Flask:
                     "error": f"File not found: {file_path}"
                 }), 404
 
-            filename = os.path.basename(file_path)
-            return send_file(
-                file_path,
-                as_attachment=True,
-                download_name=filename
-            )
+            file_size = os.path.getsize(file_path)
+            offset, length = data.get('offset'), data.get('length')
+            range_header = request.headers.get('Range', '')
+            if offset is None and range_header:
+                start, sep, end = range_header.removeprefix('bytes=').split(',')[0].strip().partition('-')
+                if not range_header.startswith('bytes=') or not sep or not (start or end) \
+                        or not (start or '0').isdigit() or not (end or '0').isdigit():
+                    return jsonify({"success": False, "error": f"Malformed Range header: {range_header}"}), 416
+                if not start:
+                    # Suffix range: the last <end> bytes
+                    offset = max(0, file_size - int(end))
+                else:
+                    offset = int(start)
+                    if end:
+                        if int(end) < offset:
+                            return jsonify({"success": False,
+                                            "error": f"Malformed Range header: {range_header}"}), 416
+                        length = int(end) - offset + 1
+
+            if offset is None:
+                filename = os.path.basename(file_path)
+                return send_file(
+                    file_path,
+                    as_attachment=True,
+                    download_name=filename
+                )
+
+            try:
+                offset = int(offset)
+                length = None if length is None else int(length)
+            except (TypeError, ValueError):
+                return jsonify({"success": False, "error": "offset and length must be integers"}), 400
+            if offset < 0 or offset > file_size:
+                return jsonify({"success": False, "error": f"offset {offset} outside file of {file_size} bytes"}), 416
+            if length is None:
+                # Open-ended: return up to one chunk, the client continues from Content-Range
+                length = min(file_size - offset, MAX_DOWNLOAD_CHUNK)
+            length = max(0, min(length, file_size - offset))
+            if length > MAX_DOWNLOAD_CHUNK:
+                return jsonify({"success": False, "error": "length must be at most 64 MB"}), 400
+
+            with open(file_path, 'rb') as f:
+                f.seek(offset)
+                chunk = f.read(length)
+
+            end = offset + len(chunk) - 1
+            return Response(chunk, status=206, mimetype='application/octet-stream', headers={
+                'Content-Range': f"bytes {offset}-{end}/{file_size}",
+                'X-File-Size': str(file_size),
+                'X-Chunk-SHA256': hashlib.sha256(chunk).hexdigest(),
+            })
 
         except Exception as e:
             logger.error(f"Error downloading file: {e}")
@@ -1208,6 +1317,143 @@ def create_app() -> Flask:
     # INPUT AUTOMATION ENDPOINTS (from KATANA RPX v0.2)
     # =========================================================================
 
+    def run_action(data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute one input action (body of /action, or one entry of /action_batch).
+
+        Raises:
+            ActionError: If the action is unknown or missing required fields
+        """
+        # Accept both 'action' (preset-manager style) and 'type' (RPX style)
+        action_type = data.get('action') or data.get('type')
+        if not action_type:
+            raise ActionError("Missing 'action' or 'type' field")
+        if action_type not in VALID_ACTIONS:
+            raise ActionError(f"Unknown action: {action_type}")
+
+        result = {"status": "success", "action": action_type}
+
+        if action_type == 'click':
+            x = data.get('x')
+            y = data.get('y')
+            button = data.get('button', 'left')
+            if x is None or y is None:
+                raise ActionError("click requires x and y")
+            input_controller.click_mouse(x, y, button)
+            result["message"] = f"Clicked {button} at ({x}, {y})"
+
+        elif action_type == 'double_click':
+            x = data.get('x')
+            y = data.get('y')
+            button = data.get('button', 'left')
+            if x is None or y is None:
+                raise ActionError("double_click requires x and y")
+            input_controller.double_click(x, y, button)
+            result["message"] = f"Double-clicked {button} at ({x}, {y})"
+
+        elif action_type == 'hold_click':
+            x = data.get('x')
+            y = data.get('y')
+            duration = data.get('duration', 0.5)
+            button = data.get('button', 'left')
+            if x is None or y is None:
+                raise ActionError("hold_click requires x and y")
+            input_controller.hold_click(x, y, duration, button)
+            result["message"] = f"Held {button} click at ({x}, {y}) for {duration}s"
+
+        elif action_type == 'drag':
+            x = data.get('x')
+            y = data.get('y')
+            end_x = data.get('end_x')
+            end_y = data.get('end_y')
+            duration = data.get('duration', 0.5)
+            button = data.get('button', 'left')
+            if None in (x, y, end_x, end_y):
+                raise ActionError("drag requires x, y, end_x, end_y")
+            input_controller.drag(x, y, end_x, end_y, duration, button)
+            result["message"] = f"Dragged from ({x}, {y}) to ({end_x}, {end_y})"
+
+        elif action_type == 'scroll':
+            x = data.get('x')
+            y = data.get('y')
+            direction = data.get('direction', 'down')
+            clicks = data.get('clicks', data.get('delta', 3))  # Support both clicks and delta
+            if x is None or y is None:
+                raise ActionError("scroll requires x and y coordinates")
+            input_controller.scroll(x, y, clicks, direction)
+            result["message"] = f"Scrolled {direction} {clicks} times at ({x}, {y})"
+
+        elif action_type == 'key':
+            key = data.get('key')
+            if not key:
+                raise ActionError("key action requires 'key' field")
+            # Support repeat: count + interval for multiple press-release cycles
+            count = data.get('count', 1)
+            interval = data.get('interval', 1.0)  # Delay between presses in seconds
+            for i in range(count):
+                input_controller.press_key(key)
+                if i < count - 1:  # Don't delay after the last press
+                    time.sleep(interval)
+            if count > 1:
+                result["message"] = f"Pressed key: {key} x{count} (interval: {interval}s)"
+            else:
+                result["message"] = f"Pressed key: {key}"
+
+        elif action_type == 'hold_key':
+            key = data.get('key')
+            duration = data.get('duration', 0.5)
+            if not key:
+                raise ActionError("hold_key requires 'key' field")
+            input_controller.hold_key(key, duration)
+            result["message"] = f"Held key {key} for {duration}s"
+
+        elif action_type == 'hotkey':
+            keys = data.get('keys', [])
+            if not keys:
+                raise ActionError("hotkey requires 'keys' array")
+            input_controller.press_hotkey(*keys)
+            result["message"] = f"Pressed hotkey: {'+'.join(keys)}"
+
+        elif action_type == 'type':
+            text = data.get('text', '')
+            if not text:
+                raise ActionError("type requires 'text' field")
+            interval = data.get('interval', 0.02)
+            input_controller.type_text(text, interval)
+            result["message"] = f"Typed {len(text)} characters"
+
+        elif action_type == 'move':
+            x = data.get('x')
+            y = data.get('y')
+            if x is None or y is None:
+                raise ActionError("move requires x and y")
+            input_controller.move_mouse(x, y)
+            result["message"] = f"Moved mouse to ({x}, {y})"
+
+        elif action_type == 'close_game' or action_type == 'terminate_game':
+            terminate_result = terminate_game()
+            result['message'] = terminate_result.get('message', 'Game terminated')
+            result['terminated'] = True
+
+            # Notify update handler that automation has ended
+            handler = get_update_handler()
+            if handler:
+                handler.set_automation_state(False)
+
+        elif action_type == 'wait':
+            duration = data.get('duration', 1.0)
+            time.sleep(duration)
+            result["message"] = f"Waited {duration} seconds"
+
+        return result
+
+    def run_action_locked(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one action under input_lock, except pure waits, which send no input."""
+        if (data.get('action') or data.get('type')) == 'wait':
+            return run_action(data)
+        with input_lock:
+            return run_action(data)
+
     @app.route('/action', methods=['POST'])
     def action():
         """
@@ -1234,194 +1480,350 @@ def create_app() -> Flask:
             if not data:
                 return jsonify({"status": "error", "message": "No data provided"}), 400
 
-            # Accept both 'action' (preset-manager style) and 'type' (RPX style)
-            action_type = data.get('action') or data.get('type')
-            if not action_type:
-                return jsonify({"status": "error", "message": "Missing 'action' or 'type' field"}), 400
-
-            result = {"status": "success", "action": action_type}
-
-            if action_type == 'click':
-                x = data.get('x')
-                y = data.get('y')
-                button = data.get('button', 'left')
-                if x is None or y is None:
-                    return jsonify({"status": "error", "message": "click requires x and y"}), 400
-                input_controller.click_mouse(x, y, button)
-                result["message"] = f"Clicked {button} at ({x}, {y})"
-
-            elif action_type == 'double_click':
-                x = data.get('x')
-                y = data.get('y')
-                button = data.get('button', 'left')
-                if x is None or y is None:
-                    return jsonify({"status": "error", "message": "double_click requires x and y"}), 400
-                input_controller.double_click(x, y, button)
-                result["message"] = f"Double-clicked {button} at ({x}, {y})"
-
-            elif action_type == 'hold_click':
-                x = data.get('x')
-                y = data.get('y')
-                duration = data.get('duration', 0.5)
-                button = data.get('button', 'left')
-                if x is None or y is None:
-                    return jsonify({"status": "error", "message": "hold_click requires x and y"}), 400
-                input_controller.hold_click(x, y, duration, button)
-                result["message"] = f"Held {button} click at ({x}, {y}) for {duration}s"
-
-            elif action_type == 'drag':
-                x = data.get('x')
-                y = data.get('y')
-                end_x = data.get('end_x')
-                end_y = data.get('end_y')
-                duration = data.get('duration', 0.5)
-                button = data.get('button', 'left')
-                if None in (x, y, end_x, end_y):
-                    return jsonify({"status": "error", "message": "drag requires x, y, end_x, end_y"}), 400
-                input_controller.drag(x, y, end_x, end_y, duration, button)
-                result["message"] = f"Dragged from ({x}, {y}) to ({end_x}, {end_y})"
-
-            elif action_type == 'scroll':
-                x = data.get('x')
-                y = data.get('y')
-                direction = data.get('direction', 'down')
-                clicks = data.get('clicks', data.get('delta', 3))  # Support both clicks and delta
-                if x is None or y is None:
-                    return jsonify({"status": "error", "message": "scroll requires x and y coordinates"}), 400
-                input_controller.scroll(x, y, clicks, direction)
-                result["message"] = f"Scrolled {direction} {clicks} times at ({x}, {y})"
-
-            elif action_type == 'key':
-                key = data.get('key')
-                if not key:
-                    return jsonify({"status": "error", "message": "key action requires 'key' field"}), 400
-                # Support repeat: count + interval for multiple press-release cycles
-                count = data.get('count', 1)
-                interval = data.get('interval', 1.0)  # Delay between presses in seconds
-                for i in range(count):
-                    input_controller.press_key(key)
-                    if i < count - 1:  # Don't delay after the last press
-                        time.sleep(interval)
-                if count > 1:
-                    result["message"] = f"Pressed key: {key} x{count} (interval: {interval}s)"
-                else:
-                    result["message"] = f"Pressed key: {key}"
-
-            elif action_type == 'hold_key':
-                key = data.get('key')
-                duration = data.get('duration', 0.5)
-                if not key:
-                    return jsonify({"status": "error", "message": "hold_key requires 'key' field"}), 400
-                input_controller.hold_key(key, duration)
-                result["message"] = f"Held key {key} for {duration}s"
-
-            elif action_type == 'hotkey':
-                keys = data.get('keys', [])
-                if not keys:
-                    return jsonify({"status": "error", "message": "hotkey requires 'keys' array"}), 400
-                input_controller.press_hotkey(*keys)
-                result["message"] = f"Pressed hotkey: {'+'.join(keys)}"
-
-            elif action_type == 'type':
-                text = data.get('text', '')
-                if not text:
-                    return jsonify({"status": "error", "message": "type requires 'text' field"}), 400
-                interval = data.get('interval', 0.02)
-                input_controller.type_text(text, interval)
-                result["message"] = f"Typed {len(text)} characters"
-
-            elif action_type == 'move':
-                x = data.get('x')
-                y = data.get('y')
-                if x is None or y is None:
-                    return jsonify({"status": "error", "message": "move requires x and y"}), 400
-                input_controller.move_mouse(x, y)
-                result["message"] = f"Moved mouse to ({x}, {y})"
-
-            elif action_type == 'close_game' or action_type == 'terminate_game':
-                terminate_result = terminate_game()
-                result['message'] = terminate_result.get('message', 'Game terminated')
-                result['terminated'] = True
-
-                # Notify update handler that automation has ended
-                handler = get_update_handler()
-                if handler:
-                    handler.set_automation_state(False)
-
-            elif action_type == 'wait':
-                duration = data.get('duration', 1.0)
-                time.sleep(duration)
-                result["message"] = f"Waited {duration} seconds"
-
-            else:
-                return jsonify({
-                    "status": "error",
-                    "message": f"Unknown action: {action_type}",
-                    "valid_actions": ["click", "double_click", "hold_click", "drag", "scroll", "close_game",
-                                      "key", "hold_key", "hotkey", "type", "move", "wait"]
-                }), 400
-
-            return jsonify(result)
+            return jsonify(run_action_locked(data))
 
+        except ActionError as e:
+            response = {"status": "error", "message": str(e)}
+            if str(e).startswith("Unknown action"):
+                response["valid_actions"] = list(VALID_ACTIONS)
+            return jsonify(response), 400
         except Exception as e:
             logger.error(f"Action error: {e}")
             return jsonify({"status": "error", "message": str(e)}), 500
 
+    @app.route('/action_batch', methods=['POST'])
+    def action_batch():
+        """
+        Execute an ordered list of input actions locally, keeping their timing.
+
+        Sending a key sequence or typed text as one batch keeps network jitter
+        out of the gaps between inputs, and costs one round trip instead of one
+        per key.
+
+        Request body:
+        {
+            "actions": [
+                {"type": "key", "key": "Down"},
+                {"type": "key", "key": "Down", "delay": 0.25},   # Seconds after the previous action finished
+                {"type": "click", "x": 100, "y": 200, "at": 1.5}  # Or: seconds after the batch started
+            ],
+            "stop_on_error": true  # Skip the rest after a failed action (default: true)
+        }
+
+        Each action takes the same fields as /action. Unknown action types are
+        rejected up front, before any input is sent.
+
+        Response:
+        {
+            "status": "success|error",
+            "completed": 2,  # Actions that succeeded
+            "results": [{"index", "type", "status", "message", "start_ms", "duration_ms", "late_ms"}, ...],
+            "total_ms": 312.5
+        }
+        """
+        data = request.get_json(silent=True) or {}
+        actions = data.get('actions')
+        if not isinstance(actions, list) or not actions:
+            return jsonify({"status": "error", "message": "actions must be a non-empty list"}), 400
+        if len(actions) > MAX_BATCH_ACTIONS:
+            return jsonify({"status": "error",
+                            "message": f"At most {MAX_BATCH_ACTIONS} actions per batch"}), 400
+        for index, item in enumerate(actions):
+            action_type = item.get('action') or item.get('type') if isinstance(item, dict) else None
+            if action_type not in VALID_ACTIONS:
+                return jsonify({"status": "error", "message": f"Action {index}: unknown action {action_type!r}",
+                                "valid_actions": list(VALID_ACTIONS)}), 400
+        stop_on_error = data.get('stop_on_error', True)
+
+        results = []
+        completed = 0
+        started = time.perf_counter()
+        previous_end = started
+        for index, item in enumerate(actions):
+            # Sleep until the action is due - relative to the batch start or the previous action
+            try:
+                if item.get('at') is not None:
+                    due = started + float(item['at'])
+                else:
+                    due = previous_end + float(item.get('delay', 0))
+            except (TypeError, ValueError):
+                due = previous_end
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+            action_start = time.perf_counter()
+            entry = {"index": index, "type": item.get('action') or item.get('type'),
+                     "start_ms": round((action_start - started) * 1000, 1),
+                     "late_ms": round(max(0.0, action_start - due) * 1000, 1)}
+            try:
+                outcome = run_action_locked(item)
+                entry.update(status="success", message=outcome.get("message"))
+                completed += 1
+            except Exception as e:
+                entry.update(status="error", message=str(e))
+                logger.warning(f"Batch action {index} ({entry['type']}) failed: {e}")
+            previous_end = time.perf_counter()
+            entry["duration_ms"] = round((previous_end - action_start) * 1000, 1)
+            results.append(entry)
+            if entry["status"] == "error" and stop_on_error:
+                break
+
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"Action batch: {completed}/{len(actions)} actions in {total_ms:.0f}ms")
+        return jsonify({
+            "status": "success" if completed == len(actions) else "error",
+            "completed": completed,
+            "results": results,
+            "total_ms": total_ms
+        })
+
+    def parse_capture_params(params) -> Dict[str, Any]:
+        """
+        Validate screenshot options shared by /screenshot and /step_snapshot.
+
+        Raises:
+            ValueError: With a message for the 400 response
+        """
+        output_format = str(params.get('format', 'png')).lower()
+        if output_format == 'base64':
+            encoding = normalize_encoding(str(params.get('encoding', 'png')))
+        else:
+            encoding = normalize_encoding(output_format)
+        if encoding is None:
+            raise ValueError("Unsupported image encoding")
+
+        try:
+            scale = params.get('scale')
+            scale = float(scale) if scale is not None else None
+            quality = params.get('quality')
+            quality = int(quality) if quality is not None else None
+            compress_level = params.get('compress_level')
+            compress_level = int(compress_level) if compress_level is not None else None
+        except (TypeError, ValueError):
+            raise ValueError("Invalid scale, quality or compress_level")
+        if scale is not None and not 0 < scale <= 1:
+            raise ValueError("scale must be in (0, 1]")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError("quality must be 1-100")
+        if compress_level is not None and not 0 <= compress_level <= 9:
+            raise ValueError("compress_level must be 0-9")
+
+        region = None
+        region_str = params.get('region')
+        if region_str:
+            parts = [int(x) for x in str(region_str).split(',')]
+            if len(parts) != 4:
+                raise ValueError("Invalid region format")
+            x, y, w, h = parts
+            region = (x, y, x + w, y + h)
+
+        return {"output_format": output_format, "encoding": encoding, "scale": scale,
+                "quality": quality, "compress_level": compress_level, "region": region}
+
+    def capture_image(options: Dict[str, Any]):
+        """Grab and encode a frame. Returns (image, encoded bytes, mimetype)."""
+        img = get_capture_backend(settings.capture_backend).grab(bbox=options["region"])
+        scale = options["scale"]
+        if scale is not None and scale < 1:
+            img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))),
+                             Image.Resampling.BILINEAR)
+        data, mimetype = encode_frame(img, options["encoding"], quality=options["quality"],
+                                      compress_level=options["compress_level"])
+        return img, data, mimetype
+
     @app.route('/screenshot', methods=['GET', 'POST'])
     def screenshot():
         """
-        Take a screenshot and return as PNG image.
+        Take a screenshot and return it as an image.
 
-        Query params:
+        Query params (or JSON body for POST):
         - region: x,y,width,height (optional, full screen if not provided)
-        - format: png|base64 (default: png)
+        - format: png|jpeg|webp to return the image, or base64 for JSON (default: png)
+        - encoding: png|jpeg|webp image encoding for format=base64 (default: png)
+        - quality: 1-100 for jpeg/webp (optional)
+        - compress_level: 0-9 zlib level for png, lower is faster (optional, default 6)
+        - scale: 0-1 downscale factor (optional, e.g. 0.1 for cheap change detection)
         """
         try:
             # Accept params from GET query string or POST JSON body
             if request.method == 'POST' and request.is_json:
-                data = request.get_json()
-                region_str = data.get('region')
-                output_format = data.get('format', 'png')
+                params = request.get_json()
             else:
-                region_str = request.args.get('region')
-                output_format = request.args.get('format', 'png')
-
-            if region_str:
-                parts = [int(x) for x in region_str.split(',')]
-                if len(parts) == 4:
-                    x, y, w, h = parts
-                    region = (x, y, x + w, y + h)
-                else:
-                    return jsonify({"status": "error", "message": "Invalid region format"}), 400
-            else:
-                region = None
+                params = request.args
+            try:
+                options = parse_capture_params(params)
+            except ValueError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
 
-            # Capture screenshot
-            img = ImageGrab.grab(bbox=region)
+            img, data, mimetype = capture_image(options)
 
-            if output_format == 'base64':
+            if options["output_format"] == 'base64':
                 # Return as base64 JSON
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                buffer.seek(0)
-                img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
                 return jsonify({
                     "status": "success",
-                    "image": img_base64,
+                    "image": base64.b64encode(data).decode('utf-8'),
+                    "encoding": options["encoding"],
                     "width": img.width,
                     "height": img.height
                 })
             else:
-                # Return as PNG file
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                buffer.seek(0)
-                return send_file(buffer, mimetype='image/png')
+                response = Response(data, mimetype=mimetype)
+                response.headers['X-Image-Width'] = str(img.width)
+                response.headers['X-Image-Height'] = str(img.height)
+                return response
 
         except Exception as e:
             logger.error(f"Screenshot error: {e}")
             return jsonify({"status": "error", "message": str(e)}), 500
 
+    @app.route('/step_snapshot', methods=['POST'])
+    def step_snapshot():
+        """
+        Everything the master needs before an automation step, in one round trip:
+        game health check, optional window focus, then an optional screenshot.
+
+        Request body:
+        {
+            "process_name": "RDR2.exe",  # Optional: check this process instead of the tracked game
+            "require_running": true,     # Skip focus and capture if the game is not running (default: true)
+            "focus": true,               # Bring the game window to the foreground (default: true)
+            "focus_process": "RDR2.exe", # Optional: focus this process instead (default: the checked one)
+            "settle_ms": 200,            # Wait after a focus change before capturing (default: 200)
+            "screenshot": true,          # Capture after focusing (default: true)
+            ...                          # Screenshot options as for /screenshot (format, quality, scale, ...)
+        }
+
+        The state is returned as JSON:
+        {"status", "game": {"running", "pid", "process_name"},
+         "focus": {"requested", "result", "changed", "pid"}, "foreground": {...}, "timings_ms": {...}}
+
+        With a screenshot the body is the image instead and the state is in the
+        X-Step-State header. If the game is not running (and require_running is
+        set) nothing is focused or captured and the JSON state is returned.
+        """
+        data = request.get_json(silent=True) or {}
+        try:
+            options = parse_capture_params(data) if data.get('screenshot', True) else None
+            settle_ms = max(0, min(int(data.get('settle_ms', 200)), 5000))
+        except (TypeError, ValueError) as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        if options and options["output_format"] == 'base64':
+            return jsonify({"status": "error", "message": "format must be an image encoding"}), 400
+
+        timings = {}
+        try:
+            # 1. Process health
+            started = time.perf_counter()
+            process_name = data.get('process_name')
+            if process_name:
+                checked = check_process(process_name)
+                game = {"running": checked.get("running", False), "pid": checked.get("pid"),
+                        "process_name": process_name}
+            else:
+                info = get_current_game_info()
+                game = {"running": info.get("running", False), "pid": info.get("pid"),
+                        "process_name": info.get("process_name")}
+            timings["check"] = round((time.perf_counter() - started) * 1000, 1)
+
+            state = {"status": "success", "game": game,
+                     "focus": {"requested": bool(data.get('focus', True)), "result": None, "changed": False}}
+            if not game["running"] and data.get('require_running', True):
+                state["foreground"] = get_foreground_window()
+                state["timings_ms"] = timings
+                return jsonify(state)
+
+            # 2. Focus - skipped (with its settle delay) when the window is already in front
+            started = time.perf_counter()
+            if state["focus"]["requested"]:
+                focus_pid = game["pid"]
+                focus_process = data.get('focus_process')
+                if focus_process and (focus_process != game["process_name"] or not game["running"]):
+                    proc = find_process_by_name(focus_process)
+                    focus_pid = proc.pid if proc else None
+                state["focus"]["pid"] = focus_pid
+
+                if focus_pid is None:
+                    state["focus"]["result"] = "not_found"
+                elif get_foreground_window()["pid"] == focus_pid:
+                    state["focus"]["result"] = "already"
+                else:
+                    focused = ensure_window_foreground_v2(focus_pid, timeout=3)
+                    state["focus"]["result"] = "success" if focused else "warning"
+                    state["focus"]["changed"] = True
+                    if settle_ms:
+                        time.sleep(settle_ms / 1000)
+            timings["focus"] = round((time.perf_counter() - started) * 1000, 1)
+            state["foreground"] = get_foreground_window()
+
+            # 3. Screenshot
+            if options is None:
+                state["timings_ms"] = timings
+                return jsonify(state)
+
+            started = time.perf_counter()
+            img, image_data, mimetype = capture_image(options)
+            timings["capture"] = round((time.perf_counter() - started) * 1000, 1)
+            state["timings_ms"] = timings
+            state["image"] = {"encoding": options["encoding"], "width": img.width, "height": img.height,
+                              "bytes": len(image_data)}
+
+            response = Response(image_data, mimetype=mimetype)
+            response.headers['X-Step-State'] = json.dumps(state, separators=(',', ':'))
+            response.headers['X-Image-Width'] = str(img.width)
+            response.headers['X-Image-Height'] = str(img.height)
+            return response
+
+        except Exception as e:
+            logger.error(f"Step snapshot error: {e}")
+            return jsonify({"status": "error", "message": str(e)}), 500
+
+    @app.route('/screen_stream', methods=['GET'])
+    def screen_stream():
+        """
+        Stream the live screen as tile deltas (format in screen_stream.py).
+
+        Meant for the discovery service relay, which fans one stream out to
+        any number of viewers. Only changed tiles are sent, plus a small
+        heartbeat every few seconds while the screen is static.
+
+        Query params:
+        - fps: max frames per second (default: 5, max 30)
+        - scale: 0-1 downscale factor (default: 0.5)
+        - quality: tile JPEG quality 1-100 (default: 70)
+        - tile: tile edge in pixels, 32-512 (default: 128)
+        """
+        try:
+            fps = float(request.args.get('fps', 5))
+            scale = float(request.args.get('scale', 0.5))
+            quality = int(request.args.get('quality', 70))
+            tile_size = int(request.args.get('tile', DEFAULT_TILE_SIZE))
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid fps, scale, quality or tile"}), 400
+        if not (0 < fps <= 30 and 0 < scale <= 1 and 1 <= quality <= 100 and 32 <= tile_size <= 512):
+            return jsonify({"status": "error", "message": "fps, scale, quality or tile out of range"}), 400
+
+        if not screen_streams.acquire(blocking=False):
+            return jsonify({"status": "error", "message": "Too many screen streams"}), 429
+
+        try:
+            backend = get_capture_backend(settings.capture_backend)
+        except Exception as e:
+            screen_streams.release()
+            logger.error(f"Screen stream error: {e}")
+            return jsonify({"status": "error", "message": str(e)}), 500
+
+        logger.info(f"Screen stream started for {request.remote_addr}: {fps} fps, scale {scale}, "
+                    f"quality {quality}, {tile_size}px tiles")
+        response = Response(
+            stream_frames(backend, fps=fps, scale=scale, quality=quality, tile_size=tile_size),
+            mimetype='application/octet-stream',
+            headers={'Cache-Control': 'no-cache'}
+        )
+        # Runs when the client disconnects, even if the stream never started
+        response.call_on_close(screen_streams.release)
+        return response
+
     # =========================================================================
     # PROCESS CONTROL ENDPOINTS (from KATANA RPX v0.2)
     # =========================================================================
@@ -2123,7 +2525,8 @@ def start_service(master_override: Optional[str] = None):
                 sut_id=settings.device_id,
                 master_ip=master_ip,
                 master_port=master_port,
-                on_command=handle_ws_command
+                on_command=handle_ws_command,
+                rpc_app=app
             )
             ws_thread.start()
             logger.info("WebSocket client started")
@@ -2176,7 +2579,8 @@ def start_service(master_override: Optional[str] = None):
             sut_id=settings.device_id,
             master_ip=master_ip,
             master_port=master_port,
-            on_command=handle_ws_command
+            on_command=handle_ws_command,
+            rpc_app=app
         )
         ws_thread.start()
         logger.info("WebSocket client started (direct connection)")
@@ -553,3 +553,22 @@ def minimize_other_windows(target_pid: int, exclude_titles: list = None, exclude
         logger.error(f"minimize_other_windows failed: {e}")
 
     return minimized_count
+
+
+def get_foreground_window() -> dict:
+    """
+    Describe the current foreground window.
+
+    Returns:
+        dict with hwnd, pid, title and minimized (hwnd/pid None if there is none)
+    """
+    info = {"hwnd": None, "pid": None, "title": "", "minimized": False}
+    try:
+        hwnd = win32gui.GetForegroundWindow()
+        if hwnd:
+            _, pid = win32process.GetWindowThreadProcessId(hwnd)
+            info.update(hwnd=hwnd, pid=pid, title=win32gui.GetWindowText(hwnd),
+                        minimized=bool(win32gui.IsIconic(hwnd)))
+    except Exception as e:
+        logger.debug(f"Could not read foreground window: {e}")
+    return info
@@ -1,13 +1,20 @@
 """
 WebSocket Client for SUT
 Maintains persistent connection to Master server
+
+The connection also carries RPC requests: the Master side can send any API
+call as an "rpc_request" and gets the Flask app's response back on the same
+socket (JSON inline, other bodies as binary frames tagged with the request
+ID). See the discovery service's discovery/rpc.py for the protocol.
 """
 
 import asyncio
+import base64
 import socket
 import json
 import platform
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any, Callable
 import logging
@@ -25,6 +32,19 @@ from .system import rename_computer
 
 logger = logging.getLogger(__name__)
 
+# Threads running RPC requests through the Flask app (as many as waitress serves)
+RPC_WORKERS = 8
+
+# Threads reading streamed RPC response bodies; separate from RPC_WORKERS so
+# slow requests (/launch, /action_batch) can't stall bodies already streaming
+RPC_STREAM_WORKERS = 4
+
+# Bytes per binary frame of a streamed RPC response body
+RPC_CHUNK_SIZE = 256 * 1024
+
+# Endpoints that don't end (and are served over HTTP only)
+RPC_EXCLUDED_PATHS = ("/screen_stream",)
+
 
 class WebSocketClient:
     """
@@ -35,7 +55,8 @@ class WebSocketClient:
             sut_id="SUT-001",
             master_ip="192.168.1.10",
             master_port=5000,
-            on_command=handle_command
+            on_command=handle_command,
+            rpc_app=flask_app
         )
         await client.run()
     """
@@ -45,7 +66,8 @@ class WebSocketClient:
         sut_id: str,
         master_ip: str,
         master_port: int,
-        on_command: Optional[Callable[[Dict[str, Any]], Any]] = None
+        on_command: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        rpc_app=None
     ):
         if websockets is None:
             raise ImportError("websockets package required: pip install websockets")
@@ -55,6 +77,14 @@ class WebSocketClient:
         self.master_port = master_port
         self.on_command = on_command
 
+        # Flask app answering RPC requests (None = no RPC over this socket)
+        self.rpc_app = rpc_app
+        self._rpc_executor = ThreadPoolExecutor(max_workers=RPC_WORKERS, thread_name_prefix="ws-rpc") if rpc_app else None
+        self._rpc_stream_executor = (
+            ThreadPoolExecutor(max_workers=RPC_STREAM_WORKERS, thread_name_prefix="ws-rpc-stream") if rpc_app else None
+        )
+        self._rpc_tasks = set()
+
         self.websocket = None
         self.connected = False
         self.running = True
@@ -91,6 +121,19 @@ class WebSocketClient:
         except Exception as e:
             logger.warning(f"SSH key setup skipped: {e}")
 
+        capabilities = [
+            "preset_sync",
+            "config_backup",
+            "config_restore",
+            "basic_clicks",
+            "advanced_clicks",
+            "hotkeys",
+            "text_input",
+            "pc_rename"
+        ]
+        if self.rpc_app is not None:
+            capabilities.append("rpc")
+
         return {
             "type": "register",
             "sut_id": self.sut_id,
@@ -99,16 +142,7 @@ class WebSocketClient:
             "cpu_model": get_cpu_model(),
             "platform": platform.system(),
             "platform_version": platform.version(),
-            "capabilities": [
-                "preset_sync",
-                "config_backup",
-                "config_restore",
-                "basic_clicks",
-                "advanced_clicks",
-                "hotkeys",
-                "text_input",
-                "pc_rename"
-            ],
+            "capabilities": capabilities,
             "timestamp": datetime.utcnow().isoformat(),
             # SSH key for Master authentication (for updates)
             "ssh_public_key": ssh_public_key,
@@ -275,7 +309,13 @@ class WebSocketClient:
         msg_type = message.get("type")
         logger.debug(f"[WS] Handling message type: {msg_type}")
 
-        if msg_type == "ping":
+        if msg_type == "rpc_request" and self.rpc_app is not None:
+            # Runs alongside the message loop; responses go out on the socket it came in on
+            task = asyncio.ensure_future(self._handle_rpc(self.websocket, message))
+            self._rpc_tasks.add(task)
+            task.add_done_callback(self._rpc_tasks.discard)
+
+        elif msg_type == "ping":
             # Respond to heartbeat
             logger.debug("[WS] --> Sending pong")
             await self.websocket.send(json.dumps({"type": "pong"}))
@@ -318,6 +358,93 @@ class WebSocketClient:
         else:
             logger.warning(f"Unhandled message type: {msg_type}")
 
+    async def _handle_rpc(self, ws, message: Dict[str, Any]):
+        """Run an RPC request through the Flask app and send back its response"""
+        request_id = message.get("id", "")
+        loop = asyncio.get_running_loop()
+        response = None
+        try:
+            if len(request_id) != 32:
+                raise ValueError(f"invalid request id {request_id!r}")
+            status, headers, body, response = await loop.run_in_executor(
+                self._rpc_executor, self._call_app, message)
+        except Exception as e:
+            logger.error(f"[WS] RPC {message.get('method')} {message.get('path')} failed: {e}")
+            await ws.send(json.dumps({"type": "rpc_response", "id": request_id, "status": 502, "error": str(e)}))
+            return
+
+        reply = {"type": "rpc_response", "id": request_id, "status": status, "headers": headers}
+        try:
+            if response is None:
+                reply["json"] = body
+                await ws.send(json.dumps(reply))
+                return
+
+            reply["stream"] = True
+            await ws.send(json.dumps(reply))
+            prefix = request_id.encode("ascii")
+            chunks = response.iter_encoded()
+            while True:
+                chunk = await loop.run_in_executor(self._rpc_stream_executor, self._read_chunk, chunks)
+                if not chunk:
+                    break
+                await ws.send(prefix + chunk)
+            await ws.send(json.dumps({"type": "rpc_end", "id": request_id}))
+        except ConnectionClosed:
+            logger.debug(f"[WS] Connection closed during RPC {message.get('path')}")
+        except Exception as e:
+            logger.error(f"[WS] RPC {message.get('path')} response failed: {e}")
+            try:
+                await ws.send(json.dumps({"type": "rpc_end", "id": request_id, "error": str(e)}))
+            except Exception:
+                pass
+        finally:
+            if response is not None:
+                response.close()
+
+    def _call_app(self, message: Dict[str, Any]):
+        """
+        Call the Flask app for an RPC request (worker thread).
+
+        Returns:
+            (status, headers, json_body, None) for a complete JSON response, or
+            (status, headers, None, response) for a body to stream
+        """
+        path = message.get("path", "/")
+        method = message.get("method", "GET")
+        if path in RPC_EXCLUDED_PATHS:
+            return 400, {}, {"status": "error", "message": f"{path} is not available over RPC"}, None
+
+        kwargs = {"query_string": message.get("params") or {}, "headers": message.get("headers") or {}}
+        if "json" in message:
+            kwargs["json"] = message["json"]
+        elif message.get("body"):
+            kwargs["data"] = base64.b64decode(message["body"])
+
+        logger.debug(f"[WS] RPC {method} {path}")
+        client = self.rpc_app.test_client(use_cookies=False)
+        response = client.open(path, method=method, buffered=False,
+                               environ_base={"REMOTE_ADDR": self.master_ip}, **kwargs)
+        headers = {k: v for k, v in response.headers.items()}
+        # Unbuffered responses always report is_streamed, so go by the headers:
+        # a JSON body of known length (jsonify) is read and sent inline
+        if response.is_json and response.content_length is not None:
+            body = response.get_json(silent=True)
+            response.close()
+            headers.pop("Content-Length", None)
+            return response.status_code, headers, body, None
+        return response.status_code, headers, None, response
+
+    @staticmethod
+    def _read_chunk(chunks) -> bytes:
+        """Next RPC_CHUNK_SIZE-ish bytes of a response body (worker thread)"""
+        buffer = bytearray()
+        for piece in chunks:
+            buffer += piece
+            if len(buffer) >= RPC_CHUNK_SIZE:
+                break
+        return bytes(buffer)
+
     async def _handle_update_available(self, message: Dict[str, Any]):
         """Handle update available notification from Master"""
         new_version = message.get("version", "unknown")
@@ -369,6 +496,9 @@ class WebSocketClient:
         logger.debug("[WS] Stop requested, closing connection")
         self.running = False
         self.connected = False
+        if self._rpc_executor:
+            self._rpc_executor.shutdown(wait=False)
+            self._rpc_stream_executor.shutdown(wait=False)
 
 
 class WebSocketClientThread(threading.Thread):
@@ -382,13 +512,15 @@ class WebSocketClientThread(threading.Thread):
         sut_id: str,
         master_ip: str,
         master_port: int,
-        on_command: Optional[Callable[[Dict[str, Any]], Any]] = None
+        on_command: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        rpc_app=None
     ):
         super().__init__(daemon=True)
         self.sut_id = sut_id
         self.master_ip = master_ip
         self.master_port = master_port
         self.on_command = on_command
+        self.rpc_app = rpc_app
         self.client: Optional[WebSocketClient] = None
         self._loop: Optional[asyncio.AbstractEventLoop] = None
 
@@ -401,7 +533,8 @@ class WebSocketClientThread(threading.Thread):
             sut_id=self.sut_id,
             master_ip=self.master_ip,
             master_port=self.master_port,
-            on_command=self.on_command
+            on_command=self.on_command,
+            rpc_app=self.rpc_app
         )
 
         try:
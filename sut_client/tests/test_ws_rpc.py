@@ -0,0 +1,126 @@
+"""RPC over the SUT WebSocket: WebSocketClient._call_app / _handle_rpc against a Flask app"""
+
+import asyncio
+import json
+
+import pytest
+
+flask = pytest.importorskip("flask")
+pytest.importorskip("websockets")
+
+from sut_client import ws_client  # noqa: E402
+from sut_client.ws_client import RPC_CHUNK_SIZE, WebSocketClient  # noqa: E402
+
+REQUEST_ID = "0" * 32
+
+
+def make_app():
+    app = flask.Flask(__name__)
+
+    @app.route("/status")
+    def status():
+        return flask.jsonify({"status": "online"})
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return flask.jsonify({"json": flask.request.get_json(), "args": dict(flask.request.args)})
+
+    @app.route("/upload", methods=["POST"])
+    def upload():
+        return flask.jsonify({"size": len(flask.request.get_data())})
+
+    @app.route("/blob")
+    def blob():
+        def generate():
+            for _ in range(3):
+                yield b"x" * RPC_CHUNK_SIZE
+        return flask.Response(generate(), mimetype="application/octet-stream")
+
+    @app.route("/fail")
+    def fail():
+        return flask.jsonify({"status": "error"}), 404
+
+    return app
+
+
+class FakeSocket:
+    """Records what the client sends back"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, data):
+        self.sent.append(data)
+
+    def text(self):
+        return [json.loads(m) for m in self.sent if isinstance(m, str)]
+
+    def frames(self):
+        return [m for m in self.sent if isinstance(m, bytes)]
+
+
+@pytest.fixture
+def client():
+    rpc = WebSocketClient("SUT-TEST", "127.0.0.1", 5000, rpc_app=make_app())
+    yield rpc
+    rpc.stop()
+
+
+def handle(client, message):
+    ws = FakeSocket()
+    asyncio.run(client._handle_rpc(ws, {"type": "rpc_request", "id": REQUEST_ID, **message}))
+    return ws
+
+
+def test_call_app_returns_json_inline(client):
+    status, headers, body, response = client._call_app({"method": "GET", "path": "/status"})
+    assert (status, body, response) == (200, {"status": "online"}, None)
+    assert "Content-Length" not in headers
+
+
+def test_call_app_passes_json_and_params(client):
+    status, _, body, _ = client._call_app(
+        {"method": "POST", "path": "/echo", "params": {"a": "1"}, "json": {"k": "v"}})
+    assert status == 200
+    assert body == {"json": {"k": "v"}, "args": {"a": "1"}}
+
+
+def test_call_app_decodes_base64_body(client):
+    _, _, body, _ = client._call_app({"method": "POST", "path": "/upload", "body": "aGVsbG8="})
+    assert body == {"size": 5}
+
+
+def test_call_app_rejects_excluded_paths(client):
+    status, _, body, response = client._call_app({"method": "GET", "path": "/screen_stream"})
+    assert status == 400 and response is None
+    assert "not available over RPC" in body["message"]
+
+
+def test_handle_rpc_json_response(client):
+    ws = handle(client, {"method": "GET", "path": "/fail"})
+    (reply,) = ws.text()
+    assert reply["type"] == "rpc_response" and reply["id"] == REQUEST_ID
+    assert reply["status"] == 404 and reply["json"] == {"status": "error"}
+    assert not ws.frames()
+
+
+def test_handle_rpc_streams_body_in_tagged_frames(client):
+    ws = handle(client, {"method": "GET", "path": "/blob"})
+    head, end = ws.text()
+    assert head["stream"] is True and head["status"] == 200
+    assert end == {"type": "rpc_end", "id": REQUEST_ID}
+    frames = ws.frames()
+    assert all(f.startswith(REQUEST_ID.encode()) for f in frames)
+    assert sum(len(f) - len(REQUEST_ID) for f in frames) == 3 * RPC_CHUNK_SIZE
+
+
+def test_handle_rpc_rejects_bad_request_id(client):
+    ws = FakeSocket()
+    asyncio.run(client._handle_rpc(ws, {"type": "rpc_request", "id": "short", "path": "/status"}))
+    (reply,) = ws.text()
+    assert reply["status"] == 502 and "invalid request id" in reply["error"]
+
+
+def test_stream_reads_do_not_share_app_workers(client):
+    assert client._rpc_stream_executor is not client._rpc_executor
+    assert client._rpc_executor._max_workers == ws_client.RPC_WORKERS
@@ -6,6 +6,7 @@ from fastapi import APIRouter
 
 from ..discovery import get_device_registry, get_ws_manager
 from ..config import get_config
+from ..utils import get_sse_broadcaster
 
 router = APIRouter()
 
@@ -22,6 +23,7 @@ async def health():
         "service": "sut-discovery-service",
         "version": "1.0.0",
         "websocket_connections": ws_manager.online_count,
+        "sse": get_sse_broadcaster().stats(),
         "devices": stats,
     }
 
@@ -54,6 +56,7 @@ async def root():
                 "launch": "/api/suts/{id}/launch",
                 "apply_preset": "/api/suts/{id}/apply-preset",
                 "status": "/api/suts/{id}/status",
-            }
+            },
+            "proxy_stats": "/api/proxy-stats",
         },
     }
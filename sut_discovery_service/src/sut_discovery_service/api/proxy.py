@@ -5,16 +5,92 @@ Neither RPX nor Preset-Manager talk directly to SUTs.
 This is the single gateway for all SUT API calls.
 """
 
+import json
 import logging
-from typing import Any, Dict, Optional
-from fastapi import APIRouter, HTTPException, Request, Response
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, HTTPException, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import httpx
 
-from ..discovery import get_device_registry
+from ..config import get_config
+from ..discovery import get_device_registry, get_ws_manager, RPCError, RPCResponse, RPCUnavailable
+from ..relay import get_screen_relay_manager
+from ..utils import get_sut_client_pool
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Response headers not passed through on streamed responses (hop-by-hop or set by this server)
+DROPPED_HEADERS = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade",
+                   "proxy-authenticate", "proxy-authorization", "date", "server", "content-type"}
+
+# Request headers forwarded by the passthrough endpoint
+FORWARDED_HEADERS = ("if-none-match", "accept")
+
+# Timeout for passthrough calls; the caller applies its own, shorter one
+PASSTHROUGH_TIMEOUT = 300.0
+
+
+def get_online_device(unique_id: str):
+    """Registry entry for a SUT that can be proxied to, or an HTTPException"""
+    device = get_device_registry().get_device_by_id(unique_id)
+
+    if not device:
+        get_sut_client_pool().remove(unique_id)
+        raise HTTPException(status_code=404, detail=f"SUT {unique_id} not found")
+
+    if not device.is_online:
+        raise HTTPException(status_code=503, detail=f"SUT {unique_id} is offline")
+
+    return device
+
+
+async def rpc_to_sut(
+    unique_id: str,
+    endpoint: str,
+    method: str = "GET",
+    params: Optional[Dict[str, Any]] = None,
+    json_data: Any = None,
+    content: Optional[bytes] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0,
+) -> Optional[RPCResponse]:
+    """
+    Send a request over the SUT's WebSocket, if it has an RPC channel.
+
+    Returns:
+        The SUT's response, or None if the request should go over HTTP
+        instead: no channel, the request never left, or a GET that failed
+        (safe to repeat). A POST that may have reached the SUT is not
+        repeated; its failure raises an HTTPException.
+    """
+    channel = get_ws_manager().get_rpc_channel(unique_id)
+    if channel is None:
+        return None
+
+    metrics = get_sut_client_pool().metrics(unique_id)
+    start = time.perf_counter()
+    try:
+        response = await channel.request(method, endpoint, params=params, json_data=json_data,
+                                         body=content, headers=headers, timeout=timeout)
+    except RPCUnavailable as e:
+        metrics.rpc_fallbacks += 1
+        logger.debug(f"RPC to SUT {unique_id} unavailable ({e}), using HTTP")
+        return None
+    except RPCError as e:
+        metrics.record((time.perf_counter() - start) * 1000, error=e, rpc=True)
+        if method == "GET":
+            metrics.rpc_fallbacks += 1
+            logger.warning(f"RPC {endpoint} to SUT {unique_id} failed ({e}), retrying over HTTP")
+            return None
+        logger.error(f"RPC {method} {endpoint} to SUT {unique_id} failed: {e}")
+        raise HTTPException(status_code=504, detail=f"SUT {unique_id} did not respond: {e}")
+
+    metrics.record((time.perf_counter() - start) * 1000, response.status_code, rpc=True)
+    return response
+
 
 async def proxy_to_sut(
     unique_id: str,
@@ -27,59 +103,202 @@ async def proxy_to_sut(
     """
     Proxy a request to a SUT.
 
+    Goes over the SUT's WebSocket when it supports RPC (see
+    discovery/rpc.py), otherwise over HTTP with the SUT's pooled client
+    (see utils/sut_client_pool.py), so calls reuse a warm connection.
+
     Args:
         unique_id: SUT unique ID
         endpoint: API endpoint on the SUT (e.g., "/installed_games")
         method: HTTP method (GET, POST)
         json_data: JSON body for POST requests
         timeout: Request timeout in seconds
-        return_raw: If True, return raw response content (for binary data like screenshots)
+        return_raw: If True, return raw response content (use stream_from_sut
+                    for large binary data like screenshots)
 
     Returns:
         JSON response from SUT, or raw bytes if return_raw=True
     """
-    registry = get_device_registry()
-    device = registry.get_device_by_id(unique_id)
+    if method not in ("GET", "POST"):
+        raise HTTPException(status_code=405, detail=f"Method {method} not supported")
+
+    device = get_online_device(unique_id)
+    pool = get_sut_client_pool()
+    metrics = pool.metrics(unique_id)
+
+    rpc_response = await rpc_to_sut(unique_id, endpoint, method, json_data=json_data, timeout=timeout)
+    if rpc_response is not None:
+        try:
+            if not rpc_response.streamed and not return_raw:
+                return rpc_response.json()
+            content = await rpc_response.read()
+            metrics.bytes_received += len(content)
+            return content if return_raw else json.loads(content)
+        except Exception as e:
+            metrics.record_error(e)
+            logger.error(f"Error proxying to SUT {unique_id}: {e}")
+            raise HTTPException(status_code=502, detail=f"Error proxying to SUT: {str(e)}")
+
+    start = time.perf_counter()
+    try:
+        async with pool.use(unique_id, device.ip, device.port) as client:
+            if method == "GET":
+                response = await client.get(endpoint, timeout=timeout)
+            else:
+                response = await client.post(endpoint, json=json_data, timeout=timeout)
+    except httpx.TimeoutException as e:
+        metrics.record((time.perf_counter() - start) * 1000, error=e)
+        logger.error(f"Timeout proxying to SUT {unique_id}: {endpoint}")
+        raise HTTPException(status_code=504, detail=f"Timeout connecting to SUT {unique_id}")
+    except Exception as e:
+        metrics.record((time.perf_counter() - start) * 1000, error=e)
+        logger.error(f"Error proxying to SUT {unique_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Error proxying to SUT: {str(e)}")
 
-    if not device:
-        raise HTTPException(status_code=404, detail=f"SUT {unique_id} not found")
+    metrics.record((time.perf_counter() - start) * 1000, response.status_code)
+    metrics.bytes_received += len(response.content)
 
-    if not device.is_online:
-        raise HTTPException(status_code=503, detail=f"SUT {unique_id} is offline")
-
-    sut_url = f"http://{device.ip}:{device.port}{endpoint}"
+    if return_raw:
+        return response.content
 
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            if method == "GET":
-                response = await client.get(sut_url)
-            elif method == "POST":
-                response = await client.post(sut_url, json=json_data)
-            else:
-                raise HTTPException(status_code=405, detail=f"Method {method} not supported")
+        return response.json()
+    except Exception as e:
+        metrics.record_error(e)
+        logger.error(f"Error proxying to SUT {unique_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Error proxying to SUT: {str(e)}")
+
+
+async def stream_from_sut(
+    unique_id: str,
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0,
+    method: str = "GET",
+    content: Optional[bytes] = None,
+) -> StreamingResponse:
+    """
+    Proxy a request to a SUT and stream its response body back as it arrives.
 
-            if return_raw:
-                return response.content
+    Status code and response headers (content type, ETag, Content-Length,
+    X-Step-State, ...) are passed through, so images and conditional
+    requests (ETag / 304) work end to end without the body being buffered
+    here. Uses the SUT's RPC channel when it has one, HTTP otherwise.
 
-            return response.json()
+    Args:
+        unique_id: SUT unique ID
+        endpoint: API endpoint on the SUT (e.g., "/screenshot")
+        params: Query parameters for the SUT
+        headers: Request headers for the SUT (including Content-Type for content)
+        timeout: Timeout in seconds (connect and between body chunks)
+        method: HTTP method
+        content: Raw request body
 
-    except httpx.TimeoutException:
-        logger.error(f"Timeout proxying to SUT {unique_id}: {endpoint}")
-        raise HTTPException(status_code=504, detail=f"Timeout connecting to SUT {unique_id}")
+    Returns:
+        StreamingResponse relaying the SUT's response
+    """
+    device = get_online_device(unique_id)
+    pool = get_sut_client_pool()
+    metrics = pool.metrics(unique_id)
+
+    json_data = None
+    if content and (headers or {}).get("Content-Type", "").startswith("application/json"):
+        json_data, content = json.loads(content), None
+    rpc_response = await rpc_to_sut(unique_id, endpoint, method, params=params, json_data=json_data,
+                                    content=content, headers=headers, timeout=timeout)
+    if rpc_response is not None:
+        async def rpc_body() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in rpc_response.iter_bytes():
+                    metrics.bytes_received += len(chunk)
+                    yield chunk
+            except Exception as e:
+                metrics.record_error(e)
+                logger.error(f"Error streaming {endpoint} from SUT {unique_id}: {e}")
+                raise
+            finally:
+                # Client gone or body done - don't hold up the socket for it
+                rpc_response.close()
+
+        response_headers = {k: v for k, v in rpc_response.headers.items() if k not in DROPPED_HEADERS}
+        if not rpc_response.streamed:
+            # The JSON body is re-encoded here
+            response_headers.pop("content-length", None)
+        return StreamingResponse(
+            rpc_body(),
+            status_code=rpc_response.status_code,
+            media_type=rpc_response.headers.get("content-type", "application/json"),
+            headers=response_headers,
+        )
+
+    if json_data is not None:
+        content = json.dumps(json_data).encode("utf-8")
+    start = time.perf_counter()
+
+    # The client stays in use until the body has been relayed
+    sut_client = pool.acquire(unique_id, device.ip, device.port)
+    try:
+        request = sut_client.client.build_request(method, endpoint, params=params, headers=headers,
+                                                   content=content, timeout=timeout)
+        response = await sut_client.client.send(request, stream=True)
     except Exception as e:
+        await pool.release(sut_client)
+        metrics.record((time.perf_counter() - start) * 1000, error=e)
+        if isinstance(e, httpx.TimeoutException):
+            logger.error(f"Timeout proxying to SUT {unique_id}: {endpoint}")
+            raise HTTPException(status_code=504, detail=f"Timeout connecting to SUT {unique_id}")
         logger.error(f"Error proxying to SUT {unique_id}: {e}")
         raise HTTPException(status_code=502, detail=f"Error proxying to SUT: {str(e)}")
+    metrics.record((time.perf_counter() - start) * 1000, response.status_code)
+
+    released = False
+
+    async def finish():
+        # Runs after the body is relayed, or as the background task if the
+        # viewer went away before it started
+        nonlocal released
+        if not released:
+            released = True
+            await response.aclose()
+            await pool.release(sut_client)
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in response.aiter_raw():
+                metrics.bytes_received += len(chunk)
+                yield chunk
+        except Exception as e:
+            metrics.record_error(e)
+            logger.error(f"Error streaming {endpoint} from SUT {unique_id}: {e}")
+            raise
+        finally:
+            await finish()
+
+    return StreamingResponse(
+        body(),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type"),
+        headers={k: v for k, v in response.headers.items() if k not in DROPPED_HEADERS},
+        background=BackgroundTask(finish),
+    )
 
 
 # ============== Game Information ==============
 
 @router.get("/suts/{unique_id}/games")
-async def get_installed_games(unique_id: str):
+async def get_installed_games(unique_id: str, request: Request):
     """
     Get installed games on SUT.
     Proxies to SUT /installed_games endpoint.
+
+    Query params (since, refresh) and If-None-Match are passed through, so
+    ETag revalidation and deltas work through the proxy.
     """
-    return await proxy_to_sut(unique_id, "/installed_games", "GET")
+    headers = {}
+    if "if-none-match" in request.headers:
+        headers["If-None-Match"] = request.headers["if-none-match"]
+    return await stream_from_sut(unique_id, "/installed_games", dict(request.query_params), headers)
 
 
 # ============== Preset Management ==============
@@ -97,14 +316,66 @@ async def apply_preset(unique_id: str, request: Request):
 # ============== Screenshots ==============
 
 @router.get("/suts/{unique_id}/screenshot")
-async def get_screenshot(unique_id: str):
+async def get_screenshot(unique_id: str, request: Request):
     """
     Get screenshot from SUT.
-    Proxies to SUT /screenshot endpoint.
-    Returns raw PNG image bytes.
+    Proxies to SUT /screenshot endpoint, streaming the image through.
+    Query params (format, quality, scale, profile, ...) are passed through;
+    without them the SUT returns PNG.
     """
-    raw_bytes = await proxy_to_sut(unique_id, "/screenshot", "GET", return_raw=True)
-    return Response(content=raw_bytes, media_type="image/png")
+    return await stream_from_sut(unique_id, "/screenshot", dict(request.query_params))
+
+
+# ============== Live Screen ==============
+
+@router.websocket("/suts/{unique_id}/screen/stream")
+async def screen_stream(websocket: WebSocket, unique_id: str, fps: Optional[float] = None):
+    """
+    Live screen of a SUT over WebSocket.
+
+    Relays the SUT /screen_stream tile-delta stream: one upstream connection
+    per SUT is shared by every viewer. Each binary message is
+    [4-byte header length][JSON header][tile JPEGs]; the header lists tiles
+    as [x, y, w, h, nbytes] and "key": true means redraw from scratch.
+
+    Query params:
+    - fps: max frames per second for this viewer (capped at the relay rate)
+    """
+    config = get_config()
+    device = get_device_registry().get_device_by_id(unique_id)
+    if not device or not device.is_online:
+        await websocket.close(code=4404, reason=f"SUT {unique_id} not found or offline")
+        return
+
+    await websocket.accept()
+    max_fps = max(0.5, min(fps or config.screen_stream_fps, config.screen_stream_fps))
+    manager = get_screen_relay_manager()
+    relay = manager.get_relay(
+        unique_id,
+        f"http://{device.ip}:{device.port}/screen_stream",
+        {
+            "fps": config.screen_stream_fps,
+            "scale": config.screen_stream_scale,
+            "quality": config.screen_stream_quality,
+        },
+    )
+    logger.info(f"Screen viewer attached to {unique_id} at {max_fps} fps ({len(relay.viewers) + 1} watching)")
+    await manager.watch(relay, websocket, max_fps)
+    logger.info(f"Screen viewer detached from {unique_id} ({len(relay.viewers)} watching)")
+
+
+@router.get("/screen-streams")
+async def screen_stream_stats():
+    """Active screen relays with their viewers and traffic."""
+    return {"relays": get_screen_relay_manager().stats()}
+
+
+# ============== Proxy Metrics ==============
+
+@router.get("/proxy-stats")
+async def proxy_stats():
+    """Per-SUT proxy metrics: request and error counts, latency (time to headers), bytes received."""
+    return {"suts": get_sut_client_pool().stats()}
 
 
 # ============== Input Actions ==============
@@ -209,3 +480,23 @@ async def restart_sut(unique_id: str):
     Proxies to SUT /restart endpoint.
     """
     return await proxy_to_sut(unique_id, "/restart", "POST", timeout=10.0)
+
+
+# ============== Passthrough ==============
+
+@router.api_route("/suts/{unique_id}/rpc/{path:path}", methods=["GET", "POST"])
+async def passthrough(unique_id: str, path: str, request: Request):
+    """
+    Any SUT API call, relayed as is.
+
+    Lets a client (e.g. RPX's NetworkManager in gateway mode) use this service
+    as the SUT's base URL: the call goes over the SUT's warm WebSocket when
+    it supports RPC, or over HTTP otherwise. Query params, the body and its
+    Content-Type are forwarded; the response streams back unchanged.
+    """
+    headers = {name.title(): request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    if "content-type" in request.headers:
+        headers["Content-Type"] = request.headers["content-type"]
+    content = await request.body() if request.method == "POST" else None
+    return await stream_from_sut(unique_id, f"/{path}", dict(request.query_params), headers,
+                                 timeout=PASSTHROUGH_TIMEOUT, method=request.method, content=content)
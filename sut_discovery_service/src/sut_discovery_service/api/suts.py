@@ -6,44 +6,35 @@ Supports SSE for real-time frontend updates.
 import asyncio
 import json
 import logging
-from typing import Optional, List, Set
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Query
+from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from ..discovery import get_device_registry, get_ws_manager, SUTStatus
 from ..discovery.events import event_bus, EventType, Event
+from ..utils import get_sut_client_pool, get_sse_broadcaster
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# SSE clients for real-time updates
-_sse_clients: Set[asyncio.Queue] = set()
+# Seconds between keepalive comments on an idle SSE stream
+SSE_KEEPALIVE = 30.0
 
 
-async def broadcast_sse_event(event_type: str, data: dict):
-    """Broadcast event to all SSE clients"""
-    event_data = json.dumps({"type": event_type, "data": data})
-    dead_clients = []
-
-    for queue in _sse_clients:
-        try:
-            queue.put_nowait(event_data)
-        except Exception:
-            dead_clients.append(queue)
-
-    for client in dead_clients:
-        _sse_clients.discard(client)
+def broadcast_sse_event(event_type: str, data: dict):
+    """Broadcast event to all SSE clients; status events are coalesced per SUT"""
+    get_sse_broadcaster().publish(event_type, data, coalesce_key=data.get("sut_id"))
 
 
 def _on_ws_connected(event: Event):
     """Handle SUT connected event"""
-    asyncio.create_task(broadcast_sse_event("sut_online", event.data))
+    broadcast_sse_event("sut_online", event.data)
 
 
 def _on_ws_disconnected(event: Event):
     """Handle SUT disconnected event"""
-    asyncio.create_task(broadcast_sse_event("sut_offline", event.data))
+    broadcast_sse_event("sut_offline", event.data)
 
 
 # Subscribe to events
@@ -61,34 +52,41 @@ def _init_sse_handlers():
 
 
 @router.get("/suts/events")
-async def sut_events_stream():
+async def sut_events_stream(request: Request, last_event_id: Optional[str] = Query(None)):
     """
     Server-Sent Events endpoint for real-time SUT updates.
 
     Events:
     - sut_online: When a SUT connects
     - sut_offline: When a SUT disconnects
+    - resync: Events were missed (client too slow, or too long away);
+      refetch the device list
+
+    A reconnecting client gets the events it missed since Last-Event-ID
+    (header, or ?last_event_id= for clients that open a new EventSource).
     """
     _init_sse_handlers()
+    broadcaster = get_sse_broadcaster()
+    resume_from = request.headers.get("last-event-id") or last_event_id
 
     async def event_generator():
-        queue = asyncio.Queue()
-        _sse_clients.add(queue)
-
+        client = broadcaster.subscribe(resume_from)
         try:
             # Send initial connection event
             yield f"data: {json.dumps({'type': 'connected', 'data': {'message': 'SSE connected'}})}\n\n"
 
             while True:
-                try:
-                    event_data = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {event_data}\n\n"
-                except asyncio.TimeoutError:
+                events = await client.get(SSE_KEEPALIVE)
+                if not events:
                     yield f": keepalive\n\n"
+                    continue
+                # Everything pending in one write, so a burst doesn't cost a loop turn per event
+                yield "".join(f"id: {event_id}\ndata: {event_data}\n\n" if event_id else f"data: {event_data}\n\n"
+                              for event_id, event_data in events)
         except asyncio.CancelledError:
             pass
         finally:
-            _sse_clients.discard(queue)
+            broadcaster.unsubscribe(client)
 
     return StreamingResponse(
         event_generator(),
@@ -324,12 +322,28 @@ async def websocket_sut_endpoint(websocket: WebSocket, sut_id: str):
         # Keep connection alive and handle messages
         while True:
             try:
-                message = await websocket.receive_json()
-                logger.debug(f"Message from SUT {sut_id}: {message}")
+                raw = await websocket.receive()
+                if raw["type"] == "websocket.disconnect":
+                    break
+
+                # Binary frames are RPC response bodies
+                if raw.get("bytes") is not None:
+                    if connection.rpc:
+                        await connection.rpc.feed_binary(raw["bytes"])
+                    continue
+
+                message = json.loads(raw["text"])
 
                 # Handle different message types
                 msg_type = message.get("type")
 
+                if msg_type in ("rpc_response", "rpc_end"):
+                    if connection.rpc:
+                        connection.rpc.feed(message)
+                    continue
+
+                logger.debug(f"Message from SUT {sut_id}: {message}")
+
                 if msg_type == "heartbeat":
                     registry.register_device(
                         ip=init_data.get("ip", "unknown"),
@@ -371,7 +385,7 @@ async def websocket_sut_endpoint(websocket: WebSocket, sut_id: str):
     except Exception as e:
         logger.error(f"Error in SUT {sut_id} WebSocket: {e}")
     finally:
-        await ws_manager.disconnect(sut_id)
+        await ws_manager.disconnect(sut_id, websocket)
         registry.mark_device_offline(sut_id)
 
 
@@ -432,6 +446,9 @@ async def cleanup_stale_devices(request: Optional[CleanupRequest] = None):
     timeout = request.timeout_seconds if request and request.timeout_seconds else None
 
     result = registry.remove_stale_devices(timeout)
+    pool = get_sut_client_pool()
+    for device in result["removed_devices"]:
+        pool.remove(device["unique_id"])
 
     return {
         "success": True,
@@ -468,7 +485,7 @@ async def broadcast_update(request: BroadcastUpdateRequest):
     }
 
     results = await ws_manager.broadcast(message)
-    notified = sum(1 for v in results.values() if v)
+    notified = sum(1 for r in results.values() if r["success"])
 
     logger.info(f"Broadcast update notification to {notified}/{len(results)} SUTs")
 
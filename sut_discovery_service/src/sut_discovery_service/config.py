@@ -28,6 +28,20 @@ class DiscoveryServiceConfig:
     # Network settings
     network_ranges: List[str] = None
 
+    # Live screen relay (one upstream /screen_stream per watched SUT)
+    screen_stream_fps: float = 5.0  # Upstream capture rate; also the per-viewer maximum
+    screen_stream_scale: float = 0.5
+    screen_stream_quality: int = 70
+
+    # SUT proxy (one pooled HTTP client per SUT)
+    proxy_max_connections: int = 8  # Per SUT
+    proxy_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+
+    # SSE (/api/suts/events)
+    sse_queue_size: int = 256  # Events buffered per client before the oldest are dropped
+    sse_coalesce_window: float = 0.5  # Seconds repeated status events for one SUT are merged over
+    sse_replay_size: int = 500  # Recent events kept for Last-Event-ID replay
+
     # Logging
     log_level: str = "INFO"
     log_file: str = "sut_discovery.log"
@@ -44,6 +58,14 @@ class DiscoveryServiceConfig:
             offline_timeout=int(os.getenv("DISCOVERY_OFFLINE_TIMEOUT", "30")),
             stale_device_timeout=int(os.getenv("DISCOVERY_STALE_TIMEOUT", "300")),
             paired_devices_file=os.getenv("PAIRED_DEVICES_FILE", "paired_devices.json"),
+            screen_stream_fps=float(os.getenv("SCREEN_STREAM_FPS", "5.0")),
+            screen_stream_scale=float(os.getenv("SCREEN_STREAM_SCALE", "0.5")),
+            screen_stream_quality=int(os.getenv("SCREEN_STREAM_QUALITY", "70")),
+            proxy_max_connections=int(os.getenv("PROXY_MAX_CONNECTIONS", "8")),
+            proxy_keepalive_expiry=float(os.getenv("PROXY_KEEPALIVE_EXPIRY", "30.0")),
+            sse_queue_size=int(os.getenv("SSE_QUEUE_SIZE", "256")),
+            sse_coalesce_window=float(os.getenv("SSE_COALESCE_WINDOW", "0.5")),
+            sse_replay_size=int(os.getenv("SSE_REPLAY_SIZE", "500")),
             log_level=os.getenv("DISCOVERY_LOG_LEVEL", "INFO"),
             log_file=os.getenv("DISCOVERY_LOG_FILE", "sut_discovery.log"),
         )
@@ -6,10 +6,12 @@ from .events import EventType, Event, EventBus, event_bus
 from .device_registry import SUTDevice, SUTStatus, DeviceRegistry, get_device_registry
 from .udp_announcer import UDPAnnouncer
 from .websocket_manager import WebSocketManager, get_ws_manager
+from .rpc import RPCChannel, RPCError, RPCResponse, RPCUnavailable
 
 __all__ = [
     "EventType", "Event", "EventBus", "event_bus",
     "SUTDevice", "SUTStatus", "DeviceRegistry", "get_device_registry",
     "UDPAnnouncer",
     "WebSocketManager", "get_ws_manager",
+    "RPCChannel", "RPCError", "RPCResponse", "RPCUnavailable",
 ]
@@ -0,0 +1,243 @@
+"""
+RPC over the SUT WebSocket.
+
+SUTs keep a WebSocket open to this service (/ws/sut/{sut_id}). SUT clients
+that advertise the "rpc" capability also answer HTTP-style requests on it,
+so the proxy can reach their API over the warm connection - no TCP handshake
+per call, and no need for the SUT's port 8080 to be reachable at all.
+
+Protocol (JSON text messages unless noted):
+  service -> SUT  {"type": "rpc_request", "id", "method", "path",
+                   "params", "headers", "json" | "body" (base64)}
+  SUT -> service  {"type": "rpc_response", "id", "status", "headers", "json"}
+                  a complete response with a JSON body, or
+                  {"type": "rpc_response", "id", "status", "headers", "stream": true}
+                  followed by binary frames [32-byte id][chunk] and
+                  {"type": "rpc_end", "id", "error"?} when the body is done.
+                  {"type": "rpc_response", "id", "status": 502, "error"} if the
+                  SUT couldn't run the request.
+
+Request IDs are uuid4 hex strings (32 ASCII bytes), used as-is to tag
+binary frames.
+
+Streamed bodies are buffered up to STREAM_BUFFER_CHUNKS frames. When a reader
+falls behind, feed_binary() waits for it, which holds up the socket and so the
+SUT; a reader that stalls for BACKPRESSURE_TIMEOUT has its stream failed.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Max time between two chunks of a streamed body
+CHUNK_TIMEOUT = 30.0
+
+# Frames buffered per streamed body (the SUT sends ~256 KB per frame)
+STREAM_BUFFER_CHUNKS = 32
+
+# Max time the socket waits for a reader to make room in a full buffer
+BACKPRESSURE_TIMEOUT = 10.0
+
+ID_LENGTH = 32
+
+
+class RPCUnavailable(Exception):
+    """The request could not be sent; it never reached the SUT"""
+
+
+class RPCError(Exception):
+    """The request was sent but no complete response came back"""
+
+
+class RPCResponse:
+    """Response to an RPC request; a streamed body is read with iter_bytes()"""
+
+    def __init__(self, message: Dict[str, Any]):
+        self.status_code: int = message.get("status", 502)
+        self.headers: Dict[str, str] = {k.lower(): v for k, v in (message.get("headers") or {}).items()}
+        self.error: Optional[str] = message.get("error")
+        self.streamed = bool(message.get("stream"))
+        self._json = message.get("json")
+        self._chunks: Optional[asyncio.Queue] = (
+            asyncio.Queue(maxsize=STREAM_BUFFER_CHUNKS) if self.streamed else None
+        )
+        # True once the body is complete, or the exception that ended it
+        self._end: Any = None
+        self._closed = False
+
+    def json(self) -> Any:
+        if self._json is None and self.error:
+            return {"error": self.error}
+        return self._json
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        """Body chunks as they arrive"""
+        if not self.streamed:
+            yield json.dumps(self.json()).encode("utf-8")
+            return
+        while True:
+            if self._end is not None and self._chunks.empty():
+                if isinstance(self._end, Exception):
+                    raise self._end
+                return
+            try:
+                chunk = await asyncio.wait_for(self._chunks.get(), CHUNK_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise RPCError(f"no data for {CHUNK_TIMEOUT:g}s")
+            if chunk is None:
+                continue  # End marker - checked above once the buffer is drained
+            yield chunk
+
+    def close(self):
+        """Stop reading; the rest of the body is discarded as it arrives"""
+        self._closed = True
+        if self._chunks is not None:
+            while not self._chunks.empty():
+                self._chunks.get_nowait()
+
+    async def _put_chunk(self, chunk: bytes) -> bool:
+        """Buffer a body chunk, waiting while the reader catches up; False if it doesn't"""
+        if self._closed:
+            return True
+        try:
+            await asyncio.wait_for(self._chunks.put(chunk), BACKPRESSURE_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _finish(self, error: Optional[Exception] = None):
+        """Mark the body complete (or failed) and wake the reader"""
+        if self._end is None:
+            self._end = error or True
+        try:
+            self._chunks.put_nowait(None)
+        except asyncio.QueueFull:
+            pass  # The reader is behind and will see _end once it drains the buffer
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_bytes()])
+
+
+class RPCChannel:
+    """Outstanding RPC requests on one SUT WebSocket"""
+
+    def __init__(self, sut_id: str, websocket: WebSocket):
+        self.sut_id = sut_id
+        self.websocket = websocket
+        self.closed = False
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, RPCResponse] = {}
+        self.requests = 0
+        self.failures = 0
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Any = None,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30.0,
+    ) -> RPCResponse:
+        """
+        Send a request to the SUT and wait for its response headers.
+
+        Raises:
+            RPCUnavailable: Channel closed or the send failed (safe to retry over HTTP)
+            RPCError: Sent, but the connection dropped or timed out before a response
+        """
+        if self.closed:
+            raise RPCUnavailable("channel closed")
+
+        request_id = uuid.uuid4().hex
+        message: Dict[str, Any] = {
+            "type": "rpc_request",
+            "id": request_id,
+            "method": method,
+            "path": path,
+            "params": params or {},
+            "headers": headers or {},
+        }
+        if json_data is not None:
+            message["json"] = json_data
+        elif body:
+            message["body"] = base64.b64encode(body).decode("ascii")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.requests += 1
+        try:
+            try:
+                await asyncio.wait_for(self.websocket.send_json(message), timeout)
+            except asyncio.TimeoutError:
+                # May or may not have gone out; not safe to retry
+                raise RPCError(f"send timed out after {timeout:g}s")
+            except Exception as e:
+                raise RPCUnavailable(f"send failed: {e}")
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise RPCError(f"no response within {timeout:g}s")
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    def feed(self, message: Dict[str, Any]):
+        """Handle an rpc_response / rpc_end text message from the SUT"""
+        request_id = message.get("id")
+        if message.get("type") == "rpc_end":
+            response = self._streams.pop(request_id, None)
+            if response is not None:
+                error = message.get("error")
+                response._finish(RPCError(error) if error else None)
+            return
+
+        future = self._pending.get(request_id)
+        if future is None or future.done():
+            logger.debug(f"RPC response for unknown request {request_id} from {self.sut_id}")
+            return
+        response = RPCResponse(message)
+        if response.streamed:
+            self._streams[request_id] = response
+        future.set_result(response)
+
+    async def feed_binary(self, frame: bytes):
+        """Handle a binary body frame from the SUT (waits while its reader is behind)"""
+        request_id = frame[:ID_LENGTH].decode("ascii", "replace")
+        response = self._streams.get(request_id)
+        if response is None:
+            return
+        if not await response._put_chunk(frame[ID_LENGTH:]):
+            logger.warning(f"RPC stream {request_id} from {self.sut_id}: reader stalled, dropping it")
+            self._streams.pop(request_id, None)
+            response._finish(RPCError(f"reader stalled for {BACKPRESSURE_TIMEOUT:g}s"))
+
+    def close(self):
+        """Fail everything outstanding (socket gone)"""
+        self.closed = True
+        error = RPCError(f"SUT {self.sut_id} disconnected")
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        for response in self._streams.values():
+            response._finish(error)
+        self._pending.clear()
+        self._streams.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "pending": len(self._pending),
+            "streaming": len(self._streams),
+        }
@@ -1,18 +1,34 @@
 """
 WebSocket Connection Manager for SUT Connections.
 Tracks connected SUTs and provides instant online/offline detection.
+
+Broadcasts (update announcements, SSH key exchange) fan out concurrently,
+a bounded number of sends at a time, each with its own timeout. A socket
+that fails or times out is evicted, so one half-dead SUT costs the
+broadcast at most one timeout instead of stalling every SUT after it.
 """
 
 import asyncio
+import time
 from datetime import datetime
 from typing import Dict, Optional, Set, Callable, Any, List
 from fastapi import WebSocket
 import logging
 
 from .events import event_bus, EventType
+from .rpc import RPCChannel
 
 logger = logging.getLogger(__name__)
 
+# Max time for one send before the socket is considered dead
+SEND_TIMEOUT = 5.0
+
+# Sends in flight at once during a broadcast
+BROADCAST_CONCURRENCY = 32
+
+# Max time to wait for an evicted socket to close
+CLOSE_TIMEOUT = 2.0
+
 
 class SUTConnection:
     """Represents a single connected SUT."""
@@ -24,6 +40,10 @@ class SUTConnection:
         self.connected_at = datetime.utcnow()
         self.last_seen = datetime.utcnow()
         self.status = "online"
+        # Request/response channel on this socket (SUT clients with the "rpc" capability)
+        self.rpc: Optional[RPCChannel] = (
+            RPCChannel(sut_id, websocket) if "rpc" in info.get("capabilities", []) else None
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API responses."""
@@ -35,6 +55,7 @@ class SUTConnection:
             "display_name": self.info.get("display_name"),
             "capabilities": self.info.get("capabilities", []),
             "status": self.status,
+            "rpc": self.rpc is not None,
             "connected_at": self.connected_at.isoformat(),
             "last_seen": self.last_seen.isoformat()
         }
@@ -63,6 +84,7 @@ class WebSocketManager:
         self._connections: Dict[str, SUTConnection] = {}
         self._event_handlers: Dict[str, Set[Callable]] = {}
         self._lock = asyncio.Lock()
+        self._closing: Set[asyncio.Task] = set()
 
     async def connect(self, sut_id: str, websocket: WebSocket, info: Dict[str, Any]) -> SUTConnection:
         """
@@ -73,6 +95,8 @@ class WebSocketManager:
             # Close existing connection if any
             if sut_id in self._connections:
                 old_conn = self._connections[sut_id]
+                if old_conn.rpc:
+                    old_conn.rpc.close()
                 try:
                     await old_conn.websocket.close(code=1000, reason="New connection")
                 except:
@@ -90,12 +114,19 @@ class WebSocketManager:
 
             return connection
 
-    async def disconnect(self, sut_id: str):
-        """Handle SUT disconnection."""
+    async def disconnect(self, sut_id: str, websocket: Optional[WebSocket] = None):
+        """
+        Handle SUT disconnection.
+        If websocket is given, only that connection is removed (not a newer
+        one the SUT has made since).
+        """
         async with self._lock:
-            if sut_id in self._connections:
-                conn = self._connections.pop(sut_id)
+            conn = self._connections.get(sut_id)
+            if conn and (websocket is None or conn.websocket is websocket):
+                self._connections.pop(sut_id)
                 conn.status = "offline"
+                if conn.rpc:
+                    conn.rpc.close()
 
                 logger.info(f"[OFFLINE] SUT {sut_id} disconnected")
 
@@ -110,6 +141,13 @@ class WebSocketManager:
         """Get connection for specific SUT."""
         return self._connections.get(sut_id)
 
+    def get_rpc_channel(self, sut_id: str) -> Optional[RPCChannel]:
+        """RPC channel to a connected SUT, if its client supports it."""
+        conn = self._connections.get(sut_id)
+        if conn and conn.rpc and not conn.rpc.closed:
+            return conn.rpc
+        return None
+
     def get_all_connections(self) -> List[Dict[str, Any]]:
         """Get all connected SUTs as list of dicts."""
         return [conn.to_dict() for conn in self._connections.values()]
@@ -131,25 +169,50 @@ class WebSocketManager:
             return True
         return False
 
-    async def send_command(self, sut_id: str, command: Dict[str, Any]) -> bool:
+    async def send_command(self, sut_id: str, command: Dict[str, Any], timeout: float = SEND_TIMEOUT) -> bool:
         """
         Send command to specific SUT.
-        Returns True if sent successfully, False if SUT not connected.
+        Returns True if sent successfully, False if SUT not connected or the
+        send failed (the connection is then evicted).
         """
         conn = self._connections.get(sut_id)
         if not conn:
             logger.warning(f"Cannot send to {sut_id}: not connected")
             return False
 
+        error = await self._send(conn, command, timeout)
+        if error:
+            logger.error(f"Send to {sut_id} failed: {error}")
+            await self._evict(conn)
+            return False
+        logger.debug(f"Sent to {sut_id}: {command.get('type')}")
+        return True
+
+    async def _send(self, conn: SUTConnection, command: Dict[str, Any], timeout: float) -> Optional[str]:
+        """Send with a timeout; returns an error message, or None if sent"""
         try:
-            await conn.websocket.send_json(command)
-            conn.update_last_seen()
-            logger.debug(f"Sent to {sut_id}: {command.get('type')}")
-            return True
+            await asyncio.wait_for(conn.websocket.send_json(command), timeout)
+        except asyncio.TimeoutError:
+            return f"timed out after {timeout:g}s"
         except Exception as e:
-            logger.error(f"Send to {sut_id} failed: {e}")
-            await self.disconnect(sut_id)
-            return False
+            return str(e) or type(e).__name__
+        conn.update_last_seen()
+        return None
+
+    async def _evict(self, conn: SUTConnection):
+        """Drop a connection whose socket failed; the socket is closed in the background"""
+        await self.disconnect(conn.sut_id, conn.websocket)
+        task = asyncio.create_task(self._close_socket(conn.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_socket(websocket: WebSocket):
+        try:
+            # A half-dead peer may never complete the close handshake
+            await asyncio.wait_for(websocket.close(code=1011, reason="Send failed"), CLOSE_TIMEOUT)
+        except Exception:
+            pass
 
     async def send_to_device(self, sut_id: str, message: Dict[str, Any]) -> bool:
         """
@@ -161,26 +224,53 @@ class WebSocketManager:
     async def broadcast(
         self,
         command: Dict[str, Any],
-        sut_ids: Optional[List[str]] = None
-    ) -> Dict[str, bool]:
+        sut_ids: Optional[List[str]] = None,
+        concurrency: int = BROADCAST_CONCURRENCY,
+        timeout: float = SEND_TIMEOUT
+    ) -> Dict[str, Dict[str, Any]]:
         """
         Broadcast command to multiple SUTs.
 
+        Sends run concurrently, at most `concurrency` at a time. A send that
+        fails or takes longer than `timeout` evicts that SUT's connection.
+
         Args:
             command: Command to send
             sut_ids: List of SUT IDs to target (None = all connected)
+            concurrency: Max sends in flight at once
+            timeout: Per-SUT send timeout in seconds
 
         Returns:
-            Dict mapping sut_id to success boolean
+            Dict mapping sut_id to {"success", "latency_ms", "error"}
         """
         targets = sut_ids if sut_ids else list(self._connections.keys())
-        results = {}
-
-        for sut_id in targets:
-            results[sut_id] = await self.send_command(sut_id, command)
-
-        success_count = sum(1 for v in results.values() if v)
-        logger.info(f"Broadcast '{command.get('type')}' to {success_count}/{len(targets)} SUTs")
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        evicted: List[SUTConnection] = []
+
+        async def send(sut_id: str) -> Dict[str, Any]:
+            conn = self._connections.get(sut_id)
+            if not conn:
+                return {"success": False, "latency_ms": None, "error": "not connected"}
+            async with semaphore:
+                start = time.perf_counter()
+                error = await self._send(conn, command, timeout)
+                latency_ms = round((time.perf_counter() - start) * 1000, 1)
+            if error:
+                logger.warning(f"Broadcast '{command.get('type')}' to {sut_id} failed: {error}")
+                evicted.append(conn)
+            return {"success": error is None, "latency_ms": latency_ms, "error": error}
+
+        start = time.perf_counter()
+        sent = await asyncio.gather(*(send(sut_id) for sut_id in targets))
+        results = dict(zip(targets, sent))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if evicted:
+            await asyncio.gather(*(self._evict(conn) for conn in evicted))
+
+        success_count = sum(1 for r in results.values() if r["success"])
+        logger.info(f"Broadcast '{command.get('type')}' to {success_count}/{len(targets)} SUTs "
+                    f"in {elapsed_ms:.0f}ms ({len(evicted)} evicted)")
 
         return results
 
@@ -15,7 +15,7 @@ import uvicorn
 
 from .config import get_config, set_config, DiscoveryServiceConfig
 from .discovery import get_device_registry, get_ws_manager, UDPAnnouncer
-from .utils import NetworkDiscovery
+from .utils import NetworkDiscovery, get_sut_client_pool
 from .api import suts_router, proxy_router, health_router, branding_router
 
 # Configure logging
@@ -85,6 +85,7 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down SUT Discovery Service")
     if _udp_announcer:
         _udp_announcer.stop()
+    await get_sut_client_pool().close_all()
     registry.save_paired_devices()
     logger.info("Discovery Service stopped")
 
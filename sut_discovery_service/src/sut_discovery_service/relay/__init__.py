@@ -0,0 +1,9 @@
+"""
+Relay module - fans SUT streams out to many clients.
+"""
+
+from .screen_relay import ScreenRelay, ScreenRelayManager, ScreenViewer, get_screen_relay_manager
+
+__all__ = [
+    "ScreenRelay", "ScreenRelayManager", "ScreenViewer", "get_screen_relay_manager",
+]
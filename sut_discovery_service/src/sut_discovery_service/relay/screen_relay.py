@@ -0,0 +1,264 @@
+"""
+Screen Relay - fans one live screen stream per SUT out to many viewers.
+
+Each SUT streams tile deltas from its /screen_stream endpoint (see the SUT
+client's screen_stream.py for the format). The relay keeps a single upstream
+connection per SUT however many viewers are watching, and remembers the
+latest JPEG for every tile so a new viewer starts with a complete picture.
+
+Viewers are capped at their own frame rate. Tiles that arrive between two
+sends are coalesced (the newest version of each tile wins), so a slow viewer
+or a low fps cap costs less bandwidth rather than building a backlog.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# (x, y) of a tile -> ([x, y, w, h], jpeg bytes)
+TileMap = Dict[Tuple[int, int], Tuple[List[int], bytes]]
+
+# Keep the upstream open this long after the last viewer leaves (page reloads, tab switches)
+UPSTREAM_GRACE_SECONDS = 10.0
+
+# Upstream reconnect backoff
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 15.0
+
+
+def parse_message(message: bytes) -> Tuple[Dict[str, Any], TileMap]:
+    """Split a stream message into its header and tiles"""
+    header_len = struct.unpack('>I', message[:4])[0]
+    header = json.loads(message[4:4 + header_len])
+    tiles: TileMap = {}
+    offset = 4 + header_len
+    for x, y, w, h, nbytes in header.get("tiles", []):
+        tiles[(x, y)] = ([x, y, w, h], message[offset:offset + nbytes])
+        offset += nbytes
+    return header, tiles
+
+
+def build_message(header: Dict[str, Any], tiles: TileMap) -> bytes:
+    """Stream message from a header and tiles (header["tiles"] is rebuilt)"""
+    header = dict(header, tiles=[rect + [len(data)] for rect, data in tiles.values()])
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    return struct.pack('>I', len(header_bytes)) + header_bytes + b''.join(data for _, data in tiles.values())
+
+
+class ScreenViewer:
+    """One WebSocket watching a SUT's screen"""
+
+    def __init__(self, websocket: WebSocket, max_fps: float):
+        self.websocket = websocket
+        self.interval = 1.0 / max_fps
+        self.pending: TileMap = {}
+        self.key = True  # Next send replaces the whole picture
+        self.header: Dict[str, Any] = {}
+        self.ready = asyncio.Event()
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.tiles_coalesced = 0
+
+    def queue(self, header: Dict[str, Any], tiles: TileMap, key: bool):
+        if key:
+            self.pending = {}
+            self.key = True
+        for pos in tiles:
+            if pos in self.pending:
+                self.tiles_coalesced += 1
+        self.pending.update(tiles)
+        self.header = header
+        self.ready.set()
+
+    async def run(self):
+        """Send coalesced updates at most max_fps times a second until the socket closes"""
+        last_send = 0.0
+        while True:
+            await self.ready.wait()
+            wait = self.interval - (time.monotonic() - last_send)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.ready.clear()
+            if not self.pending and not self.key:
+                continue
+
+            tiles, self.pending = self.pending, {}
+            header = dict(self.header, key=self.key)
+            self.key = False
+            message = build_message(header, tiles)
+            await self.websocket.send_bytes(message)
+            last_send = time.monotonic()
+            self.frames_sent += 1
+            self.bytes_sent += len(message)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_fps": round(1.0 / self.interval, 2),
+            "frames_sent": self.frames_sent,
+            "bytes_sent": self.bytes_sent,
+            "tiles_coalesced": self.tiles_coalesced,
+        }
+
+
+class ScreenRelay:
+    """Upstream screen stream of one SUT and its viewers"""
+
+    def __init__(self, unique_id: str, url: str, params: Dict[str, Any]):
+        self.unique_id = unique_id
+        self.url = url
+        self.params = params
+        self.viewers: Set[ScreenViewer] = set()
+        self.tiles: TileMap = {}
+        self.header: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop_timer: Optional[asyncio.TimerHandle] = None
+        self.connected = False
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.reconnects = 0
+
+    def add_viewer(self, viewer: ScreenViewer):
+        self.viewers.add(viewer)
+        if self._stop_timer:
+            self._stop_timer.cancel()
+            self._stop_timer = None
+        if self.tiles:
+            viewer.queue(self.header, dict(self.tiles), key=True)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_upstream())
+
+    def remove_viewer(self, viewer: ScreenViewer):
+        self.viewers.discard(viewer)
+        if not self.viewers and self._task and not self._stop_timer:
+            self._stop_timer = asyncio.get_running_loop().call_later(UPSTREAM_GRACE_SECONDS, self.stop)
+
+    def stop(self):
+        self._stop_timer = None
+        if self.viewers:
+            return
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self.tiles = {}
+        logger.info(f"Screen relay for {self.unique_id} stopped (no viewers)")
+
+    def _apply(self, message: bytes):
+        header, tiles = parse_message(message)
+        key = bool(header.get("key"))
+        if key:
+            self.tiles = {}
+        self.tiles.update(tiles)
+        self.header = {k: v for k, v in header.items() if k != "tiles"}
+        self.messages_received += 1
+        self.bytes_received += len(message) + 4
+        if tiles or key:
+            for viewer in self.viewers:
+                viewer.queue(self.header, tiles, key)
+
+    async def _run_upstream(self):
+        delay = RECONNECT_MIN_DELAY
+        timeout = httpx.Timeout(10.0, read=30.0)
+        while self.viewers:
+            try:
+                async with httpx.AsyncClient(timeout=timeout) as client:
+                    async with client.stream("GET", self.url, params=self.params) as response:
+                        if response.status_code != 200:
+                            raise RuntimeError(f"SUT returned HTTP {response.status_code}")
+                        self.connected = True
+                        delay = RECONNECT_MIN_DELAY
+                        logger.info(f"Screen relay for {self.unique_id} connected to {self.url}")
+
+                        buffer = bytearray()
+                        async for chunk in response.aiter_bytes():
+                            buffer += chunk
+                            while len(buffer) >= 4:
+                                length = struct.unpack('>I', buffer[:4])[0]
+                                if len(buffer) < 4 + length:
+                                    break
+                                self._apply(bytes(buffer[4:4 + length]))
+                                del buffer[:4 + length]
+                raise RuntimeError("SUT closed the stream")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.connected = False
+                if not self.viewers:
+                    break
+                self.reconnects += 1
+                logger.warning(f"Screen stream from {self.unique_id} lost ({e}), reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        self.connected = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "unique_id": self.unique_id,
+            "connected": self.connected,
+            "viewers": [v.stats() for v in self.viewers],
+            "messages_received": self.messages_received,
+            "bytes_received": self.bytes_received,
+            "bytes_sent": sum(v.bytes_sent for v in self.viewers),
+            "reconnects": self.reconnects,
+            "width": self.header.get("width"),
+            "height": self.header.get("height"),
+        }
+
+
+class ScreenRelayManager:
+    """Screen relays by SUT"""
+
+    def __init__(self):
+        self._relays: Dict[str, ScreenRelay] = {}
+
+    def get_relay(self, unique_id: str, url: str, params: Dict[str, Any]) -> ScreenRelay:
+        relay = self._relays.get(unique_id)
+        if relay is None or relay.url != url:
+            relay = ScreenRelay(unique_id, url, params)
+            self._relays[unique_id] = relay
+        return relay
+
+    async def watch(self, relay: ScreenRelay, websocket: WebSocket, max_fps: float):
+        """Serve a viewer until its WebSocket closes"""
+        viewer = ScreenViewer(websocket, max_fps)
+        relay.add_viewer(viewer)
+        sender = asyncio.create_task(viewer.run())
+        receiver = asyncio.create_task(self._wait_for_disconnect(websocket))
+        try:
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is sender and task.exception():
+                    logger.debug(f"Screen viewer for {relay.unique_id} send failed: {task.exception()}")
+        finally:
+            sender.cancel()
+            receiver.cancel()
+            relay.remove_viewer(viewer)
+
+    @staticmethod
+    async def _wait_for_disconnect(websocket: WebSocket):
+        # Viewers don't send anything meaningful; drain until the socket closes
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [relay.stats() for relay in self._relays.values() if relay.viewers or relay.connected]
+
+
+_manager: Optional[ScreenRelayManager] = None
+
+
+def get_screen_relay_manager() -> ScreenRelayManager:
+    """Get the global screen relay manager"""
+    global _manager
+    if _manager is None:
+        _manager = ScreenRelayManager()
+    return _manager
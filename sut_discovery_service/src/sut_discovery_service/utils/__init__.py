@@ -3,5 +3,7 @@ Utility modules for SUT Discovery Service.
 """
 
 from .network import NetworkDiscovery
+from .sut_client_pool import SUTClientPool, get_sut_client_pool
+from .sse_broadcaster import SSEBroadcaster, get_sse_broadcaster
 
-__all__ = ["NetworkDiscovery"]
+__all__ = ["NetworkDiscovery", "SUTClientPool", "get_sut_client_pool", "SSEBroadcaster", "get_sse_broadcaster"]
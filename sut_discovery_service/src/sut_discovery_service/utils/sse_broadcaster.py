@@ -0,0 +1,206 @@
+"""
+SSE Broadcaster - fan-out of SUT events to Server-Sent Events clients.
+
+Each client (a browser tab on /api/suts/events) gets a bounded buffer. A tab
+that stops reading loses its oldest events rather than growing memory
+without bound, and is sent a "resync" event so it refetches the device list.
+
+Status events for one SUT are coalesced: the first goes out immediately,
+later ones within the coalescing window are held and only the latest is
+sent when the window closes. A SUT flapping online/offline costs each client
+a couple of events per window, not one per flap.
+
+Events are numbered <boot>-<seq> and the last few hundred are kept, so a
+client reconnecting with Last-Event-ID gets what it missed. An ID from
+before a restart or older than the replay buffer, or more missed events than
+the client's buffer holds, gets a "resync" instead.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from ..config import get_config
+
+logger = logging.getLogger(__name__)
+
+
+def _resync(reason: str) -> Tuple[None, str]:
+    return None, json.dumps({"type": "resync", "data": {"reason": reason}})
+
+
+class SSEClient:
+    """One SSE connection's pending events (drop-oldest when full)"""
+
+    def __init__(self, max_queue: int):
+        self.max_queue = max_queue
+        self._events: Deque[Tuple[Optional[str], str]] = deque()
+        self._ready = asyncio.Event()
+        self._lagged = False
+        self.sent = 0
+        self.dropped = 0
+        self.connected_at = time.time()
+
+    def push(self, event_id: Optional[str], payload: str):
+        if len(self._events) >= self.max_queue:
+            self._events.popleft()
+            self.dropped += 1
+            self._lagged = True
+        self._events.append((event_id, payload))
+        self._ready.set()
+
+    async def get(self, timeout: float) -> List[Tuple[Optional[str], str]]:
+        """
+        All pending (event_id, payload) pairs, oldest first, waiting up to
+        timeout for one ([] if none came). After events were dropped, a
+        resync event goes first.
+        """
+        if not self._events and not self._lagged:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        events = list(self._events)
+        self._events.clear()
+        self.sent += len(events)
+        if self._lagged:
+            self._lagged = False
+            events.insert(0, _resync("lagged"))
+        return events
+
+    @property
+    def queued(self) -> int:
+        return len(self._events)
+
+
+class SSEBroadcaster:
+    """SSE clients, event IDs, replay buffer and per-SUT coalescing"""
+
+    def __init__(self, queue_size: int = 256, coalesce_window: float = 0.5, replay_size: int = 500):
+        self.queue_size = queue_size
+        self.coalesce_window = coalesce_window
+        self._epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._clients: Set[SSEClient] = set()
+        self._history: Deque[Tuple[int, str]] = deque(maxlen=replay_size)
+        # coalesce key -> (last payload sent, latest held back or None)
+        self._windows: Dict[str, Tuple[str, Optional[str]]] = {}
+        self.published = 0
+        self.coalesced = 0
+        self.replayed = 0
+        self.resyncs = 0
+
+    @property
+    def last_event_id(self) -> str:
+        return f"{self._epoch}-{self._seq}"
+
+    def publish(self, event_type: str, data: Dict[str, Any], coalesce_key: Optional[str] = None):
+        """
+        Send an event to all clients.
+
+        Args:
+            event_type: Event type (the "type" field clients switch on)
+            data: Event data
+            coalesce_key: Events sharing a key (e.g. a SUT's status) are
+                coalesced within the window; None sends every event
+        """
+        payload = json.dumps({"type": event_type, "data": data})
+        if coalesce_key is None or self.coalesce_window <= 0:
+            self._emit(payload)
+            return
+
+        window = self._windows.get(coalesce_key)
+        if window is None:
+            self._emit(payload)
+            self._windows[coalesce_key] = (payload, None)
+            asyncio.get_running_loop().call_later(self.coalesce_window, self._close_window, coalesce_key)
+        else:
+            if window[1] is not None:
+                self.coalesced += 1
+            self._windows[coalesce_key] = (window[0], payload)
+
+    def _close_window(self, key: str):
+        last_sent, held = self._windows.pop(key, (None, None))
+        if held is None:
+            return
+        if held == last_sent:
+            self.coalesced += 1
+            return
+        # Send the latest state and keep coalescing while the SUT is still changing
+        self._emit(held)
+        self._windows[key] = (held, None)
+        asyncio.get_running_loop().call_later(self.coalesce_window, self._close_window, key)
+
+    def _emit(self, payload: str):
+        self._seq += 1
+        self.published += 1
+        self._history.append((self._seq, payload))
+        event_id = self.last_event_id
+        for client in self._clients:
+            client.push(event_id, payload)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> SSEClient:
+        """
+        Add a client; with last_event_id, queue the events it missed (or a
+        resync if they are no longer available or don't fit its buffer).
+        """
+        client = SSEClient(self.queue_size)
+        self._clients.add(client)
+        if last_event_id:
+            missed = self._since(last_event_id)
+            if missed is None:
+                self.resyncs += 1
+                client.push(*_resync("replay_unavailable"))
+            elif len(missed) > self.queue_size:
+                # More than the client's buffer holds: a partial replay would
+                # silently skip the oldest events, so resync instead
+                self.resyncs += 1
+                client.push(*_resync("replay_too_large"))
+            else:
+                self.replayed += len(missed)
+                for seq, payload in missed:
+                    client.push(f"{self._epoch}-{seq}", payload)
+        return client
+
+    def unsubscribe(self, client: SSEClient):
+        self._clients.discard(client)
+
+    def _since(self, last_event_id: str) -> Optional[list]:
+        """Events after last_event_id, or None if that ID can't be resumed from"""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._history[0][0] if self._history else self._seq + 1
+        if seq > self._seq or seq < oldest - 1:
+            return None
+        return [event for event in self._history if event[0] > seq]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "last_event_id": self.last_event_id,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+            "queued": sum(client.queued for client in self._clients),
+            "dropped": sum(client.dropped for client in self._clients),
+        }
+
+
+_broadcaster: Optional[SSEBroadcaster] = None
+
+
+def get_sse_broadcaster() -> SSEBroadcaster:
+    """Get the global SSE broadcaster"""
+    global _broadcaster
+    if _broadcaster is None:
+        config = get_config()
+        _broadcaster = SSEBroadcaster(config.sse_queue_size, config.sse_coalesce_window, config.sse_replay_size)
+    return _broadcaster
@@ -0,0 +1,206 @@
+"""
+SUT Client Pool - long-lived HTTP clients for proxied SUT calls.
+
+Every RPX and Preset-Manager call to a SUT goes through the proxy. Opening a
+new httpx.AsyncClient per call meant a TCP handshake per call, so each SUT
+now gets one client with a small keep-alive pool, created on first use.
+
+A client is bound to the SUT's address. When the DeviceRegistry reports a new
+IP or port for the device, the next call gets a fresh client; the old one is
+closed once its in-flight requests finish.
+
+The pool also records the latency (time to response headers) and errors of
+the calls made to each SUT - over HTTP or over its WebSocket RPC channel -
+exported by the proxy's /proxy-stats.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+
+from ..config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per SUT for percentiles
+LATENCY_SAMPLES = 200
+
+
+class SUTClient:
+    """HTTP client bound to one SUT address"""
+
+    def __init__(self, ip: str, port: int, max_connections: int, keepalive_expiry: float):
+        self.ip = ip
+        self.port = port
+        self.client = httpx.AsyncClient(
+            base_url=f"http://{ip}:{port}",
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=keepalive_expiry),
+        )
+        self.created_at = time.time()
+        self.in_flight = 0
+        self.retired = False
+
+    def retire(self):
+        """Close once the last in-flight call is done"""
+        self.retired = True
+        if self.in_flight == 0:
+            asyncio.get_running_loop().create_task(self.client.aclose())
+
+
+class SUTMetrics:
+    """Calls made to one SUT through the proxy"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_received = 0
+        self.recycled = 0
+        self.rpc_requests = 0
+        self.rpc_fallbacks = 0
+        self.status_counts: Dict[int, int] = {}
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+
+    def record(self, latency_ms: float, status_code: Optional[int] = None, error: Optional[Exception] = None,
+               rpc: bool = False):
+        self.requests += 1
+        if rpc:
+            self.rpc_requests += 1
+        self.latencies_ms.append(latency_ms)
+        if status_code is not None:
+            self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        if error is not None:
+            self.record_error(error)
+
+    def record_error(self, error: Exception):
+        self.errors += 1
+        if isinstance(error, httpx.TimeoutException):
+            self.timeouts += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        self.last_error_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "status_counts": {str(code): count for code, count in sorted(self.status_counts.items())},
+            "bytes_received": self.bytes_received,
+            "latency_ms": {
+                "avg": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 1) if latencies else None,
+            },
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+            "recycled": self.recycled,
+            "rpc_requests": self.rpc_requests,
+            "rpc_fallbacks": self.rpc_fallbacks,
+        }
+
+
+class SUTClientPool:
+    """One SUTClient per device, recycled when the device's address changes"""
+
+    def __init__(self, max_connections: int = 8, keepalive_expiry: float = 30.0):
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[str, SUTClient] = {}
+        self._metrics: Dict[str, SUTMetrics] = {}
+
+    def get_client(self, unique_id: str, ip: str, port: int) -> SUTClient:
+        """Client for the device's current address"""
+        client = self._clients.get(unique_id)
+        if client is not None and (client.ip, client.port) == (ip, port):
+            return client
+
+        if client is not None:
+            logger.info(f"SUT {unique_id} moved {client.ip}:{client.port} -> {ip}:{port}, recycling its client")
+            self.metrics(unique_id).recycled += 1
+            client.retire()
+        client = SUTClient(ip, port, self.max_connections, self.keepalive_expiry)
+        self._clients[unique_id] = client
+        return client
+
+    def metrics(self, unique_id: str) -> SUTMetrics:
+        metrics = self._metrics.get(unique_id)
+        if metrics is None:
+            metrics = self._metrics[unique_id] = SUTMetrics()
+        return metrics
+
+    def acquire(self, unique_id: str, ip: str, port: int) -> SUTClient:
+        """Client for one call; pair with release()"""
+        client = self.get_client(unique_id, ip, port)
+        client.in_flight += 1
+        return client
+
+    async def release(self, client: SUTClient):
+        """End a call; a recycled client is closed after its last call"""
+        client.in_flight -= 1
+        if client.retired and client.in_flight == 0:
+            await client.client.aclose()
+
+    @asynccontextmanager
+    async def use(self, unique_id: str, ip: str, port: int) -> AsyncIterator[httpx.AsyncClient]:
+        """Client for one call"""
+        client = self.acquire(unique_id, ip, port)
+        try:
+            yield client.client
+        finally:
+            await self.release(client)
+
+    def remove(self, unique_id: str):
+        """Drop a device's client and metrics (device removed from the registry)"""
+        client = self._clients.pop(unique_id, None)
+        self._metrics.pop(unique_id, None)
+        if client is not None:
+            client.retire()
+
+    async def close_all(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.retired = True
+            await client.client.aclose()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        stats = []
+        for unique_id, metrics in self._metrics.items():
+            client = self._clients.get(unique_id)
+            stats.append(dict(
+                metrics.stats(),
+                unique_id=unique_id,
+                ip=client.ip if client else None,
+                port=client.port if client else None,
+                in_flight=client.in_flight if client else 0,
+                client_age_seconds=int(time.time() - client.created_at) if client else None,
+            ))
+        return stats
+
+
+_pool: Optional[SUTClientPool] = None
+
+
+def get_sut_client_pool() -> SUTClientPool:
+    """Get the global SUT client pool"""
+    global _pool
+    if _pool is None:
+        config = get_config()
+        _pool = SUTClientPool(config.proxy_max_connections, config.proxy_keepalive_expiry)
+    return _pool